@@ -19,6 +19,7 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+from . import role_restriction_mixin
 from . import access_role
 from . import button_registry
 from . import domain_model
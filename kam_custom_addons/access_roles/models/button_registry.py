@@ -28,12 +28,15 @@ class ButtonRegistry(models.Model):
     """Class for representing buttons"""
     _name = 'button.registry'
     _description = 'Button Registry'
+    _inherit = ['role.restriction.mixin']
 
     name = fields.Char(string='Button Name', required=True)
     action_name = fields.Char(string='Action/Method Name')
     model_id = fields.Many2one('ir.model', string='Model', ondelete='cascade')
     view_ids = fields.Many2many('ir.ui.view', string='View')
 
+    _role_restriction_fields = ('action_name', 'model_id')
+
     @api.model
     def _register_hook(self):
         """
@@ -41,7 +44,8 @@ class ButtonRegistry(models.Model):
         Calls `get_all_buttons` to populate the button registry.
         """
         super()._register_hook()
-        self.get_all_buttons()
+        # The new buttons are not restricted by any role yet
+        self.with_context(role_restrictions_batch=True).get_all_buttons()
         return True
 
     def get_all_buttons(self):
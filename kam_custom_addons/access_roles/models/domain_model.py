@@ -36,3 +36,22 @@ class DomainModel(models.Model):
         """Computes the technical name of the selected model."""
         for record in self:
             record.domain_model_name = record.domain_model_id.model if record.domain_model_id else None
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidate the cached role domains of the record rules."""
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        """Invalidate the cached role domains of the record rules."""
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Invalidate the cached role domains of the record rules."""
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
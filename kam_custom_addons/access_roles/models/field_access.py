@@ -25,6 +25,7 @@ from odoo import api, fields, models
 class FieldAccess(models.Model):
     """Manages access control for fields, buttons, tabs, and models."""
     _name = 'field.access'
+    _inherit = ['role.restriction.mixin']
 
     model_id = fields.Many2one('ir.model', domain="[('model', '!=', 'access.role')]")
     button_invisible = fields.Char(help='Field for setting button visibility')
@@ -61,6 +62,14 @@ class FieldAccess(models.Model):
     domain_access_id = fields.Many2one('role.management')
     domain_id = fields.Many2one('domain.model')
 
+    _role_restriction_fields = (
+        'model_id', 'access_field_id', 'access_model_id', 'button_access_id',
+        'filter_access_id', 'fields_ids', 'button_ids', 'tab_ids', 'filter_ids',
+        'group_ids', 'is_field_readonly', 'is_field_invisible',
+        'is_field_required', 'is_remove_link', 'is_model_readonly',
+        'is_hide_create', 'is_hide_delete', 'is_hide_duplicate',
+    )
+
     @api.onchange('model_id')
     def _onchange_model_id(self):
         """Clears related fields when the model is changed."""
@@ -28,6 +28,7 @@ class FilterRegistry(models.Model):
     """Stores and manages filters from search views."""
     _name = 'filter.registry'
     _description = 'Filter Registry'
+    _inherit = ['role.restriction.mixin']
 
     name = fields.Char(string='Filter Name', required=True)
     domain = fields.Char(string='Domain')
@@ -36,11 +37,14 @@ class FilterRegistry(models.Model):
     model_id = fields.Many2one('ir.model', string='Model', ondelete='cascade')
     view_ids = fields.Many2many('ir.ui.view', string='View')
 
+    _role_restriction_fields = ('name', 'active', 'model_id')
+
     @api.model
     def _register_hook(self):
         """Triggers filter extraction during module initialization."""
         super()._register_hook()
-        self.get_all_filters()
+        self.with_context(role_restrictions_batch=True).get_all_filters()
+        self._clear_role_restrictions_cache()
         return True
 
     def _get_filter_elements_from_arch(self, arch):
@@ -28,6 +28,7 @@ class GroupByRegistry(models.Model):
     """Stores and manages group_by filters from search views."""
     _name = 'groupby.registry'
     _description = 'GroupBy Registry'
+    _inherit = ['role.restriction.mixin']
 
     name = fields.Char(string='GroupBy Name', required=True)
     context = fields.Char(string='Context')
@@ -36,11 +37,14 @@ class GroupByRegistry(models.Model):
     model_id = fields.Many2one('ir.model', string='Model', ondelete='cascade')
     view_ids = fields.Many2many('ir.ui.view', string='View')
 
+    _role_restriction_fields = ('name', 'active', 'model_id')
+
     @api.model
     def _register_hook(self):
         """Triggers group_by extraction during module initialization."""
         super()._register_hook()
-        self.get_all_groupby()
+        self.with_context(role_restrictions_batch=True).get_all_groupby()
+        self._clear_role_restrictions_cache()
         return True
 
     def _extract_groupby_attributes(self, filter_tag):
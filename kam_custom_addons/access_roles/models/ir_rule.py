@@ -19,7 +19,7 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
-from odoo import models
+from odoo import api, models, tools
 from odoo.fields import Domain
 from odoo.tools.safe_eval import safe_eval
 
@@ -32,16 +32,34 @@ class IrRule(models.Model):
         """
         Override _compute_domain to include role-based domain restrictions.
         """
-        user = self.env.user
-        user_roles = user.access_role_id.role_management_id
-        role_domains = []
-        for role in user_roles:
-            for access in role.domain_ids:
-                if access.domain_model_name == model_name and access.name:
-                    role_domains.append(safe_eval(access.name))
         base_domain = super()._compute_domain(model_name, mode=mode)
-        if role_domains:
-            role_domain_combined = Domain.OR(role_domains)
+        role_management = self.env.user.access_role_id.role_management_id
+        if not role_management:
+            return base_domain
+        role_domain_combined = self._compute_role_domain(
+            role_management.id, model_name, mode,
+            tuple(self._compute_domain_context_values()))
+        if role_domain_combined is not None:
             return Domain.AND([base_domain,
                                role_domain_combined]) if base_domain else role_domain_combined
         return base_domain
+
+    @api.model
+    @tools.ormcache('role_management_id', 'model_name', 'mode', 'context_values')
+    def _compute_role_domain(self, role_management_id, model_name, mode, context_values):
+        """
+        Combined domain of the role on the model, evaluated once per role,
+        model, mode and company context. The cache is keyed by role, not by
+        user, so it is only cleared when the domains change.
+
+        :return: the union of the role domains, None when the role has no
+            domain on the model
+        """
+        role = self.env['role.management'].sudo().browse(role_management_id)
+        role_domains = []
+        for access in role.domain_ids:
+            if access.domain_model_name == model_name and access.name:
+                role_domains.append(safe_eval(access.name))
+        if not role_domains:
+            return None
+        return Domain.OR(role_domains)
@@ -19,7 +19,15 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
-from odoo import models
+from odoo import api, models, tools
+
+# Attribute identifying the restricted nodes of each tag
+RESTRICTED_NODE_KEYS = {
+    'button': 'name',
+    'page': 'string',
+    'filter': 'string',
+    'field': 'name',
+}
 
 
 class IrUiView(models.Model):
@@ -36,138 +44,150 @@ class IrUiView(models.Model):
         role_management = current_user_access_role.role_management_id
         if not role_management:
             return tree
+        restrictions = self._get_role_restrictions(role_management.id, current_model)
+        return self._apply_role_restrictions(tree, restrictions)
+
+    def _apply_role_restrictions(self, tree, restrictions):
+        """Apply the compiled restrictions of the role in one pass over the
+        nodes of the view."""
+        nodes = restrictions['nodes']
+        views = restrictions['views']
+        hide_buttons = (restrictions['hide_form_buttons']
+                        and next(tree.iter('form'), None) is not None)
+        tags = set(nodes) | set(views)
+        if hide_buttons:
+            tags.add('button')
+        if not tags:
+            return tree
+        for node in tree.iter(*tags):
+            if node.tag in views:
+                attributes = views[node.tag]
+            else:
+                attributes = nodes.get(node.tag, {}).get(
+                    node.get(RESTRICTED_NODE_KEYS[node.tag]), {})
+            if hide_buttons and node.tag == 'button':
+                node.set('invisible', 'True')
+            for name, value in attributes.items():
+                node.set(name, value)
+        return tree
+
+    @api.model
+    @tools.ormcache('role_management_id', 'model_name')
+    def _get_role_restrictions(self, role_management_id, model_name):
+        """Compile the restrictions of a role on the views of a model.
+
+        The result is cached until a role record changes, see
+        ``_clear_role_restrictions_cache``.
+
+        :return: dict with the attributes of the restricted nodes by tag and
+            node name, the attributes of the form, list and kanban nodes and
+            whether the buttons of the form views are hidden
+        """
+        role_management = self.env['role.management'].sudo().browse(role_management_id)
         button_access_records = role_management.button_access_ids
         filter_access_records = role_management.filter_access_ids
         field_access_records = role_management.field_access_ids
         model_access_records = role_management.model_access_ids
-        tree = self._process_button_access(tree, button_access_records, current_model)
-        tree = self._process_tab_access(tree, button_access_records, current_model)
-        tree = self._process_filter_access(tree, filter_access_records, current_model)
-        tree = self._process_field_access(tree, field_access_records, current_model)
-        tree = self._process_model_access(tree, model_access_records, role_management,
-                                          current_model)
-        return tree
+        nodes = {
+            'button': self._get_button_restrictions(button_access_records, model_name),
+            'page': self._get_tab_restrictions(button_access_records, model_name),
+            'filter': self._get_filter_restrictions(filter_access_records, model_name),
+            'field': self._get_field_restrictions(field_access_records, model_name),
+        }
+        views, hide_form_buttons = self._get_model_restrictions(
+            model_access_records, role_management, model_name)
+        return {
+            'nodes': {tag: restricted for tag, restricted in nodes.items() if restricted},
+            'views': {tag: attributes for tag, attributes in views.items() if attributes},
+            'hide_form_buttons': hide_form_buttons,
+        }
 
-    def _process_button_access(self, tree, button_access_records, current_model):
-        """Process button access restrictions."""
-        for button in button_access_records:
-            for button_node in tree.xpath('//button'):
-                button_name = button_node.get('name')
-                for record in button.button_ids:
-                    if current_model == record.model_id.model and button_name == record.action_name:
-                        button_node.set('invisible', 'True')
-        return tree
+    @api.model
+    def _clear_role_restrictions_cache(self):
+        """Invalidate the compiled role restrictions.
 
-    def _process_tab_access(self, tree, button_access_records, current_model):
-        """Process tab access restrictions."""
-        for tab in button_access_records:
-            for tab_node in tree.xpath('//page'):
-                tab_name = tab_node.get('string')
-                for record in tab.tab_ids:
-                    if current_model == record.model_id.model and tab_name == record.name:
-                        tab_node.set('invisible', 'True')
-        return tree
+        The other workers are only signaled the invalidation of a whole
+        ormcache, so this clears the default cache: the restriction records
+        are only written through ``role.restriction.mixin``, which skips the
+        writes of the fields the restrictions are not compiled from and lets
+        the registry population of ``_register_hook`` invalidate them once.
+        """
+        self.env.registry.clear_cache()
 
-    def _process_filter_access(self, tree, filter_access_records, current_model):
-        """Process filter and groupBy access restrictions."""
-        for groupby in filter_access_records:
-            for filter_node in tree.xpath('//filter'):
-                filter_name = filter_node.get('string')
-                for record in groupby.filter_ids:
-                    if current_model == record.model_id.model and filter_name == record.name:
-                        filter_node.set('invisible', 'True')
-                for record in groupby.group_ids:
-                    if current_model == record.model_id.model and filter_name == record.name:
-                        filter_node.set('invisible', 'True')
-        return tree
+    def _get_button_restrictions(self, button_access_records, current_model):
+        """Attributes of the restricted buttons by action name."""
+        buttons = button_access_records.button_ids.filtered(
+            lambda record: record.model_id.model == current_model)
+        return {
+            action_name: {'invisible': 'True'}
+            for action_name in buttons.mapped('action_name') if action_name
+        }
 
-    def _process_field_access(self, tree, field_access_records, current_model):
-        """Process field access restrictions."""
-        for field_model in field_access_records.fields_ids:
-            for field_node in tree.xpath('//field'):
-                field_name = field_node.get('name')
-                if field_model.model_id.model == current_model and field_name == field_model.name:
-                    field_access = field_access_records.filtered(
-                        lambda f: field_name in f.fields_ids.mapped("name"))
-                    if field_access:
-                        self._apply_field_attributes(field_node, field_access)
-        return tree
+    def _get_tab_restrictions(self, button_access_records, current_model):
+        """Attributes of the restricted tabs by string."""
+        tabs = button_access_records.tab_ids.filtered(
+            lambda record: record.model_id.model == current_model)
+        return {name: {'invisible': 'True'} for name in tabs.mapped('name')}
+
+    def _get_filter_restrictions(self, filter_access_records, current_model):
+        """Attributes of the restricted filters and groupBy by string."""
+        filters = filter_access_records.filter_ids.filtered(
+            lambda record: record.model_id.model == current_model)
+        groupbys = filter_access_records.group_ids.filtered(
+            lambda record: record.model_id.model == current_model)
+        return {
+            name: {'invisible': 'True'}
+            for name in filters.mapped('name') + groupbys.mapped('name')
+        }
 
-    def _apply_field_attributes(self, field_node, field_access):
-        """Apply attributes to field nodes based on access rights."""
+    def _get_field_restrictions(self, field_access_records, current_model):
+        """Attributes of the restricted fields by name."""
+        field_names = field_access_records.fields_ids.filtered(
+            lambda field: field.model_id.model == current_model).mapped('name')
+        restrictions = {}
+        for field_name in field_names:
+            field_access = field_access_records.filtered(
+                lambda f: field_name in f.fields_ids.mapped("name"))
+            restrictions[field_name] = self._get_field_attributes(field_access)
+        return restrictions
+
+    def _get_field_attributes(self, field_access):
+        """Attributes of field nodes based on access rights."""
+        attributes = {}
         if any(field_access.mapped("is_field_required")):
-            field_node.set("required", "1")
+            attributes["required"] = "1"
         if any(field_access.mapped("is_field_invisible")):
-            field_node.set("invisible", "1")
+            attributes["invisible"] = "1"
         if any(field_access.mapped("is_field_readonly")):
-            field_node.set("readonly", "1")
+            attributes["readonly"] = "1"
         if any(field_access.mapped("is_remove_link")):
-            field_node.set("options", '{"no_open": true}')
-
-    def _process_model_access(self, tree, model_access_records, role_management,
-                              current_model):
-        """Process model access restrictions for form, list, and kanban views."""
-        tree = self._process_form_access(tree, model_access_records, role_management,
-                                         current_model)
-        tree = self._process_list_access(tree, model_access_records, role_management,
-                                         current_model)
-        tree = self._process_kanban_access(tree, model_access_records,
-                                           role_management, current_model)
-        return tree
+            attributes["options"] = '{"no_open": true}'
+        return attributes
 
-    def _process_form_access(self, tree, model_access_records, role_management,
-                             current_model):
-        """Process form view access restrictions."""
-        for model_node in tree.xpath('//form'):
-            if role_management.is_readonly:
-                model_node.set("edit", "false")
-                model_node.set("create", "false")
-            for model in model_access_records:
-                if current_model == model.model_id.model:
-                    if model.is_model_readonly:
-                        model_node.set("edit", "false")
-                        model_node.set("create", "false")
-                        for button_node in model_node.xpath('//button'):
-                            button_node.set('invisible', 'True')
-                    if model.is_hide_create:
-                        model_node.set("create", "false")
-                    if model.is_hide_delete:
-                        model_node.set("delete", "false")
-                    if model.is_hide_duplicate:
-                        model_node.set("duplicate", "false")
-        return tree
-
-    def _process_list_access(self, tree, model_access_records, role_management,
-                             current_model):
-        """Process list view access restrictions."""
-        for list_node in tree.xpath('//list'):
-            if role_management.is_readonly:
-                list_node.set("edit", "false")
-                list_node.set("create", "false")
-            for model in model_access_records:
-                if current_model == model.model_id.model:
-                    if model.is_model_readonly:
-                        list_node.set("create", "false")
-                    if model.is_hide_create:
-                        list_node.set("create", "false")
-                    if model.is_hide_delete:
-                        list_node.set("delete", "false")
-                    if model.is_hide_duplicate:
-                        list_node.set("duplicate", "false")
-        return tree
-
-    def _process_kanban_access(self, tree, model_access_records, role_management,
-                               current_model):
-        """Process kanban view access restrictions."""
-        for kanban_node in tree.xpath('//kanban'):
-            if role_management.is_readonly:
-                kanban_node.set("edit", "false")
-                kanban_node.set("create", "false")
-            for model in model_access_records:
-                if current_model == model.model_id.model:
-                    if model.is_model_readonly:
-                        kanban_node.set("edit", "false")
-                        kanban_node.set("create", "false")
-                    if model.is_hide_create:
-                        kanban_node.set("create", "false")
-        return tree
+    def _get_model_restrictions(self, model_access_records, role_management,
+                                current_model):
+        """Attributes of the form, list and kanban nodes and whether the
+        buttons of the form views are hidden."""
+        form, list_, kanban = {}, {}, {}
+        hide_form_buttons = False
+        if role_management.is_readonly:
+            for attributes in (form, list_, kanban):
+                attributes.update(edit="false", create="false")
+        for model in model_access_records:
+            if current_model != model.model_id.model:
+                continue
+            if model.is_model_readonly:
+                form.update(edit="false", create="false")
+                list_["create"] = "false"
+                kanban.update(edit="false", create="false")
+                hide_form_buttons = True
+            if model.is_hide_create:
+                for attributes in (form, list_, kanban):
+                    attributes["create"] = "false"
+            if model.is_hide_delete:
+                form["delete"] = "false"
+                list_["delete"] = "false"
+            if model.is_hide_duplicate:
+                form["duplicate"] = "false"
+                list_["duplicate"] = "false"
+        return {'form': form, 'list': list_, 'kanban': kanban}, hide_form_buttons
@@ -26,7 +26,7 @@ class RoleManagement(models.Model):
     """Manages access roles, permissions, and system restrictions for users."""
     _name = 'role.management'
     _description = 'Role Management'
-    _inherit = ['mail.thread']
+    _inherit = ['mail.thread', 'role.restriction.mixin']
 
     name = fields.Char(string='Name', required=True)
     domain_ids = fields.Many2many('domain.model')
@@ -53,6 +53,11 @@ class RoleManagement(models.Model):
     domain_access_ids = fields.One2many('field.access', 'domain_access_id')
     filter_access_ids = fields.One2many('field.access', 'filter_access_id')
 
+    _role_restriction_fields = (
+        'is_readonly', 'field_access_ids', 'model_access_ids',
+        'button_access_ids', 'filter_access_ids',
+    )
+
     @api.depends('role_ids')
     def _compute_selected_role_ids(self):
         """Compute selected roles to prevent duplicate role assignments."""
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# License AGPL-3.0 (https://www.gnu.org/licenses/agpl-3.0.html).
+from odoo import api, models
+
+
+class RoleRestrictionMixin(models.AbstractModel):
+    """Invalidate the compiled role restrictions of the views when the
+    records they are compiled from change"""
+    _name = 'role.restriction.mixin'
+    _description = 'Role Restriction Mixin'
+
+    # Fields the role restrictions of the views are compiled from, see
+    # ir.ui.view._get_role_restrictions
+    _role_restriction_fields = ()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidate the compiled role restrictions of the views."""
+        records = super().create(vals_list)
+        self._clear_role_restrictions_cache()
+        return records
+
+    def write(self, vals):
+        """Invalidate the compiled role restrictions of the views when a
+        field they are compiled from is written."""
+        result = super().write(vals)
+        if not set(self._role_restriction_fields).isdisjoint(vals):
+            self._clear_role_restrictions_cache()
+        return result
+
+    def unlink(self):
+        """Invalidate the compiled role restrictions of the views."""
+        result = super().unlink()
+        self._clear_role_restrictions_cache()
+        return result
+
+    @api.model
+    def _clear_role_restrictions_cache(self):
+        """Invalidate the compiled role restrictions of the views, unless
+        the ``role_restrictions_batch`` context key is set by a caller
+        invalidating them once after a batch of changes."""
+        if not self.env.context.get('role_restrictions_batch'):
+            self.env['ir.ui.view']._clear_role_restrictions_cache()
@@ -28,16 +28,21 @@ class TabRegistry(models.Model):
     """Class for representing tabs"""
     _name = 'tab.registry'
     _description = 'Tab Registry'
+    _inherit = ['role.restriction.mixin']
 
     name = fields.Char(string='Tab Name', required=True)
     view_ids = fields.Many2many('ir.ui.view', string='View')
+
     model_id = fields.Many2one('ir.model', string='Model', ondelete='cascade')
 
+    _role_restriction_fields = ('name', 'model_id')
+
     @api.model
     def _register_hook(self):
         """Triggers filter extraction during module initialization."""
         super()._register_hook()
-        self.get_all_tabs()
+        # The new tabs are not restricted by any role yet
+        self.with_context(role_restrictions_batch=True).get_all_tabs()
         return True
 
     def get_all_tabs(self):
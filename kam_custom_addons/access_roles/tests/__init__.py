@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+# License AGPL-3.0 (https://www.gnu.org/licenses/agpl-3.0.html).
+from . import test_ir_ui_view
+from . import test_ir_rule
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# License AGPL-3.0 (https://www.gnu.org/licenses/agpl-3.0.html).
+from odoo import Command
+from odoo.tests import tagged
+
+from .test_ir_ui_view import RoleRestrictionCommon
+
+
+@tagged('post_install', '-at_install')
+class TestRoleDomains(RoleRestrictionCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env['res.partner'].create([
+            {'name': 'Role Partner A'},
+            {'name': 'Role Partner B'},
+        ])
+        cls.domain = cls.env['domain.model'].create({
+            'name': "[('name', '=', 'Role Partner A')]",
+            'domain_model_id': cls.env['ir.model']._get('res.partner').id,
+        })
+        cls.role_management.domain_ids = [Command.link(cls.domain.id)]
+
+    def _search_partners(self):
+        return self.env['res.partner'].with_user(self.user).search([
+            ('id', 'in', self.partners.ids)])
+
+    def test_role_domain(self):
+        self.assertEqual(self._search_partners(), self.partners[0])
+
+    def test_role_domain_changes(self):
+        self.assertEqual(self._search_partners(), self.partners[0])
+
+        self.domain.name = "[('name', '=', 'Role Partner B')]"
+        self.assertEqual(self._search_partners(), self.partners[1])
+
+        self.domain.name = "[('name', 'like', 'Role Partner')]"
+        self.assertEqual(self._search_partners(), self.partners)
+
+    def test_user_role_changes(self):
+        self.assertEqual(self._search_partners(), self.partners[0])
+
+        self.access_role.role_management_id = self.env['role.management'].create({
+            'name': 'Unrestricted Role',
+        })
+        self.assertEqual(self._search_partners(), self.partners)
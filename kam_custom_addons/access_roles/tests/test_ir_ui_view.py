@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# License AGPL-3.0 (https://www.gnu.org/licenses/agpl-3.0.html).
+import logging
+import time
+from unittest.mock import patch
+
+from lxml import etree
+
+from odoo import Command
+from odoo.tests import common, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+class RoleRestrictionCommon(common.TransactionCase):
+    """Role assigned to a user with field, button and model restrictions"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_management = cls.env['role.management'].create({
+            'name': 'Restricted Role',
+        })
+        cls.access_role = cls.env['access.role'].create({
+            'name': 'Restricted',
+            'role_management_id': cls.role_management.id,
+            'groups_ids': [Command.set(cls.env.ref('base.group_user').ids)],
+        })
+        cls.user = cls.env['res.users'].create({
+            'name': 'Restricted User',
+            'login': 'restricted_user',
+            'access_role_id': cls.access_role.id,
+        })
+
+    def _get_model(self, model_name):
+        return self.env['ir.model']._get(model_name)
+
+    def _restrict_fields(self, model_name, field_names, **flags):
+        fields = self.env['ir.model.fields'].search([
+            ('model', '=', model_name), ('name', 'in', field_names)])
+        return self.env['field.access'].create({
+            'access_field_id': self.role_management.id,
+            'model_id': self._get_model(model_name).id,
+            'fields_ids': [Command.set(fields.ids)],
+            **flags,
+        })
+
+    def _get_form_arch(self, model_name):
+        view = self.env[model_name].with_user(self.user).get_view(view_type='form')
+        return etree.fromstring(view['arch'])
+
+
+@tagged('post_install', '-at_install')
+class TestRoleRestrictions(RoleRestrictionCommon):
+
+    def test_field_restrictions(self):
+        self._restrict_fields('res.partner', ['email'], is_field_readonly=True,
+                              is_remove_link=True)
+        arch = self._get_form_arch('res.partner')
+        for node in arch.xpath("//field[@name='email']"):
+            self.assertEqual(node.get('readonly'), '1')
+            self.assertEqual(node.get('options'), '{"no_open": true}')
+        self.assertNotEqual(
+            arch.xpath("//field[@name='name']")[0].get('readonly'), '1')
+
+    def test_model_restrictions(self):
+        self.env['field.access'].create({
+            'access_model_id': self.role_management.id,
+            'model_id': self._get_model('res.partner').id,
+            'is_hide_delete': True,
+            'is_hide_duplicate': True,
+        })
+        arch = self._get_form_arch('res.partner')
+        self.assertEqual(arch.get('delete'), 'false')
+        self.assertEqual(arch.get('duplicate'), 'false')
+        self.assertNotEqual(arch.get('edit'), 'false')
+
+    def test_restrictions_follow_role_changes(self):
+        field_access = self._restrict_fields('res.partner', ['email'],
+                                             is_field_invisible=True)
+        arch = self._get_form_arch('res.partner')
+        self.assertEqual(arch.xpath("//field[@name='email']")[0].get('invisible'), '1')
+
+        field_access.is_field_invisible = False
+        arch = self._get_form_arch('res.partner')
+        self.assertNotEqual(arch.xpath("//field[@name='email']")[0].get('invisible'), '1')
+
+        self.role_management.is_readonly = True
+        arch = self._get_form_arch('res.partner')
+        self.assertEqual(arch.get('edit'), 'false')
+        self.assertEqual(arch.get('create'), 'false')
+
+    def test_restrictions_cache_scope(self):
+        Registry = type(self.env.registry)
+        with patch.object(Registry, 'clear_cache') as clear_cache:
+            self.role_management.name = 'Renamed Role'
+            clear_cache.assert_not_called()
+            self.role_management.is_readonly = True
+            clear_cache.assert_called_once()
+
+    def test_registry_population_clears_once(self):
+        Registry = type(self.env.registry)
+        for model_name in ('button.registry', 'tab.registry'):
+            with patch.object(Registry, 'clear_cache') as clear_cache:
+                self.env[model_name]._register_hook()
+                clear_cache.assert_not_called()
+        for model_name in ('filter.registry', 'groupby.registry'):
+            with patch.object(Registry, 'clear_cache') as clear_cache:
+                self.env[model_name]._register_hook()
+                clear_cache.assert_called_once()
+
+
+@tagged('post_install', '-at_install', '-standard', 'role_restriction_benchmark')
+class BenchmarkRoleRestrictions(RoleRestrictionCommon):
+    """Form view loads of a role restricting every field and button of a
+    large form view, run with --test-tags role_restriction_benchmark"""
+
+    model_name = 'sale.order'
+    view_loads = 50
+
+    def test_benchmark_form_view(self):
+        if self.model_name not in self.env:
+            self.skipTest("%s is not installed" % self.model_name)
+        field_names = list(self.env[self.model_name]._fields)
+        self._restrict_fields(self.model_name, field_names, is_field_readonly=True)
+        model = self._get_model(self.model_name)
+        self.env['field.access'].create({
+            'button_access_id': self.role_management.id,
+            'model_id': model.id,
+            'button_ids': [Command.set(self.env['button.registry'].search([
+                ('model_id', '=', model.id)]).ids)],
+            'tab_ids': [Command.set(self.env['tab.registry'].search([
+                ('model_id', '=', model.id)]).ids)],
+        })
+        View = type(self.env['ir.ui.view'])
+        self._get_form_arch(self.model_name)
+
+        # Compile the restrictions on every load, without flushing the other
+        # caches used to load the view
+        with patch.object(View, '_get_role_restrictions',
+                          View._get_role_restrictions.__wrapped__):
+            start = time.perf_counter()
+            for _index in range(self.view_loads):
+                self._get_form_arch(self.model_name)
+            compile_time = (time.perf_counter() - start) / self.view_loads
+
+        start = time.perf_counter()
+        for _index in range(self.view_loads):
+            self._get_form_arch(self.model_name)
+        cached_time = (time.perf_counter() - start) / self.view_loads
+
+        _logger.info(
+            "%s form view with %s restricted fields: %.4fs per load compiling "
+            "the role restrictions, %.4fs per load with cached restrictions",
+            self.model_name, len(field_names), compile_time, cached_time)
+        self.assertLess(cached_time, compile_time)
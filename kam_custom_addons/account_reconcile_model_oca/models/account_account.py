@@ -0,0 +1,16 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountAccount(models.Model):
+    _inherit = "account.account"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "reconcile" in vals:
+            lines = self.env["account.move.line"].search(
+                [("account_id", "in", self.ids), ("reconciled", "=", False)]
+            )
+            lines._refresh_match_tokens()
+        return res
@@ -0,0 +1,18 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        posted.line_ids._filter_match_token_lines()._refresh_match_tokens()
+        return posted
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "ref"} & set(vals):
+            self.line_ids._refresh_match_tokens()
+        return res
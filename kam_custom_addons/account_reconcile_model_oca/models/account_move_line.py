@@ -0,0 +1,145 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+from odoo.tools import SQL
+
+# Tokens of the open journal items that the invoice matching rule compares to
+# the statement line tokens. One row per token occurrence, so that the
+# number of matches of a journal item is the same as when tokenizing it
+# on the fly.
+MATCH_TOKEN_TABLE = "account_move_line_match_token"
+
+
+class AccountMoveLine(models.Model):
+    _inherit = "account.move.line"
+
+    def init(self):
+        """Create the match token table and tokenize the journal items again,
+        so that the table is in sync after an update"""
+        super().init()
+        self.env.cr.execute(
+            SQL(
+                """
+                CREATE TABLE IF NOT EXISTS %(table)s (
+                    aml_id INTEGER NOT NULL
+                        REFERENCES account_move_line(id) ON DELETE CASCADE,
+                    source VARCHAR NOT NULL,
+                    token_kind VARCHAR NOT NULL,
+                    token VARCHAR NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS %(token_index)s
+                    ON %(table)s (token, token_kind, source);
+                CREATE INDEX IF NOT EXISTS %(aml_index)s ON %(table)s (aml_id);
+                TRUNCATE %(table)s;
+                """,
+                table=SQL.identifier(MATCH_TOKEN_TABLE),
+                token_index=SQL.identifier(f"{MATCH_TOKEN_TABLE}_token_index"),
+                aml_index=SQL.identifier(f"{MATCH_TOKEN_TABLE}_aml_id_index"),
+            )
+        )
+        self.env.cr.execute(self._get_match_token_insert_query(SQL("TRUE")))
+
+    @api.model
+    def _get_match_token_insert_query(self, line_condition):
+        """Tokenize the label, the move name and the move reference of the
+        open posted journal items of reconcilable accounts, the same way
+        account.reconcile.model _get_invoice_matching_amls_candidates matches
+        them: numerical tokens are the digit groups, exact tokens the whole
+        value.
+
+        :param line_condition: SQL condition on the journal items (``line``)
+        """
+        return SQL(
+            r"""
+            INSERT INTO %(table)s (aml_id, source, token_kind, token)
+            SELECT sub.aml_id, sub.source, sub.token_kind, sub.token
+            FROM (
+                SELECT
+                    text.aml_id,
+                    text.source,
+                    'numerical' AS token_kind,
+                    UNNEST(
+                        REGEXP_SPLIT_TO_ARRAY(
+                            SUBSTRING(
+                                REGEXP_REPLACE(text.value, '[^0-9\s]', '', 'g'),
+                                '\S(?:.*\S)*'
+                            ),
+                            '\s+'
+                        )
+                    ) AS token
+                FROM (%(texts)s) AS text
+                WHERE text.value IS NOT NULL
+                UNION ALL
+                SELECT text.aml_id, text.source, 'exact', text.value
+                FROM (%(texts)s) AS text
+                WHERE COALESCE(text.value, '') != ''
+            ) AS sub
+            WHERE sub.token IS NOT NULL
+            """,
+            table=SQL.identifier(MATCH_TOKEN_TABLE),
+            texts=SQL(
+                """
+                SELECT line.id AS aml_id, text.source, text.value
+                FROM account_move_line line
+                JOIN account_move move ON move.id = line.move_id
+                JOIN account_account account ON account.id = line.account_id
+                CROSS JOIN LATERAL (
+                    VALUES
+                        ('label', line.name),
+                        ('note', move.name),
+                        ('reference', move.ref)
+                ) AS text(source, value)
+                WHERE move.state = 'posted'
+                    AND account.reconcile
+                    AND NOT line.reconciled
+                    AND %s
+                """,
+                line_condition,
+            ),
+        )
+
+    def _filter_match_token_lines(self):
+        """Journal items the invoice matching rule reads: the posted items of
+        reconcilable accounts"""
+        return self.filtered(
+            lambda line: line.parent_state == "posted" and line.account_id.reconcile
+        )
+
+    def _refresh_match_tokens(self):
+        """Rebuild the match tokens of the journal items, dropping the ones
+        of the items that are reconciled, no longer reconcilable or whose
+        move is not posted"""
+        if not self.ids:
+            return
+        self.env["account.move"].flush_model(["name", "ref", "state"])
+        self.flush_model(["name", "move_id", "account_id", "reconciled"])
+        self.env["account.account"].flush_model(["reconcile"])
+        self.env.cr.execute(
+            SQL(
+                "DELETE FROM %s WHERE aml_id = ANY(%s)",
+                SQL.identifier(MATCH_TOKEN_TABLE),
+                self.ids,
+            )
+        )
+        self.env.cr.execute(
+            self._get_match_token_insert_query(SQL("line.id = ANY(%s)", self.ids))
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        # Lines of draft moves are tokenized when the move is posted
+        lines._filter_match_token_lines()._refresh_match_tokens()
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "account_id", "move_id"} & set(vals):
+            self._refresh_match_tokens()
+        return res
+
+    def reconcile(self):
+        res = super().reconcile()
+        # Prune the fully reconciled items
+        self._refresh_match_tokens()
+        return res
@@ -0,0 +1,14 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import models
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    def unlink(self):
+        lines = self.debit_move_id | self.credit_move_id
+        res = super().unlink()
+        # Unreconciled items are open again
+        lines.exists()._refresh_match_tokens()
+        return res
@@ -5,6 +5,8 @@ from dateutil.relativedelta import relativedelta
 
 from odoo import Command, api, fields, models, tools
 
+from .account_move_line import MATCH_TOKEN_TABLE
+
 
 class AccountReconcileModel(models.Model):
     _inherit = "account.reconcile.model"
@@ -358,97 +360,56 @@ class AccountReconcileModel(models.Model):
         from_clause = from_string
         where_clause = where_string
 
-        sub_queries = []
-        all_params = []
-        aml_cte = ""
         (
             numerical_tokens,
             exact_tokens,
             _text_tokens,
         ) = self._get_invoice_matching_st_line_tokens(st_line)
-        if numerical_tokens or exact_tokens:
-            aml_cte = rf"""
-                WITH aml_cte AS (
-                    SELECT
-                        account_move_line.id as account_move_line_id,
-                        account_move_line.date as account_move_line_date,
-                        account_move_line.date_maturity as account_move_line_date_maturity,
-                        account_move_line.name as account_move_line_name,
-                        account_move_line__move_id.name as account_move_line__move_id_name,
-                        account_move_line__move_id.ref as account_move_line__move_id_ref
-                    FROM {from_clause}
-                    JOIN account_move account_move_line__move_id
-                        ON account_move_line__move_id.id = account_move_line.move_id
-                    WHERE {where_clause}
-                )
-            """  # noqa: E501
-            all_params += where_params
 
-        enabled_matches = []
+        sources = []
         if self.match_text_location_label:
-            enabled_matches.append(("account_move_line", "name"))
+            sources.append("label")
         if self.match_text_location_note:
-            enabled_matches.append(("account_move_line__move_id", "name"))
+            sources.append("note")
         if self.match_text_location_reference:
-            enabled_matches.append(("account_move_line__move_id", "ref"))
+            sources.append("reference")
 
+        token_kinds = []
         if numerical_tokens:
-            for table_alias, field in enabled_matches:
-                sub_queries.append(
-                    rf"""
-                    SELECT
-                        account_move_line_id as id,
-                        account_move_line_date as date,
-                        account_move_line_date_maturity as date_maturity,
-                        UNNEST(
-                            REGEXP_SPLIT_TO_ARRAY(
-                                SUBSTRING(
-                                    REGEXP_REPLACE(
-                                        {table_alias}_{field}, '[^0-9\s]', '', 'g'
-                                    ),
-                                    '\S(?:.*\S)*'
-                                ),
-                                '\s+'
-                            )
-                        ) AS token
-                    FROM aml_cte
-                    WHERE {table_alias}_{field} IS NOT NULL
-                """
-                )
-
+            token_kinds.append("numerical")
         if exact_tokens:
-            for table_alias, field in enabled_matches:
-                sub_queries.append(
-                    rf"""
-                    SELECT
-                        account_move_line_id as id,
-                        account_move_line_date as date,
-                        account_move_line_date_maturity as date_maturity,
-                        {table_alias}_{field} AS token
-                    FROM aml_cte
-                    WHERE COALESCE({table_alias}_{field}, '') != ''
-                """
-                )
+            token_kinds.append("exact")
 
-        if sub_queries:
-            order_by = get_order_by_clause(alias="sub")
+        if sources and token_kinds:
+            # The tokens of the open journal items are maintained in the match
+            # token table (see account.move.line), so that they are not
+            # computed again for each statement line.
+            order_by = get_order_by_clause(alias="account_move_line")
             self._cr.execute(
-                aml_cte
-                + """
+                f"""
                     SELECT
-                        sub.id,
+                        account_move_line.id,
                         COUNT(*) AS nb_match
-                    FROM ("""
-                + " UNION ALL ".join(sub_queries)
-                + """) AS sub
-                    WHERE sub.token IN %s
-                    GROUP BY sub.date_maturity, sub.date, sub.id
-                    HAVING COUNT(*) > 0
-                    ORDER BY nb_match DESC, """
-                + order_by
-                + """
+                    FROM {from_clause}
+                    JOIN {MATCH_TOKEN_TABLE} match_token
+                        ON match_token.aml_id = account_move_line.id
+                    WHERE
+                        {where_clause}
+                        AND match_token.token IN %s
+                        AND match_token.token_kind IN %s
+                        AND match_token.source IN %s
+                    GROUP BY
+                        account_move_line.date_maturity,
+                        account_move_line.date,
+                        account_move_line.id
+                    ORDER BY nb_match DESC, {order_by}
                 """,
-                all_params + [tuple(numerical_tokens + exact_tokens)],
+                where_params
+                + [
+                    tuple(numerical_tokens + exact_tokens),
+                    tuple(token_kinds),
+                    tuple(sources),
+                ],
             )
             candidate_ids = [r[0] for r in self._cr.fetchall()]
             if candidate_ids and (
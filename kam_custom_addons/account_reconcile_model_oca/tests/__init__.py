@@ -1 +1,2 @@
 from . import test_reconciliation_match
+from . import test_match_token_index
@@ -0,0 +1,224 @@
+import logging
+import time
+
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+from ..models.account_move_line import MATCH_TOKEN_TABLE
+
+_logger = logging.getLogger(__name__)
+
+
+class MatchTokenCommon(AccountTestInvoicingCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.bank_journal = cls.company_data["default_journal_bank"]
+        cls.account_rcv = cls.company_data["default_account_receivable"]
+        cls.rule = cls.env["account.reconcile.model"].create(
+            {
+                "name": "Invoice matching",
+                "rule_type": "invoice_matching",
+                "match_partner": False,
+                "match_text_location_label": True,
+                "match_text_location_note": True,
+                "match_text_location_reference": True,
+            }
+        )
+
+    def _get_tokens(self, lines):
+        self.env.cr.execute(
+            f"""
+                SELECT source, token_kind, token
+                FROM {MATCH_TOKEN_TABLE}
+                WHERE aml_id = ANY(%s)
+            """,
+            [lines.ids],
+        )
+        return set(self.env.cr.fetchall())
+
+    def _create_st_line(self, amount, payment_ref):
+        return self.env["account.bank.statement.line"].create(
+            {
+                "journal_id": self.bank_journal.id,
+                "amount": amount,
+                "date": "2019-01-01",
+                "payment_ref": payment_ref,
+            }
+        )
+
+
+@tagged("post_install", "-at_install")
+class TestMatchTokenIndex(MatchTokenCommon):
+    def _create_invoice(self, ref=None):
+        invoice = self.init_invoice(
+            "out_invoice",
+            partner=self.partner_a,
+            invoice_date="2019-01-01",
+            amounts=[100.0],
+        )
+        if ref:
+            invoice.ref = ref
+        return invoice
+
+    def test_tokens_of_posted_items(self):
+        invoice = self._create_invoice(ref="SO 4567")
+        term_line = invoice.line_ids.filtered(
+            lambda line: line.display_type == "payment_term"
+        )
+        self.assertFalse(self._get_tokens(term_line))
+
+        invoice.action_post()
+        tokens = self._get_tokens(term_line)
+        self.assertIn(("reference", "numerical", "4567"), tokens)
+        self.assertIn(("reference", "exact", "SO 4567"), tokens)
+        self.assertIn(("note", "exact", invoice.name), tokens)
+        # Only the items of reconcilable accounts are tokenized
+        self.assertFalse(self._get_tokens(invoice.line_ids - term_line))
+
+    def test_tokens_follow_renaming(self):
+        invoice = self._create_invoice(ref="SO 4567")
+        invoice.action_post()
+        term_line = invoice.line_ids.filtered(
+            lambda line: line.display_type == "payment_term"
+        )
+
+        invoice.ref = "SO 8910"
+        term_line.name = "PAY-1112"
+        tokens = self._get_tokens(term_line)
+        self.assertNotIn(("reference", "numerical", "4567"), tokens)
+        self.assertIn(("reference", "numerical", "8910"), tokens)
+        self.assertIn(("label", "exact", "PAY-1112"), tokens)
+
+        st_line = self._create_st_line(100.0, "SO8910")
+        candidates = self.rule._get_invoice_matching_amls_candidates(st_line, None)
+        self.assertEqual(candidates["amls"], term_line)
+
+    def test_tokens_pruned_on_reconciliation(self):
+        invoice = self._create_invoice(ref="SO 4567")
+        invoice.action_post()
+        term_line = invoice.line_ids.filtered(
+            lambda line: line.display_type == "payment_term"
+        )
+        payment = self.env["account.move"].create(
+            {
+                "move_type": "entry",
+                "date": "2019-01-01",
+                "line_ids": [
+                    Command.create(
+                        {
+                            "account_id": self.account_rcv.id,
+                            "partner_id": self.partner_a.id,
+                            "credit": term_line.debit,
+                        }
+                    ),
+                    Command.create(
+                        {
+                            "account_id": self.bank_journal.default_account_id.id,
+                            "debit": term_line.debit,
+                        }
+                    ),
+                ],
+            }
+        )
+        payment.action_post()
+        payment_line = payment.line_ids.filtered(
+            lambda line: line.account_id == self.account_rcv
+        )
+
+        (term_line + payment_line).reconcile()
+        self.assertTrue(term_line.reconciled)
+        self.assertFalse(self._get_tokens(term_line + payment_line))
+
+        term_line.remove_move_reconcile()
+        self.assertIn(("reference", "numerical", "4567"), self._get_tokens(term_line))
+
+    def test_tokens_rebuilt_on_update(self):
+        invoice = self._create_invoice(ref="SO 4567")
+        invoice.action_post()
+        term_line = invoice.line_ids.filtered(
+            lambda line: line.display_type == "payment_term"
+        )
+        tokens = self._get_tokens(term_line)
+        self.env.cr.execute(
+            f"DELETE FROM {MATCH_TOKEN_TABLE} WHERE aml_id = ANY(%s)",
+            [term_line.ids],
+        )
+        self.env.cr.execute(
+            f"INSERT INTO {MATCH_TOKEN_TABLE} VALUES (%s, 'label', 'exact', 'X')",
+            [(invoice.line_ids - term_line)[0].id],
+        )
+
+        self.env["account.move.line"].init()
+        self.assertEqual(self._get_tokens(term_line), tokens)
+        self.assertFalse(self._get_tokens(invoice.line_ids - term_line))
+
+
+@tagged("post_install", "-at_install", "-standard", "match_token_benchmark")
+class BenchmarkMatchTokenIndex(MatchTokenCommon):
+    """Candidate lookup on a synthetic ledger, run with
+    --test-tags match_token_benchmark"""
+
+    ledger_size = 5000
+    st_line_count = 200
+
+    def test_benchmark_candidates(self):
+        move = self.env["account.move"].create(
+            {
+                "move_type": "entry",
+                "date": "2019-01-01",
+                "ref": "Synthetic ledger",
+                "line_ids": [
+                    Command.create(
+                        {
+                            "account_id": self.account_rcv.id,
+                            "partner_id": self.partner_a.id,
+                            "name": f"INV/2019/{i:06d}",
+                            "debit": 10.0,
+                        }
+                    )
+                    for i in range(self.ledger_size)
+                ]
+                + [
+                    Command.create(
+                        {
+                            "account_id": self.company_data[
+                                "default_account_revenue"
+                            ].id,
+                            "credit": 10.0 * self.ledger_size,
+                        }
+                    )
+                ],
+            }
+        )
+        move.action_post()
+        ledger = move.line_ids.filtered(
+            lambda line: line.account_id == self.account_rcv
+        )
+        st_lines = self.env["account.bank.statement.line"]
+        for i in range(self.st_line_count):
+            st_lines |= self._create_st_line(10.0, f"INV/2019/{i * 7:06d}")
+
+        # What the on the fly tokenization cost for each statement line
+        start = time.perf_counter()
+        ledger._refresh_match_tokens()
+        tokenize_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, st_line in enumerate(st_lines):
+            candidates = self.rule._get_invoice_matching_amls_candidates(
+                st_line, None
+            )
+            self.assertEqual(candidates["amls"].name, f"INV/2019/{i * 7:06d}")
+        lookup_time = (time.perf_counter() - start) / len(st_lines)
+
+        _logger.info(
+            "Match tokens on %s journal items: tokenizing the ledger %.4fs, "
+            "indexed lookup %.4fs per statement line",
+            self.ledger_size,
+            tokenize_time,
+            lookup_time,
+        )
+        self.assertLess(lookup_time, tokenize_time)
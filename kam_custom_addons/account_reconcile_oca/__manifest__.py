@@ -16,6 +16,7 @@
         "base_sparse_field",
     ],
     "data": [
+        "data/ir_cron.xml",
         "views/res_config_settings.xml",
         "security/ir.model.access.csv",
         "security/security.xml",
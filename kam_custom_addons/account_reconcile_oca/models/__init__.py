@@ -1,4 +1,5 @@
 from . import account_reconcile_abstract
+from . import account_reconcile_model
 from . import account_journal
 from . import account_bank_statement_line
 from . import account_bank_statement
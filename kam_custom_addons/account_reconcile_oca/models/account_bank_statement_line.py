@@ -2,6 +2,7 @@
 # Copyright 2025 Jacques-Etienne Baudoux (BCIM) <je@bcim.be>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import logging
 from collections import defaultdict
 
 from dateutil import rrule
@@ -12,7 +13,12 @@ from odoo.exceptions import UserError
 # from odoo.fields import first
 from odoo.tools import LazyTranslate, float_compare, float_is_zero, groupby
 
+from .account_reconcile_model import ReconcileCandidatePool
+
 _lt = LazyTranslate(__name__, default_lang="en_US")
+_logger = logging.getLogger(__name__)
+
+DEFAULT_AUTO_RECONCILE_BATCH_SIZE = 200
 
 
 class AccountBankStatementLine(models.Model):
@@ -122,6 +128,11 @@ class AccountBankStatementLine(models.Model):
         "account.move", default=False, store=False, prefetch=False, readonly=True
     )
     can_reconcile = fields.Boolean(sparse="reconcile_data_info")
+    auto_reconcile_pending = fields.Boolean(
+        copy=False,
+        index="btree_not_null",
+        help="Waiting for the auto reconciliation cron",
+    )
     reconcile_aggregate = fields.Char(compute="_compute_reconcile_aggregate")
     aggregate_id = fields.Integer(compute="_compute_reconcile_aggregate")
     aggregate_name = fields.Char(compute="_compute_reconcile_aggregate")
@@ -979,31 +990,118 @@ class AccountBankStatementLine(models.Model):
         result._auto_reconcile()
         return result
 
+    def _get_auto_reconcile_batch_size(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(
+                "account_reconcile_oca.auto_reconcile_batch_size",
+                DEFAULT_AUTO_RECONCILE_BATCH_SIZE,
+            )
+        )
+
+    def _get_auto_reconcile_models(self, journal):
+        return self.env["account.reconcile.model"].search(
+            [
+                ("trigger", "=", "auto_reconcile"),
+                ("company_id", "in", journal.company_id.ids),
+                "|",
+                ("match_journal_ids", "=", False),
+                ("match_journal_ids", "in", journal.id),
+            ]
+        )
+
     def _auto_reconcile(self):
         """Try to auto reconcile records that are not yet reconciled"""
         non_reconciled = self.filtered(lambda rec: not rec.is_reconciled)
+        batch_size = self._get_auto_reconcile_batch_size()
+        if batch_size and len(non_reconciled) > batch_size:
+            # Large imports are reconciled by the cron, chunk by chunk
+            non_reconciled.auto_reconcile_pending = True
+            self.env.ref("account_reconcile_oca.ir_cron_auto_reconcile")._trigger()
+            return
         lines_by_journal = groupby(non_reconciled, key=lambda r: r.journal_id)
         for journal, ilines in lines_by_journal:
-            models = self.env["account.reconcile.model"].search(
-                [
-                    ('trigger', '=', 'auto_reconcile'),
-                    ("company_id", "in", journal.company_id.ids),
-
-                    "|",
-                    ("match_journal_ids", "=", False),
-                    ("match_journal_ids", "in", journal.id),
-                ]
-            )
+            models = self._get_auto_reconcile_models(journal)
+            if batch_size:
+                self.browse([line.id for line in ilines])._auto_reconcile_batch(
+                    models
+                )
+                continue
             for record in ilines:
                 record._do_auto_reconcile(models)
 
-    def _do_auto_reconcile(self, models):
+    def _retrieve_partners(self):
+        """Partner of each statement line, the lines sharing the same
+        counterpart information are looked up once.
+
+        :return: a dictionary {statement line id: partner}
+        """
+        partners = {}
+        partners_by_key = {}
+        for record in self:
+            if record.partner_id or self.env.context.get("skip_retrieve_partner"):
+                partners[record.id] = record.partner_id
+                continue
+            key = (
+                record.company_id.id,
+                record.account_number,
+                record.partner_name,
+                tuple(record._get_st_line_strings_for_matching()),
+            )
+            if key not in partners_by_key:
+                partners_by_key[key] = record._retrieve_partner()
+            partners[record.id] = partners_by_key[key]
+        return partners
+
+    def _auto_reconcile_batch(self, models):
+        """Auto reconcile statement lines of the same journal: partners are
+        resolved once for all the lines and the candidates of each rule are
+        fetched for all the lines at once"""
+        records = self.filtered(lambda rec: not rec.is_reconciled)
+        if not records or not models:
+            return
+        partners = records._retrieve_partners()
+        pool = ReconcileCandidatePool(records, partners)
+        models = models.with_context(reconcile_candidate_pool=pool)
+        for record in records:
+            record._do_auto_reconcile(models, partner=partners[record.id])
+
+    @api.model
+    def _cron_auto_reconcile(self):
+        """Auto reconcile a chunk of the statement lines of large imports, the
+        cron is triggered again while lines are left pending so that each
+        chunk is committed by the cron runner"""
+        batch_size = (
+            self._get_auto_reconcile_batch_size() or DEFAULT_AUTO_RECONCILE_BATCH_SIZE
+        )
+        records = self.search(
+            [("auto_reconcile_pending", "=", True)], limit=batch_size, order="id"
+        )
+        for journal, ilines in groupby(records, key=lambda r: r.journal_id):
+            lines = self.browse([line.id for line in ilines])
+            try:
+                with self.env.cr.savepoint():
+                    lines._auto_reconcile_batch(
+                        self._get_auto_reconcile_models(journal)
+                    )
+            except Exception:
+                _logger.exception(
+                    "Auto reconciliation failed for statement lines %s", lines.ids
+                )
+        records.auto_reconcile_pending = False
+        if self.search_count([("auto_reconcile_pending", "=", True)], limit=1):
+            self.env.ref("account_reconcile_oca.ir_cron_auto_reconcile")._trigger()
+
+    def _do_auto_reconcile(self, models, partner=None):
         self.ensure_one()
         if self.is_reconciled:
             # In case the method is run asynchronously, the record could have
             # been already reconciled
             return
-        res = models._apply_rules(self, self._retrieve_partner())
+        if partner is None:
+            partner = self._retrieve_partner()
+        res = models._apply_rules(self, partner)
         if not res:
             return
         liquidity_lines, suspense_lines, other_lines = self._seek_for_lines()
@@ -0,0 +1,218 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from collections import Counter, defaultdict
+
+from odoo import models
+from odoo.fields import Domain
+from odoo.tools import SQL
+
+from odoo.addons.account_reconcile_model_oca.models.account_move_line import (
+    MATCH_TOKEN_TABLE,
+)
+
+
+class ReconcileCandidatePool:
+    """Candidates of the invoice matching rules for a chunk of statement
+    lines. Each rule fetches the candidates of the whole chunk with one query
+    per kind of lookup, then every statement line gets, in memory, the same
+    candidates in the same order as _get_invoice_matching_amls_candidates.
+    """
+
+    def __init__(self, st_lines, partners):
+        self.st_lines = st_lines
+        self.partners = partners
+        self._cache = {}
+
+    def _get(self, key, loader):
+        if key not in self._cache:
+            self._cache[key] = loader()
+        return self._cache[key]
+
+    def get_candidates(self, rule, st_line, partner):
+        aml_domain = rule._get_invoice_matching_amls_domain(st_line, partner)
+        sources, tokens, token_kinds = rule._get_invoice_matching_token_params(st_line)
+        if sources and token_kinds:
+            rows_by_token, ordered = self._get(
+                ("tokens", rule.id), lambda: self._load_token_matches(rule)
+            )
+            counts = Counter()
+            for token in set(tokens):
+                for aml_id, token_kind in rows_by_token.get(token, ()):
+                    if token_kind in token_kinds:
+                        counts[aml_id] += 1
+            candidate_ids = sorted(
+                counts, key=lambda aml_id: (-counts[aml_id], ordered[aml_id])
+            )
+            amls = rule.env["account.move.line"].browse(candidate_ids)
+            amls = amls.filtered_domain(aml_domain)
+            if amls and (not rule.unique_matching or len(amls) == 1):
+                return {"allow_auto_reconcile": True, "amls": amls}
+            return
+
+        if not partner:
+            currency, amount_field, amount = rule._get_invoice_matching_amount_params(
+                st_line
+            )
+            amls_by_amount = self._get(
+                ("amount", rule.id), lambda: self._load_amount_matches(rule)
+            )
+            amls = amls_by_amount.get((currency.id, amount_field, amount))
+            if amls:
+                # The residual changes when a previous line of the chunk is
+                # reconciled with the item
+                amls = amls.filtered(
+                    lambda aml: currency.round(aml[amount_field]) == amount
+                ).filtered_domain(aml_domain)
+        else:
+            amls_by_partner = self._get(
+                ("partner", rule.id), lambda: self._load_partner_matches(rule)
+            )
+            amls = amls_by_partner.get(partner.id)
+            if amls:
+                amls = amls.filtered_domain(aml_domain)
+        if amls and (not rule.unique_matching or len(amls) == 1):
+            return {"allow_auto_reconcile": False, "amls": amls}
+
+    def _load_token_matches(self, rule):
+        rule.env["account.move.line"].flush_model()
+        tokens = set()
+        sources = set()
+        for st_line in self.st_lines:
+            line_sources, line_tokens, _token_kinds = (
+                rule._get_invoice_matching_token_params(st_line)
+            )
+            tokens.update(line_tokens)
+            sources.update(line_sources)
+        rows_by_token = defaultdict(list)
+        if tokens and sources:
+            rule.env.cr.execute(
+                SQL(
+                    """
+                    SELECT token, aml_id, token_kind
+                    FROM %s
+                    WHERE token IN %s AND source IN %s
+                    """,
+                    SQL.identifier(MATCH_TOKEN_TABLE),
+                    tuple(tokens),
+                    tuple(sources),
+                )
+            )
+            for token, aml_id, token_kind in rule.env.cr.fetchall():
+                rows_by_token[token].append((aml_id, token_kind))
+        aml_ids = {aml_id for rows in rows_by_token.values() for aml_id, _k in rows}
+        ordered = []
+        if aml_ids:
+            rule.env.cr.execute(
+                SQL(
+                    "SELECT id FROM account_move_line WHERE id IN %s ORDER BY %s",
+                    tuple(aml_ids),
+                    SQL(rule._get_invoice_matching_order_by()),
+                )
+            )
+            ordered = [row[0] for row in rule.env.cr.fetchall()]
+        return rows_by_token, {aml_id: index for index, aml_id in enumerate(ordered)}
+
+    def _load_partner_matches(self, rule):
+        domains = [
+            rule._get_invoice_matching_amls_domain(st_line, partner)
+            for st_line in self.st_lines
+            for partner in [self.partners[st_line.id]]
+            if partner
+        ]
+        aml_ids_by_partner = defaultdict(list)
+        if domains:
+            for aml in rule.env["account.move.line"].search(
+                Domain.OR(domains), order=rule._get_invoice_matching_order_by()
+            ):
+                aml_ids_by_partner[aml.partner_id.id].append(aml.id)
+        return {
+            partner_id: rule.env["account.move.line"].browse(aml_ids)
+            for partner_id, aml_ids in aml_ids_by_partner.items()
+        }
+
+    def _load_amount_matches(self, rule):
+        domains = []
+        for st_line in self.st_lines:
+            if self.partners[st_line.id]:
+                continue
+            currency, amount_field, amount = rule._get_invoice_matching_amount_params(
+                st_line
+            )
+            # Rounded amounts are compared below, fetch the ones around
+            half_unit = currency.rounding / 2
+            domains.append(
+                Domain.AND(
+                    [
+                        rule._get_invoice_matching_amls_domain(st_line, None),
+                        [
+                            ("currency_id", "=", currency.id),
+                            (amount_field, ">=", amount - half_unit),
+                            (amount_field, "<=", amount + half_unit),
+                        ],
+                    ]
+                )
+            )
+        aml_ids_by_amount = defaultdict(list)
+        if domains:
+            for aml in rule.env["account.move.line"].search(
+                Domain.OR(domains), order=rule._get_invoice_matching_order_by()
+            ):
+                for amount_field in ("amount_residual", "amount_residual_currency"):
+                    key = (
+                        aml.currency_id.id,
+                        amount_field,
+                        aml.currency_id.round(aml[amount_field]),
+                    )
+                    aml_ids_by_amount[key].append(aml.id)
+        return {
+            key: rule.env["account.move.line"].browse(aml_ids)
+            for key, aml_ids in aml_ids_by_amount.items()
+        }
+
+
+class AccountReconcileModel(models.Model):
+    _inherit = "account.reconcile.model"
+
+    def _get_invoice_matching_order_by(self):
+        direction = "DESC" if self.matching_order == "new_first" else "ASC"
+        return f"date_maturity {direction}, date {direction}, id {direction}"
+
+    def _get_invoice_matching_token_params(self, st_line):
+        """Text locations, tokens and token kinds the statement line is
+        matched on"""
+        numerical_tokens, exact_tokens, _text_tokens = (
+            self._get_invoice_matching_st_line_tokens(st_line)
+        )
+        sources = []
+        if self.match_text_location_label:
+            sources.append("label")
+        if self.match_text_location_note:
+            sources.append("note")
+        if self.match_text_location_reference:
+            sources.append("reference")
+        token_kinds = []
+        if numerical_tokens:
+            token_kinds.append("numerical")
+        if exact_tokens:
+            token_kinds.append("exact")
+        return sources, numerical_tokens + exact_tokens, token_kinds
+
+    def _get_invoice_matching_amount_params(self, st_line):
+        """Currency, residual field and rounded amount of the journal items
+        matching the statement line when there is no partner"""
+        currency = (
+            st_line.foreign_currency_id
+            or st_line.journal_id.currency_id
+            or st_line.company_currency_id
+        )
+        if currency == self.company_id.currency_id:
+            amount_field = "amount_residual"
+        else:
+            amount_field = "amount_residual_currency"
+        return currency, amount_field, currency.round(-st_line.amount_residual)
+
+    def _get_invoice_matching_amls_candidates(self, st_line, partner):
+        pool = self.env.context.get("reconcile_candidate_pool")
+        if pool is None or st_line not in pool.st_lines:
+            return super()._get_invoice_matching_amls_candidates(st_line, partner)
+        return pool.get_candidates(self, st_line, partner)
@@ -3,6 +3,8 @@
 
 from odoo import fields, models
 
+from .account_bank_statement_line import DEFAULT_AUTO_RECONCILE_BATCH_SIZE
+
 
 class ResConfigSettings(models.TransientModel):
     _inherit = "res.config.settings"
@@ -10,3 +12,7 @@ class ResConfigSettings(models.TransientModel):
     reconcile_aggregate = fields.Selection(
         related="company_id.reconcile_aggregate", readonly=False
     )
+    auto_reconcile_batch_size = fields.Integer(
+        config_parameter="account_reconcile_oca.auto_reconcile_batch_size",
+        default=DEFAULT_AUTO_RECONCILE_BATCH_SIZE,
+    )
@@ -1,2 +1,3 @@
 from . import test_bank_account_reconcile
 from . import test_account_reconcile
+from . import test_auto_reconcile_batch
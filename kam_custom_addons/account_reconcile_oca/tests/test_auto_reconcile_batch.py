@@ -0,0 +1,82 @@
+import time
+
+from odoo.tests import tagged
+
+from .test_bank_account_reconcile import TestAccountReconciliationCommon
+
+
+@tagged("post_install", "-at_install")
+class TestAutoReconcileBatch(TestAccountReconciliationCommon):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.matching_rule = cls.env["account.reconcile.model"].create(
+            {
+                "name": "Invoice matching on label",
+                "rule_type": "invoice_matching",
+                "trigger": "auto_reconcile",
+                "match_partner": False,
+                "match_text_location_label": True,
+                "match_journal_ids": [cls.bank_journal_euro.id],
+            }
+        )
+
+    def _set_batch_size(self, batch_size):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "account_reconcile_oca.auto_reconcile_batch_size", batch_size
+        )
+
+    def _create_invoices_and_lines(self, count):
+        invoices = self.env["account.move"]
+        for amount in range(100, 100 + count):
+            invoices |= self.create_invoice(
+                currency_id=self.currency_euro_id, invoice_amount=amount
+            )
+        lines = self.acc_bank_stmt_line_model.create(
+            [
+                {
+                    "journal_id": self.bank_journal_euro.id,
+                    "amount": invoice.amount_total,
+                    "date": time.strftime("%Y-07-15"),
+                    "payment_ref": invoice.name,
+                }
+                for invoice in invoices
+            ]
+        )
+        return invoices, lines
+
+    def test_batch_reconcile(self):
+        self._set_batch_size(10)
+        invoices, lines = self._create_invoices_and_lines(3)
+        self.assertTrue(all(lines.mapped("is_reconciled")))
+        self.assertFalse(any(lines.mapped("auto_reconcile_pending")))
+        self.assertEqual(set(invoices.mapped("amount_residual")), {0.0})
+
+    def test_legacy_reconcile(self):
+        self._set_batch_size(0)
+        invoices, lines = self._create_invoices_and_lines(3)
+        self.assertTrue(all(lines.mapped("is_reconciled")))
+        self.assertEqual(set(invoices.mapped("amount_residual")), {0.0})
+
+    def test_large_import_reconciled_by_cron(self):
+        self._set_batch_size(1)
+        invoices, lines = self._create_invoices_and_lines(2)
+        self.assertTrue(all(lines.mapped("auto_reconcile_pending")))
+        self.assertFalse(any(lines.mapped("is_reconciled")))
+
+        cron = self.env.ref("account_reconcile_oca.ir_cron_auto_reconcile")
+        triggers = self.env["ir.cron.trigger"].search([("cron_id", "=", cron.id)])
+        self.acc_bank_stmt_line_model._cron_auto_reconcile()
+        self.assertEqual(lines.mapped("auto_reconcile_pending"), [False, True])
+        self.assertTrue(lines[0].is_reconciled)
+        # The cron runs again for the lines left pending
+        self.assertTrue(
+            self.env["ir.cron.trigger"].search(
+                [("cron_id", "=", cron.id), ("id", "not in", triggers.ids)]
+            )
+        )
+
+        self.acc_bank_stmt_line_model._cron_auto_reconcile()
+        self.assertFalse(any(lines.mapped("auto_reconcile_pending")))
+        self.assertTrue(all(lines.mapped("is_reconciled")))
+        self.assertEqual(set(invoices.mapped("amount_residual")), {0.0})
@@ -10,6 +10,80 @@ class ReportAgedPartnerBalance(models.AbstractModel):
     _name = 'report.accounting_pdf_reports.report_agedpartnerbalance'
     _description = 'Aged Partner Balance Report'
 
+    def _get_currency_rates(self, currency_ids, to_currency, company, date):
+        """ returns a dictionary with key=the ID of a currency and value=its conversion
+            rate to ``to_currency`` at ``date``, so that the rates are looked up once
+            for the whole report instead of once per amount
+        """
+        currencies = self.env['res.currency'].browse(currency_ids)
+        return {
+            currency.id: self.env['res.currency']._get_conversion_rate(
+                currency, to_currency, company, date)
+            for currency in currencies
+        }
+
+    def _get_aged_move_lines(self, move_state, account_type, partner_ids, date_from, company_ids):
+        """ returns a dictionary with key=the ID of a journal item to age and value=its
+            partner, balance and currency of its company, aging date and its amounts
+            reconciled up to ``date_from`` by currency of the partial reconciliations:
+            the amounts of the partials where it is the credit line are added, the ones
+            where it is the debit line are subtracted.
+        """
+        self.env.cr.execute('''
+            WITH aged_line AS (
+                SELECT l.id, l.partner_id, l.balance, company.currency_id,
+                    COALESCE(l.date_maturity, l.date) AS date
+                FROM account_move_line AS l
+                JOIN account_account ON l.account_id = account_account.id
+                JOIN account_move am ON l.move_id = am.id
+                JOIN res_company company ON l.company_id = company.id
+                WHERE (am.state IN %(move_state)s)
+                    AND (account_account.account_type IN %(account_type)s)
+                    AND ((l.partner_id IN %(partner_ids)s) OR (l.partner_id IS NULL))
+                    AND (l.date <= %(date_from)s)
+                    AND l.company_id IN %(company_ids)s
+            ),
+            partial AS (
+                SELECT partial.line_id, partial_company.currency_id, SUM(partial.amount) AS amount
+                FROM (
+                    SELECT apr.credit_move_id AS line_id, apr.company_id, apr.amount
+                    FROM account_partial_reconcile apr
+                    JOIN aged_line ON aged_line.id = apr.credit_move_id
+                    WHERE apr.max_date <= %(date_from)s
+                    UNION ALL
+                    SELECT apr.debit_move_id, apr.company_id, -apr.amount
+                    FROM account_partial_reconcile apr
+                    JOIN aged_line ON aged_line.id = apr.debit_move_id
+                    WHERE apr.max_date <= %(date_from)s
+                ) AS partial
+                JOIN res_company partial_company ON partial.company_id = partial_company.id
+                GROUP BY partial.line_id, partial_company.currency_id
+            )
+            SELECT aged_line.id, aged_line.partner_id, aged_line.balance, aged_line.currency_id,
+                aged_line.date, partial.currency_id AS partial_currency_id, partial.amount AS partial_amount
+            FROM aged_line
+            LEFT JOIN partial ON partial.line_id = aged_line.id
+            ORDER BY aged_line.id
+        ''', {
+            'move_state': tuple(move_state),
+            'account_type': tuple(account_type),
+            'partner_ids': tuple(partner_ids),
+            'date_from': date_from,
+            'company_ids': tuple(company_ids),
+        })
+        aged_lines = {}
+        for row in self.env.cr.dictfetchall():
+            aged_line = aged_lines.setdefault(row['id'], {
+                'partner_id': row['partner_id'],
+                'balance': row['balance'],
+                'currency_id': row['currency_id'],
+                'date': row['date'],
+                'partials': {},
+            })
+            if row['partial_currency_id']:
+                aged_line['partials'][row['partial_currency_id']] = row['partial_amount']
+        return aged_lines
+
     def _get_partner_move_lines(self, account_type, partner_ids,
                                 date_from, target_move, period_length):
         # This method can receive the context key 'include_nullified_amount' {Boolean}
@@ -53,15 +127,12 @@ class ReportAgedPartnerBalance(models.AbstractModel):
             move_state = ['posted']
         arg_list = (tuple(move_state), tuple(account_type))
 
-        reconciliation_clause = '(l.reconciled IS FALSE)'
-        cr.execute('SELECT debit_move_id, credit_move_id FROM account_partial_reconcile where max_date > %s', (date_from,))
-        reconciled_after_date = []
-        for row in cr.fetchall():
-            reconciled_after_date += [row[0], row[1]]
-        if reconciled_after_date:
-            reconciliation_clause = '(l.reconciled IS FALSE OR l.id IN %s)'
-            arg_list += (tuple(reconciled_after_date),)
-        arg_list += (date_from, tuple(company_ids))
+        # The lines reconciled after date_from are still open at that date
+        reconciliation_clause = '''(l.reconciled IS FALSE OR l.id IN (
+                SELECT debit_move_id FROM account_partial_reconcile WHERE max_date > %s
+                UNION ALL
+                SELECT credit_move_id FROM account_partial_reconcile WHERE max_date > %s))'''
+        arg_list += (date_from, date_from, date_from, tuple(company_ids))
         query = '''
             SELECT DISTINCT l.partner_id, UPPER(res_partner.name)
             FROM account_move_line AS l left join res_partner on l.partner_id = res_partner.id, account_account, account_move am
@@ -88,105 +159,49 @@ class ReportAgedPartnerBalance(models.AbstractModel):
 
         # This dictionary will store the not due amount of all partners
         undue_amounts = {}
-        query = '''SELECT l.id
-                FROM account_move_line AS l, account_account, account_move am
-                WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                    AND (am.state IN %s)
-                    AND (account_account.account_type IN %s)
-                    AND (COALESCE(l.date_maturity,l.date) >= %s)\
-                    AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                AND (l.date <= %s)
-                AND l.company_id IN %s'''
-        cr.execute(query, (tuple(move_state), tuple(account_type), date_from,
-                           tuple(partner_ids), date_from, tuple(company_ids)))
-        aml_ids = cr.fetchall()
-        aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-        for line in self.env['account.move.line'].browse(aml_ids):
-            partner_id = line.partner_id.id or False
-            if partner_id not in undue_amounts:
-                undue_amounts[partner_id] = 0.0
-            line_amount = line.company_id.currency_id._convert(line.balance,
-                                                               user_currency,
-                                                               company, date)
+        # history will contain the amounts of each period: history[1] = {'<partner_id>': <partner_debit-credit>}
+        history = [{} for i in range(5)]
+        period_dates = [(
+            periods[str(i)]['start'] and fields.Date.to_date(periods[str(i)]['start']),
+            fields.Date.to_date(periods[str(i)]['stop']),
+        ) for i in range(5)]
+        aged_lines = self._get_aged_move_lines(
+            move_state, account_type, partner_ids, date_from, company_ids)
+        currency_ids = set()
+        for aged_line in aged_lines.values():
+            currency_ids.add(aged_line['currency_id'])
+            currency_ids.update(aged_line['partials'])
+        rates = self._get_currency_rates(currency_ids, user_currency, company, date)
+        move_lines = self.env['account.move.line'].browse(list(aged_lines))
+        for line in move_lines:
+            aged_line = aged_lines[line.id]
+            partner_id = aged_line['partner_id'] or False
+            line_amount = user_currency.round(aged_line['balance'] * rates[aged_line['currency_id']])
             if user_currency.is_zero(line_amount):
                 continue
-            for partial_line in line.matched_debit_ids:
-                if partial_line.max_date <= date_from:
-                    line_currency = partial_line.company_id.currency_id
-                    line_amount += line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
-            for partial_line in line.matched_credit_ids:
-                if partial_line.max_date <= date_from:
-                    line_currency = partial_line.company_id.currency_id
-                    line_amount -= line_currency._convert(partial_line.amount,
-                                                          user_currency,
-                                                          company, date)
-            if not self.env.user.company_id.currency_id.is_zero(line_amount):
-                undue_amounts[partner_id] += line_amount
-                lines[partner_id].append({
-                    'line': line,
-                    'amount': line_amount,
-                    'period': 6,
-                })
-
-        # Use one query per period and store results in history (a list variable)
-        # Each history will contain: history[1] = {'<partner_id>': <partner_debit-credit>}
-        history = []
-        for i in range(5):
-            args_list = (tuple(move_state), tuple(account_type), tuple(partner_ids),)
-            dates_query = '(COALESCE(l.date_maturity,l.date)'
-
-            if periods[str(i)]['start'] and periods[str(i)]['stop']:
-                dates_query += ' BETWEEN %s AND %s)'
-                args_list += (periods[str(i)]['start'], periods[str(i)]['stop'])
-            elif periods[str(i)]['start']:
-                dates_query += ' >= %s)'
-                args_list += (periods[str(i)]['start'],)
+            for currency_id, partial_amount in aged_line['partials'].items():
+                line_amount += user_currency.round(partial_amount * rates[currency_id])
+            if user_currency.is_zero(line_amount):
+                continue
+            if aged_line['date'] >= date_from:
+                period = 6
+                partners_amount = undue_amounts
             else:
-                dates_query += ' <= %s)'
-                args_list += (periods[str(i)]['stop'],)
-            args_list += (date_from, tuple(company_ids))
-
-            query = '''SELECT l.id
-                    FROM account_move_line AS l, account_account, account_move am
-                    WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                        AND (am.state IN %s)
-                        AND (account_account.account_type IN %s)
-                        AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                        AND ''' + dates_query + '''
-                    AND (l.date <= %s)
-                    AND l.company_id IN %s'''
-            cr.execute(query, args_list)
-            partners_amount = {}
-            aml_ids = cr.fetchall()
-            aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-            for line in self.env['account.move.line'].browse(aml_ids):
-                partner_id = line.partner_id.id or False
-                if partner_id not in partners_amount:
-                    partners_amount[partner_id] = 0.0
-                line_currency_id = line.company_id.currency_id
-                line_amount = line_currency_id._convert(line.balance, user_currency, company, date)
-                if user_currency.is_zero(line_amount):
-                    continue
-                for partial_line in line.matched_debit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_currency_id = partial_line.company_id.currency_id
-                        line_amount += line_currency_id._convert(
-                            partial_line.amount, user_currency, company, date)
-                for partial_line in line.matched_credit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_currency_id = partial_line.company_id.currency_id
-                        line_amount -= line_currency_id._convert(
-                            partial_line.amount, user_currency, company, date)
-                if not self.env.user.company_id.currency_id.is_zero(line_amount):
-                    partners_amount[partner_id] += line_amount
-                    lines[partner_id].append({
-                        'line': line,
-                        'amount': line_amount,
-                        'period': i + 1,
-                        })
-            history.append(partners_amount)
+                # the oldest period has no start
+                period = next(
+                    i + 1 for i, (period_start, period_stop) in enumerate(period_dates)
+                    if (not period_start or period_start <= aged_line['date']) and aged_line['date'] <= period_stop
+                )
+                partners_amount = history[period - 1]
+            partners_amount[partner_id] = partners_amount.get(partner_id, 0.0) + line_amount
+            lines.setdefault(partner_id, []).append({
+                'line': line,
+                'amount': line_amount,
+                'period': period,
+            })
+        for partner_lines in lines.values():
+            # the not due lines first, then the periods from the oldest one
+            partner_lines.sort(key=lambda line: line['period'] % 6)
 
         for partner in partners:
             if partner['partner_id'] is None:
@@ -37,47 +37,82 @@ class ReportFinancial(models.AbstractModel):
                 res[row['id']] = row
         return res
 
-    def _compute_report_balance(self, reports):
-        '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
-           computed for this record. If the record is of type :
-               'accounts' : it's the sum of the linked accounts
-               'account_type' : it's the sum of leaf accoutns with such an account_type
-               'account_report' : it's the amount of the related report
-               'sum' : it's the sum of the children of this record (aka a 'view' record)'''
-        res = {}
-        fields = ['credit', 'debit', 'balance']
-        for report in reports:
-            if report.id in res:
+    def _get_report_accounts(self, reports):
+        """ returns a dictionary with key=the ID of a record of the tree below the
+            provided reports and value=the accounts whose balance it sums up
+        """
+        accounts_by_report = {}
+        account_type_reports = self.env['account.financial.report']
+        todo = list(reports)
+        while todo:
+            report = todo.pop()
+            if report.id in accounts_by_report:
                 continue
-            res[report.id] = dict((fn, 0.0) for fn in fields)
+            accounts_by_report[report.id] = self.env['account.account']
             if report.type == 'accounts':
-                # it's the sum of the linked accounts
-                res[report.id]['account'] = self._compute_account_balance(report.account_ids)
-                for value in res[report.id]['account'].values():
-                    for field in fields:
-                        res[report.id][field] += value.get(field)
+                accounts_by_report[report.id] = report.account_ids
             elif report.type == 'account_type':
-                # it's the sum the leaf accounts with such an account type
-                accounts = self.env['account.account'].search(
-                    [('account_type', 'in', report.account_type_ids.mapped('type'))])
+                account_type_reports |= report
+            elif report.type == 'account_report' and report.account_report_id:
+                todo.append(report.account_report_id)
+            elif report.type == 'sum':
+                todo.extend(report.children_ids)
+        if account_type_reports:
+            # the leaf accounts of all the account types are searched at once
+            accounts = self.env['account.account'].search(
+                [('account_type', 'in', account_type_reports.account_type_ids.mapped('type'))])
+            for report in account_type_reports:
+                account_types = report.account_type_ids.mapped('type')
+                accounts_by_report[report.id] = accounts.filtered(
+                    lambda account: account.account_type in account_types)
+        return accounts_by_report
 
-                res[report.id]['account'] = self._compute_account_balance(accounts)
-                for value in res[report.id]['account'].values():
+    def _compute_report_balance(self, reports):
+        '''returns a dictionary with key=the ID of a record and value=the credit, debit and balance amount
+           computed for this record. If the record is of type :
+               'accounts' : it's the sum of the linked accounts
+               'account_type' : it's the sum of leaf accoutns with such an account_type
+               'account_report' : it's the amount of the related report
+               'sum' : it's the sum of the children of this record (aka a 'view' record)
+
+           The balances of all the accounts of the tree are fetched with one query, then
+           each record is computed once from them, however many times it is referenced.'''
+        fields = ['credit', 'debit', 'balance']
+        accounts_by_report = self._get_report_accounts(reports)
+        account_ids = set()
+        for accounts in accounts_by_report.values():
+            account_ids.update(accounts.ids)
+        account_balances = self._compute_account_balance(
+            self.env['account.account'].browse(sorted(account_ids)))
+        memo = {}
+
+        def report_balance(report):
+            if report.id in memo:
+                return memo[report.id]
+            res = memo[report.id] = dict((fn, 0.0) for fn in fields)
+            if report.type in ('accounts', 'account_type'):
+                # it's the sum of the linked accounts, or of the leaf accounts with such an account type
+                res['account'] = {
+                    account.id: dict(account_balances[account.id])
+                    for account in accounts_by_report[report.id]
+                }
+                for value in res['account'].values():
                     for field in fields:
-                        res[report.id][field] += value.get(field)
+                        res[field] += value.get(field)
             elif report.type == 'account_report' and report.account_report_id:
                 # it's the amount of the linked report
-                res2 = self._compute_report_balance(report.account_report_id)
-                for key, value in res2.items():
-                    for field in fields:
-                        res[report.id][field] += value[field]
+                value = report_balance(report.account_report_id)
+                for field in fields:
+                    res[field] += value[field]
             elif report.type == 'sum':
                 # it's the sum of the children of this account.report
-                res2 = self._compute_report_balance(report.children_ids)
-                for key, value in res2.items():
+                for child in report.children_ids:
+                    value = report_balance(child)
                     for field in fields:
-                        res[report.id][field] += value[field]
-        return res
+                        res[field] += value[field]
+            return res
+
+        return {report.id: report_balance(report) for report in reports}
 
     def get_account_lines(self, data):
         lines = []
@@ -0,0 +1,2 @@
+from . import test_report_financial
+from . import test_report_aged_partner
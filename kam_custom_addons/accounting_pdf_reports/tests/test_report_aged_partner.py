@@ -0,0 +1,104 @@
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportAgedPartner(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.invoice_line = cls._create_receivable_line('2019-01-01', 100.0)
+        cls.old_invoice_line = cls._create_receivable_line('2018-06-01', 15.0)
+        cls.undue_invoice_line = cls._create_receivable_line('2019-02-01', 10.0, date_maturity='2019-03-01')
+        # paid before the report date, the payment is not aged
+        payment_line = cls._create_receivable_line('2019-01-20', -30.0)
+        (cls.invoice_line + payment_line).reconcile()
+        # paid after the report date, the invoice is still open at that date
+        payment_line = cls._create_receivable_line('2019-03-10', -15.0)
+        (cls.old_invoice_line + payment_line).reconcile()
+
+    @classmethod
+    def _create_receivable_line(cls, date, amount, date_maturity=None, company_data=None):
+        company_data = company_data or cls.company_data
+        account_receivable = company_data['default_account_receivable']
+        move = cls.env['account.move'].with_company(company_data['company']).create({
+            'move_type': 'entry',
+            'date': date,
+            'line_ids': [
+                Command.create({
+                    'account_id': account_receivable.id,
+                    'partner_id': cls.partner_a.id,
+                    'debit': max(amount, 0.0),
+                    'credit': max(-amount, 0.0),
+                    'date_maturity': date_maturity or date,
+                }),
+                Command.create({
+                    'account_id': company_data['default_account_revenue'].id,
+                    'debit': max(-amount, 0.0),
+                    'credit': max(amount, 0.0),
+                }),
+            ],
+        })
+        move.action_post()
+        return move.line_ids.filtered(lambda line: line.account_id == account_receivable)
+
+    def test_aged_partner_balance(self):
+        report = self.env['report.accounting_pdf_reports.report_agedpartnerbalance'].with_context(
+            company_ids=self.env.company.ids, company_id=self.env.company.id)
+        res, total, lines = report._get_partner_move_lines(
+            ['asset_receivable'], [self.partner_a.id], '2019-02-08', 'posted', 30)
+
+        self.assertEqual(len(res), 1)
+        values = res[0]
+        self.assertEqual(values['partner_id'], self.partner_a.id)
+        self.assertEqual(
+            [values[key] for key in ('0', '1', '2', '3', '4', 'direction', 'total')],
+            [15.0, 0.0, 0.0, 70.0, 0.0, 10.0, 95.0])
+        self.assertEqual(total, [15.0, 0.0, 0.0, 70.0, 0.0, 95.0, 10.0])
+        self.assertEqual(
+            [(line['line'], line['amount'], line['period']) for line in lines[self.partner_a.id]],
+            [
+                (self.undue_invoice_line, 10.0, 6),
+                (self.old_invoice_line, 15.0, 1),
+                (self.invoice_line, 70.0, 4),
+            ])
+
+    def test_aged_partner_balance_other_currency(self):
+        company_currency = self.env.company.currency_id
+        other_currency = self.setup_other_currency('EUR', rates=[('2016-01-01', 2.0)])
+        company_data_2 = self.setup_other_company(currency_id=other_currency.id)
+        invoice_line = self._create_receivable_line('2019-01-01', 200.0, company_data=company_data_2)
+        payment_line = self._create_receivable_line('2019-01-20', -60.0, company_data=company_data_2)
+        (invoice_line + payment_line).reconcile()
+        companies = self.env.company + company_data_2['company']
+        report = self.env['report.accounting_pdf_reports.report_agedpartnerbalance'].with_context(
+            company_ids=companies.ids, company_id=self.env.company.id)
+
+        rates = report._get_currency_rates(
+            {company_currency.id, other_currency.id}, company_currency, self.env.company, '2019-02-08')
+        self.assertEqual(rates, {company_currency.id: 1.0, other_currency.id: 0.5})
+
+        aged_lines = report._get_aged_move_lines(
+            ['posted'], ['asset_receivable'], [self.partner_a.id], '2019-02-08', companies.ids)
+        self.assertEqual(
+            [(aged_lines[line.id]['balance'], aged_lines[line.id]['currency_id'], aged_lines[line.id]['partials'])
+             for line in (invoice_line, payment_line, self.invoice_line)],
+            [
+                (200.0, other_currency.id, {other_currency.id: -60.0}),
+                (-60.0, other_currency.id, {other_currency.id: 60.0}),
+                (100.0, company_currency.id, {company_currency.id: -30.0}),
+            ])
+
+        res, total, lines = report._get_partner_move_lines(
+            ['asset_receivable'], [self.partner_a.id], '2019-02-08', 'posted', 30)
+        values = res[0]
+        self.assertEqual(
+            [values[key] for key in ('0', '1', '2', '3', '4', 'direction', 'total')],
+            [15.0, 0.0, 0.0, 140.0, 0.0, 10.0, 165.0])
+        self.assertEqual(total, [15.0, 0.0, 0.0, 140.0, 0.0, 165.0, 10.0])
+        self.assertIn(
+            (invoice_line, 70.0, 4),
+            [(line['line'], line['amount'], line['period']) for line in lines[self.partner_a.id]])
@@ -0,0 +1,123 @@
+from unittest.mock import patch
+
+from odoo import Command
+from odoo.tests import tagged
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportFinancial(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account_revenue = cls.company_data['default_account_revenue']
+        cls.account_expense = cls.company_data['default_account_expense']
+        cls.account_receivable = cls.company_data['default_account_receivable']
+        Report = cls.env['account.financial.report']
+        cls.report = Report.create({'name': 'Profit and Receivables'})
+        cls.report_income = Report.create({
+            'name': 'Income',
+            'parent_id': cls.report.id,
+            'sequence': 1,
+            'type': 'accounts',
+            'account_ids': [Command.set((cls.account_revenue + cls.account_expense).ids)],
+            'sign': '-1',
+        })
+        cls.report_receivable = Report.create({
+            'name': 'Receivable',
+            'parent_id': cls.report.id,
+            'sequence': 2,
+            'type': 'account_type',
+            'account_type_ids': [Command.set(
+                cls.env.ref('accounting_pdf_reports.data_account_type_receivable').ids)],
+        })
+        cls.report_income_value = Report.create({
+            'name': 'Income Value',
+            'parent_id': cls.report.id,
+            'sequence': 3,
+            'type': 'account_report',
+            'account_report_id': cls.report_income.id,
+        })
+        for date, amount in (('2019-01-15', 100.0), ('2019-02-15', 40.0), ('2018-06-15', 25.0)):
+            move = cls.env['account.move'].create({
+                'move_type': 'entry',
+                'date': date,
+                'line_ids': [
+                    Command.create({
+                        'account_id': cls.account_receivable.id,
+                        'partner_id': cls.partner_a.id,
+                        'debit': amount,
+                    }),
+                    Command.create({
+                        'account_id': cls.account_revenue.id,
+                        'credit': amount,
+                    }),
+                ],
+            })
+            move.action_post()
+
+    def _get_context(self, date_from, date_to):
+        return {
+            'journal_ids': False,
+            'state': 'posted',
+            'date_from': date_from,
+            'date_to': date_to,
+            'strict_range': True,
+            'company_id': self.env.company.id,
+        }
+
+    def test_report_balance(self):
+        ReportFinancial = self.env['report.accounting_pdf_reports.report_financial'].with_context(
+            self._get_context('2019-01-01', '2019-12-31'))
+        reports = self.report._get_children_by_order()
+        with patch.object(
+            type(ReportFinancial), '_compute_account_balance',
+            autospec=True, side_effect=type(ReportFinancial)._compute_account_balance,
+        ) as compute_account_balance:
+            res = ReportFinancial._compute_report_balance(reports)
+        # the accounts of the whole tree are aggregated at once
+        self.assertEqual(compute_account_balance.call_count, 1)
+
+        # the same balances as aggregating the accounts of each record separately
+        receivable_accounts = self.env['account.account'].search(
+            [('account_type', '=', 'asset_receivable')])
+        for report, accounts in (
+            (self.report_income, self.report_income.account_ids),
+            (self.report_receivable, receivable_accounts),
+        ):
+            expected = ReportFinancial._compute_account_balance(accounts)
+            self.assertEqual(set(res[report.id]['account']), set(expected))
+            for field in ('debit', 'credit', 'balance'):
+                self.assertAlmostEqual(
+                    res[report.id][field],
+                    sum(value[field] for value in expected.values()))
+
+        self.assertEqual(
+            {key: res[self.report_income.id][key] for key in ('debit', 'credit', 'balance')},
+            {'debit': 0.0, 'credit': 140.0, 'balance': -140.0})
+        self.assertEqual(res[self.report_income.id]['account'][self.account_expense.id]['balance'], 0.0)
+        self.assertEqual(res[self.report_receivable.id]['balance'], 140.0)
+        self.assertEqual(res[self.report_income_value.id]['balance'], -140.0)
+        self.assertEqual(
+            {key: res[self.report.id][key] for key in ('debit', 'credit', 'balance')},
+            {'debit': 140.0, 'credit': 280.0, 'balance': -140.0})
+
+    def test_account_lines_comparison(self):
+        data = {
+            'account_report_id': (self.report.id, self.report.name),
+            'enable_filter': True,
+            'debit_credit': False,
+            'used_context': self._get_context('2019-01-01', '2019-12-31'),
+            'comparison_context': self._get_context('2018-01-01', '2018-12-31'),
+        }
+        lines = self.env['report.accounting_pdf_reports.report_financial'].get_account_lines(data)
+        lines_by_name = {line['name']: line for line in lines}
+        self.assertEqual(
+            [(line['balance'], line['balance_cmp']) for line in lines if line['type'] == 'report'],
+            [(-140.0, -25.0), (140.0, 25.0), (140.0, 25.0), (-140.0, -25.0)])
+        revenue_line = lines_by_name[f'{self.account_revenue.code} {self.account_revenue.name}']
+        self.assertEqual((revenue_line['balance'], revenue_line['balance_cmp']), (140.0, 25.0))
+        # the accounts without any amount are not displayed
+        self.assertNotIn(f'{self.account_expense.code} {self.account_expense.name}', lines_by_name)
@@ -33,7 +33,9 @@ class XLSXReportController(http.Controller):
         a response.
             Args:
                 model (str): The name of the model on which the report is based.
-                data (str): The data required for generating the report.
+                data (str): The data required for generating the report. The
+                journal items reports are computed again from the options
+                posted under its 'report_options' key and streamed.
                 output_format (str): The desired output format for the report
                 (e.g., 'xlsx').
                 report_name (str): The name to be given to the generated report
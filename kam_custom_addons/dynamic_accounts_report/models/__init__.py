@@ -19,11 +19,14 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ################################################################################
+from . import xlsx_report_mixin
 from . import account_general_ledger
 from . import account_partner_ledger
 from . import account_trial_balance
+from . import age_report_mixin
 from . import aged_payable_report
 from . import aged_receivable_report
+from . import book_report_mixin
 from . import bank_book_report
 from . import cash_book_report
 from . import dynamic_balance_sheet_report
@@ -19,19 +19,24 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ################################################################################
-import io
 import json
 import calendar
+import functools
 from dateutil.relativedelta import relativedelta
-import xlsxwriter
 from odoo import api, fields, models
 from datetime import datetime
 from odoo.tools import date_utils
 
+LEDGER_PAGE_SIZE = 200
+LEDGER_LINE_FIELDS = ['date', 'name', 'move_name', 'debit', 'credit',
+                      'partner_id', 'account_id', 'journal_id', 'move_id',
+                      'analytic_line_ids']
+
 
 class AccountGeneralLedger(models.TransientModel):
     """For creating General Ledger report"""
     _name = 'account.general.ledger'
+    _inherit = ['xlsx.report.mixin']
     _description = 'General Ledger Report'
 
     @api.model
@@ -48,35 +53,7 @@ class AccountGeneralLedger(models.TransientModel):
         :return: A dictionary containing the partner ledger report data.
         :rtype: dict
         """
-        account_dict = {}
-        account_totals = {}
-        move_line_ids = self.env['account.move.line'].search(
-            [('parent_state', '=', 'posted')])
-        account_ids = move_line_ids.mapped('account_id')
-        account_dict['journal_ids'] = self.env['account.journal'].search_read(
-            [], ['name'])
-        account_dict['analytic_ids'] = self.env[
-            'account.analytic.account'].search_read(
-            [], ['name'])
-        for account in account_ids:
-            move_line_id = move_line_ids.filtered(
-                lambda x: x.account_id == account)
-            move_line_list = []
-            for move_line in move_line_id:
-                move_line_data = move_line.read(
-                    ['date', 'name', 'move_name', 'debit', 'credit',
-                     'partner_id', 'account_id', 'journal_id', 'move_id',
-                     'analytic_line_ids'])
-                move_line_list.append(move_line_data)
-            account_dict[account.display_name] = move_line_list
-            currency_id = self.env.company.currency_id.symbol
-            account_totals[account.display_name] = {
-                'total_debit': round(sum(move_line_id.mapped('debit')), 2),
-                'total_credit': round(sum(move_line_id.mapped('credit')), 2),
-                'currency_id': currency_id,
-                'account_id': account.id}
-            account_dict['account_totals'] = account_totals
-        return account_dict
+        return self._get_ledger_report([('parent_state', '=', 'posted')])
 
     @api.model
     def get_filter_values(self, journal_id, date_range, options, analytic,
@@ -103,24 +80,77 @@ class AccountGeneralLedger(models.TransientModel):
         ledger report.
         :rtype: dict
         """
-        account_dict = {}
-        account_totals = {}
+        return self._get_ledger_report(self._get_ledger_domain(
+            journal_id, date_range, options, analytic, method))
+
+    @api.model
+    def get_ledger_totals(self, journal_id, date_range, options, analytic,
+                          method):
+        """
+        First step of the lazy general ledger: the per account totals,
+        without any journal item. The lines of an account are fetched with
+        get_ledger_lines when it is unfolded.
+
+        :param journal_id: The journal IDs to filter the report data.
+        :param date_range: The date range option to filter the report data.
+        :param options: The additional options to filter the report data.
+        :param analytic: The analytic IDs to filter the report data.
+        :param method: The accounting method (accrual or cash basis).
+        :return: Same structure as get_filter_values, with an empty list of
+        lines for every account.
+        :rtype: dict
+        """
+        domain = self._get_ledger_domain(journal_id, date_range, options,
+                                         analytic, method)
+        account_dict = self._get_ledger_filters()
+        account_totals = self._get_ledger_account_totals(domain)
+        for account_name in account_totals:
+            account_dict[account_name] = []
+        if account_totals:
+            account_dict['account_totals'] = account_totals
+        return account_dict
+
+    @api.model
+    def get_ledger_lines(self, account_id, journal_id, date_range, options,
+                         analytic, method, after=None,
+                         limit=LEDGER_PAGE_SIZE):
+        """
+        Fetch one page of the journal items of an account, most recent
+        first as in the journal items order: by date then id, descending.
+        Pages are chained with the key of the last line returned, so
+        fetching a page never depends on the number of lines before it.
+
+        :param account_id: The account to drill down.
+        :param after: The (date, id) key of the last line already fetched.
+        :param limit: The maximum number of lines of the page.
+        :return: The lines, in the format of get_filter_values, and the key
+        of the next page (False on the last page).
+        :rtype: dict
+        """
+        domain = self._get_ledger_domain(journal_id, date_range, options,
+                                         analytic, method)
+        lines, next_key = self._get_ledger_page(
+            domain, account_id or False, after, limit)
+        return {'lines': lines, 'next': next_key}
+
+    @api.model
+    def _get_ledger_domain(self, journal_id, date_range, options, analytic,
+                           method):
+        """
+        Build the journal items domain from the filters of the report.
+        """
         today = fields.Date.today()
         quarter_start, quarter_end = date_utils.get_quarter(today)
         previous_quarter_start = quarter_start - relativedelta(months=3)
         previous_quarter_end = quarter_start - relativedelta(days=1)
-        if options == {}:
-            options = None
-        if options is None:
-            option_domain = ['posted']
-        elif 'draft' in options:
+        if options and 'draft' in options:
             option_domain = ['posted', 'draft']
+        else:
+            option_domain = ['posted']
         domain = [('journal_id', 'in', journal_id),
                   ('parent_state', 'in', option_domain), ] if journal_id else [
             ('parent_state', 'in', option_domain), ]
-        if method == {}:
-            method = None
-        if method is not None and 'cash' in method:
+        if method and 'cash' in method:
             domain += [('journal_id', 'in',
                         self.env.company.tax_cash_basis_journal_id.ids), ]
         if analytic:
@@ -170,30 +200,88 @@ class AccountGeneralLedger(models.TransientModel):
                 end_date = datetime.strptime(date_range['end_date'],
                                              '%Y-%m-%d').date()
                 domain += [('date', '<=', end_date)]
-        move_line_ids = self.env['account.move.line'].search(domain)
-        account_ids = move_line_ids.mapped('account_id')
-        account_dict['journal_ids'] = self.env['account.journal'].search_read(
-            [], ['name'])
-        account_dict['analytic_ids'] = self.env[
-            'account.analytic.account'].search_read(
-            [], ['name'])
-        for account in account_ids:
-            move_line_id = move_line_ids.filtered(
-                lambda x: x.account_id == account)
-            move_line_list = []
-            for move_line in move_line_id:
-                move_line_data = move_line.read(
-                    ['date', 'name', 'move_name', 'debit', 'credit',
-                     'partner_id', 'account_id', 'journal_id', 'move_id',
-                     'analytic_line_ids'])
-                move_line_list.append(move_line_data)
-            account_dict[account.display_name] = move_line_list
-            currency_id = self.env.company.currency_id.symbol
+        return domain
+
+    @api.model
+    def _get_ledger_filters(self):
+        """Journals and analytic accounts offered as filters."""
+        return {
+            'journal_ids': self.env['account.journal'].search_read(
+                [], ['name']),
+            'analytic_ids': self.env['account.analytic.account'].search_read(
+                [], ['name']),
+        }
+
+    @api.model
+    def _get_ledger_account_totals(self, domain):
+        """
+        Debit and credit totals of every account having journal items in
+        the domain, computed by a single grouped query.
+
+        :return: The totals keyed by the account display name.
+        :rtype: dict
+        """
+        currency_id = self.env.company.currency_id.symbol
+        account_totals = {}
+        for account, debit, credit in self.env[
+                'account.move.line']._read_group(
+                domain, ['account_id'], ['debit:sum', 'credit:sum']):
+            if not account:
+                continue
             account_totals[account.display_name] = {
-                'total_debit': round(sum(move_line_id.mapped('debit')), 2),
-                'total_credit': round(sum(move_line_id.mapped('credit')), 2),
+                'total_debit': round(debit, 2),
+                'total_credit': round(credit, 2),
                 'currency_id': currency_id,
                 'account_id': account.id}
+        return account_totals
+
+    @api.model
+    def _get_ledger_page(self, domain, account_id, after=None,
+                         limit=LEDGER_PAGE_SIZE):
+        """
+        Keyset paginated journal items of an account, read in one batch.
+
+        :return: The lines of the page and the (date, id) key of the next
+        page, or False when there is none.
+        :rtype: tuple
+        """
+        domain = domain + [('account_id', '=', account_id)]
+        if after:
+            after_date, after_id = after
+            domain += ['|', ('date', '<', after_date),
+                       '&', ('date', '=', after_date), ('id', '<', after_id)]
+        move_lines = self.env['account.move.line'].search_fetch(
+            domain, LEDGER_LINE_FIELDS, limit=limit, order='date desc, id desc')
+        lines = [[line] for line in move_lines.read(LEDGER_LINE_FIELDS)]
+        next_key = False
+        if limit and len(move_lines) == limit:
+            next_key = [fields.Date.to_string(move_lines[-1].date),
+                        move_lines[-1].id]
+        return lines, next_key
+
+    @api.model
+    def _iter_ledger_lines(self, domain, account_id):
+        """Yield the pages of journal items of an account."""
+        next_key = None
+        while next_key is not False:
+            lines, next_key = self._get_ledger_page(domain, account_id,
+                                                    next_key)
+            yield lines
+
+    @api.model
+    def _get_ledger_report(self, domain):
+        """
+        Complete general ledger of the domain, lines included, as expected
+        by the PDF report.
+        """
+        account_dict = self._get_ledger_filters()
+        account_totals = self._get_ledger_account_totals(domain)
+        for account_name, totals in account_totals.items():
+            account_dict[account_name] = [
+                line for lines in self._iter_ledger_lines(
+                    domain, totals['account_id'])
+                for line in lines]
+        if account_totals:
             account_dict['account_totals'] = account_totals
         return account_dict
 
@@ -203,7 +291,8 @@ class AccountGeneralLedger(models.TransientModel):
         Generate an XLSX report based on the provided data and write it to the
         response stream.
 
-        :param data: The data used to generate the report.
+        :param data: The report filters, and the options the report is
+        computed from under the 'report_options' key.
         :type data: str (JSON format)
 
         :param response: The response object to write the generated report to.
@@ -213,117 +302,89 @@ class AccountGeneralLedger(models.TransientModel):
         :type report_name: str
         """
         data = json.loads(data)
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        start_date = data['filters']['start_date'] if \
-            data['filters']['start_date'] else ''
-        end_date = data['filters']['end_date'] if \
-            data['filters']['end_date'] else ''
+        return self._stream_xlsx_report(response, functools.partial(
+            self._write_xlsx_report, data, report_name))
+
+    @api.model
+    def _write_xlsx_report(self, data, report_name, workbook):
+        """
+        Write the general ledger XLSX report from the options of the report.
+        Journal items are read page by page, so the ledger is never loaded
+        as a whole.
+
+        :param data: The report filters, with the ledger domain arguments
+        under the 'report_options' key.
+        :type data: dict
+
+        :param report_name: The name of the report.
+        :type report_name: str
+
+        :param workbook: The workbook, in constant memory mode.
+        :type workbook: xlsxwriter.Workbook
+        """
+        report_options = data['report_options']
+        domain = self._get_ledger_domain(
+            report_options.get('journal_id'),
+            report_options.get('date_range'), report_options.get('options'),
+            report_options.get('analytic'), report_options.get('method'))
+        filters = data['filters']
         sheet = workbook.add_worksheet()
-        head = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '15px'})
-        sub_heading = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px',
-             'border': 1, 'bg_color': '#D3D3D3',
-             'border_color': 'black'})
-        filter_head = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px',
-             'border': 1, 'bg_color': '#D3D3D3',
-             'border_color': 'black'})
-        filter_body = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px'})
-        side_heading_sub = workbook.add_format(
-            {'align': 'left', 'bold': True, 'font_size': '10px',
-             'border': 1,
-             'border_color': 'black'})
-        side_heading_sub.set_indent(1)
-        txt_name = workbook.add_format({'font_size': '10px', 'border': 1})
-        txt_name.set_indent(2)
-        sheet.set_column(0, 0, 30)
-        sheet.set_column(1, 1, 20)
-        sheet.set_column(2, 2, 15)
-        sheet.set_column(3, 3, 15)
+        formats = self._get_xlsx_formats(workbook)
+        sub_heading = formats['sub_heading']
+        filter_head = formats['filter_head']
+        txt_name = formats['txt_name']
+        date_range = ''
+        if filters['start_date'] or filters['end_date']:
+            date_range = f"{filters['start_date'] or ''} to " \
+                         f"{filters['end_date'] or ''}"
+        self._write_xlsx_header(sheet, formats, report_name, [
+            ('Date Range', date_range),
+            ('Journals', ', '.join(filters['journal'] or [])),
+            ('Analytic', ', '.join(filters['analytic'] or [])),
+            ('Options', ', '.join(filters['options'] or {})),
+        ])
         col = 0
-        sheet.write('A1:b1', report_name, head)
-        sheet.write('B3:b4', 'Date Range', filter_head)
-        sheet.write('B4:b4', 'Journals', filter_head)
-        sheet.write('B5:b4', 'Analytic', filter_head)
-        sheet.write('B6:b4', 'Options', filter_head)
-        if start_date or end_date:
-            sheet.merge_range('C3:G3', f"{start_date} to {end_date}",
-                              filter_body)
-        if data['filters']['journal']:
-            display_names = [journal for
-                             journal in data['filters']['journal']]
-            display_names_str = ', '.join(display_names)
-            sheet.merge_range('C4:G4', display_names_str, filter_body)
-        if data['filters']['analytic']:
-            display_names = [analytic for
-                             analytic in data['filters']['analytic']]
-            account_keys_str = ', '.join(display_names)
-            sheet.merge_range('C5:G5', account_keys_str, filter_body)
-        if data['filters']['options']:
-            option_keys = list(data['filters']['options'].keys())
-            option_keys_str = ', '.join(option_keys)
-            sheet.merge_range('C6:G6', option_keys_str, filter_body)
-        if data:
-            if report_action == 'dynamic_accounts_report.action_general_ledger':
-                sheet.write(8, col, ' ', sub_heading)
-                sheet.write(8, col + 1, 'Date', sub_heading)
-                sheet.merge_range('C9:E9', 'Communication', sub_heading)
-                sheet.merge_range('F9:G9', 'Partner', sub_heading)
-                sheet.merge_range('H9:I9', 'Debit', sub_heading)
-                sheet.merge_range('J9:K9', 'Credit', sub_heading)
-                sheet.merge_range('L9:M9', 'Balance', sub_heading)
-                row = 8
-                if data['account']:
-                    for account in data['account']:
-                        row += 1
-                        sheet.write(row, col, account, txt_name)
-                        sheet.write(row, col + 1, ' ', txt_name)
-                        sheet.merge_range(row, col + 2, row, col + 4, ' ', txt_name)
-                        sheet.merge_range(row, col + 5, row, col + 6, ' ',
-                                          txt_name)
-                        sheet.merge_range(row, col + 7, row, col + 8,
-                                          data['total'][account]['total_debit_display'],
-                                          txt_name)
-                        sheet.merge_range(row, col + 9, row, col + 10,
-                                          data['total'][account]['total_credit_display'],
-                                          txt_name)
-                        sheet.merge_range(row, col + 11, row, col + 12,
-                                          data['total'][account]['balance_display'],
-                                          txt_name)
-                        for rec in data['data'][account]:
-                            row += 1
-                            partner = rec[0]['partner_id']
-                            name = partner[1] if partner else None
-                            sheet.write(row, col, rec[0]['move_name'], txt_name)
-                            sheet.write(row, col + 1, rec[0]['date'], txt_name)
-                            sheet.merge_range(row, col + 2, row, col + 4,
-                                              rec[0]['name'], txt_name)
-                            sheet.merge_range(row, col + 5, row, col + 6, name,
-                                              txt_name)
-                            sheet.merge_range(row, col + 7, row, col + 8,
-                                              rec[0]['debit'],
-                                              txt_name)
-                            sheet.merge_range(row, col + 9, row, col + 10,
-                                              rec[0]['credit'], txt_name)
-                            sheet.merge_range(row, col + 11, row, col + 12, ' ',
-                                              txt_name)
+        self._write_xlsx_columns(sheet, 8, [
+            (' ', 30), ('Date', 15), ('Communication', 30), ('Partner', 25),
+            ('Debit', 15), ('Credit', 15), ('Balance', 15),
+        ], sub_heading)
+        row = 8
+        total_debit = total_credit = 0.0
+        account_totals = self._get_ledger_account_totals(domain)
+        for account, totals in account_totals.items():
+            total_debit += totals['total_debit']
+            total_credit += totals['total_credit']
+            row += 1
+            sheet.write(row, col, account, txt_name)
+            for blank in range(1, 4):
+                sheet.write(row, col + blank, ' ', txt_name)
+            sheet.write(row, col + 4, f"{totals['total_debit']:,.2f}",
+                        txt_name)
+            sheet.write(row, col + 5, f"{totals['total_credit']:,.2f}",
+                        txt_name)
+            sheet.write(
+                row, col + 6,
+                f"{totals['total_debit'] - totals['total_credit']:,.2f}",
+                txt_name)
+            for lines in self._iter_ledger_lines(domain,
+                                                 totals['account_id']):
+                for rec in lines:
                     row += 1
-                    sheet.merge_range(row, col, row, col + 6, 'Total',
-                                      filter_head)
-                    sheet.merge_range(row, col + 7, row, col + 8,
-                                      data['grand_total']['total_debit_display'],
-                                      filter_head)
-                    sheet.merge_range(row, col + 9, row, col + 10,
-                                      data['grand_total']['total_credit_display'],
-                                      filter_head)
-                    sheet.merge_range(row, col + 11, row, col + 12,
-                                      float(data['grand_total']['total_debit']) -
-                                      float(data['grand_total']['total_credit']),
-                                      filter_head)
-        workbook.close()
-        output.seek(0)
-        response.stream.write(output.read())
-        output.close()
+                    partner = rec[0]['partner_id']
+                    name = partner[1] if partner else None
+                    sheet.write(row, col, rec[0]['move_name'], txt_name)
+                    sheet.write(row, col + 1, rec[0]['date'], txt_name)
+                    sheet.write(row, col + 2, rec[0]['name'], txt_name)
+                    sheet.write(row, col + 3, name, txt_name)
+                    sheet.write(row, col + 4, rec[0]['debit'], txt_name)
+                    sheet.write(row, col + 5, rec[0]['credit'], txt_name)
+                    sheet.write(row, col + 6, ' ', txt_name)
+                # keep the cache as small as the page
+                self.env['account.move.line'].invalidate_model()
+        if account_totals:
+            row += 1
+            sheet.merge_range(row, col, row, col + 3, 'Total', filter_head)
+            sheet.write(row, col + 4, f"{total_debit:,.2f}", filter_head)
+            sheet.write(row, col + 5, f"{total_credit:,.2f}", filter_head)
+            sheet.write(row, col + 6, round(total_debit - total_credit, 2),
+                        filter_head)
@@ -19,18 +19,23 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ################################################################################
-import io
+import functools
 import json
-from dateutil.relativedelta import relativedelta
-import xlsxwriter
-from odoo import api, fields, models
-from datetime import datetime
-from odoo.tools import date_utils
+from collections import defaultdict
+from odoo import api, models
+from datetime import date
+from odoo.tools import SQL
+
+PARTNER_LEDGER_LINE_FIELDS = ['date', 'move_name', 'account_type', 'debit',
+                              'credit', 'date_maturity', 'account_id',
+                              'journal_id', 'move_id', 'matching_number',
+                              'amount_currency']
 
 
 class AccountPartnerLedger(models.TransientModel):
     """For creating Partner Ledger report"""
     _name = 'account.partner.ledger'
+    _inherit = ['xlsx.report.mixin']
     _description = 'Partner Ledger Report'
 
     @api.model
@@ -47,55 +52,8 @@ class AccountPartnerLedger(models.TransientModel):
         :return: A dictionary containing the partner data for the report.
         :rtype: dict
         """
-        fiscal_year = self.env['res.company'].search([]).mapped('account_opening_date')[0].strftime('%Y-%m-%d')
-        fiscal_year_start = datetime.strptime(fiscal_year,
-                                              '%Y-%m-%d').date()
-        partner_dict = {}
-        partner_totals = {}
-        move_line_ids = self.env['account.move.line'].search(
-            [('account_type', 'in',
-              ['liability_payable', 'asset_receivable']),
-             ('parent_state', '=', 'posted')])
-        partner_ids = move_line_ids.mapped('partner_id')
-        for partner in partner_ids:
-            total_debit_balance = 0
-            total_credit_balance = 0
-            balance = 0
-            move_line_id = move_line_ids.filtered(
-                lambda x: x.partner_id == partner)
-            move_line_list = []
-            for move_line in move_line_id:
-                if move_line.invoice_date:
-                    if move_line.invoice_date < fiscal_year_start:
-                        total_debit_balance += move_line.debit
-                        total_credit_balance += move_line.credit
-                        balance = total_debit_balance - total_credit_balance
-                move_line_data = move_line.read(
-                    ['date', 'move_name', 'account_type', 'debit', 'credit',
-                     'date_maturity', 'account_id', 'journal_id', 'move_id',
-                     'matching_number', 'amount_currency'])
-                account_code = self.env['account.account'].browse(
-                    move_line.account_id.id).code
-                journal_code = self.env['account.journal'].browse(
-                    move_line.journal_id.id).code
-                if account_code:
-                    move_line_data[0]['jrnl'] = journal_code
-                    move_line_data[0]['code'] = account_code
-                move_line_list.append(move_line_data)
-            partner_dict[partner.name] = move_line_list
-            currency_id = self.env.company.currency_id.symbol
-            partner_totals[partner.name] = {
-                'total_debit': round(sum(move_line_id.mapped('debit')), 2),
-                'total_credit': round(sum(move_line_id.mapped('credit')), 2),
-                'currency_id': currency_id,
-                'initial_balance': balance,
-                'partner_id': partner.id,
-                'move_name': 'Initial Balance',
-                'initial_debit': total_debit_balance,
-                'initial_credit': total_credit_balance,
-            }
-            partner_dict['partner_totals'] = partner_totals
-        return partner_dict
+        return self._get_partner_ledger_report(
+            *self._get_partner_ledger_domain(False, False, None, None))
 
     @api.model
     def get_filter_values(self, partner_id, data_range, account, options):
@@ -117,228 +75,205 @@ class AccountPartnerLedger(models.TransientModel):
         :return: A dictionary containing the filtered partner data.
         :rtype: dict
         """
-        if options == {}:
-            options = None
-        if account == {}:
-            account = None
-        account_type_domain = []
-        if options is None:
-            option_domain = ['posted']
-        elif 'draft' in options:
+        return self._get_partner_ledger_report(
+            *self._get_partner_ledger_domain(partner_id, data_range, account,
+                                             options))
+
+    @api.model
+    def get_partner_ledger_totals(self, partner_id, data_range, account,
+                                  options):
+        """
+        First step of the lazy partner ledger: the per partner totals,
+        without any journal item. The lines of a partner are fetched with
+        get_partner_ledger_lines when it is unfolded.
+
+        :return: Same structure as get_filter_values, with an empty list of
+        lines for every partner.
+        :rtype: dict
+        """
+        domain, date_from, date_to = self._get_partner_ledger_domain(
+            partner_id, data_range, account, options)
+        partner_totals = self._get_partner_ledger_totals(
+            domain, date_from, date_to)
+        partner_dict = {partner_name: [] for partner_name in partner_totals}
+        if partner_totals:
+            partner_dict['partner_totals'] = partner_totals
+        return partner_dict
+
+    @api.model
+    def get_partner_ledger_lines(self, partner_ids, data_range, account,
+                                 options):
+        """
+        Journal items of the unfolded partners, fetched in one batch.
+
+        :param partner_ids: The IDs of the unfolded partners.
+        :return: The lines, in the format of get_filter_values, keyed by the
+        partner name.
+        :rtype: dict
+        """
+        domain, date_from, date_to = self._get_partner_ledger_domain(
+            partner_ids, data_range, account, options)
+        return self._get_partner_ledger_lines(domain, date_from, date_to)
+
+    @api.model
+    def _get_partner_ledger_domain(self, partner_id, data_range, account,
+                                   options):
+        """
+        Build the journal items domain from the filters of the report.
+
+        :return: The domain, without the dates, and the start and end dates
+        of the period. Journal items before the start date make the initial
+        balance, there is no end date when the period is open.
+        :rtype: tuple
+        """
+        if options and 'draft' in options:
             option_domain = ['posted', 'draft']
-        if account is None or (
-                'Receivable' in account and 'Payable' in account):
-            account_type_domain.append('liability_payable')
-            account_type_domain.append('asset_receivable')
+        else:
+            option_domain = ['posted']
+        if not account or ('Receivable' in account and 'Payable' in account):
+            account_type_domain = ['liability_payable', 'asset_receivable']
         elif 'Receivable' in account:
-            account_type_domain.append('asset_receivable')
-        elif 'Payable' in account:
-            account_type_domain.append('liability_payable')
-        partner_dict = {}
+            account_type_domain = ['asset_receivable']
+        else:
+            account_type_domain = ['liability_payable']
+        domain = [('account_type', 'in', account_type_domain),
+                  ('parent_state', 'in', option_domain),
+                  ('partner_id', '!=', False)]
+        if partner_id:
+            domain += [('partner_id', 'in', partner_id)]
+        date_from, date_to = self._get_report_dates(
+            data_range, self.env.company.account_opening_date or date.min)
+        return domain, date_from, date_to
+
+    @api.model
+    def _get_partner_ledger_totals(self, domain, date_from, date_to):
+        """
+        Initial and period debit and credit of every partner having journal
+        items in the domain, computed by a single grouped query.
+
+        :return: The totals keyed by the partner name.
+        :rtype: dict
+        """
+        if date_to:
+            domain = domain + [('date', '<=', date_to)]
+        query = self.env['account.move.line']._search(domain)
+        self.env.cr.execute(SQL(
+            """
+            SELECT account_move_line.partner_id,
+                   ROUND(COALESCE(SUM(account_move_line.debit) FILTER
+                         (WHERE account_move_line.date < %(date_from)s), 0), 2),
+                   ROUND(COALESCE(SUM(account_move_line.credit) FILTER
+                         (WHERE account_move_line.date < %(date_from)s), 0), 2),
+                   ROUND(COALESCE(SUM(account_move_line.debit) FILTER
+                         (WHERE account_move_line.date >= %(date_from)s), 0), 2),
+                   ROUND(COALESCE(SUM(account_move_line.credit) FILTER
+                         (WHERE account_move_line.date >= %(date_from)s), 0), 2)
+              FROM %(from_clause)s
+             WHERE %(where_clause)s
+          GROUP BY account_move_line.partner_id
+            """,
+            date_from=date_from,
+            from_clause=query.from_clause,
+            where_clause=query.where_clause or SQL("TRUE"),
+        ))
+        rows = self.env.cr.fetchall()
+        partners = self.env['res.partner'].browse(
+            [row[0] for row in rows]).sorted('name')
+        amounts = {partner_id: [float(amount) for amount in row]
+                   for partner_id, *row in rows}
+        currency_id = self.env.company.currency_id.symbol
         partner_totals = {}
-        today = fields.Date.today()
-        quarter_start, quarter_end = date_utils.get_quarter(today)
-        previous_quarter_start = quarter_start - relativedelta(months=3)
-        previous_quarter_end = quarter_start - relativedelta(days=1)
-        if not partner_id:
-            partner_id = self.env['account.move.line'].search([(
-                'account_type', 'in', account_type_domain),
-                ('parent_state', 'in', option_domain)]).mapped(
-                'partner_id').ids
-        balance_move_line_ids = []
-        for partners in partner_id:
-            partner = self.env['res.partner'].browse(partners).name
-            if data_range:
-                if data_range == 'month':
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain)]).filtered(
-                        lambda x: x.date.month == fields.Date.today().month)
-                    date_start = fields.Date.today().replace(day=1)
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif data_range == 'year':
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain)]).filtered(
-                        lambda x: x.date.year == fields.Date.today().year)
-                    date_start = fields.Date.today().replace(month=1, day=1)
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif data_range == 'quarter':
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('date', '>=', quarter_start),
-                         ('date', '<=', quarter_end),
-                         ('parent_state', 'in', option_domain)])
-                    date_start = quarter_start
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif data_range == 'last-month':
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain)]).filtered(
-                        lambda x: x.date.month == fields.Date.today().month - 1)
-                    date_start = fields.Date.today().replace(day=1, month=fields.Date.today().month - 1)
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif data_range == 'last-year':
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain)]).filtered(
-                        lambda x: x.date.year == fields.Date.today().year - 1)
-                    date_start = fields.Date.today().replace(day=1, month=1, )
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif data_range == 'last-quarter':
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('date', '>=', previous_quarter_start),
-                         ('date', '<=', previous_quarter_end),
-                         ('parent_state', 'in', option_domain)])
-                    date_start = previous_quarter_start
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif 'start_date' in data_range and 'end_date' in data_range:
-                    start_date = datetime.strptime(data_range['start_date'],
-                                                   '%Y-%m-%d').date()
-                    end_date = datetime.strptime(data_range['end_date'],
-                                                 '%Y-%m-%d').date()
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('date', '>=', start_date),
-                         ('date', '<=', end_date),
-                         ('parent_state', 'in', option_domain)])
-                    date_start = start_date
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif 'start_date' in data_range:
-                    start_date = datetime.strptime(data_range['start_date'],
-                                                   '%Y-%m-%d').date()
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('date', '>=', start_date),
-                         ('parent_state', 'in', option_domain)])
-                    date_start = start_date
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-                elif 'end_date' in data_range:
-                    end_date = datetime.strptime(data_range['end_date'],
-                                                 '%Y-%m-%d').date()
-                    move_line_ids = self.env['account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('date', '<=', end_date),
-                         ('parent_state', 'in', option_domain)])
-                    fiscal_year = self.env['res.company'].search([]).mapped(
-                        'account_opening_date')[0].strftime('%Y-%m-%d')
-                    date_start = datetime.strptime(fiscal_year,
-                                                   '%Y-%m-%d').date()
-                    balance_move_line_ids = self.env[
-                        'account.move.line'].search(
-                        [('partner_id', '=', partners), (
-                            'account_type', 'in',
-                            account_type_domain),
-                         ('parent_state', 'in', option_domain),
-                         ('invoice_date', '<', date_start)])
-            else:
-                move_line_ids = self.env['account.move.line'].search(
-                    [('partner_id', '=', partners), (
-                        'account_type', 'in',
-                        account_type_domain),
-                     ('parent_state', 'in', option_domain)])
-            total_debit_balance = 0
-            total_credit_balance = 0
-            balance = 0
-            move_line_list = []
-            for move_line in move_line_ids:
-                move_line_data = move_line.read(
-                    ['date', 'move_name', 'account_type', 'debit', 'credit',
-                     'date_maturity', 'account_id', 'journal_id', 'move_id',
-                     'matching_number', 'amount_currency'])
-                account_code = self.env['account.account'].browse(
-                    move_line.account_id.id).code
-                journal_code = self.env['account.journal'].browse(
-                    move_line.journal_id.id).code
-                if account_code:
-                    move_line_data[0]['jrnl'] = journal_code
-                    move_line_data[0]['code'] = account_code
-                move_line_list.append(move_line_data)
-            for remaining_move in balance_move_line_ids:
-                if remaining_move.invoice_date:
-                    if remaining_move.invoice_date < date_start:
-                        total_debit_balance += remaining_move.debit
-                        total_credit_balance += remaining_move.credit
-                        balance = total_debit_balance - total_credit_balance
-            partner_dict[partner] = move_line_list
-            currency_id = self.env.company.currency_id.symbol
-            partner_totals[partner] = {
-                'total_debit': round(sum(move_line_ids.mapped('debit')), 2),
-                'total_credit': round(sum(move_line_ids.mapped('credit')), 2),
+        for partner in partners:
+            initial_debit, initial_credit, total_debit, total_credit = \
+                amounts[partner.id]
+            initial_balance = round(initial_debit - initial_credit, 2)
+            partner_totals[partner.name] = {
+                'total_debit': total_debit,
+                'total_credit': total_credit,
                 'currency_id': currency_id,
-                'partner_id': partners,
-                'initial_balance': balance,
+                'partner_id': partner.id,
+                'initial_balance': initial_balance,
                 'move_name': 'Initial Balance',
-                'initial_debit': total_debit_balance,
-                'initial_credit': total_credit_balance,
+                'initial_debit': initial_debit,
+                'initial_credit': initial_credit,
+                'end_balance': round(
+                    initial_balance + total_debit - total_credit, 2),
             }
+        return partner_totals
+
+    @api.model
+    def _get_partner_ledger_period_domain(self, domain, date_from, date_to):
+        """Restrict the domain to the journal items of the period."""
+        domain = domain + [('date', '>=', date_from)]
+        if date_to:
+            domain += [('date', '<=', date_to)]
+        return domain
+
+    @api.model
+    def _read_partner_ledger_lines(self, move_lines):
+        """
+        Read the journal items along with their journal and account codes.
+
+        :return: The lines, in the format of get_filter_values.
+        :rtype: list
+        """
+        # Prefetched in one query each for all the lines
+        move_lines.journal_id.mapped('code')
+        move_lines.account_id.mapped('code')
+        lines = []
+        for move_line, move_line_data in zip(
+                move_lines, move_lines.read(PARTNER_LEDGER_LINE_FIELDS)):
+            if move_line.account_id.code:
+                move_line_data['jrnl'] = move_line.journal_id.code
+                move_line_data['code'] = move_line.account_id.code
+            lines.append([move_line_data])
+        return lines
+
+    @api.model
+    def _get_partner_ledger_lines(self, domain, date_from, date_to):
+        """
+        Journal items of the period of the partners in the domain, read in
+        one batch along with their journal and account codes.
+
+        :return: The lines keyed by the partner name.
+        :rtype: dict
+        """
+        move_lines = self.env['account.move.line'].search_fetch(
+            self._get_partner_ledger_period_domain(domain, date_from, date_to),
+            PARTNER_LEDGER_LINE_FIELDS + ['partner_id'],
+            order='partner_id, date, id')
+        partner_dict = defaultdict(list)
+        for move_line, line in zip(
+                move_lines, self._read_partner_ledger_lines(move_lines)):
+            partner_dict[move_line.partner_id.name].append(line)
+        return dict(partner_dict)
+
+    @api.model
+    def _iter_partner_ledger_lines(self, domain, partner_id, date_from,
+                                   date_to):
+        """
+        Yield the journal items of the period of a partner page by page, in
+        the order of the report screen.
+        """
+        domain = self._get_partner_ledger_period_domain(
+            domain + [('partner_id', '=', partner_id)], date_from, date_to)
+        for move_lines in self._iter_move_line_pages(
+                domain, PARTNER_LEDGER_LINE_FIELDS):
+            yield self._read_partner_ledger_lines(move_lines)
+
+    @api.model
+    def _get_partner_ledger_report(self, domain, date_from, date_to):
+        """
+        Complete partner ledger of the domain, lines included, as expected
+        by the PDF report.
+        """
+        partner_totals = self._get_partner_ledger_totals(
+            domain, date_from, date_to)
+        partner_lines = self._get_partner_ledger_lines(
+            domain, date_from, date_to)
+        partner_dict = {partner_name: partner_lines.get(partner_name, [])
+                        for partner_name in partner_totals}
+        if partner_totals:
             partner_dict['partner_totals'] = partner_totals
         return partner_dict
 
@@ -347,7 +282,8 @@ class AccountPartnerLedger(models.TransientModel):
         """
         Generate an Excel report based on the provided data.
 
-        :param data: The data used to generate the report.
+        :param data: The report filters, and the options the report is
+        computed from under the 'report_options' key.
         :type data: str (JSON format)
 
         :param response: The response object to write the report to.
@@ -359,147 +295,112 @@ class AccountPartnerLedger(models.TransientModel):
         :return: None
         """
         data = json.loads(data)
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        start_date = data['filters']['start_date'] if data['filters']['start_date'] else ''
-        end_date = data['filters']['end_date'] if data['filters']['end_date'] else ''
+        return self._stream_xlsx_report(response, functools.partial(
+            self._write_xlsx_report, data, report_name))
+
+    @api.model
+    def _write_xlsx_report(self, data, report_name, workbook):
+        """
+        Write the partner ledger XLSX report from the options of the report.
+        The journal items are read page by page, so the ledger is never
+        loaded as a whole.
+
+        :param data: The report filters, with the arguments of
+        get_filter_values under the 'report_options' key.
+        :type data: dict
+
+        :param report_name: The name of the report.
+        :type report_name: str
+
+        :param workbook: The workbook, in constant memory mode.
+        :type workbook: xlsxwriter.Workbook
+        """
+        report_options = data['report_options']
+        domain, date_from, date_to = self._get_partner_ledger_domain(
+            report_options.get('partner_id'),
+            report_options.get('data_range'), report_options.get('account'),
+            report_options.get('options'))
+        filters = data['filters']
         sheet = workbook.add_worksheet()
+        formats = self._get_xlsx_formats(workbook)
+        sub_heading = formats['sub_heading']
+        filter_head = formats['filter_head']
+        txt_name = formats['txt_name']
+        date_range = ''
+        if filters['start_date'] or filters['end_date']:
+            date_range = f"{filters['start_date'] or ''} to " \
+                         f"{filters['end_date'] or ''}"
+        self._write_xlsx_header(sheet, formats, report_name, [
+            ('Date Range', date_range),
+            ('Partners', ', '.join(
+                partner.get('display_name', 'undefined')
+                for partner in filters['partner'] or [])),
+            ('Accounts', ', '.join(filters['account'] or {})),
+            ('Options', ', '.join(filters['options'] or {})),
+        ])
 
-        # Define formats
-        head = workbook.add_format({'font_size': 15, 'align': 'center', 'bold': True})
-        head_highlight = workbook.add_format({'font_size': 10, 'align': 'center', 'bold': True})
-        sub_heading = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px', 'border': 1, 'bg_color': '#D3D3D3',
-             'border_color': 'black'})
-        filter_head = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px', 'border': 1, 'bg_color': '#D3D3D3',
-             'border_color': 'black'})
-        filter_body = workbook.add_format({'align': 'center', 'bold': True, 'font_size': '10px'})
-        side_heading_sub = workbook.add_format(
-            {'align': 'left', 'bold': True, 'font_size': '10px', 'border': 1, 'border_color': 'black'})
-        side_heading_sub.set_indent(1)
-        txt_name = workbook.add_format({'font_size': '10px', 'border': 1})
-        txt_name.set_indent(2)
-
-        # Set column widths
-        sheet.set_column(0, 0, 30)
-        sheet.set_column(1, 1, 20)
-        sheet.set_column(2, 2, 15)
-        sheet.set_column(3, 3, 15)
-
-        # Write headers and filters
-        col = 0
-        sheet.write('A1:B1', report_name, head)
-        sheet.write('B3:B4', 'Date Range', filter_head)
-        sheet.write('B4:B4', 'Partners', filter_head)
-        sheet.write('B5:B4', 'Accounts', filter_head)
-        sheet.write('B6:B4', 'Options', filter_head)
-
-        if start_date or end_date:
-            sheet.merge_range('C3:G3', f"{start_date} to {end_date}", filter_body)
-
-        if data['filters']['partner']:
-            display_names = [partner.get('display_name', 'undefined') for partner in data['filters']['partner']]
-            display_names_str = ', '.join(display_names)
-            sheet.merge_range('C4:G4', display_names_str, filter_body)
-
-        if data['filters']['account']:
-            account_keys = list(data['filters']['account'].keys())
-            account_keys_str = ', '.join(account_keys)
-            sheet.merge_range('C5:G5', account_keys_str, filter_body)
-
-        if data['filters']['options']:
-            option_keys = list(data['filters']['options'].keys())
-            option_keys_str = ', '.join(option_keys)
-            sheet.merge_range('C6:G6', option_keys_str, filter_body)
-
-        # Define a helper function to format numbers with thousand separators
         def format_number(value):
-            if value is None:
-                return "0.00"
-            return "{:,.2f}".format(float(value))
-
-        # Process partner data
-        if data and report_action == 'dynamic_accounts_report.action_partner_ledger':
-            sheet.write(8, col, ' ', sub_heading)
-            sheet.write(8, col + 1, 'JNRL', sub_heading)
-            sheet.write(8, col + 2, 'Account', sub_heading)
-            sheet.merge_range('D9:E9', 'Ref', sub_heading)
-            sheet.merge_range('F9:G9', 'Due Date', sub_heading)
-            sheet.merge_range('H9:I9', 'Debit', sub_heading)
-            sheet.merge_range('J9:K9', 'Credit', sub_heading)
-            sheet.merge_range('L9:M9', 'Balance', sub_heading)
-
-            row = 8
-            # Ensure data['partners'] is iterable; default to empty list if None
-            partners = data.get('partners', []) or []
-            for partner in partners:
-                row += 1
-                # Format partner totals
-                total_debit = data['total'][partner]['total_debit'] if data['total'] and partner in data['total'] else 0
-                total_credit = data['total'][partner]['total_credit'] if data['total'] and partner in data[
-                    'total'] else 0
-                balance = total_debit - total_credit
+            return "{:,.2f}".format(value)
 
-                sheet.write(row, col, partner, txt_name)
+        col = 0
+        self._write_xlsx_columns(sheet, 8, [
+            (' ', 30), ('JNRL', 15), ('Account', 15), ('Ref', 20),
+            ('Due Date', 15), ('Debit', 15), ('Credit', 15), ('Balance', 15),
+        ], sub_heading)
+        row = 8
+        grand_total_debit = grand_total_credit = 0.0
+        partner_totals = self._get_partner_ledger_totals(
+            domain, date_from, date_to)
+        for partner, totals in partner_totals.items():
+            grand_total_debit += totals['total_debit']
+            grand_total_credit += totals['total_credit']
+            row += 1
+            sheet.write(row, col, partner, txt_name)
+            for blank in range(1, 5):
+                sheet.write(row, col + blank, ' ', txt_name)
+            sheet.write(row, col + 5,
+                        format_number(totals['total_debit']), txt_name)
+            sheet.write(row, col + 6,
+                        format_number(totals['total_credit']), txt_name)
+            sheet.write(row, col + 7, format_number(
+                totals['total_debit'] - totals['total_credit']), txt_name)
+            running_balance = totals['initial_balance']
+            if running_balance != 0:
+                row += 1
+                sheet.write(row, col, '', txt_name)
                 sheet.write(row, col + 1, ' ', txt_name)
                 sheet.write(row, col + 2, ' ', txt_name)
-                sheet.merge_range(row, col + 3, row, col + 4, ' ', txt_name)
-                sheet.merge_range(row, col + 5, row, col + 6, ' ', txt_name)
-                sheet.merge_range(row, col + 7, row, col + 8, format_number(total_debit), txt_name)
-                sheet.merge_range(row, col + 9, row, col + 10, format_number(total_credit), txt_name)
-                sheet.merge_range(row, col + 11, row, col + 12, format_number(balance), txt_name)
-
-                # Handle initial balance
-                initial_balance = data['total'][partner]['initial_balance'] if data['total'] and partner in data[
-                    'total'] else 0
-                if initial_balance != 0:
+                sheet.write(row, col + 3, 'Initial Balance',
+                            formats['filter_body'])
+                sheet.write(row, col + 4, ' ', txt_name)
+                sheet.write(row, col + 5,
+                            format_number(totals['initial_debit']), txt_name)
+                sheet.write(row, col + 6,
+                            format_number(totals['initial_credit']), txt_name)
+                sheet.write(row, col + 7, format_number(running_balance),
+                            txt_name)
+            for lines in self._iter_partner_ledger_lines(
+                    domain, totals['partner_id'], date_from, date_to):
+                for rec in lines:
                     row += 1
-                    initial_debit = data['total'][partner]['initial_debit'] if data['total'] and partner in data[
-                        'total'] else 0
-                    initial_credit = data['total'][partner]['initial_credit'] if data['total'] and partner in data[
-                        'total'] else 0
-
-                    sheet.write(row, col, '', txt_name)
-                    sheet.write(row, col + 1, ' ', txt_name)
-                    sheet.write(row, col + 2, ' ', txt_name)
-                    sheet.merge_range(row, col + 3, row, col + 4, 'Initial Balance', head_highlight)
-                    sheet.merge_range(row, col + 5, row, col + 6, ' ', txt_name)
-                    sheet.merge_range(row, col + 7, row, col + 8, format_number(initial_debit), txt_name)
-                    sheet.merge_range(row, col + 9, row, col + 10, format_number(initial_credit), txt_name)
-                    sheet.merge_range(row, col + 11, row, col + 12, format_number(initial_balance), txt_name)
-
-                # Process move lines for the partner
-                running_balance = initial_balance or 0
-                for rec in data['data'][partner]:
-                    row += 1
-                    debit = rec[0].get('debit', 0) or 0
-                    credit = rec[0].get('credit', 0) or 0
-                    running_balance = running_balance + debit - credit
-                    sheet.write(row, col, rec[0]['date'], txt_name)
-                    sheet.write(row, col + 1, rec[0]['jrnl'], txt_name)
-                    sheet.write(row, col + 2, rec[0]['code'], txt_name)
-                    sheet.merge_range(row, col + 3, row, col + 4, rec[0]['move_name'], txt_name)
-                    sheet.merge_range(row, col + 5, row, col + 6, rec[0]['date_maturity'] or '', txt_name)
-                    sheet.merge_range(row, col + 7, row, col + 8, format_number(rec[0]['debit']), txt_name)
-                    sheet.merge_range(row, col + 9, row, col + 10, format_number(rec[0]['credit']), txt_name)
-                    sheet.merge_range(row, col + 11, row, col + 12, format_number(running_balance), txt_name)
-
-            # Grand totals
-            row += 1
-            # Ensure grand_total values are numbers
-            grand_total_debit = data['grand_total']['total_debit'] if data['grand_total'] and data['grand_total'][
-                'total_debit'] is not None else 0
-            grand_total_credit = data['grand_total']['total_credit'] if data['grand_total'] and data['grand_total'][
-                'total_credit'] is not None else 0
-            grand_balance = grand_total_debit - grand_total_credit
-
-            sheet.merge_range(row, col, row, col + 6, 'Total', filter_head)
-            sheet.merge_range(row, col + 7, row, col + 8, format_number(grand_total_debit), filter_head)
-            sheet.merge_range(row, col + 9, row, col + 10, format_number(grand_total_credit), filter_head)
-            sheet.merge_range(row, col + 11, row, col + 12, format_number(grand_balance), filter_head)
-
-        workbook.close()
-        output.seek(0)
-        response.stream.write(output.read())
-        output.close()
+                    running_balance += rec[0]['debit'] - rec[0]['credit']
+                    sheet.write(row, col, str(rec[0]['date']), txt_name)
+                    sheet.write(row, col + 1, rec[0].get('jrnl'), txt_name)
+                    sheet.write(row, col + 2, rec[0].get('code'), txt_name)
+                    sheet.write(row, col + 3, rec[0]['move_name'], txt_name)
+                    sheet.write(row, col + 4,
+                                str(rec[0]['date_maturity'] or ''), txt_name)
+                    sheet.write(row, col + 5, format_number(rec[0]['debit']),
+                                txt_name)
+                    sheet.write(row, col + 6, format_number(rec[0]['credit']),
+                                txt_name)
+                    sheet.write(row, col + 7, format_number(running_balance),
+                                txt_name)
+        row += 1
+        sheet.merge_range(row, col, row, col + 4, 'Total', filter_head)
+        sheet.write(row, col + 5, format_number(grand_total_debit),
+                    filter_head)
+        sheet.write(row, col + 6, format_number(grand_total_credit),
+                    filter_head)
+        sheet.write(row, col + 7, format_number(
+            grand_total_debit - grand_total_credit), filter_head)
@@ -25,9 +25,16 @@ import json
 from datetime import datetime
 import xlsxwriter
 from odoo import api, fields, models
+from odoo.tools import SQL
 from odoo.tools.date_utils import get_month, get_fiscal_year, \
     get_quarter_number, subtract
 
+EMPTY_TRIAL_BALANCE = {
+    'initial': (0.0, 0.0),
+    'period': (0.0, 0.0),
+    'columns': [],
+}
+
 
 class AccountTrialBalance(models.TransientModel):
     """For creating Trial Balance report"""
@@ -45,39 +52,23 @@ class AccountTrialBalance(models.TransientModel):
         :return: List of dictionaries representing the trial balance report.
         :rtype: list
         """
-        account_ids = self.env['account.move.line'].search([]).mapped(
-            'account_id')
         today = fields.Date.today()
+        date_from, date_to = get_month(today)
+        balances = self._get_trial_balance_totals(
+            [('parent_state', '=', 'posted')], date_from, date_from, date_to)
+        journal_ids = self.env['account.journal'].search_read([], ['name'])
         move_line_list = []
-        for account_id in account_ids:
-            initial_move_line_ids = self.env['account.move.line'].search(
-                [('date', '<', get_month(today)[0]),
-                 ('account_id', '=', account_id.id),
-                 ('parent_state', '=', 'posted')])
-            initial_total_debit = round(
-                sum(initial_move_line_ids.mapped('debit')), 2)
-            initial_total_credit = round(
-                sum(initial_move_line_ids.mapped('credit')), 2)
-            move_line_ids = self.env['account.move.line'].search(
-                [('date', '>=', get_month(today)[0]),
-                 ('account_id', '=', account_id.id),
-                 ('date', '<=', get_month(today)[1]),
-                 ('parent_state', '=', 'posted')])
-            total_debit = round(sum(move_line_ids.mapped('debit')), 2)
-            total_credit = round(sum(move_line_ids.mapped('credit')), 2)
-            sum_debit = initial_total_debit + total_debit
-            sum_credit = initial_total_credit + total_credit
-            diff_credit_debit = sum_debit - sum_credit
-            if diff_credit_debit > 0:
-                end_total_debit = diff_credit_debit
-                end_total_credit = 0.0
-            else:
-                end_total_debit = 0.0
-                end_total_credit = abs(diff_credit_debit)
+        for account_id in self._get_trial_balance_accounts():
+            balance = balances.get(account_id.id, EMPTY_TRIAL_BALANCE)
+            initial_total_debit, initial_total_credit = balance['initial']
+            total_debit, total_credit = balance['period']
+            end_total_debit, end_total_credit = self._get_end_balance(
+                initial_total_debit + total_debit,
+                initial_total_credit + total_credit)
             data = {
                 'account': account_id.display_name,
                 'account_id': account_id.id,
-                'journal_ids': self.env['account.journal'].search_read([], ['name']),
+                'journal_ids': journal_ids,
                 'initial_total_debit': "{:,.2f}".format(initial_total_debit),
                 'initial_total_credit': "{:,.2f}".format(initial_total_credit),
                 'total_debit': total_debit,
@@ -87,8 +78,7 @@ class AccountTrialBalance(models.TransientModel):
             }
             move_line_list.append(data)
         journal = {
-            'journal_ids': self.env['account.journal'].search_read([], [
-                'name'])
+            'journal_ids': journal_ids
         }
         return move_line_list, journal
 
@@ -104,6 +94,11 @@ class AccountTrialBalance(models.TransientModel):
         amounts for each account,considering date range, comparison type, and
         other filter criteria.
 
+        The computation mode is read from the
+        ``dynamic_accounts_report.trial_balance_mode`` parameter: 'grouped'
+        (default) computes every account and column with one query,
+        'per_account' keeps the former account by account searches.
+
         :param str start_date: Start date of the reporting period.
         :param str end_date: End date of the reporting period.
         :param int comparison_number: Number of periods for comparison.
@@ -115,7 +110,198 @@ class AccountTrialBalance(models.TransientModel):
         :return: List of dictionaries representing the financial report.
         :rtype: list
         """
+        mode = self.env['ir.config_parameter'].sudo().get_param(
+            'dynamic_accounts_report.trial_balance_mode', 'grouped')
+        if mode == 'per_account':
+            return self._get_filter_values_per_account(
+                start_date, end_date, comparison_number, comparison_type,
+                journal_list, analytic, options, method)
+        return self._get_filter_values_grouped(
+            start_date, end_date, comparison_number, comparison_type,
+            journal_list, analytic, options, method)
+
+    @api.model
+    def _get_filter_values_grouped(self, start_date, end_date,
+                                   comparison_number, comparison_type,
+                                   journal_list, analytic, options, method):
+        """
+        Same result as get_filter_values, computed with a single grouped
+        query for all the accounts and comparison columns.
+        """
+        domain = [('parent_state', 'in',
+                   ['posted', 'draft'] if options and 'draft' in options
+                   else ['posted'])]
+        if journal_list:
+            domain.append(('journal_id', 'in', journal_list))
+        if analytic:
+            domain.append(('analytic_line_ids', 'in', analytic))
+        if method and 'cash' in method:
+            domain.append(('journal_id', 'in',
+                           self.env.company.tax_cash_basis_journal_id.ids))
+        comparison_number = int(comparison_number or 0)
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        if comparison_type == 'year':
+            start_date = get_fiscal_year(start_date)[0]
+            end_date = get_fiscal_year(end_date)[1]
+        if comparison_number:
+            initial_start_date = subtract(
+                start_date, **self._get_comparison_delta(
+                    comparison_type, comparison_number))
+        else:
+            initial_start_date = start_date
+        columns = []
+        dynamic_date_num = {}
+        if comparison_number and comparison_type in ('year', 'month',
+                                                     'quarter'):
+            if comparison_type != 'year':
+                dynamic_date_num["dynamic_date_num0"] = \
+                    self._get_comparison_label(comparison_type, start_date)
+            for i in range(1, comparison_number + 1):
+                delta = self._get_comparison_delta(comparison_type, i)
+                com_start_date = subtract(start_date, **delta)
+                columns.append((com_start_date, subtract(end_date, **delta)))
+                if comparison_type != 'year':
+                    dynamic_date_num[f"dynamic_date_num{i}"] = \
+                        self._get_comparison_label(comparison_type,
+                                                   com_start_date)
+        balances = self._get_trial_balance_totals(
+            domain, initial_start_date, start_date, end_date, columns)
+        journal_ids = self.env['account.journal'].search_read([], ['name'])
+        move_line_list = []
+        for account_id in self._get_trial_balance_accounts():
+            balance = balances.get(account_id.id, EMPTY_TRIAL_BALANCE)
+            initial_total_debit, initial_total_credit = balance['initial']
+            total_debit, total_credit = balance['period']
+            column_balances = balance['columns'] or [(0.0, 0.0)] * len(columns)
+            end_total_debit, end_total_credit = self._get_end_balance(
+                initial_total_debit + total_debit + sum(
+                    debit for debit, _credit in column_balances),
+                initial_total_credit + total_credit + sum(
+                    credit for _debit, credit in column_balances))
+            data = {
+                'account': account_id.display_name,
+                'account_id': account_id.id,
+                'journal_ids': journal_ids,
+                'initial_total_debit': initial_total_debit,
+                'initial_total_credit': initial_total_credit,
+                'total_debit': total_debit,
+                'total_credit': total_credit,
+                'end_total_debit': end_total_debit,
+                'end_total_credit': end_total_credit
+            }
+            if comparison_number:
+                if dynamic_date_num:
+                    data['dynamic_date_num'] = dynamic_date_num
+                for i in range(1, comparison_number + 1):
+                    # oldest comparison column first
+                    debit, credit = column_balances[comparison_number - i] \
+                        if columns else (0.0, 0.0)
+                    data[f'dynamic_total_debit_{i}'] = debit
+                    data[f'dynamic_total_credit_{i}'] = credit
+            move_line_list.append(data)
+        return move_line_list
+
+    @api.model
+    def _get_trial_balance_accounts(self):
+        """
+        Accounts shown in the trial balance: the ones having journal items.
+        """
+        return self.env['account.account'].search([('used', '=', True)])
+
+    @api.model
+    def _get_trial_balance_totals(self, domain, initial_date, date_from,
+                                  date_to, columns=()):
+        """
+        Compute the initial, period and comparison columns debit and credit
+        of every account with one grouped query.
 
+        :param list domain: Journal items domain, without the dates.
+        :param date initial_date: Journal items before this date are part of
+                                  the initial balance.
+        :param date date_from: Start date of the reporting period.
+        :param date date_to: End date of the reporting period.
+        :param list columns: (start date, end date) of the comparison columns.
+        :return: {account id: {'initial': (debit, credit),
+                               'period': (debit, credit),
+                               'columns': [(debit, credit), ...]}}
+        :rtype: dict
+        """
+        query = self.env['account.move.line']._search(
+            domain + [('date', '<=', max([date_to] + [
+                column_end for _column_start, column_end in columns]))])
+        periods = [SQL("account_move_line.date < %s", initial_date),
+                   SQL("account_move_line.date BETWEEN %s AND %s",
+                       date_from, date_to)]
+        periods += [SQL("account_move_line.date BETWEEN %s AND %s",
+                        column_start, column_end)
+                    for column_start, column_end in columns]
+        aggregates = SQL(", ").join(
+            SQL("ROUND(COALESCE(SUM(account_move_line.%s) FILTER "
+                "(WHERE %s), 0), 2)", SQL.identifier(field), period)
+            for period in periods for field in ('debit', 'credit'))
+        self.env.cr.execute(SQL(
+            """
+            SELECT account_move_line.account_id, %(aggregates)s
+              FROM %(from_clause)s
+             WHERE %(where_clause)s
+          GROUP BY account_move_line.account_id
+            """,
+            aggregates=aggregates,
+            from_clause=query.from_clause,
+            where_clause=query.where_clause or SQL("TRUE"),
+        ))
+        balances = {}
+        for account_id, *amounts in self.env.cr.fetchall():
+            amounts = [float(amount) for amount in amounts]
+            pairs = list(zip(amounts[::2], amounts[1::2]))
+            balances[account_id] = {
+                'initial': pairs[0],
+                'period': pairs[1],
+                'columns': pairs[2:],
+            }
+        return balances
+
+    @api.model
+    def _get_end_balance(self, sum_debit, sum_credit):
+        """
+        Split the end balance in a debit or a credit amount.
+        """
+        diff_credit_debit = sum_debit - sum_credit
+        if diff_credit_debit > 0:
+            return diff_credit_debit, 0.0
+        return 0.0, abs(diff_credit_debit)
+
+    @api.model
+    def _get_comparison_delta(self, comparison_type, count):
+        """
+        Keyword arguments of date_utils.subtract for `count` periods.
+        """
+        if comparison_type == 'year':
+            return {'years': count}
+        if comparison_type == 'month':
+            return {'months': count}
+        return {'months': count * 3}
+
+    @api.model
+    def _get_comparison_label(self, comparison_type, date):
+        """
+        Header of a month or quarter comparison column.
+        """
+        if comparison_type == 'month':
+            return self.get_month_name(date) + ' ' + str(date.year)
+        return 'Q' + ' ' + str(get_quarter_number(date)) + ' ' + str(
+            date.year)
+
+    @api.model
+    def _get_filter_values_per_account(self, start_date, end_date,
+                                       comparison_number, comparison_type,
+                                       journal_list, analytic, options,
+                                       method):
+        """
+        Former implementation of get_filter_values, searching the journal
+        items account by account. Kept as the 'per_account' mode.
+        """
         if options == {}:
             options = None
         if options is None:
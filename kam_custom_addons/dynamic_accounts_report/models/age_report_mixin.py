@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+import bisect
+import logging
+from odoo import api, fields, models
+from odoo.tools import SQL, split_every
+from .xlsx_report_mixin import XLSX_BATCH_SIZE
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_AGING_BOUNDARIES = [30, 60, 90, 120]
+AGING_LINE_FIELDS = ['name', 'move_name', 'date', 'amount_currency',
+                     'account_id', 'date_maturity', 'currency_id', 'move_id',
+                     'partner_id']
+
+
+class AgeReportMixin(models.AbstractModel):
+    """Aging engine shared by the aged receivable and payable reports"""
+    _name = 'age.report.mixin'
+    _inherit = ['xlsx.report.mixin']
+    _description = 'Aged Partner Report Engine'
+
+    _aging_account_type = None
+    _aging_amount_field = None
+
+    @api.model
+    def _get_aging_boundaries(self):
+        """
+        Upper bounds (in days) of the overdue buckets, read from the
+        'dynamic_accounts_report.aging_buckets' parameter, e.g. '30,60,90,120'.
+        The report screens have four overdue columns, so the default bounds
+        are used when the parameter doesn't define four increasing values.
+
+        :return: The sorted list of bucket bounds.
+        :rtype: list
+        """
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            'dynamic_accounts_report.aging_buckets')
+        if not param:
+            return list(DEFAULT_AGING_BOUNDARIES)
+        try:
+            boundaries = [int(value) for value in param.split(',')]
+        except ValueError:
+            boundaries = []
+        if len(boundaries) != len(DEFAULT_AGING_BOUNDARIES) or \
+                boundaries[0] <= 0 or boundaries != sorted(set(boundaries)):
+            _logger.warning("Invalid aging buckets %r, using %s", param,
+                            DEFAULT_AGING_BOUNDARIES)
+            return list(DEFAULT_AGING_BOUNDARIES)
+        return boundaries
+
+    @api.model
+    def _get_aging_labels(self, boundaries):
+        """Column titles of the buckets: at date, each range, then older."""
+        labels = ['At Date']
+        lower = 1
+        for upper in boundaries:
+            labels.append(f'{lower}-{upper}')
+            lower = upper + 1
+        labels.append('Older')
+        return labels
+
+    @api.model
+    def _get_aging_domain(self, date, partner=None):
+        """Open journal items of the report, posted until the given date."""
+        domain = [('parent_state', '=', 'posted'),
+                  ('account_type', '=', self._aging_account_type),
+                  ('reconciled', '=', False),
+                  ('partner_id', '!=', False)]
+        if date:
+            domain += [('date', '<=', date)]
+        if partner:
+            domain += [('partner_id', 'in', partner)]
+        return domain
+
+    @api.model
+    def _get_aging_totals(self, date, partner=None, boundaries=None):
+        """
+        Compute the buckets of all partners in one grouped query. A journal
+        item is aged on the number of days between its maturity date and the
+        as-of date; items without maturity date are not due yet.
+
+        :param date: The as-of date, today if not set.
+        :param partner: The partner IDs to restrict the report to, they are
+        all listed even when they have no open journal item.
+        :param boundaries: The bucket bounds, see _get_aging_boundaries.
+        :return: The totals keyed by the partner name, with the total amount
+        under '<amount field>_sum' and each bucket under 'diff<n>_sum'.
+        :rtype: dict
+        """
+        if boundaries is None:
+            boundaries = self._get_aging_boundaries()
+        as_of = fields.Date.to_date(date) or fields.Date.today()
+        amount = SQL.identifier('account_move_line', self._aging_amount_field)
+        age = SQL("(%s::date - COALESCE(account_move_line.date_maturity, "
+                  "%s::date))", as_of, as_of)
+        conditions = [SQL("%s <= 0", age)]
+        lower = 0
+        for upper in boundaries:
+            conditions.append(SQL("%s > %s AND %s <= %s",
+                                  age, lower, age, upper))
+            lower = upper
+        conditions.append(SQL("%s > %s", age, lower))
+        query = self.env['account.move.line']._search(
+            self._get_aging_domain(date, partner))
+        self.env.cr.execute(SQL(
+            """
+            SELECT account_move_line.partner_id,
+                   ROUND(SUM(%(amount)s), 2),
+                   %(buckets)s
+              FROM %(from_clause)s
+             WHERE %(where_clause)s
+          GROUP BY account_move_line.partner_id
+            """,
+            amount=amount,
+            buckets=SQL(", ").join(
+                SQL("ROUND(COALESCE(SUM(%s) FILTER (WHERE %s), 0), 2)",
+                    amount, condition)
+                for condition in conditions),
+            from_clause=query.from_clause,
+            where_clause=query.where_clause or SQL("TRUE"),
+        ))
+        rows = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+        partners = self.env['res.partner'].browse(list(rows))
+        if partner:
+            # the selected partners are listed even without open items
+            partners |= self.env['res.partner'].search([('id', 'in', partner)])
+        no_amounts = [0.0] * (len(conditions) + 1)
+        currency_id = self.env.company.currency_id.symbol
+        partner_total = {}
+        for partner_id in partners.sorted('name'):
+            total, *buckets = rows.get(partner_id.id, no_amounts)
+            values = {f'{self._aging_amount_field}_sum': float(total)}
+            for index, bucket in enumerate(buckets):
+                values[f'diff{index}_sum'] = float(bucket)
+            values.update(currency_id=currency_id, partner_id=partner_id.id)
+            partner_total[partner_id.name] = values
+        return partner_total
+
+    @api.model
+    def _get_aging_lines(self, date, partner, boundaries=None):
+        """
+        Read the journal items of the given partners in one batch and put
+        their amount in their bucket.
+
+        :return: The journal items grouped by partner ID.
+        :rtype: dict
+        """
+        if boundaries is None:
+            boundaries = self._get_aging_boundaries()
+        as_of = fields.Date.to_date(date) or fields.Date.today()
+        amount_field = self._aging_amount_field
+        lines = {}
+        for val in self.env['account.move.line'].search_read(
+                self._get_aging_domain(date, partner),
+                AGING_LINE_FIELDS + [amount_field], order='date, id'):
+            difference = 0
+            if val['date_maturity']:
+                difference = (as_of - val['date_maturity']).days
+            bucket = 0 if difference <= 0 else \
+                bisect.bisect_left(boundaries, difference) + 1
+            for index in range(len(boundaries) + 2):
+                val[f'diff{index}'] = val[amount_field] \
+                    if index == bucket else 0.0
+            lines.setdefault(val.pop('partner_id')[0], []).append(val)
+        return lines
+
+    @api.model
+    def get_aging_totals(self, date, partner):
+        """
+        First step of the lazy aged report: the buckets of every partner,
+        without any journal item. The items of a partner are fetched with
+        get_aging_lines when it is unfolded.
+
+        :param date: The as-of date (format: 'YYYY-MM-DD').
+        :param partner: The partner IDs to filter the report on.
+        :return: Same structure as get_filter_values, with an empty list of
+        journal items for every partner and the bucket titles under the
+        'aging_labels' key.
+        :rtype: dict
+        """
+        boundaries = self._get_aging_boundaries()
+        partner_total = self._get_aging_totals(date, partner, boundaries)
+        move_line_list = {name: [] for name in partner_total}
+        move_line_list['partner_totals'] = partner_total
+        move_line_list['aging_labels'] = self._get_aging_labels(boundaries)
+        return move_line_list
+
+    @api.model
+    def get_aging_lines(self, partner_id, date):
+        """
+        Journal items of one partner, for the drill down.
+
+        :param partner_id: The partner to drill down.
+        :param date: The as-of date (format: 'YYYY-MM-DD').
+        :return: The journal items, in the format of get_filter_values.
+        :rtype: list
+        """
+        return self._get_aging_lines(date, [partner_id]).get(partner_id, [])
+
+    @api.model
+    def _get_aging_report(self, date, partner):
+        """
+        Complete aged report, journal items included, as returned by
+        get_filter_values.
+        """
+        boundaries = self._get_aging_boundaries()
+        partner_total = self._get_aging_totals(date, partner, boundaries)
+        lines = self._get_aging_lines(date, partner, boundaries)
+        move_line_list = {
+            name: lines.get(values['partner_id'], [])
+            for name, values in partner_total.items()
+        }
+        move_line_list['partner_totals'] = partner_total
+        return move_line_list
+
+    @api.model
+    def _write_xlsx_report(self, data, report_name, workbook):
+        """
+        Write the aged report XLSX from the options of the report. The
+        journal items are read for a batch of partners at a time, so the
+        report is never loaded as a whole.
+
+        :param data: The report filters, with the as-of date and the partner
+        IDs under the 'report_options' key.
+        :type data: dict
+
+        :param report_name: The name of the report.
+        :type report_name: str
+
+        :param workbook: The workbook, in constant memory mode.
+        :type workbook: xlsxwriter.Workbook
+        """
+        report_options = data['report_options']
+        date = report_options.get('date') or False
+        partner = report_options.get('partner')
+        filters = data['filters']
+        sheet = workbook.add_worksheet()
+        formats = self._get_xlsx_formats(workbook)
+        sub_heading = formats['sub_heading']
+        txt_name = formats['txt_name']
+        num_format = formats['num_format']
+        total_num_format = formats['total_num_format']
+        self._write_xlsx_header(sheet, formats, report_name, [
+            ('Date Range', filters['end_date'] or ''),
+            ('Partners', ', '.join(
+                record.get('display_name', 'undefined')
+                for record in filters['partner'] or [])),
+        ])
+        boundaries = self._get_aging_boundaries()
+        labels = self._get_aging_labels(boundaries)
+        total_col = 6 + len(labels)
+        col = 0
+        self._write_xlsx_columns(sheet, 6, [
+            (' ', 30), ('Invoice Date', 15), ('Amount Currency', 15),
+            ('Currency', 10), ('Account', 25), ('Expected Date', 15),
+        ] + [(label, 15) for label in labels] + [('Total', 15)], sub_heading)
+        row = 6
+        amount_sum = f'{self._aging_amount_field}_sum'
+        bucket_sums = [f'diff{index}_sum' for index in range(len(labels))]
+        grand_total = dict.fromkeys(bucket_sums + [amount_sum], 0.0)
+        partner_total = self._get_aging_totals(date, partner, boundaries)
+        for partner_names in split_every(XLSX_BATCH_SIZE,
+                                         list(partner_total)):
+            lines = self._get_aging_lines(date, [
+                partner_total[name]['partner_id'] for name in partner_names],
+                boundaries)
+            for name in partner_names:
+                totals = partner_total[name]
+                row += 1
+                sheet.write(row, col, name, txt_name)
+                sheet.write(row, col + 1, ' ', txt_name)
+                sheet.write(row, col + 2, ' ', txt_name)
+                sheet.write(row, col + 3, ' ', txt_name)
+                sheet.write(row, col + 4, ' ', txt_name)
+                sheet.write(row, col + 5, ' ', txt_name)
+                for index, key in enumerate(bucket_sums):
+                    sheet.write(row, col + 6 + index, totals[key],
+                                num_format)
+                    grand_total[key] += totals[key]
+                sheet.write(row, col + total_col, totals[amount_sum],
+                            num_format)
+                grand_total[amount_sum] += totals[amount_sum]
+                for rec in lines.get(totals['partner_id'], []):
+                    row += 1
+                    sheet.write(row, col, rec['move_name'] + (
+                        rec['name'] or ' '), txt_name)
+                    sheet.write(row, col + 1, str(rec['date']), txt_name)
+                    sheet.write(row, col + 2, rec['amount_currency'],
+                                num_format)
+                    sheet.write(row, col + 3, rec['currency_id'][1],
+                                txt_name)
+                    sheet.write(row, col + 4, rec['account_id'][1], txt_name)
+                    sheet.write(row, col + 5, str(rec['date_maturity'] or ''),
+                                txt_name)
+                    for index in range(len(labels)):
+                        sheet.write(row, col + 6 + index, rec[f'diff{index}'],
+                                    num_format)
+                    sheet.write(row, col + total_col, ' ', txt_name)
+            # keep the cache as small as the batch
+            self.env['account.move.line'].invalidate_model()
+        row += 1
+        sheet.merge_range(row, col, row, col + 5, 'Total',
+                          formats['filter_head'])
+        for index, key in enumerate(bucket_sums):
+            sheet.write(row, col + 6 + index, grand_total[key],
+                        total_num_format)
+        sheet.write(row, col + total_col, grand_total[amount_sum],
+                    total_num_format)
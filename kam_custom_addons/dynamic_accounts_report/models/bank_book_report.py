@@ -19,10 +19,9 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ################################################################################
-import io
+import functools
 import json
 from dateutil.relativedelta import relativedelta
-import xlsxwriter
 from datetime import datetime
 from odoo.tools import date_utils
 from odoo import api, fields, models
@@ -31,8 +30,11 @@ from odoo import api, fields, models
 class BankBookReport(models.TransientModel):
     """For creating Bank Book report"""
     _name = 'bank.book.report'
+    _inherit = 'book.report.mixin'
     _description = 'Account Bank Book Report'
 
+    _book_journal_type = 'bank'
+
     @api.model
     def view_report(self):
         """
@@ -182,7 +184,8 @@ class BankBookReport(models.TransientModel):
     def get_xlsx_report(self, data, response, report_name, report_action):
         """
         Generate an Excel report based on the provided data.
-        :param data: The data used to generate the report.
+        :param data: The report filters, and the options the report is
+        computed from under the 'report_options' key.
         :type data: str (JSON format)
         :param response: The response object to write the report to.
         :type response: object
@@ -191,131 +194,5 @@ class BankBookReport(models.TransientModel):
         :return: None
         """
         data = json.loads(data)
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        start_date = data['filters']['start_date'] if \
-            data['filters']['start_date'] else ''
-        end_date = data['filters']['end_date'] if \
-            data['filters']['end_date'] else ''
-        sheet = workbook.add_worksheet()
-        head = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '15px'})
-        sub_heading = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px',
-             'border': 1, 'bg_color': '#D3D3D3',
-             'border_color': 'black'})
-        filter_head = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px',
-             'border': 1, 'bg_color': '#D3D3D3',
-             'border_color': 'black'})
-        filter_body = workbook.add_format(
-            {'align': 'center', 'bold': True, 'font_size': '10px'})
-        side_heading_sub = workbook.add_format(
-            {'align': 'left', 'bold': True, 'font_size': '10px',
-             'border': 1,
-             'border_color': 'black'})
-        side_heading_sub.set_indent(1)
-        txt_name = workbook.add_format({'font_size': '10px', 'border': 1})
-        txt_name.set_indent(2)
-        sheet.set_column(0, 0, 30)
-        sheet.set_column(1, 1, 20)
-        sheet.set_column(2, 2, 15)
-        sheet.set_column(3, 3, 15)
-        col = 0
-        sheet.write('A1:b1', report_name, head)
-        sheet.write('B3:b4', 'Date Range', filter_head)
-        sheet.write('B4:b4', 'Partners', filter_head)
-        sheet.write('B5:b4', 'Accounts', filter_head)
-        sheet.write('B6:b4', 'Options', filter_head)
-        if start_date or end_date:
-            sheet.merge_range('C3:G3', f"{start_date} to {end_date}",
-                              filter_body)
-        if data['filters']['partner']:
-            display_names = [partner.get('display_name', 'undefined') for
-                             partner in data['filters']['partner']]
-            display_names_str = ', '.join(display_names)
-            sheet.merge_range('C4:G4', display_names_str, filter_body)
-        if data['filters']['account']:
-            account_keys_str = ', '.join(data['filters']['account'])
-            sheet.merge_range('C5:G5', account_keys_str, filter_body)
-        if data['filters']['options']:
-            option_keys = list(data['filters']['options'].keys())
-            option_keys_str = ', '.join(option_keys)
-            sheet.merge_range('C6:G6', option_keys_str, filter_body)
-        if data:
-            if report_action == 'dynamic_accounts_report.action_bank_book':
-                sheet.write(8, col, ' ', sub_heading)
-                sheet.merge_range('B9:C9', 'Journal', sub_heading)
-                sheet.merge_range('D9:E9', 'Partner', sub_heading)
-                sheet.merge_range('F9:G9', 'Ref', sub_heading)
-                sheet.merge_range('H9:I9', 'Move', sub_heading)
-                sheet.merge_range('J9:K9', 'Entry Label', sub_heading)
-                sheet.merge_range('L9:M9', 'Debit', sub_heading)
-                sheet.merge_range('N9:O9', 'Credit', sub_heading)
-                sheet.merge_range('P9:Q9', 'Balance', sub_heading)
-                row = 8
-                for move_line in data['move_lines']:
-                    row += 1
-                    sheet.write(row, col, move_line, txt_name)
-                    sheet.merge_range(row, col + 1, row, col + 2, ' ',
-                                      txt_name)
-                    sheet.merge_range(row, col + 3, row, col + 4, ' ',
-                                      txt_name)
-                    sheet.merge_range(row, col + 5, row, col + 6, ' ',
-                                      txt_name)
-                    sheet.merge_range(row, col + 7, row, col + 8, ' ',
-                                      txt_name)
-                    sheet.merge_range(row, col + 9, row, col + 10, ' ',
-                                      txt_name)
-                    sheet.merge_range(row, col + 11, row, col + 12,
-                                      data['total'][move_line]['total_debit'],
-                                      txt_name)
-                    sheet.merge_range(row, col + 13, row, col + 14,
-                                      data['total'][move_line]['total_credit'],
-                                      txt_name)
-                    sheet.merge_range(row, col + 15, row, col + 16,
-                                      data['total'][move_line]['total_debit'] -
-                                      data['total'][move_line]['total_credit'],
-                                      txt_name)
-                    for rec in data['data'][move_line]:
-                        row += 1
-                        if rec['partner_id']:
-                            partner = rec['partner_id'][1]
-                        else:
-                            partner = ' '
-                        sheet.write(row, col, rec['date'], txt_name)
-                        sheet.merge_range(row, col + 1, row, col + 2,
-                                          rec['journal_id'][1],
-                                          txt_name)
-                        sheet.merge_range(row, col + 3, row, col + 4, partner,
-                                          txt_name)
-                        sheet.merge_range(row, col + 5, row, col + 6,
-                                          rec['ref'], txt_name)
-                        sheet.merge_range(row, col + 7, row, col + 8,
-                                          rec['move_name'],
-                                          txt_name)
-                        sheet.merge_range(row, col + 9, row, col + 10,
-                                          rec['name'],
-                                          txt_name)
-                        sheet.merge_range(row, col + 11, row, col + 12,
-                                          rec['debit_display'], txt_name)
-                        sheet.merge_range(row, col + 13, row, col + 14,
-                                          rec['credit_display'], txt_name)
-                        sheet.merge_range(row, col + 15, row, col + 16, ' ',
-                                          txt_name)
-                sheet.merge_range(row + 1, col, row + 1, col + 10, 'Total',
-                                  filter_head)
-                sheet.merge_range(row + 1, col + 11, row + 1, col + 12,
-                                  data['grand_total']['total_debit_display'],
-                                  filter_head)
-                sheet.merge_range(row + 1, col + 13, row + 1, col + 14,
-                                  data['grand_total']['total_credit_display'],
-                                  filter_head)
-                sheet.merge_range(row + 1, col + 15, row + 1, col + 16,
-                                  float(data['grand_total']['total_debit']) -
-                                  float(data['grand_total']['total_credit']),
-                                  filter_head)
-        workbook.close()
-        output.seek(0)
-        response.stream.write(output.read())
-        output.close()
+        return self._stream_xlsx_report(response, functools.partial(
+            self._write_xlsx_report, data, report_name))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from odoo import api, fields, models
+
+BOOK_LINE_FIELDS = ['date', 'journal_id', 'partner_id', 'move_name', 'debit',
+                    'move_id', 'credit', 'name', 'ref']
+
+
+class BookReportMixin(models.AbstractModel):
+    """Streamed XLSX export shared by the bank and cash book reports"""
+    _name = 'book.report.mixin'
+    _inherit = ['xlsx.report.mixin']
+    _description = 'Bank and Cash Book XLSX Report'
+
+    _book_journal_type = None
+
+    @api.model
+    def _get_book_domain(self, partner_id, data_range, account_list,
+                         options):
+        """
+        Build the journal items domain from the filters of the report, with
+        the same periods as get_filter_values: the 'month' and 'year'
+        presets and their 'last-' variants match the month or the year
+        number of the journal items.
+        """
+        option_domain = ['posted']
+        if options and 'draft' in options:
+            option_domain = ['posted', 'draft']
+        journals = self.env['account.journal'].search(
+            [('type', '=', self._book_journal_type)])
+        domain = [('parent_state', 'in', option_domain),
+                  ('journal_id', 'in', journals.ids)]
+        if partner_id:
+            domain += [('partner_id', 'in', partner_id)]
+        if account_list:
+            domain += [('account_id', 'in', account_list)]
+        today = fields.Date.today()
+        if data_range == 'month':
+            return domain + [('date.month_number', '=', today.month)]
+        if data_range == 'last-month':
+            return domain + [('date.month_number', '=', today.month - 1)]
+        if data_range == 'year':
+            return domain + [('date.year_number', '=', today.year)]
+        if data_range == 'last-year':
+            return domain + [('date.year_number', '=', today.year - 1)]
+        date_from, date_to = self._get_report_dates(data_range)
+        if date_from:
+            domain += [('date', '>=', date_from)]
+        if date_to:
+            domain += [('date', '<=', date_to)]
+        return domain
+
+    @api.model
+    def _get_book_totals(self, domain):
+        """
+        Debit and credit totals of every account having journal items in
+        the domain, computed by a single grouped query.
+
+        :return: The totals keyed by the account display name.
+        :rtype: dict
+        """
+        currency_id = self.env.company.currency_id.symbol
+        move_lines_total = {}
+        for account, debit, credit in self.env[
+                'account.move.line']._read_group(
+                domain, ['account_id'], ['debit:sum', 'credit:sum']):
+            move_lines_total[account.display_name] = {
+                'total_debit': round(debit, 2),
+                'total_credit': round(credit, 2),
+                'currency_id': currency_id,
+                'account_id': account.id}
+        return move_lines_total
+
+    @api.model
+    def _iter_book_lines(self, domain, account_id):
+        """
+        Yield the journal items of an account page by page, most recent
+        first as on the report screen.
+        """
+        for move_lines in self._iter_move_line_pages(
+                domain + [('account_id', '=', account_id)], BOOK_LINE_FIELDS,
+                descending=True):
+            yield move_lines.read(BOOK_LINE_FIELDS)
+
+    @api.model
+    def _write_xlsx_report(self, data, report_name, workbook):
+        """
+        Write the book XLSX report from the options of the report. The
+        journal items are read page by page, so the book is never loaded as
+        a whole.
+
+        :param data: The report filters, with the arguments of
+        get_filter_values under the 'report_options' key.
+        :type data: dict
+
+        :param report_name: The name of the report.
+        :type report_name: str
+
+        :param workbook: The workbook, in constant memory mode.
+        :type workbook: xlsxwriter.Workbook
+        """
+        report_options = data['report_options']
+        domain = self._get_book_domain(
+            report_options.get('partner_id'),
+            report_options.get('data_range'),
+            report_options.get('account_list'),
+            report_options.get('options'))
+        filters = data['filters']
+        sheet = workbook.add_worksheet()
+        formats = self._get_xlsx_formats(workbook)
+        sub_heading = formats['sub_heading']
+        filter_head = formats['filter_head']
+        txt_name = formats['txt_name']
+        num_format = formats['num_format']
+        total_num_format = formats['total_num_format']
+        date_range = ''
+        if filters['start_date'] or filters['end_date']:
+            date_range = f"{filters['start_date'] or ''} to " \
+                         f"{filters['end_date'] or ''}"
+        self._write_xlsx_header(sheet, formats, report_name, [
+            ('Date Range', date_range),
+            ('Partners', ', '.join(
+                record.get('display_name', 'undefined')
+                for record in filters['partner'] or [])),
+            ('Accounts', ', '.join(filters['account'] or [])),
+            ('Options', ', '.join(filters['options'] or {})),
+        ])
+        col = 0
+        self._write_xlsx_columns(sheet, 8, [
+            (' ', 30), ('Journal', 20), ('Partner', 25), ('Ref', 15),
+            ('Move', 20), ('Entry Label', 30), ('Debit', 15), ('Credit', 15),
+            ('Balance', 15),
+        ], sub_heading)
+        row = 8
+        total_debit = total_credit = 0.0
+        move_lines_total = self._get_book_totals(domain)
+        for name, totals in move_lines_total.items():
+            total_debit += totals['total_debit']
+            total_credit += totals['total_credit']
+            row += 1
+            sheet.write(row, col, name, txt_name)
+            for blank in range(1, 6):
+                sheet.write(row, col + blank, ' ', txt_name)
+            sheet.write(row, col + 6, totals['total_debit'], num_format)
+            sheet.write(row, col + 7, totals['total_credit'], num_format)
+            sheet.write(row, col + 8, totals['total_debit'] -
+                        totals['total_credit'], num_format)
+            for lines in self._iter_book_lines(domain, totals['account_id']):
+                for rec in lines:
+                    row += 1
+                    partner = rec['partner_id'][1] if rec['partner_id'] \
+                        else ' '
+                    sheet.write(row, col, str(rec['date']), txt_name)
+                    sheet.write(row, col + 1, rec['journal_id'][1], txt_name)
+                    sheet.write(row, col + 2, partner, txt_name)
+                    sheet.write(row, col + 3, rec['ref'] or ' ', txt_name)
+                    sheet.write(row, col + 4, rec['move_name'], txt_name)
+                    sheet.write(row, col + 5, rec['name'] or ' ', txt_name)
+                    sheet.write(row, col + 6, rec['debit'], num_format)
+                    sheet.write(row, col + 7, rec['credit'], num_format)
+                    sheet.write(row, col + 8, ' ', txt_name)
+        row += 1
+        sheet.merge_range(row, col, row, col + 5, 'Total', filter_head)
+        sheet.write(row, col + 6, total_debit, total_num_format)
+        sheet.write(row, col + 7, total_credit, total_num_format)
+        sheet.write(row, col + 8, total_debit - total_credit,
+                    total_num_format)
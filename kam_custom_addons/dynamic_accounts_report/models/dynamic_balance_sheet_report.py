@@ -25,9 +25,22 @@ import datetime
 import xlsxwriter
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 from odoo.tools.date_utils import get_month, get_fiscal_year, get_quarter, \
     subtract
 
+ACCOUNT_TYPES = [
+    'income', 'income_other', 'expense', 'expense_depreciation',
+    'expense_direct_cost', 'asset_receivable', 'asset_cash', 'asset_current',
+    'asset_non_current', 'asset_prepayments', 'asset_fixed',
+    'liability_payable', 'liability_credit_card', 'liability_current',
+    'liability_non_current', 'equity', 'equity_unaffected',
+]
+CREDIT_ACCOUNT_TYPES = [
+    'income', 'income_other', 'liability_payable', 'liability_current',
+    'liability_non_current', 'equity', 'equity_unaffected',
+]
+
 
 class ProfitLossReport(models.TransientModel):
     """For creating Profit and Loss and Balance sheet report."""
@@ -64,258 +77,188 @@ class ProfitLossReport(models.TransientModel):
 
     @api.model
     def view_report(self, option, comparison, comparison_type):
-        datas = []
-        account_types = {
-            'income': 'income',
-            'income_other': 'income_other',
-            'expense': 'expense',
-            'expense_depreciation': 'expense_depreciation',
-            'expense_direct_cost': 'expense_direct_cost',
-            'asset_receivable': 'asset_receivable',
-            'asset_cash': 'asset_cash',
-            'asset_current': 'asset_current',
-            'asset_non_current': 'asset_non_current',
-            'asset_prepayments': 'asset_prepayments',
-            'asset_fixed': 'asset_fixed',
-            'liability_payable': 'liability_payable',
-            'liability_credit_card': 'liability_credit_card',
-            'liability_current': 'liability_current',
-            'liability_non_current': 'liability_non_current',
-            'equity': 'equity',
-            'equity_unaffected': 'equity_unaffected',
-        }
+        """Compute the Profit and Loss / Balance Sheet columns.
+
+        The balances of every account and every period are read with a
+        single grouped query, the report sections are then built from this
+        result and only formatted at the end.
+        """
         financial_report_id = self.browse(option)
-        current_year = fields.Date.today().year
+        periods = self._get_report_periods(financial_report_id, comparison,
+                                           comparison_type)
+        balances = self._get_period_balances(financial_report_id, periods)
+        accounts_by_type = {account_type: self.env['account.account']
+                            for account_type in ACCOUNT_TYPES}
+        for account in self.env['account.account'].search(
+                [('account_type', 'in', ACCOUNT_TYPES)]):
+            accounts_by_type[account.account_type] |= account
+        datas = []
+        for period_index in range(len(periods)):
+            account_entries = {
+                account_type: self._get_entries(
+                    balances.get(period_index, {}),
+                    accounts_by_type[account_type], account_type)
+                for account_type in ACCOUNT_TYPES}
+            datas.append(self._prepare_report_data(account_entries))
+        filters = self._get_filter_data()
+        return datas[-1], filters, datas
+
+    def _get_report_periods(self, financial_report_id, comparison,
+                            comparison_type):
+        """
+            Get the date range of every column of the report.
+            :param financial_report_id: The report wizard.
+            :param comparison: Number of comparison periods.
+            :param comparison_type: 'month' or 'year'.
+            :return: A list of (date_from, date_to) tuples.
+            """
         current_date = fields.Date.today()
+        current_year = current_date.year
+        if not comparison:
+            return [(financial_report_id.date_from or
+                     datetime.date(current_year, 1, 1),
+                     financial_report_id.date_to or
+                     datetime.date(current_year, 12, 31))]
+        periods = []
+        for count in range(0, int(comparison) + 1):
+            if comparison_type == "month":
+                period_date = current_date - datetime.timedelta(
+                    days=30 * count)
+                date_from = period_date.replace(day=1)
+                date_to = period_date.replace(day=12)
+            else:
+                date_from = datetime.date(current_year - count, 1, 1)
+                date_to = datetime.date(current_year - count, 12, 31)
+            if financial_report_id.date_from:
+                date_from = max(date_from, financial_report_id.date_from)
+            if financial_report_id.date_to:
+                date_to = min(date_to, financial_report_id.date_to)
+            periods.append((date_from, date_to))
+        return periods
+
+    def _get_period_balances(self, financial_report_id, periods):
+        """
+            Get the debit and credit of every account for every period.
+            :param financial_report_id: The report wizard.
+            :param periods: A list of (date_from, date_to) tuples.
+            :return: A dictionary {period index: {account id: (debit, credit)}}.
+            """
         if financial_report_id.target_move == 'draft':
             target_move = ['posted', 'draft']
         else:
             target_move = ['posted']
-        if comparison:
-            for count in range(0, int(comparison) + 1):
-                if comparison_type == "month":
-                    account_move_lines = self.env['account.move.line'].search(
-                        [(
-                            'parent_state', 'in', target_move),
-                            ('date', '>=', (current_date - datetime.timedelta(
-                                days=30 * count)).strftime('%Y-%m-01')),
-                            ('date', '<=', (current_date - datetime.timedelta(
-                                days=30 * count)).strftime('%Y-%m-12'))])
-                elif comparison_type == "year":
-                    account_move_lines = self.env['account.move.line'].search(
-                        [(
-                            'parent_state', 'in', target_move),
-                            ('date', '>=', f'{current_year - count}-01-01'),
-                            ('date', '<=', f'{current_year - count}-12-31')])
-                lists = [{'id': rec.id, 'value': [eval(i) for i in
-                                                  rec.analytic_distribution.keys()]}
-                         for rec in account_move_lines if
-                         rec.analytic_distribution]
-                if financial_report_id.analytic_ids:
-                    account_move_lines = account_move_lines.filtered(lambda
-                                                                         rec: rec.id in [
-                        lst['id'] for lst in lists if lst['value'] and any(
-                            i in financial_report_id.analytic_ids.mapped('id')
-                            for i in lst['value'])])
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.journal_ids or a.journal_id in financial_report_id.journal_ids)
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.account_ids or a.account_id in financial_report_id.account_ids)
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.date_from or a.date >= financial_report_id.date_from)
-                account_move_lines = account_move_lines.filtered(lambda
-                                                                     a: not financial_report_id.date_to or a.date <= financial_report_id.date_to)
-                account_entries = {}
-                for account_type in account_types.values():
-                    account_entries[account_type] = self._get_entries(
-                        account_move_lines, self.env['account.account'].search(
-                            [('account_type', '=', account_type)]),
-                        account_type)
-                total_income = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['income', 'income_other'] for entry in
-                    account_entries[account_type][0]) - sum(
-                    float(entry['amount'].replace(',', '')) for entry in
-                    account_entries['expense_direct_cost'][0])
-                total_expense = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['expense', 'expense_depreciation'] for entry in
-                    account_entries[account_type][0])
-                total_current_asset = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['asset_receivable', 'asset_current', 'asset_cash',
-                     'asset_prepayments'] for entry in
-                    account_entries[account_type][0])
-                total_assets = total_current_asset + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['asset_fixed', 'asset_non_current'] for entry in
-                    account_entries[account_type][0])
-                total_current_liability = sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['liability_current', 'liability_payable'] for entry in
-                    account_entries[account_type][0])
-                total_liability = total_current_liability + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['liability_non_current'] for entry in
-                    account_entries[account_type][0])
-                total_unallocated_earning = (
-                                                    total_income - total_expense) + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['equity_unaffected'] for entry in
-                    account_entries[account_type][0])
-                total_equity = total_unallocated_earning + sum(
-                    float(entry['amount'].replace(',', '')) for account_type
-                    in
-                    ['equity'] for entry in
-                    account_entries[account_type][0])
-                total = total_liability + total_equity
-                data = {
-                    'total': total_income - total_expense,
-                    'total_expense': "{:,.2f}".format(total_expense),
-                    'total_income': "{:,.2f}".format(total_income),
-                    'total_current_asset': "{:,.2f}".format(
-                        total_current_asset),
-                    'total_assets': "{:,.2f}".format(total_assets),
-                    'total_current_liability': "{:,.2f}".format(
-                        total_current_liability),
-                    'total_liability': "{:,.2f}".format(total_liability),
-                    'total_earnings': "{:,.2f}".format(
-                        total_income - total_expense),
-                    'total_unallocated_earning': "{:,.2f}".format(
-                        total_unallocated_earning),
-                    'total_equity': "{:,.2f}".format(total_equity),
-                    'total_balance': "{:,.2f}".format(total),
-                    **account_entries}
-                datas.append(data)
-        else:
-            current_year = fields.Date.today().year
-            date_from = financial_report_id.date_from or f'{current_year}-01-01'
-            date_to = financial_report_id.date_to or f'{current_year}-12-31'
-            account_move_lines = self.env['account.move.line'].search(
-                [('parent_state', 'in', target_move),
-                 ('date', '>=', date_from),
-                 ('date', '<=', date_to)])
-            lists = [{'id': rec.id,
-                      'value': [eval(i) for i in
-                                rec.analytic_distribution.keys()]}
-                     for rec in account_move_lines if
-                     rec.analytic_distribution]
-            if financial_report_id.analytic_ids:
-                account_move_lines = account_move_lines.filtered(
-                    lambda rec: rec.id in [lst['id'] for lst in lists if
-                                           lst['value'] and any(
-                                               i in financial_report_id.analytic_ids.mapped(
-                                                   'id') for i in
-                                               lst['value'])])
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.journal_ids or a.journal_id in financial_report_id.journal_ids)
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.account_ids or a.account_id in financial_report_id.account_ids)
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.date_from or a.date >= financial_report_id.date_from)
-            account_move_lines = account_move_lines.filtered(lambda
-                                                                 a: not financial_report_id.date_to or a.date <= financial_report_id.date_to)
-            account_entries = {}
-            for account_type in account_types.values():
-                account_entries[account_type] = self._get_entries(
-                    account_move_lines, self.env['account.account'].search(
-                        [('account_type', '=', account_type)]), account_type)
-            total_income = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['income', 'income_other'] for entry in
-                account_entries[account_type][0]) - sum(
-                float(entry['amount'].replace(',', '')) for entry in
-                account_entries['expense_direct_cost'][0])
-            total_expense = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['expense', 'expense_depreciation'] for entry in
-                account_entries[account_type][0])
-            total_current_asset = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['asset_receivable', 'asset_current', 'asset_cash',
-                 'asset_prepayments'] for entry in
-                account_entries[account_type][0])
-            total_assets = total_current_asset + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['asset_fixed', 'asset_non_current'] for entry in
-                account_entries[account_type][0])
-            total_current_liability = sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['liability_current', 'liability_payable'] for entry in
-                account_entries[account_type][0])
-            total_liability = total_current_liability + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['liability_non_current'] for entry in
-                account_entries[account_type][0])
-            total_unallocated_earning = (total_income - total_expense) + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['equity_unaffected'] for entry in
-                account_entries[account_type][0])
-            total_equity = total_unallocated_earning + sum(
-                float(entry['amount'].replace(',', '')) for account_type in
-                ['equity'] for entry in account_entries[account_type][0])
-            total = total_liability + total_equity
-            data = {
-                'total': total_income - total_expense,
-                'total_expense': "{:,.2f}".format(total_expense),
-                'total_income': "{:,.2f}".format(total_income),
-                'total_current_asset': "{:,.2f}".format(total_current_asset),
-                'total_assets': "{:,.2f}".format(total_assets),
-                'total_current_liability': "{:,.2f}".format(
-                    total_current_liability),
-                'total_liability': "{:,.2f}".format(total_liability),
-                'total_earnings': "{:,.2f}".format(
-                    total_income - total_expense),
-                'total_unallocated_earning': "{:,.2f}".format(
-                    total_unallocated_earning),
-                'total_equity': "{:,.2f}".format(total_equity),
-                'total_balance': "{:,.2f}".format(total),
-                **account_entries}
-            datas.append(data)
-        filters = self._get_filter_data()
-        return data, filters, datas
+        domain = [
+            ('parent_state', 'in', target_move),
+            ('date', '>=', min(period[0] for period in periods)),
+            ('date', '<=', max(period[1] for period in periods)),
+        ]
+        if financial_report_id.journal_ids:
+            domain.append(
+                ('journal_id', 'in', financial_report_id.journal_ids.ids))
+        if financial_report_id.account_ids:
+            domain.append(
+                ('account_id', 'in', financial_report_id.account_ids.ids))
+        if financial_report_id.analytic_ids:
+            domain.append(('distribution_analytic_account_ids', 'in',
+                           financial_report_id.analytic_ids.ids))
+        query = self.env['account.move.line']._search(domain)
+        period_values = SQL(", ").join(
+            SQL("(%s, %s::date, %s::date)", index, date_from, date_to)
+            for index, (date_from, date_to) in enumerate(periods))
+        self.env.cr.execute(SQL(
+            """
+            SELECT period.period_index,
+                   account_move_line.account_id,
+                   SUM(account_move_line.debit),
+                   SUM(account_move_line.credit)
+              FROM %(from_clause)s
+              JOIN (VALUES %(periods)s)
+                   AS period(period_index, date_from, date_to)
+                ON account_move_line.date
+                   BETWEEN period.date_from AND period.date_to
+             WHERE %(where_clause)s
+          GROUP BY period.period_index, account_move_line.account_id
+            """,
+            from_clause=query.from_clause,
+            periods=period_values,
+            where_clause=query.where_clause or SQL("TRUE"),
+        ))
+        balances = {}
+        for period_index, account_id, debit, credit in self.env.cr.fetchall():
+            balances.setdefault(period_index, {})[account_id] = (debit, credit)
+        return balances
 
-    def _get_entries(self, account_move_lines, account_ids, account_type):
+    def _get_entries(self, balances, account_ids, account_type):
         """
             Get the entries for the specified account type.
-            :param account_move_lines: The account move lines to filter.
-            :param account_ids: The account IDs to filter.
+            :param balances: The (debit, credit) of the period per account id.
+            :param account_ids: The accounts of the account type.
             :param account_type: The account type.
-            :return: A tuple containing the entries and the total amount.
+            :return: A tuple containing the entries and the total amount,
+                     amounts are not formatted.
             """
         entries = []
         total = 0
         for account in account_ids:
-            filtered_lines = account_move_lines.filtered(
-                lambda line: line.account_id == account)
-            if filtered_lines:
-                if account_type in ['income', 'income_other',
-                                    'liability_payable', 'liability_current',
-                                    'liability_non_current', 'equity',
-                                    'equity_unaffected']:
-                    amount = -(sum(filtered_lines.mapped('debit')) - sum(
-                        filtered_lines.mapped('credit')))
-                else:
-                    amount = sum(filtered_lines.mapped('debit')) - sum(
-                        filtered_lines.mapped('credit'))
-                entries.append({
-                    'name': "{} - {}".format(account.code, account.name),
-                    'amount': "{:,.2f}".format(amount),
-                })
-                total += amount
-            else:
-                entries.append({
-                    'name': "{} - {}".format(account.code, account.name),
-                    'amount': "{:,.2f}".format(0),
-                })
-        return entries, "{:,.2f}".format(total)
+            debit, credit = balances.get(account.id, (0, 0))
+            amount = debit - credit
+            if account_type in CREDIT_ACCOUNT_TYPES:
+                amount = -amount
+            entries.append({
+                'name': "{} - {}".format(account.code, account.name),
+                'amount': amount,
+            })
+            total += amount
+        return entries, total
+
+    def _prepare_report_data(self, account_entries):
+        """
+            Compute the report totals and format the amounts.
+            :param account_entries: The raw entries and total per account type.
+            :return: The report data of one column.
+            """
+
+        def section_total(*account_types):
+            return sum(account_entries[account_type][1]
+                       for account_type in account_types)
+
+        total_income = section_total('income', 'income_other') - \
+            section_total('expense_direct_cost')
+        total_expense = section_total('expense', 'expense_depreciation')
+        total_current_asset = section_total(
+            'asset_receivable', 'asset_current', 'asset_cash',
+            'asset_prepayments')
+        total_assets = total_current_asset + section_total(
+            'asset_fixed', 'asset_non_current')
+        total_current_liability = section_total(
+            'liability_current', 'liability_payable')
+        total_liability = total_current_liability + section_total(
+            'liability_non_current')
+        total_unallocated_earning = (total_income - total_expense) + \
+            section_total('equity_unaffected')
+        total_equity = total_unallocated_earning + section_total('equity')
+        total = total_liability + total_equity
+        formatted_entries = {
+            account_type: ([
+                {**entry, 'amount': "{:,.2f}".format(entry['amount'])}
+                for entry in entries], "{:,.2f}".format(entries_total))
+            for account_type, (entries, entries_total) in
+            account_entries.items()}
+        return {
+            'total': total_income - total_expense,
+            'total_expense': "{:,.2f}".format(total_expense),
+            'total_income': "{:,.2f}".format(total_income),
+            'total_current_asset': "{:,.2f}".format(total_current_asset),
+            'total_assets': "{:,.2f}".format(total_assets),
+            'total_current_liability': "{:,.2f}".format(
+                total_current_liability),
+            'total_liability': "{:,.2f}".format(total_liability),
+            'total_earnings': "{:,.2f}".format(total_income - total_expense),
+            'total_unallocated_earning': "{:,.2f}".format(
+                total_unallocated_earning),
+            'total_equity': "{:,.2f}".format(total_equity),
+            'total_balance': "{:,.2f}".format(total),
+            **formatted_entries}
 
     def filter(self, vals):
         """
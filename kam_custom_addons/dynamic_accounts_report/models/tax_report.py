@@ -22,9 +22,11 @@
 import calendar
 import io
 import json
+from collections import defaultdict
 from datetime import datetime
 import xlsxwriter
 from odoo import models, fields, api
+from odoo.tools import SQL
 from odoo.tools.date_utils import get_month, get_fiscal_year, \
     get_quarter_number, subtract
 
@@ -44,38 +46,11 @@ class TaxReport(models.TransientModel):
             :return: Dictionary containing sale and purchase data for the
                      current month.
         """
-        sale = []
-        purchase = []
-        tax_ids = self.env['account.move.line'].search([]).mapped(
-            'tax_ids')
-        today = fields.Date.today()
-        for tax in tax_ids:
-            tax_id = self.env['account.move.line'].search(
-                [('tax_ids', '=', tax.id), ('parent_state', '=', 'posted'),
-                 ('date', '>=', get_month(today)[0]),
-                 ('date', '<=', get_month(today)[1])]).read(
-                ['debit', 'credit'])
-            tax_debit_sums = sum(record['debit'] for record in tax_id)
-            tax_credit_sums = sum(record['credit'] for record in tax_id)
-            if tax.type_tax_use == 'sale':
-                sale.append({
-                    'name': tax.name,
-                    'amount': tax.amount,
-                    'net': round(tax_debit_sums + tax_credit_sums, 2),
-                    'tax': round((tax_debit_sums + tax_credit_sums) * (
-                            tax.amount / 100), 2)
-                })
-            elif tax.type_tax_use == 'purchase':
-                purchase.append({
-                    'name': tax.name,
-                    'amount': tax.amount,
-                    'net': round(tax_debit_sums + tax_credit_sums, 2),
-                    'tax': round((tax_debit_sums + tax_credit_sums) * (
-                            tax.amount / 100), 2)
-                })
+        date_from, date_to = get_month(fields.Date.today())
+        report = self._get_tax_report(['posted'], date_from, date_to)
         return {
-            'sale': sale,
-            'purchase': purchase
+            'sale': report['sale'],
+            'purchase': report['purchase']
         }
 
     @api.model
@@ -93,507 +68,198 @@ class TaxReport(models.TransientModel):
            :return: Dictionary containing dynamic_date_num, sale, and purchase
                     data.
            """
-        sale = []
-        purchase = []
-        dynamic_date_num = {}
-        if options == {}:
-            options = None
-        if options is None:
-            option_domain = ['posted']
-        elif 'draft' in options:
+        if options and 'draft' in options:
             option_domain = ['posted', 'draft']
-        tax_ids = self.env['account.move.line'].search([]).mapped(
-            'tax_ids')
-        start_date_first = \
-            get_fiscal_year(datetime.strptime(start_date, "%Y-%m-%d").date())[
-                0] if comparison_type == 'year' else datetime.strptime(
-                start_date, "%Y-%m-%d").date()
-        end_date_first = \
-            get_fiscal_year(datetime.strptime(end_date, "%Y-%m-%d").date())[
-                1] if comparison_type == 'year' else datetime.strptime(
-                end_date, "%Y-%m-%d").date()
+        else:
+            option_domain = ['posted']
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        if comparison_type == 'year':
+            start_date = get_fiscal_year(start_date)[0]
+            end_date = get_fiscal_year(end_date)[1]
         if report_type is not None and 'account' in report_type:
-            start_date = start_date_first
-            end_date = end_date_first
-            account_ids = self.env['account.move.line'].search([]).mapped(
-                'account_id')
-            for account in account_ids:
-                tax_ids = self.env['account.move.line'].search(
-                    [('account_id', '=', account.id)]).mapped('tax_ids')
-                if tax_ids:
-                    for tax in tax_ids:
-                        dynamic_total_tax_sum = {}
-                        dynamic_total_net_sum = {}
-                        if comparison_number:
-                            if comparison_type == 'year':
-                                start_date = start_date_first
-                                end_date = end_date_first
-                                for i in range(1, eval(comparison_number) + 1):
-                                    com_start_date = subtract(start_date,
-                                                              years=i)
-                                    com_end_date = subtract(end_date, years=i)
-                                    tax_id = self.env[
-                                        'account.move.line'].search(
-                                        [('tax_ids', '=', tax.id),
-                                         ('date', '>=', com_start_date),
-                                         ('date', '<=', com_end_date),
-                                         ('account_id', '=', account.id),
-                                         ('parent_state', 'in',
-                                          option_domain)]).read(
-                                        ['debit', 'credit'])
-                                    tax_debit_sums = sum(
-                                        record['debit'] for record in tax_id)
-                                    tax_credit_sums = sum(
-                                        record['credit'] for record in tax_id)
-                                    dynamic_total_net_sum[
-                                        f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                                    dynamic_total_tax_sum[
-                                        f"dynamic_total_tax_sum{i}"] = \
-                                        dynamic_total_net_sum[
-                                            f"dynamic_total_net_sum{i}"] * (
-                                                tax.amount / 100)
-                            elif comparison_type == 'month':
-                                dynamic_date_num[
-                                    f"dynamic_date_num{0}"] = self.get_month_name(
-                                    start_date) + ' ' + str(start_date.year)
-                                for i in range(1, eval(comparison_number) + 1):
-                                    com_start_date = subtract(start_date,
-                                                              months=i)
-                                    com_end_date = subtract(end_date, months=i)
-                                    tax_id = self.env[
-                                        'account.move.line'].search(
-                                        [('tax_ids', '=', tax.id),
-                                         ('date', '>=', com_start_date),
-                                         ('account_id', '=', account.id),
-                                         ('date', '<=', com_end_date),
-                                         ('parent_state', 'in',
-                                          option_domain)]).read(
-                                        ['debit', 'credit'])
-                                    tax_debit_sums = sum(
-                                        record['debit'] for record in tax_id)
-                                    tax_credit_sums = sum(
-                                        record['credit'] for record in tax_id)
-                                    dynamic_total_net_sum[
-                                        f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                                    dynamic_total_tax_sum[
-                                        f"dynamic_total_tax_sum{i}"] = \
-                                        dynamic_total_net_sum[
-                                            f"dynamic_total_net_sum{i}"] * (
-                                                tax.amount / 100)
-                                    dynamic_date_num[
-                                        f"dynamic_date_num{i}"] = self.get_month_name(
-                                        com_start_date) + ' ' + str(
-                                        com_start_date.year)
-                            elif comparison_type == 'quarter':
-                                dynamic_date_num[
-                                    f"dynamic_date_num{0}"] = 'Q' + ' ' + str(
-                                    get_quarter_number(
-                                        start_date)) + ' ' + str(
-                                    start_date.year)
-                                for i in range(1, eval(comparison_number) + 1):
-                                    com_start_date = subtract(start_date,
-                                                              months=i * 3)
-                                    com_end_date = subtract(end_date,
-                                                            months=i * 3)
-                                    tax_id = self.env[
-                                        'account.move.line'].search(
-                                        [('tax_ids', '=', tax.id),
-                                         ('date', '>=', com_start_date),
-                                         ('account_id', '=', account.id),
-                                         ('date', '<=', com_end_date),
-                                         ('parent_state', 'in',
-                                          option_domain)]).read(
-                                        ['debit', 'credit'])
-                                    tax_debit_sums = sum(
-                                        record['debit'] for record in tax_id)
-                                    tax_credit_sums = sum(
-                                        record['credit'] for record in tax_id)
-                                    dynamic_total_net_sum[
-                                        f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                                    dynamic_total_tax_sum[
-                                        f"dynamic_total_tax_sum{i}"] = \
-                                        dynamic_total_net_sum[
-                                            f"dynamic_total_net_sum{i}"] * (
-                                                tax.amount / 100)
-                                    dynamic_date_num[
-                                        f"dynamic_date_num{i}"] = 'Q' + ' ' + str(
-                                        get_quarter_number(
-                                            com_start_date)) + ' ' + str(
-                                        com_start_date.year)
-                        tax_id = self.env['account.move.line'].search(
-                            [('tax_ids', '=', tax.id),
-                             ('date', '>=', start_date_first),
-                             ('date', '<=', end_date_first),
-                             ('parent_state', 'in', option_domain),
-                             ('account_id', '=', account.id)]).read(
-                            ['debit', 'credit'])
-                        tax_debit_sums = sum(
-                            record['debit'] for record in tax_id)
-                        tax_credit_sums = sum(
-                            record['credit'] for record in tax_id)
-                        if tax_id and tax.type_tax_use == 'sale':
-                            if comparison_number:
-                                sale.append({
-                                    'name': tax.name,
-                                    'amount': tax.amount,
-                                    'net': round(
-                                        tax_debit_sums + tax_credit_sums,
-                                        2),
-                                    'tax': round(
-                                        (tax_debit_sums + tax_credit_sums) * (
-                                                tax.amount / 100), 2),
-                                    'dynamic net': dynamic_total_net_sum,
-                                    'dynamic tax': dynamic_total_tax_sum,
-                                    'account': account.display_name,
-                                })
-                            else:
-                                sale.append({
-                                    'name': tax.name,
-                                    'amount': tax.amount,
-                                    'net': round(
-                                        tax_debit_sums + tax_credit_sums,
-                                        2),
-                                    'tax': round(
-                                        (tax_debit_sums + tax_credit_sums) * (
-                                                tax.amount / 100), 2),
-                                    'account': account.display_name,
-                                })
-                        elif tax_id and tax.type_tax_use == 'purchase':
-                            if comparison_number:
-                                purchase.append({
-                                    'name': tax.name,
-                                    'amount': tax.amount,
-                                    'net': round(
-                                        tax_debit_sums + tax_credit_sums,
-                                        2),
-                                    'tax': round(
-                                        (tax_debit_sums + tax_credit_sums) * (
-                                                tax.amount / 100), 2),
-                                    'dynamic net': dynamic_total_net_sum,
-                                    'dynamic tax': dynamic_total_tax_sum,
-                                    'account': account.display_name,
-                                })
-                            else:
-                                purchase.append({
-                                    'name': tax.name,
-                                    'amount': tax.amount,
-                                    'net': round(
-                                        tax_debit_sums + tax_credit_sums,
-                                        2),
-                                    'tax': round(
-                                        (tax_debit_sums + tax_credit_sums) * (
-                                                tax.amount / 100), 2),
-                                    'account': account.display_name,
-                                })
+            group_by = 'account'
         elif report_type is not None and 'tax' in report_type:
-            start_date = start_date_first
-            end_date = end_date_first
-            for tax in tax_ids:
-                account_ids = self.env['account.move.line'].search(
-                    [('tax_ids', '=', tax.id)]).mapped('account_id')
-                for account in account_ids:
-                    dynamic_total_tax_sum = {}
-                    dynamic_total_net_sum = {}
-                    if comparison_number:
-                        if comparison_type == 'year':
-                            start_date = start_date_first
-                            end_date = end_date_first
-                            for i in range(1, eval(comparison_number) + 1):
-                                com_start_date = subtract(start_date,
-                                                          years=i)
-                                com_end_date = subtract(end_date, years=i)
-                                tax_id = self.env[
-                                    'account.move.line'].search(
-                                    [('tax_ids', '=', tax.id),
-                                     ('date', '>=', com_start_date),
-                                     ('date', '<=', com_end_date),
-                                     ('account_id', '=', account.id),
-                                     ('parent_state', 'in',
-                                      option_domain)]).read(
-                                    ['debit', 'credit'])
-                                tax_debit_sums = sum(
-                                    record['debit'] for record in tax_id)
-                                tax_credit_sums = sum(
-                                    record['credit'] for record in tax_id)
-                                dynamic_total_net_sum[
-                                    f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                                dynamic_total_tax_sum[
-                                    f"dynamic_total_tax_sum{i}"] = \
-                                    dynamic_total_net_sum[
-                                        f"dynamic_total_net_sum{i}"] * (
-                                            tax.amount / 100)
-                        elif comparison_type == 'month':
-                            dynamic_date_num[
-                                f"dynamic_date_num{0}"] = self.get_month_name(
-                                start_date) + ' ' + str(start_date.year)
-                            for i in range(1, eval(comparison_number) + 1):
-                                com_start_date = subtract(start_date, months=i)
-                                com_end_date = subtract(end_date, months=i)
-                                tax_id = self.env[
-                                    'account.move.line'].search(
-                                    [('tax_ids', '=', tax.id),
-                                     ('date', '>=', com_start_date),
-                                     ('date', '<=', com_end_date),
-                                     ('account_id', '=', account.id),
-                                     ('parent_state', 'in',
-                                      option_domain)]).read(
-                                    ['debit', 'credit'])
-                                tax_debit_sums = sum(
-                                    record['debit'] for record in tax_id)
-                                tax_credit_sums = sum(
-                                    record['credit'] for record in tax_id)
-                                dynamic_total_net_sum[
-                                    f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                                dynamic_total_tax_sum[
-                                    f"dynamic_total_tax_sum{i}"] = \
-                                    dynamic_total_net_sum[
-                                        f"dynamic_total_net_sum{i}"] * (
-                                            tax.amount / 100)
-                                dynamic_date_num[
-                                    f"dynamic_date_num{i}"] = self.get_month_name(
-                                    com_start_date) + ' ' + str(
-                                    com_start_date.year)
-                        elif comparison_type == 'quarter':
-                            dynamic_date_num[
-                                f"dynamic_date_num{0}"] = 'Q' + ' ' + str(
-                                get_quarter_number(start_date)) + ' ' + str(
-                                start_date.year)
-                            for i in range(1, eval(comparison_number) + 1):
-                                com_start_date = subtract(start_date,
-                                                          months=i * 3)
-                                com_end_date = subtract(end_date,
-                                                        months=i * 3)
-                                tax_id = self.env[
-                                    'account.move.line'].search(
-                                    [('tax_ids', '=', tax.id),
-                                     ('date', '>=', com_start_date),
-                                     ('date', '<=', com_end_date),
-                                     ('account_id', '=', account.id),
-                                     ('parent_state', 'in',
-                                      option_domain)]).read(
-                                    ['debit', 'credit'])
-                                tax_debit_sums = sum(
-                                    record['debit'] for record in tax_id)
-                                tax_credit_sums = sum(
-                                    record['credit'] for record in tax_id)
-                                dynamic_total_net_sum[
-                                    f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                                dynamic_total_tax_sum[
-                                    f"dynamic_total_tax_sum{i}"] = \
-                                    dynamic_total_net_sum[
-                                        f"dynamic_total_net_sum{i}"] * (
-                                            tax.amount / 100)
-                                dynamic_date_num[
-                                    f"dynamic_date_num{i}"] = 'Q' + ' ' + str(
-                                    get_quarter_number(
-                                        com_start_date)) + ' ' + str(
-                                    com_start_date.year)
-                    tax_id = self.env['account.move.line'].search(
-                        [('tax_ids', '=', tax.id),
-                         ('parent_state', 'in', option_domain),
-                         ('date', '>=', start_date_first),
-                         ('date', '<=', end_date_first),
-                         ('account_id', '=', account.id)]).read(
-                        ['debit', 'credit'])
-                    tax_debit_sums = sum(
-                        record['debit'] for record in tax_id)
-                    tax_credit_sums = sum(
-                        record['credit'] for record in tax_id)
-                    if tax_id and tax.type_tax_use == 'sale':
-                        if comparison_number:
-                            sale.append({
-                                'name': tax.name,
-                                'amount': tax.amount,
-                                'net': round(tax_debit_sums + tax_credit_sums,
-                                             2),
-                                'tax': round(
-                                    (tax_debit_sums + tax_credit_sums) * (
-                                            tax.amount / 100), 2),
-                                'dynamic net': dynamic_total_net_sum,
-                                'dynamic tax': dynamic_total_tax_sum,
-                                'account': account.display_name,
-                            })
-                        else:
-                            sale.append({
-                                'name': tax.name,
-                                'amount': tax.amount,
-                                'net': round(tax_debit_sums + tax_credit_sums,
-                                             2),
-                                'tax': round(
-                                    (tax_debit_sums + tax_credit_sums) * (
-                                            tax.amount / 100), 2),
-                                'account': account.display_name,
-                            })
-                    elif tax_id and tax.type_tax_use == 'purchase':
-                        if comparison_number:
-                            purchase.append({
-                                'name': tax.name,
-                                'amount': tax.amount,
-                                'net': round(tax_debit_sums + tax_credit_sums,
-                                             2),
-                                'tax': round(
-                                    (tax_debit_sums + tax_credit_sums) * (
-                                            tax.amount / 100), 2),
-                                'dynamic net': dynamic_total_net_sum,
-                                'dynamic tax': dynamic_total_tax_sum,
-                                'account': account.display_name,
-                            })
-                        else:
-                            purchase.append({
-                                'name': tax.name,
-                                'amount': tax.amount,
-                                'net': round(tax_debit_sums + tax_credit_sums,
-                                             2),
-                                'tax': round(
-                                    (tax_debit_sums + tax_credit_sums) * (
-                                            tax.amount / 100), 2),
-                                'account': account.display_name,
-                            })
+            group_by = 'tax'
+        else:
+            group_by = None
+        return self._get_tax_report(
+            option_domain, start_date, end_date,
+            int(comparison_number or 0), comparison_type, group_by)
+
+    @api.model
+    def _get_tax_report(self, option_domain, start_date, end_date,
+                        comparison_number=0, comparison_type=None,
+                        group_by=None):
+        """
+        Build the sale and purchase tax lines of the period and of its
+        comparison columns.
+
+        :param list option_domain: States of the journal entries.
+        :param date start_date: Start date of the reporting period.
+        :param date end_date: End date of the reporting period.
+        :param int comparison_number: Number of comparison periods.
+        :param str comparison_type: Type of comparison (year, month,
+                                    quarter).
+        :param str group_by: 'account' or 'tax' to split the taxes by base
+                             account, listed by account or by tax.
+        :return: Dictionary containing dynamic_date_num, sale, and purchase
+                 data.
+        """
+        dynamic_date_num = {}
+        columns = []
+        if comparison_number:
+            if comparison_type != 'year':
+                dynamic_date_num["dynamic_date_num0"] = \
+                    self._get_comparison_label(comparison_type, start_date)
+            for i in range(1, comparison_number + 1):
+                delta = self._get_comparison_delta(comparison_type, i)
+                com_start_date = subtract(start_date, **delta)
+                columns.append((com_start_date, subtract(end_date, **delta)))
+                if comparison_type != 'year':
+                    dynamic_date_num[f"dynamic_date_num{i}"] = \
+                        self._get_comparison_label(comparison_type,
+                                                   com_start_date)
+        periods = [(start_date, end_date)] + columns
+        base_amounts, tax_amounts = self._get_tax_totals(
+            [('parent_state', 'in', option_domain)], periods)
+        empty_amounts = [0.0] * len(periods)
+        tax_bases = defaultdict(lambda: empty_amounts)
+        for (tax_id, _account_id), amounts in base_amounts.items():
+            tax_bases[tax_id] = [
+                total + amount
+                for total, amount in zip(tax_bases[tax_id], amounts)]
+        rows = []
+        if group_by:
+            # The tax lines are on the tax accounts, the tax of each base
+            # account is its share of the base of the tax.
+            for (tax_id, account_id), amounts in base_amounts.items():
+                tax_totals = tax_amounts.get(tax_id, empty_amounts)
+                rows.append((tax_id, account_id, amounts, [
+                    tax * amount / base if base else 0.0
+                    for tax, amount, base in zip(
+                        tax_totals, amounts, tax_bases[tax_id])]))
+        else:
+            for tax_id in set(tax_bases) | set(tax_amounts):
+                rows.append((tax_id, None, tax_bases[tax_id],
+                             tax_amounts.get(tax_id, empty_amounts)))
+        taxes = self.env['account.tax'].browse(
+            {row[0] for row in rows}).sorted()
+        accounts = self.env['account.account'].browse(
+            {row[1] for row in rows if row[1]})
+        tax_sequence = {tax.id: index for index, tax in enumerate(taxes)}
+        account_names = {account.id: account.display_name
+                         for account in accounts}
+        if group_by == 'account':
+            rows.sort(key=lambda row: (account_names[row[1]],
+                                       tax_sequence[row[0]]))
         else:
-            start_date = start_date_first
-            end_date = end_date_first
-            for tax in tax_ids:
-                dynamic_total_tax_sum = {}
-                dynamic_total_net_sum = {}
-                if comparison_number:
-                    if comparison_type == 'year':
-                        start_date = start_date_first
-                        end_date = end_date_first
-                        for i in range(1, eval(comparison_number) + 1):
-                            com_start_date = subtract(start_date,
-                                                      years=i)
-                            com_end_date = subtract(end_date, years=i)
-                            tax_id = self.env[
-                                'account.move.line'].search(
-                                [('tax_ids', '=', tax.id),
-                                 ('date', '>=', com_start_date),
-                                 ('date', '<=', com_end_date),
-                                 ('parent_state', 'in', option_domain)]).read(
-                                ['debit', 'credit'])
-                            tax_debit_sums = sum(
-                                record['debit'] for record in tax_id)
-                            tax_credit_sums = sum(
-                                record['credit'] for record in tax_id)
-                            dynamic_total_net_sum[
-                                f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                            dynamic_total_tax_sum[
-                                f"dynamic_total_tax_sum{i}"] = \
-                                dynamic_total_net_sum[
-                                    f"dynamic_total_net_sum{i}"] * (
-                                        tax.amount / 100)
-                    elif comparison_type == 'month':
-                        dynamic_date_num[
-                            f"dynamic_date_num{0}"] = self.get_month_name(
-                            start_date) + ' ' + str(start_date.year)
-                        for i in range(1, eval(comparison_number) + 1):
-                            com_start_date = subtract(start_date, months=i)
-                            com_end_date = subtract(end_date, months=i)
-                            tax_id = self.env[
-                                'account.move.line'].search(
-                                [('tax_ids', '=', tax.id),
-                                 ('date', '>=', com_start_date),
-                                 ('date', '<=', com_end_date),
-                                 ('parent_state', 'in', option_domain)]).read(
-                                ['debit', 'credit'])
-                            tax_debit_sums = sum(
-                                record['debit'] for record in tax_id)
-                            tax_credit_sums = sum(
-                                record['credit'] for record in tax_id)
-                            dynamic_total_net_sum[
-                                f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                            dynamic_total_tax_sum[
-                                f"dynamic_total_tax_sum{i}"] = \
-                                dynamic_total_net_sum[
-                                    f"dynamic_total_net_sum{i}"] * (
-                                        tax.amount / 100)
-                            dynamic_date_num[
-                                f"dynamic_date_num{i}"] = self.get_month_name(
-                                com_start_date) + ' ' + str(
-                                com_start_date.year)
-                    elif comparison_type == 'quarter':
-                        dynamic_date_num[
-                            f"dynamic_date_num{0}"] = 'Q' + ' ' + str(
-                            get_quarter_number(start_date)) + ' ' + str(
-                            start_date.year)
-                        for i in range(1, eval(comparison_number) + 1):
-                            com_start_date = subtract(start_date,
-                                                      months=i * 3)
-                            com_end_date = subtract(end_date,
-                                                    months=i * 3)
-                            tax_id = self.env[
-                                'account.move.line'].search(
-                                [('tax_ids', '=', tax.id),
-                                 ('date', '>=', com_start_date),
-                                 ('date', '<=', com_end_date),
-                                 ('parent_state', 'in', option_domain)]).read(
-                                ['debit', 'credit'])
-                            tax_debit_sums = sum(
-                                record['debit'] for record in tax_id)
-                            tax_credit_sums = sum(
-                                record['credit'] for record in tax_id)
-                            dynamic_total_net_sum[
-                                f"dynamic_total_net_sum{i}"] = tax_debit_sums + tax_credit_sums
-                            dynamic_total_tax_sum[
-                                f"dynamic_total_tax_sum{i}"] = \
-                                dynamic_total_net_sum[
-                                    f"dynamic_total_net_sum{i}"] * (
-                                        tax.amount / 100)
-                            dynamic_date_num[
-                                f"dynamic_date_num{i}"] = 'Q' + ' ' + str(
-                                get_quarter_number(
-                                    com_start_date)) + ' ' + str(
-                                com_start_date.year)
-                tax_id = self.env['account.move.line'].search(
-                    [('tax_ids', '=', tax.id),
-                     ('parent_state', 'in', option_domain),
-                     ('date', '>=', start_date_first),
-                     ('date', '<=', end_date_first)]).read(['debit', 'credit'])
-                tax_debit_sums = sum(record['debit'] for record in tax_id)
-                tax_credit_sums = sum(record['credit'] for record in tax_id)
-                if tax.type_tax_use == 'sale':
-                    if comparison_number:
-                        sale.append({
-                            'name': tax.name,
-                            'amount': tax.amount,
-                            'net': round(tax_debit_sums + tax_credit_sums, 2),
-                            'tax': round((tax_debit_sums + tax_credit_sums) * (
-                                    tax.amount / 100), 2),
-                            'dynamic net': dynamic_total_net_sum,
-                            'dynamic tax': dynamic_total_tax_sum,
-                        })
-                    else:
-                        sale.append({
-                            'name': tax.name,
-                            'amount': tax.amount,
-                            'net': round(tax_debit_sums + tax_credit_sums, 2),
-                            'tax': round((tax_debit_sums + tax_credit_sums) * (
-                                    tax.amount / 100), 2),
-                        })
-                elif tax.type_tax_use == 'purchase':
-                    if comparison_number:
-                        purchase.append({
-                            'name': tax.name,
-                            'amount': tax.amount,
-                            'net': round(tax_debit_sums + tax_credit_sums, 2),
-                            'tax': round((tax_debit_sums + tax_credit_sums) * (
-                                    tax.amount / 100), 2),
-                            'dynamic net': dynamic_total_net_sum,
-                            'dynamic tax': dynamic_total_tax_sum,
-                        })
-                    else:
-                        purchase.append({
-                            'name': tax.name,
-                            'amount': tax.amount,
-                            'net': round(tax_debit_sums + tax_credit_sums, 2),
-                            'tax': round((tax_debit_sums + tax_credit_sums) * (
-                                    tax.amount / 100), 2),
-                        })
+            rows.sort(key=lambda row: (tax_sequence[row[0]],
+                                       account_names.get(row[1], '')))
+        sale = []
+        purchase = []
+        for tax_id, account_id, nets, tax_totals in rows:
+            tax = taxes.browse(tax_id)
+            if tax.type_tax_use not in ('sale', 'purchase'):
+                continue
+            values = {
+                'name': tax.name,
+                'amount': tax.amount,
+                'net': round(nets[0], 2),
+                'tax': round(tax_totals[0], 2),
+            }
+            if comparison_number:
+                values['dynamic net'] = {
+                    f"dynamic_total_net_sum{i}": round(nets[i], 2)
+                    for i in range(1, comparison_number + 1)}
+                values['dynamic tax'] = {
+                    f"dynamic_total_tax_sum{i}": round(tax_totals[i], 2)
+                    for i in range(1, comparison_number + 1)}
+            if account_id:
+                values['account'] = account_names[account_id]
+            if tax.type_tax_use == 'sale':
+                sale.append(values)
+            else:
+                purchase.append(values)
         return {
             'dynamic_date_num': dynamic_date_num,
             'sale': sale,
             'purchase': purchase
         }
 
+    @api.model
+    def _get_tax_totals(self, domain, periods):
+        """
+        Compute the base and the tax amounts of every tax for each period
+        with one grouped query. The base amounts are the journal items
+        linked to the tax, the tax amounts the journal items of the tax.
+
+        :param list domain: Journal items domain, without the dates.
+        :param list periods: (start date, end date) of the periods.
+        :return: ({(tax id, base account id): [amount, ...]},
+                  {tax id: [amount, ...]}), one amount per period.
+        :rtype: tuple
+        """
+        query = self.env['account.move.line']._search(
+            domain + [('date', '>=', min(start for start, _end in periods)),
+                      ('date', '<=', max(end for _start, end in periods))])
+        aggregates = SQL(", ").join(
+            SQL("COALESCE(SUM(account_move_line.debit + "
+                "account_move_line.credit) FILTER "
+                "(WHERE account_move_line.date BETWEEN %s AND %s), 0)",
+                period_start, period_end)
+            for period_start, period_end in periods)
+        self.env.cr.execute(SQL(
+            """
+            SELECT tax_rel.account_tax_id, account_move_line.account_id,
+                   TRUE, %(aggregates)s
+              FROM %(from_clause)s
+              JOIN account_move_line_account_tax_rel tax_rel
+                ON tax_rel.account_move_line_id = account_move_line.id
+             WHERE %(where_clause)s
+          GROUP BY tax_rel.account_tax_id, account_move_line.account_id
+         UNION ALL
+            SELECT account_move_line.tax_line_id, NULL, FALSE, %(aggregates)s
+              FROM %(from_clause)s
+             WHERE %(where_clause)s
+               AND account_move_line.tax_line_id IS NOT NULL
+          GROUP BY account_move_line.tax_line_id
+            """,
+            aggregates=aggregates,
+            from_clause=query.from_clause,
+            where_clause=query.where_clause or SQL("TRUE"),
+        ))
+        base_amounts = {}
+        tax_amounts = {}
+        for tax_id, account_id, is_base, *amounts in self.env.cr.fetchall():
+            amounts = [float(amount) for amount in amounts]
+            if is_base:
+                base_amounts[tax_id, account_id] = amounts
+            else:
+                tax_amounts[tax_id] = amounts
+        return base_amounts, tax_amounts
+
+    @api.model
+    def _get_comparison_delta(self, comparison_type, count):
+        """
+        Keyword arguments of date_utils.subtract for `count` periods.
+        """
+        if comparison_type == 'year':
+            return {'years': count}
+        if comparison_type == 'month':
+            return {'months': count}
+        return {'months': count * 3}
+
+    @api.model
+    def _get_comparison_label(self, comparison_type, date):
+        """
+        Header of a month or quarter comparison column.
+        """
+        if comparison_type == 'month':
+            return self.get_month_name(date) + ' ' + str(date.year)
+        return 'Q' + ' ' + str(get_quarter_number(date)) + ' ' + str(
+            date.year)
+
     @api.model
     def get_month_name(self, date):
         """
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+import functools
+import tempfile
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+import xlsxwriter
+from odoo import api, fields, models
+from odoo.tools import date_utils
+
+XLSX_CHUNK_SIZE = 64 * 1024
+# Number of accounts or partners whose journal items are read at once
+XLSX_BATCH_SIZE = 100
+# Number of journal items read at once
+XLSX_PAGE_SIZE = 1000
+
+
+class XlsxReportMixin(models.AbstractModel):
+    """Streamed XLSX export shared by the journal items reports"""
+    _name = 'xlsx.report.mixin'
+    _description = 'Streamed XLSX Report'
+
+    @api.model
+    def _get_report_dates(self, data_range, date_from=None):
+        """
+        Start and end dates of the date range option of a report, either a
+        preset ('month', 'last-year', ...) or the custom start and end dates.
+
+        :param date_from: The start date when the option doesn't give one.
+        :return: The start and end dates, the end date is None when the
+        period is open.
+        :rtype: tuple
+        """
+        today = fields.Date.today()
+        date_to = None
+        if data_range == 'month':
+            date_from, date_to = date_utils.get_month(today)
+        elif data_range == 'year':
+            date_from = today.replace(month=1, day=1)
+            date_to = today.replace(month=12, day=31)
+        elif data_range == 'quarter':
+            date_from, date_to = date_utils.get_quarter(today)
+        elif data_range == 'last-month':
+            date_from, date_to = date_utils.get_month(
+                today - relativedelta(months=1))
+        elif data_range == 'last-year':
+            date_from = today.replace(month=1, day=1) - relativedelta(years=1)
+            date_to = date_from.replace(month=12, day=31)
+        elif data_range == 'last-quarter':
+            date_from, date_to = date_utils.get_quarter(
+                today - relativedelta(months=3))
+        elif data_range:
+            if 'start_date' in data_range:
+                date_from = datetime.strptime(data_range['start_date'],
+                                              '%Y-%m-%d').date()
+            if 'end_date' in data_range:
+                date_to = datetime.strptime(data_range['end_date'],
+                                            '%Y-%m-%d').date()
+        return date_from, date_to
+
+    @api.model
+    def _stream_xlsx_report(self, response, write_report):
+        """
+        Write the report in a workbook in constant memory mode, backed by a
+        temporary file, then stream the file to the response by chunks. The
+        memory used doesn't depend on the number of rows of the report.
+
+        :param response: The response object to write the report to.
+        :type response: werkzeug.wrappers.Response
+
+        :param write_report: Function writing the report to the workbook it
+        receives.
+        :type write_report: callable
+        """
+        output = tempfile.TemporaryFile()
+        try:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+            write_report(workbook)
+            workbook.close()
+            output.seek(0)
+        except Exception:
+            output.close()
+            raise
+        response.response = iter(
+            functools.partial(output.read, XLSX_CHUNK_SIZE), b'')
+        response.call_on_close(output.close)
+
+    @api.model
+    def _get_xlsx_formats(self, workbook):
+        """Cell formats of the reports."""
+        txt_name = workbook.add_format({'font_size': '10px', 'border': 1})
+        txt_name.set_indent(2)
+        num_format = workbook.add_format(
+            {'font_size': '10px', 'border': 1, 'num_format': '#,##0.00'})
+        num_format.set_indent(2)
+        return {
+            'head': workbook.add_format(
+                {'align': 'center', 'bold': True, 'font_size': '15px'}),
+            'sub_heading': workbook.add_format(
+                {'align': 'center', 'bold': True, 'font_size': '10px',
+                 'border': 1, 'bg_color': '#D3D3D3',
+                 'border_color': 'black'}),
+            'filter_head': workbook.add_format(
+                {'align': 'center', 'bold': True, 'font_size': '10px',
+                 'border': 1, 'bg_color': '#D3D3D3',
+                 'border_color': 'black'}),
+            'filter_body': workbook.add_format(
+                {'align': 'center', 'bold': True, 'font_size': '10px'}),
+            'txt_name': txt_name,
+            'num_format': num_format,
+            'total_num_format': workbook.add_format(
+                {'align': 'center', 'bold': True, 'font_size': '10px',
+                 'border': 1, 'bg_color': '#D3D3D3',
+                 'border_color': 'black', 'num_format': '#,##0.00'}),
+        }
+
+    @api.model
+    def _write_xlsx_header(self, sheet, formats, report_name, filters):
+        """
+        Write the title of the report and its filters, one per row from the
+        third row. Rows can only be written in ascending order in constant
+        memory mode, so each filter is written along with its label.
+
+        :param filters: The (label, value) of the filters.
+        :type filters: list
+        """
+        sheet.set_column(0, 0, 30)
+        sheet.set_column(1, 1, 20)
+        sheet.set_column(2, 2, 15)
+        sheet.set_column(3, 3, 15)
+        sheet.write(0, 0, report_name, formats['head'])
+        for row, (label, value) in enumerate(filters, start=2):
+            sheet.write(row, 1, label, formats['filter_head'])
+            if value:
+                sheet.merge_range(row, 2, row, 6, value,
+                                  formats['filter_body'])
+
+    @api.model
+    def _write_xlsx_columns(self, sheet, row, columns, cell_format):
+        """
+        Write the titles of the columns of the report lines. Every value of a
+        line has a column of its own, wide enough to be written without
+        merging cells: a merged range is kept in memory until the workbook
+        is closed, even in constant memory mode.
+
+        :param columns: The (title, width) of the columns, from the first
+        one.
+        :type columns: list
+        """
+        for col, (title, width) in enumerate(columns):
+            sheet.set_column(col, col, width)
+            sheet.write(row, col, title, cell_format)
+
+    @api.model
+    def _iter_move_line_pages(self, domain, field_names, descending=False,
+                              page_size=XLSX_PAGE_SIZE):
+        """
+        Yield the journal items of the domain page by page, ordered by date
+        and id. As in the general ledger, a page starts after the (date, id)
+        key of the last line of the previous page, so reading a page never
+        depends on the number of lines before it. The record cache is
+        cleared between pages.
+
+        :param descending: Yield the most recent journal items first.
+        :type descending: bool
+        """
+        operator = '<' if descending else '>'
+        order = 'date desc, id desc' if descending else 'date, id'
+        page_domain = domain
+        while True:
+            move_lines = self.env['account.move.line'].search_fetch(
+                page_domain, field_names, limit=page_size, order=order)
+            if not move_lines:
+                return
+            last_date, last_id = move_lines[-1].date, move_lines[-1].id
+            yield move_lines
+            if len(move_lines) < page_size:
+                return
+            self.env['account.move.line'].invalidate_model()
+            page_domain = domain + ['|', ('date', operator, last_date),
+                                    '&', ('date', '=', last_date),
+                                    ('id', operator, last_id)]
@@ -32,6 +32,9 @@ class AgedReceivable extends owl.Component {
             diff5_sum: null,
             selected_partner: [],
             selected_partner_rec: [],
+            aging_labels: null,
+            unfolded: {},
+            loaded: {},
         });
         this.load_data(self.initial_render = true);
     }
@@ -52,7 +55,7 @@ class AgedReceivable extends owl.Component {
         var self = this;
         var action_title = self.props.action.display_name;
         try {
-            self.state.data = await self.orm.call("age.receivable.report", "view_report", []);
+            self.state.data = await self.getAgingTotals(false);
             for (const index in self.state.data) {
                 const value = self.state.data[index];
                 if (index !== 'partner_totals') {
@@ -142,23 +145,63 @@ class AgedReceivable extends owl.Component {
     }
     async unfoldAll(ev) {
         /**
-         * Unfolds all items in the table body if the event target does not have the 'selected-filter' class,
-         * or folds all items if the event target has the 'selected-filter' class.
+         * Unfolds all partners if the event target does not have the 'selected-filter' class,
+         * or folds all of them if the event target has the 'selected-filter' class.
          *
          * @param {Event} ev - The event object triggered by the action.
          */
         if (!ev.target.classList.contains("selected-filter")) {
-            for (var length = 0; length < this.tbody.el.children.length; length++) {
-                 this.tbody.el.children[length].classList.add('show');
-            }
             ev.target.classList.add("selected-filter");
+            await Promise.all((this.state.move_line || []).map((partner) => this.unfoldPartner(partner)));
         } else {
-            for (var length = 0; length < this.tbody.el.children.length; length++) {
-                this.tbody.el.children[length].classList.remove('show')
-            }
+            this.state.unfolded = {}
             ev.target.classList.remove("selected-filter");
         }
     }
+    async getAgingTotals(date) {
+        /**
+         * Fetches the buckets of every partner, the journal items of a
+         * partner are only loaded when it is unfolded.
+         *
+         * @param {String} date - The as-of date of the report.
+         * @returns {Object} - The partners without their journal items.
+         */
+        const data = await this.orm.call("age.receivable.report", "get_aging_totals", [date, this.state.selected_partner]);
+        this.state.aging_labels = data.aging_labels
+        delete data.aging_labels
+        this.state.unfolded = {}
+        this.state.loaded = {}
+        return data
+    }
+    async unfoldPartner(partner) {
+        /**
+         * Loads the journal items of the partner, if needed, and shows them.
+         *
+         * @param {String} partner - The name of the partner.
+         */
+        if (!this.state.loaded[partner]) {
+            const date = this.date_range.el ? this.date_range.el.value : false
+            this.state.data[partner] = await this.orm.call("age.receivable.report", "get_aging_lines", [this.state.total[partner]['partner_id'], date]);
+            this.state.loaded[partner] = true
+        }
+        this.state.unfolded[partner] = true
+    }
+    async togglePartner(partner) {
+        if (this.state.unfolded[partner]) {
+            this.state.unfolded[partner] = false
+        } else {
+            await this.unfoldPartner(partner)
+        }
+    }
+    async loadAllLines() {
+        /**
+         * The printed reports contain the journal items of every partner,
+         * loads the ones not fetched yet.
+         */
+        const unfolded = {...this.state.unfolded}
+        await Promise.all((this.state.move_line || []).map((partner) => this.unfoldPartner(partner)));
+        this.state.unfolded = unfolded
+    }
     async printPdf(ev) {
         /**
          * Generates and displays a PDF report for the partner ledger.
@@ -168,6 +211,7 @@ class AgedReceivable extends owl.Component {
          */
         ev.preventDefault();
         var self = this;
+        await this.loadAllLines();
         var action_title = self.props.action.display_name;
         let totals = {
             'diff0_sum':this.state.diff0_sum,
@@ -225,10 +269,12 @@ class AgedReceivable extends owl.Component {
             'diff5_sum':this.state.diff5_sum,
             'total_debit':this.state.total_debit,
         }
+        // The report is computed again on the server from its options
         var datas = {
-            'move_lines': self.state.move_line,
-            'data': self.state.data,
-            'total': self.state.total,
+            'report_options': {
+                'date': this.date_range.el.value,
+                'partner': this.state.selected_partner,
+            },
             'filters': this.filter(),
             'grand_total': totals,
             'title': action_title,
@@ -278,7 +324,7 @@ class AgedReceivable extends owl.Component {
             this.state.selected_partner_rec.splice(index, 1)
             this.state.selected_partner = this.state.selected_partner_rec.map((rec) => rec.id)
         }
-        let filtered_data = await this.orm.call("age.receivable.report", "get_filter_values", [this.date_range.el.value, this.state.selected_partner,]);
+        let filtered_data = await this.getAgingTotals(this.date_range.el.value);
         for (const index in filtered_data) {
             const value = filtered_data[index];
             if (index !== 'partner_totals') {
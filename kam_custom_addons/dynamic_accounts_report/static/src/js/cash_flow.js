@@ -192,10 +192,14 @@ class CashBook extends owl.Component {
             'total_credit':this.state.total_credit,
             'currency':this.state.currency,
         }
+        // The report is computed again on the server from its options
         var datas = {
-            'move_lines': self.state.move_line,
-            'data': self.state.data,
-            'total': self.state.total,
+            'report_options': {
+                'partner_id': self.state.selected_partner,
+                'data_range': self.state.date_range,
+                'account_list': self.state.selected_account_list,
+                'options': self.state.options,
+            },
             'title': action_title,
             'filters': this.filter(),
             'grand_total': totals,
@@ -38,6 +38,8 @@ class GeneralLedger extends owl.Component {
             method: {
                         'accural': true
                     },
+            unfolded: {},
+            next_page: {},
         });
         this.load_data(self.initial_render = true);
     }
@@ -61,11 +63,9 @@ class GeneralLedger extends owl.Component {
         var action_title = self.props.action.display_name;
         try {
             var self = this;
-            let filtered_data = await this.orm.call("account.general.ledger", "get_filter_values", [self.state.selected_journal_list, self.state.date_range, self.state.options, self.state.selected_analytic_list,self.state.method]);
-            self.state.journals = filtered_data['journal_ids']
-            self.state.analytics = filtered_data['analytic_ids']
-            account_totals = filtered_data['account_totals']
-            self.state.account_data = await self.orm.call("account.general.ledger", "view_report", [self.wizard_id, action_title,]);
+            self.state.unfolded = {}
+            self.state.next_page = {}
+            self.state.account_data = await self.orm.call("account.general.ledger", "get_ledger_totals", self.ledgerArgs());
             for (const [index, value] of Object.entries(self.state.account_data)){
                 if (index !== 'account_totals' && index !== 'journal_ids' && index !== 'analytic_ids') {
                     account_list.push(index)
@@ -107,6 +107,7 @@ class GeneralLedger extends owl.Component {
     async printPdf(ev) {
         ev.preventDefault();
         var self = this;
+        await this.loadAllLines();
         let totals = {
             'total_debit':this.state.total_debit || false,
             'total_debit_display':this.state.total_debit_display || false,
@@ -142,10 +143,15 @@ class GeneralLedger extends owl.Component {
             'currency':this.state.currency,
         }
         var action_title = self.props.action.display_name;
+        var ledgerArgs = this.ledgerArgs();
         var datas = {
-            'account': self.state.account,
-            'data': self.state.account_data,
-            'total': self.state.account_total,
+            'report_options': {
+                'journal_id': ledgerArgs[0],
+                'date_range': ledgerArgs[1],
+                'options': ledgerArgs[2],
+                'analytic': ledgerArgs[3],
+                'method': ledgerArgs[4],
+            },
             'title': action_title,
             'filters': this.filter(),
             'grand_total': totals,
@@ -306,7 +312,9 @@ class GeneralLedger extends owl.Component {
                 }
             }
         }
-        let filtered_data = await this.orm.call("account.general.ledger", "get_filter_values", [this.state.selected_journal_list, this.state.date_range, this.state.options, this.state.selected_analytic_list,this.state.method]);
+        this.state.unfolded = {}
+        this.state.next_page = {}
+        let filtered_data = await this.orm.call("account.general.ledger", "get_ledger_totals", this.ledgerArgs());
         for (let index in filtered_data) {
              const value = filtered_data[index];
             if (index !== 'account_totals' && index !== 'journal_ids' && index !== 'analytic_ids') {
@@ -330,18 +338,50 @@ class GeneralLedger extends owl.Component {
         }
     }
     async unfoldAll(ev) {
+        const accounts = Object.keys(this.state.account_data.account_totals || {})
         if (!ev.target.classList.contains("selected-filter")) {
-            for (var length = 0; length < this.tbody.el.children.length; length++) {
-                this.tbody.el.children[length].classList.add('show')
-            }
             ev.target.classList.add("selected-filter");
+            await Promise.all(accounts.map((account) => this.unfoldAccount(account)));
         } else {
-            for (var length = 0; length < this.tbody.el.children.length; length++) {
-                this.tbody.el.children[length].classList.remove('show')
-            }
+            this.state.unfolded = {}
             ev.target.classList.remove("selected-filter");
         }
     }
+    ledgerArgs() {
+        return [this.state.selected_journal_list, this.state.date_range, this.state.options, this.state.selected_analytic_list, this.state.method]
+    }
+    async loadAccountLines(account) {
+        // Fetch the next page of journal items of the account, starting after
+        // the last line already loaded.
+        const next = this.state.next_page[account]
+        const page = await this.orm.call("account.general.ledger", "get_ledger_lines", [
+            this.state.account_data.account_totals[account]['account_id'], ...this.ledgerArgs(),
+        ], {after: next || null});
+        this.state.account_data[account] = next ? [...this.state.account_data[account], ...page.lines] : page.lines
+        this.state.next_page[account] = page.next
+    }
+    async unfoldAccount(account) {
+        if (this.state.next_page[account] === undefined) {
+            await this.loadAccountLines(account)
+        }
+        this.state.unfolded[account] = true
+    }
+    async toggleAccount(account) {
+        if (this.state.unfolded[account]) {
+            this.state.unfolded[account] = false
+        } else {
+            await this.unfoldAccount(account)
+        }
+    }
+    async loadAllLines() {
+        // The PDF report is printed from the loaded lines, fetch the
+        // remaining pages of every account first.
+        for (const account of Object.keys(this.state.account_data.account_totals || {})) {
+            while (this.state.next_page[account] !== false) {
+                await this.loadAccountLines(account)
+            }
+        }
+    }
     filter() {
     var self=this;
     let startDate, endDate;
@@ -35,6 +35,8 @@ class PartnerLedger extends Component {
             account: {},
             options: {},
             message_list: [],
+            unfolded: {},
+            loaded: {},
         });
         this.load_data();
     }
@@ -55,8 +57,12 @@ class PartnerLedger extends Component {
             const self = this;
             const action_title = self.props.action.display_name;
 
-            // Load data from backend
-            self.state.data = await self.orm.call("account.partner.ledger", "view_report", [[], action_title]);
+            // Load the partner totals, the lines are loaded on unfold
+            self.state.unfolded = {};
+            self.state.loaded = {};
+            self.state.data = await self.orm.call("account.partner.ledger", "get_partner_ledger_totals", [
+                self.state.selected_partner, ...self.ledgerArgs(),
+            ]);
 
             const dataArray = self.state.data;
             let partner_list = [];
@@ -65,39 +71,9 @@ class PartnerLedger extends Component {
             let totalCreditSum = 0;
             let currency = null;
 
-            // Process data
             Object.entries(dataArray).forEach(([key, value]) => {
                 if (key !== 'partner_totals') {
                     partner_list.push(key);
-
-                    // Calculate running balance for each partner
-                    let runningBalance = 0;
-
-                    // Check initial balance
-                    if (partner_totals[key] && partner_totals[key].initial_balance !== undefined) {
-                        runningBalance = partner_totals[key].initial_balance;
-                    }
-
-                    // Process each entry
-                    value.forEach(entry => {
-                        if (entry && entry[0]) {
-                            const line = entry[0];
-
-                            // Calculate running balance
-                            const debit = parseFloat(line.debit) || 0;
-                            const credit = parseFloat(line.credit) || 0;
-                            runningBalance = debit - credit;
-
-                            // Store balance in the entry
-                            line.balance = runningBalance;
-
-                            // Format display values
-                            line.debit_display = this.formatNumberWithSeparators(debit);
-                            line.credit_display = this.formatNumberWithSeparators(credit);
-                            line.amount_currency_display = this.formatNumberWithSeparators(line.amount_currency || 0);
-                            line.balance_display = this.formatNumberWithSeparators(runningBalance);
-                        }
-                    });
                 } else {
                     partner_totals = value;
                 }
@@ -146,6 +122,7 @@ class PartnerLedger extends Component {
 
     async printPdf(ev) {
         ev.preventDefault();
+        await this.loadAllLines();
         let totals = {
             'total_debit': this.state.total_debit,
             'total_debit_display': this.state.total_debit_display,
@@ -240,10 +217,14 @@ class PartnerLedger extends Component {
         };
 
         var action_title = self.props.action.display_name;
+        // The report is computed again on the server from its options
         var datas = {
-            'partners': self.state.partners,
-            'data': self.state.data,
-            'total': self.state.total,
+            'report_options': {
+                'partner_id': self.state.selected_partner,
+                'data_range': self.state.date_range,
+                'account': self.state.account,
+                'options': self.state.options,
+            },
             'title': action_title,
             'filters': this.filter(),
             'grand_total': totals,
@@ -372,39 +353,16 @@ class PartnerLedger extends Component {
             }
         }
 
-        // Load filtered data
-        let filtered_data = await this.orm.call("account.partner.ledger", "get_filter_values", [
-            this.state.selected_partner,
-            this.state.date_range,
-            this.state.account,
-            this.state.options
+        // Load the filtered partner totals, the lines are loaded on unfold
+        this.state.unfolded = {};
+        this.state.loaded = {};
+        let filtered_data = await this.orm.call("account.partner.ledger", "get_partner_ledger_totals", [
+            this.state.selected_partner, ...this.ledgerArgs(),
         ]);
 
-        // Process filtered data
         Object.entries(filtered_data).forEach(([key, value]) => {
             if (key !== 'partner_totals') {
                 partner_list.push(key);
-
-                let runningBalance = 0;
-                if (partner_totals[key] && partner_totals[key].initial_balance !== undefined) {
-                    runningBalance = partner_totals[key].initial_balance;
-                }
-
-                // Process each entry
-                value.forEach(entry => {
-                    if (entry && entry[0]) {
-                        const line = entry[0];
-                        const debit = parseFloat(line.debit) || 0;
-                        const credit = parseFloat(line.credit) || 0;
-                        runningBalance = runningBalance + debit - credit;
-
-                        line.balance = runningBalance;
-                        line.debit_display = this.formatNumberWithSeparators(debit);
-                        line.credit_display = this.formatNumberWithSeparators(credit);
-                        line.amount_currency_display = this.formatNumberWithSeparators(line.amount_currency || 0);
-                        line.balance_display = this.formatNumberWithSeparators(runningBalance);
-                    }
-                });
             } else {
                 partner_totals = value;
             }
@@ -453,19 +411,73 @@ class PartnerLedger extends Component {
     }
 
     async unfoldAll(ev) {
-        if (this.tbody.el) {
-            const children = this.tbody.el.children;
-            if (!ev.target.classList.contains("selected-filter")) {
-                for (let i = 0; i < children.length; i++) {
-                    children[i].classList.add('show');
-                }
-                ev.target.classList.add("selected-filter");
-            } else {
-                for (let i = 0; i < children.length; i++) {
-                    children[i].classList.remove('show');
-                }
-                ev.target.classList.remove("selected-filter");
+        if (!ev.target.classList.contains("selected-filter")) {
+            ev.target.classList.add("selected-filter");
+            await this.loadAllLines();
+            for (const partner of this.state.partners) {
+                this.state.unfolded[partner] = true;
+            }
+        } else {
+            this.state.unfolded = {};
+            ev.target.classList.remove("selected-filter");
+        }
+    }
+
+    ledgerArgs() {
+        return [this.state.date_range, this.state.account, this.state.options];
+    }
+
+    formatLines(partner, lines) {
+        // Running balance of the lines, starting from the initial balance
+        let runningBalance = 0;
+        if (this.state.total[partner] && this.state.total[partner].initial_balance !== undefined) {
+            runningBalance = this.state.total[partner].initial_balance;
+        }
+        lines.forEach(entry => {
+            if (entry && entry[0]) {
+                const line = entry[0];
+                const debit = parseFloat(line.debit) || 0;
+                const credit = parseFloat(line.credit) || 0;
+                runningBalance = runningBalance + debit - credit;
+
+                line.balance = runningBalance;
+                line.debit_display = this.formatNumberWithSeparators(debit);
+                line.credit_display = this.formatNumberWithSeparators(credit);
+                line.amount_currency_display = this.formatNumberWithSeparators(line.amount_currency || 0);
+                line.balance_display = this.formatNumberWithSeparators(runningBalance);
+            }
+        });
+        return lines;
+    }
+
+    async loadPartnerLines(partners) {
+        // Fetch the journal items of all the given partners in one call
+        const lines = await this.orm.call("account.partner.ledger", "get_partner_ledger_lines", [
+            partners.map((partner) => this.state.total[partner]['partner_id']), ...this.ledgerArgs(),
+        ]);
+        for (const partner of partners) {
+            this.state.data[partner] = this.formatLines(partner, lines[partner] || []);
+            this.state.loaded[partner] = true;
+        }
+    }
+
+    async togglePartner(partner) {
+        if (this.state.unfolded[partner]) {
+            this.state.unfolded[partner] = false;
+        } else {
+            if (!this.state.loaded[partner]) {
+                await this.loadPartnerLines([partner]);
             }
+            this.state.unfolded[partner] = true;
+        }
+    }
+
+    async loadAllLines() {
+        // The reports are printed from the loaded lines, fetch the ones of
+        // the partners never unfolded first.
+        const partners = this.state.partners.filter((partner) => !this.state.loaded[partner]);
+        if (partners.length) {
+            await this.loadPartnerLines(partners);
         }
     }
 }
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from . import test_trial_balance
+from . import test_general_ledger
+from . import test_aged_report
+from . import test_partner_ledger
+from . import test_tax_report
+from . import test_xlsx_report
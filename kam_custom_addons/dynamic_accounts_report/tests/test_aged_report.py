@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from datetime import timedelta
+from odoo import Command, fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestAgedReport(TransactionCase):
+    """Check the grouped aging buckets against the journal items."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.aged_receivable = cls.env['age.receivable.report']
+        cls.partner = cls.env['res.partner'].create({'name': 'Aged Partner'})
+        journal = cls.env['account.journal'].search(
+            [('type', '=', 'general'),
+             ('company_id', '=', cls.env.company.id)], limit=1)
+        receivable = cls.partner.property_account_receivable_id
+        income = cls.env['account.account'].search(
+            [('company_ids', 'in', cls.env.company.id),
+             ('account_type', '=', 'income')], limit=1)
+        cls.as_of = fields.Date.to_date('2024-06-30')
+        # one journal item due in each bucket and one without maturity date
+        moves = cls.env['account.move'].create([{
+            'journal_id': journal.id,
+            'date': cls.as_of - timedelta(days=days),
+            'line_ids': [
+                Command.create({'account_id': receivable.id,
+                                'partner_id': cls.partner.id,
+                                'date_maturity': cls.as_of - timedelta(
+                                    days=days),
+                                'debit': amount, 'credit': 0.0}),
+                Command.create({'account_id': income.id,
+                                'debit': 0.0, 'credit': amount}),
+            ],
+        } for days, amount in [(-5, 1.0), (0, 2.0), (30, 4.0), (31, 8.0),
+                               (90, 16.0), (121, 32.0)]])
+        moves.action_post()
+        cls.partner_id = cls.partner.id
+
+    def test_aging_buckets(self):
+        totals = self.aged_receivable._get_aging_totals(
+            self.as_of, [self.partner_id], [30, 60, 90, 120])
+        self.assertEqual(totals['Aged Partner'], {
+            'debit_sum': 63.0,
+            'diff0_sum': 3.0,
+            'diff1_sum': 4.0,
+            'diff2_sum': 8.0,
+            'diff3_sum': 16.0,
+            'diff4_sum': 0.0,
+            'diff5_sum': 32.0,
+            'currency_id': self.env.company.currency_id.symbol,
+            'partner_id': self.partner_id,
+        })
+
+    def test_aging_as_of_date(self):
+        as_of = self.as_of - timedelta(days=30)
+        totals = self.aged_receivable._get_aging_totals(
+            as_of, [self.partner_id], [15, 45])
+        # the items dated after the as-of date are left out
+        self.assertEqual(totals['Aged Partner']['debit_sum'], 60.0)
+        self.assertEqual(totals['Aged Partner']['diff0_sum'], 4.0)
+        self.assertEqual(totals['Aged Partner']['diff1_sum'], 8.0)
+        self.assertEqual(totals['Aged Partner']['diff2_sum'], 0.0)
+        self.assertEqual(totals['Aged Partner']['diff3_sum'], 48.0)
+
+    def test_aging_lines(self):
+        report = self.aged_receivable.get_filter_values(
+            fields.Date.to_string(self.as_of), [self.partner_id])
+        totals = report['partner_totals']['Aged Partner']
+        for index in range(6):
+            self.assertAlmostEqual(
+                sum(line[f'diff{index}'] for line in report['Aged Partner']),
+                totals[f'diff{index}_sum'])
+        lazy = self.aged_receivable.get_aging_totals(
+            fields.Date.to_string(self.as_of), [self.partner_id])
+        self.assertEqual(lazy['Aged Partner'], [])
+        self.assertEqual(lazy['partner_totals'], report['partner_totals'])
+        self.assertEqual(
+            self.aged_receivable.get_aging_lines(
+                self.partner_id, fields.Date.to_string(self.as_of)),
+            report['Aged Partner'])
+
+    def test_aging_partner_filter(self):
+        other = self.env['res.partner'].create({'name': 'Aged Partner Paid'})
+        report = self.aged_receivable.get_filter_values(
+            fields.Date.to_string(self.as_of), [self.partner_id, other.id])
+        # a selected partner without open items is listed with no amount
+        self.assertEqual(report['Aged Partner Paid'], [])
+        totals = report['partner_totals']['Aged Partner Paid']
+        self.assertEqual(totals['partner_id'], other.id)
+        self.assertEqual(totals['debit_sum'], 0.0)
+        for index in range(6):
+            self.assertEqual(totals[f'diff{index}_sum'], 0.0)
+        self.assertEqual(
+            report['partner_totals']['Aged Partner']['debit_sum'], 63.0)
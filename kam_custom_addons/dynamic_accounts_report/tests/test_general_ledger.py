@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from odoo import Command, fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestGeneralLedger(TransactionCase):
+    """Check the lazy general ledger against the complete one."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.general_ledger = cls.env['account.general.ledger']
+        journal = cls.env['account.journal'].search(
+            [('type', '=', 'general'),
+             ('company_id', '=', cls.env.company.id)], limit=1)
+        cls.accounts = cls.env['account.account'].search(
+            [('company_ids', 'in', cls.env.company.id),
+             ('account_type', 'not in', ['asset_receivable',
+                                         'liability_payable',
+                                         'off_balance'])], limit=2)
+        today = fields.Date.today()
+        moves = cls.env['account.move'].create([{
+            'journal_id': journal.id,
+            'date': today.replace(day=1 + index % 3),
+            'line_ids': [
+                Command.create({'account_id': cls.accounts[0].id,
+                                'debit': 10.0 + index, 'credit': 0.0}),
+                Command.create({'account_id': cls.accounts[1].id,
+                                'debit': 0.0, 'credit': 10.0 + index}),
+            ],
+        } for index in range(7)])
+        moves.action_post()
+        cls.args = [[], 'month', {}, [], {'accural': True}]
+
+    def test_ledger_totals(self):
+        report = self.general_ledger.get_filter_values(*self.args)
+        totals = self.general_ledger.get_ledger_totals(*self.args)
+        self.assertEqual(totals['account_totals'], report['account_totals'])
+        for account in report['account_totals']:
+            self.assertEqual(totals[account], [])
+
+    def test_ledger_pages(self):
+        today = fields.Date.today()
+        totals = self.general_ledger.get_ledger_totals(*self.args)
+        for account in self.accounts:
+            # the journal items of the 'month' option, read independently
+            expected = self.env['account.move.line'].search_read(
+                [('parent_state', '=', 'posted'),
+                 ('account_id', '=', account.id),
+                 ('date', '>=', today.replace(day=1)),
+                 ('date', '<=', today)],
+                ['date', 'debit', 'credit'], order='date desc, id desc')
+            self.assertTrue(expected)
+            self.assertIn(account.display_name, totals['account_totals'])
+            lines, after = [], None
+            while after is not False:
+                page = self.general_ledger.get_ledger_lines(
+                    account.id, *self.args, after=after, limit=3)
+                self.assertLessEqual(len(page['lines']), 3)
+                lines += page['lines']
+                after = page['next']
+            self.assertEqual(
+                [(line[0]['id'], line[0]['date'], line[0]['debit'],
+                  line[0]['credit']) for line in lines],
+                [(line['id'], line['date'], line['debit'], line['credit'])
+                 for line in expected])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from odoo import Command
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestPartnerLedger(TransactionCase):
+    """Check the grouped partner totals and the lazy partner lines."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner_ledger = cls.env['account.partner.ledger']
+        cls.partner = cls.env['res.partner'].create(
+            {'name': 'Ledger Partner'})
+        journal = cls.env['account.journal'].search(
+            [('type', '=', 'general'),
+             ('company_id', '=', cls.env.company.id)], limit=1)
+        receivable = cls.partner.property_account_receivable_id
+        income = cls.env['account.account'].search(
+            [('company_ids', 'in', cls.env.company.id),
+             ('account_type', '=', 'income')], limit=1)
+        # one journal item before the period and two in it
+        moves = cls.env['account.move'].create([{
+            'journal_id': journal.id,
+            'date': date,
+            'line_ids': [
+                Command.create({'account_id': receivable.id,
+                                'partner_id': cls.partner.id,
+                                'debit': amount, 'credit': 0.0}),
+                Command.create({'account_id': income.id,
+                                'debit': 0.0, 'credit': amount}),
+            ],
+        } for date, amount in [('2023-12-15', 5.0), ('2024-01-10', 10.0),
+                               ('2024-01-20', 20.0)]])
+        moves.action_post()
+        cls.journal_code = journal.code
+        cls.account_code = receivable.code
+        cls.args = [{'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+                    {}, {}]
+
+    def test_partner_totals(self):
+        totals = self.partner_ledger.get_partner_ledger_totals(
+            [self.partner.id], *self.args)
+        self.assertEqual(totals['Ledger Partner'], [])
+        partner_totals = totals['partner_totals']['Ledger Partner']
+        self.assertEqual(partner_totals['initial_debit'], 5.0)
+        self.assertEqual(partner_totals['initial_balance'], 5.0)
+        self.assertEqual(partner_totals['total_debit'], 30.0)
+        self.assertEqual(partner_totals['total_credit'], 0.0)
+        self.assertEqual(partner_totals['end_balance'], 35.0)
+        report = self.partner_ledger.get_filter_values(
+            [self.partner.id], *self.args)
+        self.assertEqual(report['partner_totals'], totals['partner_totals'])
+
+    def test_partner_lines(self):
+        lines = self.partner_ledger.get_partner_ledger_lines(
+            [self.partner.id], *self.args)
+        self.assertEqual(
+            [line[0]['debit'] for line in lines['Ledger Partner']],
+            [10.0, 20.0])
+        for line in lines['Ledger Partner']:
+            self.assertEqual(line[0]['jrnl'], self.journal_code)
+            self.assertEqual(line[0]['code'], self.account_code)
+        report = self.partner_ledger.get_filter_values(
+            [self.partner.id], *self.args)
+        self.assertEqual(report['Ledger Partner'], lines['Ledger Partner'])
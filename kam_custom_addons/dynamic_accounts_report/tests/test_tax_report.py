@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from odoo import Command
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestTaxReport(TransactionCase):
+    """Check the grouped tax amounts and their comparison columns."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tax_report = cls.env['tax.report']
+        cls.tax = cls.env['account.tax'].create({
+            'name': 'Tax Report 10%',
+            'amount': 10.0,
+            'type_tax_use': 'sale',
+        })
+        partner = cls.env['res.partner'].create({'name': 'Tax Partner'})
+        invoices = cls.env['account.move'].create([{
+            'move_type': 'out_invoice',
+            'partner_id': partner.id,
+            'invoice_date': invoice_date,
+            'invoice_line_ids': [Command.create({
+                'name': 'Taxed line',
+                'quantity': 1.0,
+                'price_unit': price_unit,
+                'tax_ids': [Command.set(cls.tax.ids)],
+            })],
+        } for invoice_date, price_unit in [('2024-02-10', 50.0),
+                                           ('2024-03-15', 100.0),
+                                           ('2024-03-20', 200.0)]])
+        invoices.action_post()
+        cls.income_account = invoices.invoice_line_ids.account_id
+
+    def _get_tax_line(self, report):
+        return [line for line in report['sale']
+                if line['name'] == 'Tax Report 10%']
+
+    def test_tax_totals(self):
+        report = self.tax_report.get_filter_values(
+            '2024-03-01', '2024-03-31', '1', 'month', {}, None)
+        line, = self._get_tax_line(report)
+        self.assertEqual(line['net'], 300.0)
+        self.assertEqual(line['tax'], 30.0)
+        self.assertEqual(line['dynamic net'], {'dynamic_total_net_sum1': 50.0})
+        self.assertEqual(line['dynamic tax'], {'dynamic_total_tax_sum1': 5.0})
+        self.assertEqual(report['dynamic_date_num'], {
+            'dynamic_date_num0': 'Mar 2024',
+            'dynamic_date_num1': 'Feb 2024',
+        })
+
+    def test_tax_totals_by_account(self):
+        report = self.tax_report.get_filter_values(
+            '2024-03-01', '2024-03-31', None, None, {}, {'account': True})
+        line, = self._get_tax_line(report)
+        self.assertEqual(line['account'], self.income_account.display_name)
+        self.assertEqual(line['net'], 300.0)
+        self.assertEqual(line['tax'], 30.0)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+import logging
+import os
+import time
+from odoo import Command, fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestTrialBalance(TransactionCase):
+    """Compare the grouped and the per account trial balance modes."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.trial_balance = cls.env['account.trial.balance']
+        cls.journal = cls.env['account.journal'].search(
+            [('type', '=', 'general'),
+             ('company_id', '=', cls.env.company.id)], limit=1)
+        cls.accounts = cls.env['account.account'].search(
+            [('company_ids', 'in', cls.env.company.id),
+             ('account_type', 'not in', ['asset_receivable',
+                                         'liability_payable',
+                                         'off_balance'])], limit=10)
+        today = fields.Date.today()
+        moves = cls.env['account.move'].create([{
+            'journal_id': cls.journal.id,
+            'date': today.replace(day=1, month=month),
+            'line_ids': [
+                Command.create({'account_id': cls.accounts[index].id,
+                                'debit': 100.0 * month, 'credit': 0.0}),
+                Command.create({'account_id': cls.accounts[index + 1].id,
+                                'debit': 0.0, 'credit': 100.0 * month}),
+            ],
+        } for index, month in enumerate(range(1, 9))])
+        moves.action_post()
+
+    def _get_values(self, mode, *args):
+        self.env['ir.config_parameter'].sudo().set_param(
+            'dynamic_accounts_report.trial_balance_mode', mode)
+        return {line['account_id']: line
+                for line in self.trial_balance.get_filter_values(*args)}
+
+    def _assert_same_values(self, *args):
+        per_account = self._get_values('per_account', *args)
+        grouped = self._get_values('grouped', *args)
+        for account_id, line in per_account.items():
+            self.assertEqual(grouped[account_id], line)
+
+    def test_trial_balance_without_comparison(self):
+        year = fields.Date.today().year
+        self._assert_same_values(f'{year}-03-01', f'{year}-06-30', False,
+                                 False, [], [], {}, {})
+
+    def test_trial_balance_month_comparison(self):
+        year = fields.Date.today().year
+        self._assert_same_values(f'{year}-06-01', f'{year}-06-30', '3',
+                                 'month', [], [], {}, {})
+
+    def test_trial_balance_year_comparison(self):
+        year = fields.Date.today().year
+        self._assert_same_values(f'{year}-01-01', f'{year}-12-31', '2',
+                                 'year', [self.journal.id], [], {}, {})
+
+
+@tagged('post_install', '-at_install', '-standard', 'trial_balance_benchmark')
+class TestTrialBalanceBenchmark(TransactionCase):
+    """Time both trial balance modes on a generated ledger.
+
+    Run with --test-tags trial_balance_benchmark, the ledger size can be
+    changed with the TRIAL_BALANCE_BENCHMARK_LINES environment variable.
+    """
+
+    def test_trial_balance_benchmark(self):
+        line_count = int(os.environ.get('TRIAL_BALANCE_BENCHMARK_LINES',
+                                        1000000))
+        journal = self.env['account.journal'].search(
+            [('type', '=', 'general'),
+             ('company_id', '=', self.env.company.id)], limit=1)
+        accounts = self.env['account.account'].search(
+            [('company_ids', 'in', self.env.company.id),
+             ('account_type', 'not in', ['asset_receivable',
+                                         'liability_payable',
+                                         'off_balance'])], limit=50)
+        move = self.env['account.move'].create({
+            'journal_id': journal.id,
+            'date': fields.Date.today(),
+            'line_ids': [
+                Command.create({'account_id': accounts[0].id,
+                                'debit': 10.0, 'credit': 0.0}),
+                Command.create({'account_id': accounts[1].id,
+                                'debit': 0.0, 'credit': 10.0}),
+            ],
+        })
+        move.action_post()
+        template = move.line_ids[0]
+        self.env.flush_all()
+        # Copy the template line over the accounts and the last two years
+        self.env.cr.execute("""
+            INSERT INTO account_move_line (
+                move_id, move_name, journal_id, company_id, company_currency_id,
+                currency_id, account_id, date, parent_state, display_type,
+                debit, credit, balance, amount_currency, name)
+            SELECT line.move_id, line.move_name, line.journal_id,
+                   line.company_id, line.company_currency_id,
+                   line.currency_id, (%(account_ids)s)[1 + n %% %(count)s],
+                   line.date - (n %% 730), line.parent_state,
+                   line.display_type,
+                   CASE WHEN n %% 2 = 0 THEN n %% 1000 ELSE 0 END,
+                   CASE WHEN n %% 2 = 1 THEN n %% 1000 ELSE 0 END,
+                   CASE WHEN n %% 2 = 0 THEN n %% 1000 ELSE -(n %% 1000) END,
+                   CASE WHEN n %% 2 = 0 THEN n %% 1000 ELSE -(n %% 1000) END,
+                   line.name
+              FROM account_move_line line, generate_series(1, %(lines)s) n
+             WHERE line.id = %(template_id)s
+        """, {
+            'account_ids': accounts.ids,
+            'count': len(accounts),
+            'lines': line_count,
+            'template_id': template.id,
+        })
+        self.env.cr.execute("ANALYZE account_move_line")
+        self.env.invalidate_all()
+        year = fields.Date.today().year
+        args = (f'{year}-01-01', f'{year}-12-31', '1', 'year', [], [], {}, {})
+        timings = {}
+        for mode in ('grouped', 'per_account'):
+            self.env['ir.config_parameter'].sudo().set_param(
+                'dynamic_accounts_report.trial_balance_mode', mode)
+            self.env.invalidate_all()
+            start = time.perf_counter()
+            self.env['account.trial.balance'].get_filter_values(*args)
+            timings[mode] = time.perf_counter() - start
+        _logger.info(
+            "Trial balance on %s journal items: grouped %.2fs, "
+            "per account %.2fs (x%.1f)", line_count, timings['grouped'],
+            timings['per_account'],
+            timings['per_account'] / max(timings['grouped'], 1e-6))
+        self.assertLess(timings['grouped'], timings['per_account'])
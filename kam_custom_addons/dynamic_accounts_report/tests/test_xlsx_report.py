@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+import io
+import json
+import zipfile
+from datetime import date, timedelta
+from werkzeug.wrappers import Response
+from odoo import Command, fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestXlsxReport(TransactionCase):
+    """Check the XLSX reports computed again from the report options."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner = cls.env['res.partner'].create(
+            {'name': 'Xlsx Partner'})
+        journal = cls.env['account.journal'].search(
+            [('type', '=', 'general'),
+             ('company_id', '=', cls.env.company.id)], limit=1)
+        income = cls.env['account.account'].search(
+            [('company_ids', 'in', cls.env.company.id),
+             ('account_type', '=', 'income')], limit=1)
+        move = cls.env['account.move'].create({
+            'journal_id': journal.id,
+            'date': '2024-01-10',
+            'ref': 'XLSX-REF',
+            'line_ids': [
+                Command.create({
+                    'account_id':
+                        cls.partner.property_account_receivable_id.id,
+                    'partner_id': cls.partner.id,
+                    'debit': 10.0, 'credit': 0.0}),
+                Command.create({'account_id': income.id,
+                                'debit': 0.0, 'credit': 10.0}),
+            ],
+        })
+        move.action_post()
+        cls.move_name = move.name
+
+    def _get_sheet(self, model, data, report_action):
+        """Export the report and return the XML of its worksheet."""
+        response = Response()
+        self.env[model].get_xlsx_report(
+            json.dumps(data), response, 'Report', report_action)
+        content = b''.join(response.response)
+        response.close()
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            return workbook.read('xl/worksheets/sheet1.xml').decode()
+
+    def test_partner_ledger_xlsx(self):
+        sheet = self._get_sheet('account.partner.ledger', {
+            'report_options': {
+                'partner_id': [self.partner.id],
+                'data_range': {'start_date': '2024-01-01',
+                               'end_date': '2024-01-31'},
+                'account': {},
+                'options': {},
+            },
+            'filters': {'partner': [], 'account': {}, 'options': {},
+                        'start_date': None, 'end_date': None},
+        }, 'dynamic_accounts_report.action_partner_ledger')
+        self.assertIn('Xlsx Partner', sheet)
+        self.assertIn(self.move_name, sheet)
+        # only the grand total is merged, not the partner and its lines
+        self.assertEqual(sheet.count('<mergeCell '), 1)
+
+    def test_aged_receivable_xlsx(self):
+        sheet = self._get_sheet('age.receivable.report', {
+            'report_options': {
+                'date': '2024-01-31',
+                'partner': [self.partner.id],
+            },
+            'filters': {'partner': [], 'end_date': '2024-01-31'},
+        }, 'dynamic_accounts_report.action_aged_receivable')
+        self.assertIn('Xlsx Partner', sheet)
+        self.assertIn(self.move_name, sheet)
+        # the date filter and the grand total
+        self.assertEqual(sheet.count('<mergeCell '), 2)
+
+    def test_report_dates(self):
+        ledger = self.env['account.partner.ledger']
+        self.assertEqual(ledger._get_report_dates(
+            {'start_date': '2024-01-01', 'end_date': '2024-01-31'}),
+            (date(2024, 1, 1), date(2024, 1, 31)))
+        self.assertEqual(ledger._get_report_dates({}, date.min),
+                         (date.min, None))
+        date_from, date_to = ledger._get_report_dates('last-month')
+        self.assertEqual(date_from.day, 1)
+        self.assertEqual(date_to + timedelta(days=1),
+                         fields.Date.today().replace(day=1))
+
+    def test_move_line_pages(self):
+        domain = [('parent_state', '=', 'posted'),
+                  ('move_name', '=', self.move_name)]
+        report = self.env['account.partner.ledger']
+        for descending, order in ((False, 'date, id'),
+                                  (True, 'date desc, id desc')):
+            pages = list(report._iter_move_line_pages(
+                domain, ['date'], descending=descending, page_size=1))
+            self.assertTrue(all(len(page) == 1 for page in pages))
+            self.assertEqual(
+                [page.id for page in pages],
+                self.env['account.move.line'].search(domain, order=order).ids)
@@ -2,6 +2,7 @@ import json
 import hashlib
 import logging
 import ssl
+import threading
 import requests
 import urllib3
 
@@ -15,6 +16,11 @@ _logger = logging.getLogger(__name__)
 apiBaseUrl = 'https://api.invoicing.eta.gov.eg'
 idSrvBaseUrl = 'https://id.eta.gov.eg'
 
+# ETA limits of one receipt submission, both can be lowered with the
+# egypt_ereceipt.batch_size and egypt_ereceipt.batch_max_bytes parameters
+RECEIPT_BATCH_SIZE = 100
+RECEIPT_BATCH_MAX_BYTES = 1024 * 1024
+
 
 class CustomHttpAdapter(requests.adapters.HTTPAdapter):
     def __init__(self, ssl_context=None, **kwargs):
@@ -27,6 +33,35 @@ class CustomHttpAdapter(requests.adapters.HTTPAdapter):
             block=block, ssl_context=self.ssl_context)
 
 
+class EtaSessionPool:
+    """Keep one HTTP session per POS device and thread, so that token,
+    submission and status calls of a device reuse the same connections"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get_session(self, device):
+        sessions = self._local.__dict__.setdefault('sessions', {})
+        session = sessions.get(device)
+        if session is None:
+            ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+            ctx.options |= 0x4
+            session = requests.session()
+            session.mount('https://', CustomHttpAdapter(ctx))
+            sessions[device] = session
+        return session
+
+    def close(self, device=None):
+        sessions = self._local.__dict__.get('sessions', {})
+        for key in [device] if device is not None else list(sessions):
+            session = sessions.pop(key, None)
+            if session is not None:
+                session.close()
+
+
+eta_sessions = EtaSessionPool()
+
+
 class EgyptEReceipt(models.Model):
     _name = 'egypt.ereceipt'
     _description = 'Egypt e-Receipt Record'
@@ -197,7 +232,7 @@ class EgyptEReceipt(models.Model):
             return token
 
         try:
-            auth_url = f"{idSrvBaseUrl}/connect/token"
+            auth_url = f"{self._get_eta_url('id_srv_base_url', idSrvBaseUrl)}/connect/token"
 
             headers = {
                 'posserial': order.config_id.pos_serial,
@@ -215,10 +250,7 @@ class EgyptEReceipt(models.Model):
                 'client_secret': order.config_id.pos_secret_code
             }
 
-            session = requests.session()
-            ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-            ctx.options |= 0x4
-            session.mount('https://', CustomHttpAdapter(ctx))
+            session = self._get_eta_session(order.config_id)
 
             response = session.request(
                 'POST',
@@ -447,7 +479,7 @@ class EgyptEReceipt(models.Model):
     def _call_api(self, token, receipt_data):
         try:
             response = requests.post(
-                f"{apiBaseUrl}/api/v1/receiptsubmissions",
+                f"{self._get_eta_url('api_base_url', apiBaseUrl)}/api/v1/receiptsubmissions",
                 json=receipt_data,
                 headers={
                     'Authorization': f'Bearer {token}',
@@ -461,6 +493,201 @@ class EgyptEReceipt(models.Model):
             _logger.error("ETA API exception: %s", str(e))
             return None
 
+    def _get_eta_url(self, key, default):
+        """ETA endpoint, overridable with an egypt_ereceipt.* parameter"""
+        url = self.env['ir.config_parameter'].sudo().get_param(f'egypt_ereceipt.{key}') or default
+        return url.rstrip('/')
+
+    def _get_eta_session(self, pos_config):
+        """Pooled HTTP session of the POS device"""
+        return eta_sessions.get_session((self.env.cr.dbname, pos_config.id))
+
+    def _get_batch_limits(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        return (
+            int(ICP.get_param('egypt_ereceipt.batch_size', RECEIPT_BATCH_SIZE)),
+            int(ICP.get_param('egypt_ereceipt.batch_max_bytes', RECEIPT_BATCH_MAX_BYTES)),
+        )
+
+    def _split_receipt_batches(self, receipts_data):
+        """Split the (record, receipt) pairs in batches within the ETA limits"""
+        batch_size, max_bytes = self._get_batch_limits()
+        batches = []
+        batch, batch_bytes = [], 0
+        for record, receipt in receipts_data:
+            receipt_bytes = len(json.dumps(receipt, ensure_ascii=False).encode('utf-8'))
+            if batch and (len(batch) >= batch_size or batch_bytes + receipt_bytes > max_bytes):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append((record, receipt))
+            batch_bytes += receipt_bytes
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _submit_batch_to_api(self, commit=False):
+        """Submit receipts as multi-receipt submissions, grouped per POS
+        device. The receipts of a device are chained in order date through
+        their previous UUID, the token and the HTTP session of the device
+        are shared by all its submissions.
+
+        :param commit: commit after each submission (cron only)
+        """
+        receipts_by_config = {}
+        for record in self.sorted(lambda r: (r.pos_date_order or fields.Datetime.now(), r.id)):
+            receipts_by_config.setdefault(record.pos_config_id, self.browse())
+            receipts_by_config[record.pos_config_id] |= record
+
+        for pos_config, records in receipts_by_config.items():
+            try:
+                token = records[0]._get_auth_token(records[0].pos_order_id, records[0].company_id)
+                if not token:
+                    raise UserError(_('Failed to obtain authentication token.'))
+            except Exception as e:
+                for record in records:
+                    record._handle_submission_error(str(e))
+                continue
+
+            session = self._get_eta_session(pos_config)
+            url = f"{self._get_eta_url('api_base_url', apiBaseUrl)}/api/v1/receiptsubmissions"
+            previous_uuid = records[0].previous_uuid
+            pending = records
+            while pending:
+                try:
+                    receipts_data = pending._prepare_chained_receipts(previous_uuid)
+                except Exception as e:
+                    for record in pending:
+                        record._handle_submission_error(str(e))
+                    break
+                for batch in self._split_receipt_batches(receipts_data):
+                    batch_records = self.browse([record.id for record, _receipt in batch])
+                    try:
+                        response = session.post(
+                            url,
+                            json={'receipts': [receipt for _record, receipt in batch]},
+                            headers={
+                                'Authorization': f'Bearer {token}',
+                                'Content-Type': 'application/json',
+                                'Accept': 'application/json'
+                            },
+                            timeout=60
+                        )
+                        batch_records._process_batch_response(response)
+                    except Exception as e:
+                        _logger.error("ETA batch submission exception: %s", str(e))
+                        for record in batch_records:
+                            record._handle_submission_error(str(e))
+                    if commit:
+                        self.env.cr.commit()
+                    pending -= batch_records
+                    accepted = batch_records.filtered(lambda r: r.state == 'accepted')
+                    if accepted:
+                        previous_uuid = accepted[-1].uuid
+                    if accepted != batch_records:
+                        # The next receipts were chained to a receipt that is
+                        # not accepted, chain them again to the last accepted one
+                        break
+
+    def _prepare_chained_receipts(self, previous_uuid):
+        """Prepare the receipts in order, each one chained to the previous
+        one, starting from the given previous UUID. The reference UUID of the
+        returns is resolved now, so that the original receipt prepared before
+        in the same submission is referenced.
+
+        :return: list of (record, receipt) pairs
+        """
+        receipts_data = []
+        for record in self:
+            record.uuid = False
+            record.previous_uuid = previous_uuid or ''
+            if record.pos_order_id.amount_total < 0.0:
+                refunded_ereceipt = self._get_refunded_ereceipt(record.pos_order_id)
+                if refunded_ereceipt:
+                    record.reference_uuid = refunded_ereceipt.uuid or ''
+            receipt = record._prepare_receipt_data()['receipts'][0]
+            receipts_data.append((record, receipt))
+            previous_uuid = record.uuid
+        return receipts_data
+
+    @api.model
+    def _get_refunded_ereceipt(self, order):
+        """e-Receipt of the order refunded by the given return order"""
+        for line in order.lines:
+            if line.refunded_orderline_id:
+                return self.search(
+                    [('pos_order_id', '=', line.refunded_orderline_id.order_id.id)], limit=1)
+        return self.browse()
+
+    def _process_batch_response(self, response):
+        """Map the accepted and rejected documents of a multi-receipt
+        submission back to the receipts, by UUID then receipt number"""
+        if response.status_code not in [200, 202]:
+            for record in self:
+                record.api_response = response.text
+                record._handle_submission_error(f"API call failed: {response.status_code} - {response.text}")
+            return
+
+        try:
+            response_data = response.json()
+        except json.JSONDecodeError:
+            for record in self:
+                record._handle_submission_error("Invalid JSON response from ETA")
+            return
+
+        by_uuid = {record.uuid: record for record in self if record.uuid}
+        by_number = {record.pos_order_id.name: record for record in self}
+
+        def find_record(doc):
+            return by_uuid.get(doc.get('uuid')) or by_number.get(doc.get('receiptNumber'))
+
+        submission_uuid = response_data.get('submissionId')
+        request_time = response_data.get('header', {}).get('requestTime')
+        request_date = self._parse_eta_request_time(request_time) if request_time else fields.Datetime.now()
+        self.write({
+            'api_response': response.text,
+            'submission_uuid': submission_uuid,
+            'request_date': request_date,
+        })
+
+        processed = self.browse()
+        accepted_date = fields.Datetime.now()
+        for doc in response_data.get('acceptedDocuments', []):
+            record = find_record(doc)
+            if not record:
+                continue
+            record.write({
+                'uuid': doc.get('uuid') or record.uuid,
+                'receipt_number': doc.get('receiptNumber'),
+                'long_id': doc.get('longId'),
+                'state': 'accepted',
+                # resolved by the status cron, with the same pooled session
+                'eta_status': 'undetected',
+                'accepted_date': accepted_date,
+                'error_message': False,
+            })
+            processed |= record
+            _logger.info(f"[ETA] Receipt accepted: {record.receipt_number} | UUID: {record.uuid}")
+
+        for doc in response_data.get('rejectedDocuments', []):
+            record = find_record(doc)
+            if not record:
+                continue
+            error = doc.get('error', {})
+            code = error.get('code', 'UNKNOWN')
+            message = error.get('message', 'Unknown error')
+            details = error.get('details', [])
+            detail_messages = ', '.join([d.get('message', '') for d in details])
+
+            record.receipt_number = doc.get('receiptNumber')
+            record.long_id = doc.get('longId')
+            record._handle_submission_error(
+                f"[ETA] Receipt rejected: {message} (Code: {code}). Details: {detail_messages}")
+            record.state = 'rejected'
+            processed |= record
+
+        for record in self - processed:
+            record._handle_submission_error("Receipt missing from the ETA submission response")
+
     def _parse_eta_request_time(self, iso_str):
         # Example input: "2025-07-12T04:50:07.1372626Z"
         if '.' in iso_str:
@@ -573,22 +800,18 @@ class EgyptEReceipt(models.Model):
             if not uuid:
                 raise ValidationError(_('UUID not found to check the status for %s' % (rec.receipt_number)))
 
-            get_url = 'https://api.invoicing.eta.gov.eg/api/v1/receipts/%s/raw'
+            get_url = '%s/api/v1/receipts/%%s/raw' % rec._get_eta_url('api_base_url', apiBaseUrl)
             if get_url:
-                access_token = rec._get_auth_token(self.pos_order_id, self.company_id)
+                access_token = rec._get_auth_token(rec.pos_order_id, rec.company_id)
 
                 headers = {
                     'Authorization': 'Bearer %s' % access_token,
                     'Content-Type': 'application/json'
                 }
 
-                ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-                ctx.options |= 0x4
-
-                session = requests.session()
-                session.mount('https://', CustomHttpAdapter(ctx))
+                session = rec._get_eta_session(rec.pos_config_id)
 
-                get_response = session.request("GET", (get_url) % uuid, headers=headers, data={})
+                get_response = session.request("GET", (get_url) % uuid, headers=headers, data={}, timeout=30)
                 get_response_data = get_response.json()
 
                 if get_response_data.get('receipt') and get_response_data['receipt'].get('status'):
@@ -620,8 +843,11 @@ class EgyptEReceipt(models.Model):
 
         return f"{year}-{month}-{branch_code}-{next_seq}"
 
-    def cron_sync_pos_receipts(self):
-        """Cron job to sync receipts"""
+    def cron_sync_pos_receipts(self, commit=False):
+        """Cron job to sync receipts
+
+        :param commit: commit after each submission, set by the cron
+        """
         pending_receipt = self.env['egypt.ereceipt'].search([
             ('state', 'in', ['rejected', 'error', 'retry']),
         ], limit=1)
@@ -636,15 +862,14 @@ class EgyptEReceipt(models.Model):
             ('create_date', '>', '2025-12-21 00:00:00'),
         ])
 
+        ereceipt_ids = []
         for order in sorted(orders, key=lambda o: o.date_order):
             referenceUUID = ""
             if order.amount_total < 0.0:
-                for line in order.lines:
-                    if line.refunded_orderline_id:
-                        ereceipt_id = self.search(
-                            [('pos_order_id', '=', line.refunded_orderline_id.order_id.id)], limit=1)
-                        referenceUUID = ereceipt_id.uuid if ereceipt_id else ""
-                        break
+                # Resolved again at submission when the original receipt is
+                # submitted in the same run
+                ereceipt_id = self._get_refunded_ereceipt(order)
+                referenceUUID = ereceipt_id.uuid if ereceipt_id else ""
 
             ereceipt_data = {
                 'pos_order_id': order.id,
@@ -661,13 +886,13 @@ class EgyptEReceipt(models.Model):
                 continue
 
             ereceipt = self.env['egypt.ereceipt'].create(ereceipt_data)
+            ereceipt_ids.append(ereceipt.id)
 
-            # Submit to API (async to avoid blocking POS)
-            try:
-                ereceipt._submit_to_api()
-            except Exception as e:
-                _logger.error(f"Failed to submit receipt for order {order.id}: {str(e)}")
-                ereceipt._handle_submission_error(str(e))
+        # Submit to API in batches per POS device
+        try:
+            self.browse(ereceipt_ids)._submit_batch_to_api(commit=commit)
+        except Exception as e:
+            _logger.error(f"Failed to submit receipts {ereceipt_ids}: {str(e)}")
 
     @api.model
     def cron_get_status(self):
@@ -1,3 +1,4 @@
 from . import test_egypt_ereceipt
 from . import test_pos_order
-from . import test_res_config_settings
\ No newline at end of file
+from . import test_res_config_settings
+from . import test_ereceipt_batch
@@ -1347,7 +1347,7 @@ class TestEgyptEReceiptCronJobs(TransactionCase):
         
         # Test cron job
         with patch.object(self.env['egypt.ereceipt'], 'create') as mock_create:
-            self.env['egypt.ereceipt'].cron_sync_pos_receipts()
+            self.env['egypt.ereceipt'].cron_sync_pos_receipts(commit=False)
             
             # Verify e-receipts were created for orders
             self.assertEqual(mock_create.call_count, 2)
@@ -1399,7 +1399,7 @@ class TestEgyptEReceiptCronJobs(TransactionCase):
         
         # Test cron job (should skip due to pending)
         with patch.object(self.env['egypt.ereceipt'], 'create') as mock_create:
-            self.env['egypt.ereceipt'].cron_sync_pos_receipts()
+            self.env['egypt.ereceipt'].cron_sync_pos_receipts(commit=False)
             
             # Verify no new e-receipts were created
             mock_create.assert_not_called()
@@ -1430,7 +1430,7 @@ class TestEgyptEReceiptCronJobs(TransactionCase):
         
         # Test cron job
         with patch.object(self.env['egypt.ereceipt'], 'create') as mock_create:
-            self.env['egypt.ereceipt'].cron_sync_pos_receipts()
+            self.env['egypt.ereceipt'].cron_sync_pos_receipts(commit=False)
             
             # Verify no new e-receipt was created
             mock_create.assert_not_called()
@@ -1482,7 +1482,7 @@ class TestEgyptEReceiptCronJobs(TransactionCase):
         
         # Test cron job
         with patch.object(self.env['egypt.ereceipt'], 'create') as mock_create:
-            self.env['egypt.ereceipt'].cron_sync_pos_receipts()
+            self.env['egypt.ereceipt'].cron_sync_pos_receipts(commit=False)
             
             # Verify e-receipt was created with reference UUID
             mock_create.assert_called_once()
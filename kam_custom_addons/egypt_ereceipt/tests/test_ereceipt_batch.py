@@ -0,0 +1,255 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from odoo.tests.common import TransactionCase
+
+from ..models.egypt_ereceipt import eta_sessions
+
+
+class MockEtaServer(ThreadingMixIn, HTTPServer):
+    """Local stand-in of the ETA identity and receipt submission APIs"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), MockEtaHandler)
+        self.connections = 0
+        self.token_requests = 0
+        self.submissions = []
+        self.rejected_numbers = set()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%s' % self.server_address[1]
+
+
+class MockEtaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path == '/connect/token':
+            self.server.token_requests += 1
+            return self._reply({'access_token': 'mock_token', 'expires_in': 3600})
+        if self.path == '/api/v1/receiptsubmissions':
+            receipts = json.loads(body)['receipts']
+            self.server.submissions.append(receipts)
+            accepted, rejected = [], []
+            for receipt in receipts:
+                header = receipt['header']
+                doc = {
+                    'uuid': header['uuid'],
+                    'longId': 'long_%s' % header['uuid'][:8],
+                    'receiptNumber': header['receiptNumber'],
+                }
+                if header['receiptNumber'] in self.server.rejected_numbers:
+                    doc['error'] = {'code': 'INVALID', 'message': 'Invalid receipt', 'details': []}
+                    rejected.append(doc)
+                else:
+                    accepted.append(doc)
+            return self._reply({
+                'submissionId': 'submission_%s' % len(self.server.submissions),
+                'header': {'requestTime': '2025-12-22T10:00:00.0000000Z'},
+                'acceptedDocuments': accepted,
+                'rejectedDocuments': rejected,
+            }, status=202)
+        self._reply({}, status=404)
+
+
+class TestEReceiptBatch(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = MockEtaServer()
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.server.connections = 0
+        self.server.token_requests = 0
+        self.server.submissions = []
+        self.server.rejected_numbers = set()
+        self.addCleanup(eta_sessions.close)
+
+        ICP = self.env['ir.config_parameter'].sudo()
+        ICP.set_param('egypt_ereceipt.api_base_url', self.server.url)
+        ICP.set_param('egypt_ereceipt.id_srv_base_url', self.server.url)
+
+        self.company = self.env['res.company'].create({
+            'name': 'Test Batch Company',
+            'vat': '123456789',
+            'egypt_ereceipt_enabled': True,
+            'activity_code': '4771',
+        })
+        self.pos_config = self.env['pos.config'].create({
+            'name': 'Test Batch POS',
+            'pos_serial': 'BATCH123456',
+            'pos_branch_code': '01',
+            'pos_client_code': 'test_client',
+            'pos_secret_code': 'test_secret',
+        })
+        self.pos_session = self.env['pos.session'].create({
+            'config_id': self.pos_config.id,
+            'user_id': self.env.user.id,
+            'state': 'opened',
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Test Batch Product',
+            'list_price': 100.0,
+        })
+
+    def _create_receipts(self, count):
+        receipts = self.env['egypt.ereceipt']
+        for _i in range(count):
+            order = self.env['pos.order'].create({
+                'session_id': self.pos_session.id,
+                'company_id': self.company.id,
+                'amount_tax': 0.0,
+                'amount_total': 100.0,
+                'amount_paid': 100.0,
+                'amount_return': 0.0,
+                'lines': [(0, 0, {
+                    'product_id': self.product.id,
+                    'qty': 1.0,
+                    'price_unit': 100.0,
+                    'price_subtotal': 100.0,
+                    'price_subtotal_incl': 100.0,
+                })],
+            })
+            receipts |= self.env['egypt.ereceipt'].create({
+                'pos_order_id': order.id,
+                'company_id': self.company.id,
+            })
+        return receipts
+
+    def test_batch_submission(self):
+        """Receipts are submitted together and chained by previous UUID"""
+        receipts = self._create_receipts(3)
+
+        receipts._submit_batch_to_api()
+
+        self.assertEqual(len(self.server.submissions), 1)
+        self.assertEqual(len(self.server.submissions[0]), 3)
+        self.assertEqual(self.server.token_requests, 1)
+        self.assertEqual(set(receipts.mapped('state')), {'accepted'})
+        self.assertEqual(set(receipts.mapped('submission_uuid')), {'submission_1'})
+        self.assertEqual(self.pos_config.access_token, 'mock_token')
+
+        submitted = self.server.submissions[0]
+        for receipt, previous in zip(submitted[1:], submitted):
+            self.assertEqual(receipt['header']['previousUUID'], previous['header']['uuid'])
+        self.assertEqual(
+            [r['header']['uuid'] for r in submitted],
+            receipts.sorted(lambda r: (r.pos_date_order, r.id)).mapped('uuid'),
+        )
+
+    def test_batch_rejected_documents(self):
+        """Accepted and rejected documents are mapped back to their receipt"""
+        receipts = self._create_receipts(3)
+        rejected = receipts[1]
+        self.server.rejected_numbers = {rejected.pos_order_id.name}
+
+        receipts._submit_batch_to_api()
+
+        self.assertEqual(rejected.state, 'rejected')
+        self.assertFalse(rejected.uuid)
+        self.assertIn('Invalid receipt', rejected.error_message)
+        self.assertEqual(set((receipts - rejected).mapped('state')), {'accepted'})
+
+    def test_batch_limits_and_connection_reuse(self):
+        """Batches respect the size limit and reuse the device connection"""
+        self.env['ir.config_parameter'].sudo().set_param('egypt_ereceipt.batch_size', 2)
+        receipts = self._create_receipts(5)
+
+        receipts._submit_batch_to_api()
+
+        self.assertEqual([len(batch) for batch in self.server.submissions], [2, 2, 1])
+        self.assertEqual(self.server.token_requests, 1)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(set(receipts.mapped('state')), {'accepted'})
+        self.assertEqual(len(set(receipts.mapped('submission_uuid'))), 3)
+
+    def test_batch_submission_api_error(self):
+        """A failed submission puts all its receipts in retry"""
+        receipts = self._create_receipts(2)
+        self.env['ir.config_parameter'].sudo().set_param(
+            'egypt_ereceipt.api_base_url', self.server.url + '/unknown')
+
+        receipts._submit_batch_to_api()
+
+        self.assertEqual(set(receipts.mapped('state')), {'retry'})
+        self.assertTrue(all('API call failed: 404' in r.error_message for r in receipts))
+
+    def test_batch_rechained_after_rejection(self):
+        """The receipts after a rejected submission are chained to the last
+        accepted receipt"""
+        self.env['ir.config_parameter'].sudo().set_param('egypt_ereceipt.batch_size', 2)
+        receipts = self._create_receipts(4)
+        self.server.rejected_numbers = {receipts[1].pos_order_id.name}
+
+        receipts._submit_batch_to_api()
+
+        self.assertEqual([len(batch) for batch in self.server.submissions], [2, 2])
+        self.assertEqual(receipts[1].state, 'rejected')
+        self.assertEqual(set((receipts - receipts[1]).mapped('state')), {'accepted'})
+        next_batch = self.server.submissions[1]
+        self.assertEqual(next_batch[0]['header']['previousUUID'], receipts[0].uuid)
+        self.assertEqual(next_batch[1]['header']['previousUUID'], receipts[2].uuid)
+
+    def test_batch_return_references_same_run(self):
+        """A return submitted with its original receipt references the UUID
+        the original receipt is submitted with"""
+        original = self._create_receipts(1)
+        return_order = self.env['pos.order'].create({
+            'session_id': self.pos_session.id,
+            'company_id': self.company.id,
+            'amount_tax': 0.0,
+            'amount_total': -100.0,
+            'amount_paid': 0.0,
+            'amount_return': 0.0,
+            'lines': [(0, 0, {
+                'product_id': self.product.id,
+                'qty': -1.0,
+                'price_unit': 100.0,
+                'price_subtotal': -100.0,
+                'price_subtotal_incl': -100.0,
+                'refunded_orderline_id': original.pos_order_id.lines[0].id,
+            })],
+        })
+        return_receipt = self.env['egypt.ereceipt'].create({
+            'pos_order_id': return_order.id,
+            'company_id': self.company.id,
+            'reference_uuid': '',
+        })
+
+        (original | return_receipt)._submit_batch_to_api()
+
+        self.assertEqual(set((original | return_receipt).mapped('state')), {'accepted'})
+        submitted = {r['header']['receiptNumber']: r for r in self.server.submissions[0]}
+        self.assertEqual(
+            submitted[return_order.name]['header']['referenceUUID'], original.uuid)
+        self.assertEqual(return_receipt.reference_uuid, original.uuid)
@@ -20,6 +20,8 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
@@ -75,109 +77,167 @@ class HrPayslip(models.Model):
         first uncanceled, then all moves are unlinked. Finally, the method
         calls the parent class's action_payslip_cancel method."""
         moves = self.mapped('move_id')
+        shared_slips = self.search([('move_id', 'in', moves.ids),
+                                    ('id', 'not in', self.ids)])
+        if shared_slips:
+            raise UserError(
+                _('The accounting entry of these payslips is shared with '
+                  'other payslips of their batch, cancel them together: %s')
+                % ', '.join(shared_slips.mapped('name')))
         moves.filtered(lambda x: x.state == 'posted').button_cancel()
         moves.unlink()
         return super(HrPayslip, self).action_payslip_cancel()
 
     def action_payslip_done(self):
-        """Finalize and post the payroll slip, creating accounting entries.This
-         method is called when marking a payroll slip as done. It calculates
-         the accounting entries based on the salary details, creates a move
-         (journal entry),and posts it. If necessary, adjustment entries are
-         added to balance the debit and credit amounts."""
+        """Finalize and post the payroll slips, creating accounting entries.
+        The entries of all the slips are created at once and posted
+        together: one entry per slip, or for the slips of a batch grouping
+        them (see hr.payslip.run move_grouping), one entry per journal and
+        date with the amounts summed by employee or by salary rule. If
+        necessary, adjustment entries are added to balance the debit and
+        credit amounts."""
         res = super(HrPayslip, self).action_payslip_done()
+        slips_by_move = defaultdict(lambda: self.env['hr.payslip'])
         for slip in self:
-            line_ids = []
-            debit_sum = 0.0
-            credit_sum = 0.0
-            name = _('Payslip of %s') % slip.employee_id.name
-            move_dict = {
-                'narration': name,
-                'ref': slip.number,
-                'journal_id': slip.journal_id.id,
-                'date': slip.date or slip.date_to,
-            }
-            for line in slip.details_by_salary_rule_category_ids:
-                amount = slip.company_id.currency_id.round(
-                    slip.credit_note and -line.total or line.total)
-                if slip.company_id.currency_id.is_zero(amount):
-                    continue
-                debit_account_id = line.salary_rule_id.account_debit_id.id
-                credit_account_id = line.salary_rule_id.account_credit_id.id
-                if debit_account_id:
-                    debit_line = (0, 0, {
-                        'name': line.name,
-                        'partner_id': line._get_partner_id(
-                            credit_account=False),
-                        'account_id': debit_account_id,
-                        'journal_id': slip.journal_id.id,
-                        'date': slip.date or slip.date_to,
-                        'debit': amount > 0.0 and amount or 0.0,
-                        'credit': amount < 0.0 and -amount or 0.0,
-                        'tax_line_id': line.salary_rule_id.account_tax_id.id,
-                    })
-                    line_ids.append(debit_line)
-                    debit_sum += debit_line[2]['debit'] - debit_line[2][
-                        'credit']
-                if credit_account_id:
-                    credit_line = (0, 0, {
-                        'name': line.name,
-                        'partner_id': line._get_partner_id(credit_account=True),
-                        'account_id': credit_account_id,
-                        'journal_id': slip.journal_id.id,
-                        'date': slip.date or slip.date_to,
-                        'debit': amount < 0.0 and -amount or 0.0,
-                        'credit': amount > 0.0 and amount or 0.0,
-                        'tax_line_id': line.salary_rule_id.account_tax_id.id,
-                    })
-                    line_ids.append(credit_line)
-                    credit_sum += credit_line[2]['credit'] - credit_line[2][
-                        'debit']
-            if slip.company_id.currency_id.compare_amounts(
-                    credit_sum, debit_sum) == -1:
-                acc_id = slip.journal_id.default_account_id.id
-                if not acc_id:
-                    raise UserError(
-                        _('The Expense Journal "%s" has not properly '
-                          'configured the Credit Account!') % (
-                            slip.journal_id.name))
-                adjust_credit = (0, 0, {
-                    'name': _('Adjustment Entry'),
-                    'partner_id': False,
-                    'account_id': acc_id,
-                    'journal_id': slip.journal_id.id,
-                    'date': slip.date or slip.date_to,
-                    'debit': 0.0,
-                    'credit': slip.company_id.currency_id.round(
-                        debit_sum - credit_sum),
-                })
-                line_ids.append(adjust_credit)
-            elif slip.company_id.currency_id.compare_amounts(
-                    debit_sum, credit_sum) == -1:
-                acc_id = slip.journal_id.default_account_id.id
-                if not acc_id:
-                    raise UserError(
-                        _('The Expense Journal "%s" has not properly '
-                          'configured the Debit Account!') % (
-                            slip.journal_id.name))
-                adjust_debit = (0, 0, {
-                    'name': _('Adjustment Entry'),
-                    'partner_id': False,
-                    'account_id': acc_id,
-                    'journal_id': slip.journal_id.id,
-                    'date': slip.date or slip.date_to,
-                    'debit': slip.company_id.currency_id.round(
-                        credit_sum - debit_sum),
-                    'credit': 0.0,
-                })
-                line_ids.append(adjust_debit)
-            move_dict['line_ids'] = line_ids
-            move = self.env['account.move'].create(move_dict)
-            slip.write({'move_id': move.id, 'date': slip.date or slip.date_to})
+            slips_by_move[slip._get_move_grouping_key()] |= slip
+        # the partner of a salary line only depends on its rule
+        partners = {}
+        moves = self.env['account.move'].create([
+            slips._prepare_move_vals(partners)
+            for slips in slips_by_move.values()])
+        for slips, move in zip(slips_by_move.values(), moves):
+            slips.write({'move_id': move.id,
+                         'date': slips[0].date or slips[0].date_to})
             if not move.line_ids:
                 raise UserError(
                     _("As you installed the payroll accounting module you have"
                       " to choose Debit and Credit account for at least one "
                       "salary rule in the chosen Salary Structure."))
-            move.action_post()
+        moves.action_post()
         return res
+
+    def _get_move_grouping_key(self):
+        """Key of the accounting entry of the slip, the slips of a batch
+        grouping them share the entry of their journal and date"""
+        self.ensure_one()
+        grouping = self.payslip_run_id.move_grouping
+        if not grouping or grouping == 'payslip':
+            return 'payslip', self.id
+        return (grouping, self.payslip_run_id.id, self.journal_id.id,
+                self.date or self.date_to)
+
+    def _prepare_move_vals(self, partners):
+        """Values of the accounting entry of the slips, which share their
+        journal and date.
+
+        :param partners: partner of the salary lines by (rule id, credit
+            account), filled as the rules are met
+        """
+        first_slip = self[0]
+        grouping = first_slip.payslip_run_id.move_grouping or 'payslip'
+        if len(self) > 1 and grouping == 'payslip':
+            raise UserError(_('Only the payslips of a batch grouping their '
+                              'accounting entries can share one.'))
+        journal = first_slip.journal_id
+        date = first_slip.date or first_slip.date_to
+        currency = first_slip.company_id.currency_id
+        # balance of the move lines, by employee or by rule when grouped
+        balances = {}
+        debit_sum = 0.0
+        credit_sum = 0.0
+        for slip in self:
+            for line in slip.details_by_salary_rule_category_ids:
+                amount = currency.round(
+                    slip.credit_note and -line.total or line.total)
+                if currency.is_zero(amount):
+                    continue
+                rule = line.salary_rule_id
+                for account, credit_account in (
+                        (rule.account_debit_id, False),
+                        (rule.account_credit_id, True)):
+                    if not account:
+                        continue
+                    if (rule.id, credit_account) not in partners:
+                        partners[rule.id, credit_account] = \
+                            line._get_partner_id(credit_account=credit_account)
+                    partner_id = partners[rule.id, credit_account]
+                    if credit_account:
+                        credit_sum += amount
+                    else:
+                        debit_sum += amount
+                    if grouping == 'employee':
+                        key = (slip.employee_id.id, account.id, partner_id,
+                               rule.account_tax_id.id)
+                        name = slip.employee_id.name
+                    elif grouping == 'rule':
+                        key = (rule.id, account.id, partner_id,
+                               rule.account_tax_id.id)
+                        name = line.name
+                    else:
+                        key = len(balances)
+                        name = line.name
+                    if key not in balances:
+                        balances[key] = {
+                            'name': name,
+                            'partner_id': partner_id,
+                            'account_id': account.id,
+                            'tax_line_id': rule.account_tax_id.id,
+                            'balance': 0.0,
+                        }
+                    balances[key]['balance'] += \
+                        credit_account and -amount or amount
+        line_ids = []
+        for values in balances.values():
+            balance = currency.round(values.pop('balance'))
+            if grouping != 'payslip' and currency.is_zero(balance):
+                continue
+            line_ids.append((0, 0, dict(
+                values,
+                journal_id=journal.id,
+                date=date,
+                debit=balance > 0.0 and balance or 0.0,
+                credit=balance < 0.0 and -balance or 0.0,
+            )))
+        if currency.compare_amounts(credit_sum, debit_sum) == -1:
+            acc_id = journal.default_account_id.id
+            if not acc_id:
+                raise UserError(
+                    _('The Expense Journal "%s" has not properly '
+                      'configured the Credit Account!') % (journal.name))
+            line_ids.append((0, 0, {
+                'name': _('Adjustment Entry'),
+                'partner_id': False,
+                'account_id': acc_id,
+                'journal_id': journal.id,
+                'date': date,
+                'debit': 0.0,
+                'credit': currency.round(debit_sum - credit_sum),
+            }))
+        elif currency.compare_amounts(debit_sum, credit_sum) == -1:
+            acc_id = journal.default_account_id.id
+            if not acc_id:
+                raise UserError(
+                    _('The Expense Journal "%s" has not properly '
+                      'configured the Debit Account!') % (journal.name))
+            line_ids.append((0, 0, {
+                'name': _('Adjustment Entry'),
+                'partner_id': False,
+                'account_id': acc_id,
+                'journal_id': journal.id,
+                'date': date,
+                'debit': currency.round(credit_sum - debit_sum),
+                'credit': 0.0,
+            }))
+        if grouping == 'payslip':
+            name = _('Payslip of %s') % first_slip.employee_id.name
+            ref = first_slip.number
+        else:
+            name = _('Payslips of %s') % first_slip.payslip_run_id.name
+            ref = first_slip.payslip_run_id.name
+        return {
+            'narration': name,
+            'ref': ref,
+            'journal_id': journal.id,
+            'date': date,
+            'line_ids': line_ids,
+        }
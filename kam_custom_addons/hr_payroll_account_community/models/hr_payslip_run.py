@@ -38,3 +38,18 @@ class HrPayslipRun(models.Model):
                                      'account.journal'].search(
                                      [('type', '=', 'general')],
                                      limit=1))
+    move_grouping = fields.Selection(
+        selection=[('payslip', 'One Entry per Payslip'),
+                   ('employee', 'One Entry, Lines per Employee'),
+                   ('rule', 'One Entry, Lines per Salary Rule')],
+        string='Accounting Entries', default='payslip', required=True,
+        help="Accounting entries of the payslips of the batch: one per "
+             "payslip, or one per journal and date summing the amounts by "
+             "employee or by salary rule")
+
+    def action_validate_payslips(self):
+        """Confirm the payslips of the batch, their accounting entries are
+        created and posted together"""
+        self.mapped('slip_ids').filtered(
+            lambda slip: slip.state in ('draft', 'verify')
+        ).action_payslip_done()
@@ -21,3 +21,4 @@
 #
 #############################################################################
 from . import test_hr_payroll_account
+from . import test_hr_payslip_run_moves
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from odoo.tests import common
+
+
+class TestHrPayslipRunMoves(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.journal = cls.env['account.journal'].create({
+            'name': 'Salaries',
+            'code': 'SAL',
+            'type': 'general',
+        })
+        cls.expense_account = cls.env['account.account'].create({
+            'name': 'Salary Expenses',
+            'code': '620001',
+            'account_type': 'expense',
+        })
+        cls.payable_account = cls.env['account.account'].create({
+            'name': 'Salaries Payable',
+            'code': '420001',
+            'account_type': 'liability_current',
+        })
+        category = cls.env.ref('hr_payroll_community.BASIC')
+        cls.rules = cls.env['hr.salary.rule'].create([{
+            'name': name,
+            'code': name.upper(),
+            'category_id': category.id,
+            'account_debit_id': cls.expense_account.id,
+            'account_credit_id': cls.payable_account.id,
+        } for name in ('Basic', 'Bonus')])
+        cls.run = cls.env['hr.payslip.run'].create({
+            'name': 'Batch',
+            'date_start': '2025-01-01',
+            'date_end': '2025-01-31',
+            'journal_id': cls.journal.id,
+        })
+        cls.slips = cls.env['hr.payslip']
+        for name, amounts in (('Alice', (1000.0, 100.0)),
+                              ('Bob', (2000.0, 200.0))):
+            employee = cls.env['hr.employee'].create({'name': name})
+            slip = cls.env['hr.payslip'].create({
+                'employee_id': employee.id,
+                'contract_id': employee.version_id.id,
+                'payslip_run_id': cls.run.id,
+                'journal_id': cls.journal.id,
+                'date_from': '2025-01-01',
+                'date_to': '2025-01-31',
+            })
+            cls.env['hr.payslip.line'].create([{
+                'slip_id': slip.id,
+                'salary_rule_id': rule.id,
+                'name': rule.name,
+                'code': rule.code,
+                'category_id': rule.category_id.id,
+                'amount': amount,
+            } for rule, amount in zip(cls.rules, amounts)])
+            cls.slips |= slip
+
+    def _get_move_lines(self):
+        keys = {slip._get_move_grouping_key() for slip in self.slips}
+        vals_list = [
+            self.slips.filtered(
+                lambda slip: slip._get_move_grouping_key() == key
+            )._prepare_move_vals({})
+            for key in keys]
+        return [[line[2] for line in vals['line_ids']] for vals in vals_list]
+
+    def test_move_per_payslip(self):
+        moves = self._get_move_lines()
+        self.assertEqual(len(moves), 2)
+        self.assertEqual(sorted(len(lines) for lines in moves), [4, 4])
+
+    def test_move_per_employee(self):
+        self.run.move_grouping = 'employee'
+        [lines] = self._get_move_lines()
+        self.assertEqual(len(lines), 4)
+        expenses = {line['name']: line['debit'] for line in lines
+                    if line['account_id'] == self.expense_account.id}
+        self.assertEqual(expenses, {'Alice': 1100.0, 'Bob': 2200.0})
+
+    def test_move_per_rule(self):
+        self.run.move_grouping = 'rule'
+        [lines] = self._get_move_lines()
+        self.assertEqual(len(lines), 4)
+        payables = {line['name']: line['credit'] for line in lines
+                    if line['account_id'] == self.payable_account.id}
+        self.assertEqual(payables, {'Basic': 3000.0, 'Bonus': 300.0})
+        self.assertEqual(sum(line['debit'] for line in lines),
+                         sum(line['credit'] for line in lines))
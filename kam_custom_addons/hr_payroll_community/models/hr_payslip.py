@@ -192,6 +192,17 @@ class HrPayslip(models.Model):
         @return: returns the ids of all the contracts for the given employee
         that need to be considered for the given dates
         """
+        prefetch = self.env.context.get('payslip_batch_prefetch')
+        if prefetch is not None and prefetch.covers(employee, date_from,
+                                                    date_to):
+            return list(prefetch.contract_ids_by_employee[employee.id])
+        return self.env['hr.version'].search(
+            self._get_contract_domain(employee, date_from, date_to)).ids
+
+    @api.model
+    def _get_contract_domain(self, employees, date_from, date_to):
+        """Domain of the contracts of the employees that need to be
+        considered for the given dates"""
         # a contract is valid if it ends between the given dates
         clause_1 = ['&', ('date_end', '<=', date_to),
                     ('date_end', '>=', date_from)]
@@ -203,12 +214,12 @@ class HrPayslip(models.Model):
         clause_3 = ['&', ('date_start', '<=', date_from), '|',
                     ('date_end', '=', False), ('date_end', '>=', date_to)]
 
-        clause_final = [('employee_id', '=', employee.id), '|',
-                        '|'] + clause_1 + clause_2 + clause_3
-        return self.env['hr.version'].search(clause_final).ids
+        return [('employee_id', 'in', employees.ids), '|',
+                '|'] + clause_1 + clause_2 + clause_3
 
     def action_compute_sheet(self):
         """Function for compute Payslip sheet"""
+        line_vals_list = []
         for payslip in self:
             number = payslip.number or self.env['ir.sequence'].next_by_code(
                 'salary.slip')
@@ -220,9 +231,12 @@ class HrPayslip(models.Model):
             contract_ids = payslip.contract_id.ids or \
                            self.get_contract(payslip.employee_id,
                                              payslip.date_from, payslip.date_to)
-            lines = [(0, 0, line) for line in
-                     self._get_payslip_lines(contract_ids, payslip.id)]
-            payslip.write({'line_ids': lines, 'number': number})
+            line_vals_list += [
+                dict(line, slip_id=payslip.id) for line in
+                self._get_payslip_lines(contract_ids, payslip.id)]
+            payslip.write({'number': number})
+        # the lines of all the payslips are created at once
+        self.env['hr.payslip.line'].create(line_vals_list)
         return True
 
     @api.model
@@ -314,15 +328,29 @@ class HrPayslip(models.Model):
         return res
 
     @api.model
-    def get_inputs(self, contracts, date_from, date_to):
-        """Function for getting contracts upon date_from and date_to fields"""
-        res = []
-        structure_ids = contracts.get_all_structures()
+    def _get_sorted_salary_rules(self, structure_ids):
+        """Rules of the structures and their children, sorted by sequence.
+        Payslips computed by a batch share the rules of the same structures.
+        """
+        prefetch = self.env.context.get('payslip_batch_prefetch')
+        key = tuple(structure_ids)
+        if prefetch is not None and key in prefetch.sorted_rules:
+            return prefetch.sorted_rules[key]
         rule_ids = self.env['hr.payroll.structure'].browse(
             structure_ids).get_all_rules()
         sorted_rule_ids = [id for id, sequence in
                            sorted(rule_ids, key=lambda x: x[1])]
-        inputs = self.env['hr.salary.rule'].browse(sorted_rule_ids).mapped(
+        rules = self.env['hr.salary.rule'].browse(sorted_rule_ids)
+        if prefetch is not None:
+            prefetch.sorted_rules[key] = rules
+        return rules
+
+    @api.model
+    def get_inputs(self, contracts, date_from, date_to):
+        """Function for getting contracts upon date_from and date_to fields"""
+        res = []
+        structure_ids = contracts.get_all_structures()
+        inputs = self._get_sorted_salary_rules(structure_ids).mapped(
             'input_ids')
         for contract in contracts:
             for input in inputs:
@@ -365,6 +393,15 @@ class HrPayslip(models.Model):
                 """Function for return dict"""
                 return attr in self.dict and self.dict.__getitem__(attr) or 0.0
 
+            def _history_sum(self, kind, code, from_date, to_date):
+                """Totals preloaded by the payslip batch, None when they
+                have to be queried"""
+                prefetch = self.env.context.get('payslip_batch_prefetch')
+                if prefetch is None:
+                    return None
+                return prefetch.history.get_sum(kind, self.employee_id, code,
+                                                from_date, to_date)
+
         class InputLine(BrowsableObject):
             """a class that will be used into the python code, mainly for
             usability purposes"""
@@ -374,6 +411,9 @@ class HrPayslip(models.Model):
                  from_date,to_date fields"""
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = self._history_sum('inputs', code, from_date, to_date)
+                if res is not None:
+                    return res[0] or 0.0
                 self.env.cr.execute("""
                     SELECT sum(amount) as sum
                     FROM hr_payslip as hp, hr_payslip_input as pi
@@ -393,6 +433,10 @@ class HrPayslip(models.Model):
                  from_date,to_date fields"""
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = self._history_sum('worked_days', code, from_date,
+                                        to_date)
+                if res is not None:
+                    return res
                 self.env.cr.execute("""
                     SELECT sum(number_of_days) as number_of_days, 
                     sum(number_of_hours) as number_of_hours
@@ -425,6 +469,9 @@ class HrPayslip(models.Model):
                  from_date,to_date fields"""
                 if to_date is None:
                     to_date = fields.Date.today()
+                res = self._history_sum('lines', code, from_date, to_date)
+                if res is not None:
+                    return res[0] or 0.0
                 self.env.cr.execute("""SELECT sum(case when hp.credit_note = 
                 False then (pl.total) else (-pl.total) end)
                 FROM hr_payslip as hp, hr_payslip_line as pl
@@ -466,13 +513,8 @@ class HrPayslip(models.Model):
                 set(payslip.contract_id.contract_template_id.struct_id._get_parent_structure().ids))
         else:
             structure_ids = contracts.get_all_structures()
-        # get the rules of the structure and thier children
-        rule_ids = self.env['hr.payroll.structure'].browse(
-            structure_ids).get_all_rules()
-        # run the rules by sequence
-        sorted_rule_ids = [id for id, sequence in
-                           sorted(rule_ids, key=lambda x: x[1])]
-        sorted_rules = self.env['hr.salary.rule'].browse(sorted_rule_ids)
+        # get the rules of the structure and thier children, by sequence
+        sorted_rules = self._get_sorted_salary_rules(structure_ids)
         for contract in contracts:
             employee = contract.employee_id
             localdict = dict(baselocaldict, employee=employee,
@@ -20,9 +20,169 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
-from odoo import fields, models
+from odoo import Command, api, fields, models
+from odoo.modules.registry import Registry
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+# Employees whose payslips are created and computed together
+DEFAULT_PAYSLIP_BATCH_SIZE = 100
+DEFAULT_PAYSLIP_BATCH_WORKERS = 4
+
+
+def _generate_payslips_worker(dbname, uid, context, run_id, employee_ids):
+    """Generate the payslips of a chunk of employees in its own cursor
+    (see HrPayslipRun._generate_payslips)."""
+    threading.current_thread().dbname = dbname
+    with Registry(dbname).cursor() as cr:
+        env = api.Environment(cr, uid, context)
+        payslips, avoided_queries = env['hr.payslip.run'].browse(
+            run_id)._generate_payslips_chunk(
+            env['hr.employee'].browse(employee_ids))
+        return payslips.ids, avoided_queries
+
+
+class PayslipHistory:
+    """Totals of the done payslips of the employees of a chunk, used by the
+    sum helpers of the salary rules. The totals of a code are loaded for
+    all the employees by one query grouped by employee and payslip period,
+    on first use. Periods starting before date_start are left to the
+    helpers' own queries."""
+
+    QUERIES = {
+        'inputs': """
+            SELECT hp.employee_id, hp.date_from, hp.date_to, sum(pi.amount)
+            FROM hr_payslip as hp, hr_payslip_input as pi
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.id = pi.payslip_id
+            AND pi.code = %s
+            GROUP BY hp.employee_id, hp.date_from, hp.date_to""",
+        'worked_days': """
+            SELECT hp.employee_id, hp.date_from, hp.date_to,
+            sum(pi.number_of_days), sum(pi.number_of_hours)
+            FROM hr_payslip as hp, hr_payslip_worked_days as pi
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.id = pi.payslip_id
+            AND pi.code = %s
+            GROUP BY hp.employee_id, hp.date_from, hp.date_to""",
+        'lines': """
+            SELECT hp.employee_id, hp.date_from, hp.date_to,
+            sum(case when hp.credit_note = False then (pl.total)
+            else (-pl.total) end)
+            FROM hr_payslip as hp, hr_payslip_line as pl
+            WHERE hp.employee_id IN %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.id = pl.slip_id
+            AND pl.code = %s
+            GROUP BY hp.employee_id, hp.date_from, hp.date_to""",
+    }
+
+    def __init__(self, env, employees, date_start):
+        self.env = env
+        self.employee_ids = set(employees.ids)
+        self.date_start = date_start
+        self.served = 0
+        self._totals = {}
+
+    @property
+    def avoided_queries(self):
+        """Helper calls served from memory, less the loading queries"""
+        return self.served - len(self._totals)
+
+    def _load(self, kind, code):
+        """Totals of the code by employee, as (date from, date to, sums)"""
+        if (kind, code) not in self._totals:
+            self.env.flush_all()
+            self.env.cr.execute(self.QUERIES[kind], (
+                tuple(self.employee_ids), self.date_start, code))
+            totals = defaultdict(list)
+            for employee_id, date_from, date_to, *sums in \
+                    self.env.cr.fetchall():
+                totals[employee_id].append((date_from, date_to, sums))
+            self._totals[kind, code] = totals
+        return self._totals[kind, code]
+
+    def get_sum(self, kind, employee_id, code, from_date, to_date):
+        """Sums of the done payslips of the employee for the code and the
+        period, as the helpers query them, None when not preloaded"""
+        try:
+            from_date = fields.Date.to_date(from_date)
+            to_date = fields.Date.to_date(to_date)
+        except ValueError:
+            return None
+        if (employee_id not in self.employee_ids or not from_date
+                or not to_date or from_date < self.date_start):
+            return None
+        rows = [sums for date_from, date_to, sums in
+                self._load(kind, code)[employee_id]
+                if date_from >= from_date and date_to <= to_date]
+        self.served += 1
+        width = 2 if kind == 'worked_days' else 1
+        if not rows:
+            return (None,) * width
+        return tuple(sum(value for value in values if value is not None)
+                     for values in zip(*rows))
+
+
+class PayslipBatchPrefetch:
+    """Data shared by the payslips of a chunk of employees: their contracts,
+    the sorted rules of each set of structures and the attendance and leave
+    intervals of each calendar are fetched once for all the employees
+    instead of once per payslip. Passed in the context as
+    ``payslip_batch_prefetch``."""
+
+    def __init__(self, env, employees, date_from, date_to):
+        self.employee_ids = set(employees.ids)
+        self.date_from = date_from
+        self.date_to = date_to
+        self.contract_ids_by_employee = defaultdict(list)
+        self.resources_by_calendar = defaultdict(
+            lambda: env['resource.resource'])
+        self.sorted_rules = {}
+        self._intervals = {}
+        # payslips of the year before the batch are served from memory
+        self.history = PayslipHistory(
+            env, employees, date(date_from.year - 1, 1, 1))
+        contracts = env['hr.version'].search(
+            env['hr.payslip']._get_contract_domain(employees, date_from,
+                                                   date_to))
+        for contract in contracts:
+            self.contract_ids_by_employee[contract.employee_id.id].append(
+                contract.id)
+            if contract.resource_calendar_id:
+                self.resources_by_calendar[
+                    contract.resource_calendar_id.id] |= \
+                    contract.employee_id.resource_id
+
+    def covers(self, employee, date_from, date_to):
+        """Whether the contracts of the employee for the dates are known"""
+        return (len(employee) == 1 and employee.id in self.employee_ids
+                and (date_from, date_to) == (self.date_from, self.date_to))
+
+    def get_intervals(self, calendar, method, start_dt, end_dt, resources,
+                      args, kwargs):
+        """Intervals of the calendar, computed for all the resources of the
+        chunk working with it on the first call for the given period"""
+        key = (method, calendar.id, start_dt, end_dt,
+               repr((args, sorted(kwargs.items()))))
+        calendar = calendar.with_context(payslip_batch_prefetch=None)
+        if key not in self._intervals:
+            batch_resources = self.resources_by_calendar[calendar.id] | \
+                resources
+            self._intervals[key] = (batch_resources, getattr(
+                calendar, method)(start_dt, end_dt, batch_resources, *args,
+                                  **kwargs))
+        batch_resources, intervals = self._intervals[key]
+        if resources - batch_resources:
+            return getattr(calendar, method)(start_dt, end_dt, resources,
+                                             *args, **kwargs)
+        return intervals
 
 
 class HrPayslipRun(models.Model):
@@ -55,6 +215,20 @@ class HrPayslipRun(models.Model):
                                  help="If its checked, indicates that all"
                                       "payslips generated from here are refund"
                                       "payslips.")
+    compute_progress = fields.Float(string='Progress', readonly=True,
+                                    copy=False,
+                                    help="Share of the employees whose "
+                                         "payslips are generated by the last "
+                                         "payslip generation")
+    history_queries_avoided = fields.Integer(
+        string='History Queries Avoided', readonly=True, copy=False,
+        help="Payslip history totals asked by the salary rules of the last "
+             "payslip generation that were served without a query")
+    failed_employee_ids = fields.Many2many(
+        'hr.employee', 'hr_payslip_run_failed_employee_rel', 'run_id',
+        'employee_id', string='Failed Employees', readonly=True, copy=False,
+        help="Employees whose payslips could not be generated by the last "
+             "payslip generation, the errors are in the server log")
 
     def action_payslip_run(self):
         """Function for state change"""
@@ -63,3 +237,140 @@ class HrPayslipRun(models.Model):
     def close_payslip_run(self):
         """Function for state change"""
         return self.write({'state': 'close'})
+
+    def _get_payslip_batch_params(self):
+        """Number of employees computed together and number of workers
+        computing them in parallel, 1 (one) computes all of them in the
+        current transaction"""
+        params = self.env['ir.config_parameter'].sudo()
+        return (
+            int(params.get_param('hr_payroll_community.payslip_batch_size',
+                                 DEFAULT_PAYSLIP_BATCH_SIZE)),
+            int(params.get_param('hr_payroll_community.payslip_batch_workers',
+                                 DEFAULT_PAYSLIP_BATCH_WORKERS)),
+        )
+
+    def _prepare_payslip_vals(self, employee):
+        """Values of the payslip of the employee for the batch"""
+        self.ensure_one()
+        slip_data = self.env['hr.payslip'].onchange_employee_id(
+            self.date_start, self.date_end, employee.id, contract_id=False)
+        return {
+            'employee_id': employee.id,
+            'name': slip_data['value'].get('name'),
+            'struct_id': slip_data['value'].get('struct_id'),
+            'contract_id': slip_data['value'].get('contract_id'),
+            'payslip_run_id': self.id,
+            'input_line_ids': [(0, 0, x) for x in
+                               slip_data['value'].get('input_line_ids')],
+            'worked_days_line_ids': [(0, 0, x) for x in
+                                     slip_data['value'].get(
+                                         'worked_days_line_ids')],
+            'date_from': self.date_start,
+            'date_to': self.date_end,
+            'credit_note': self.credit_note,
+            'company_id': employee.company_id.id,
+        }
+
+    def _generate_payslips_chunk(self, employees):
+        """Create and compute the payslips of a chunk of employees, sharing
+        the data they have in common
+
+        :return: the payslips and the number of history queries avoided
+        """
+        self.ensure_one()
+        prefetch = PayslipBatchPrefetch(self.env, employees, self.date_start,
+                                        self.date_end)
+        run = self.with_context(payslip_batch_prefetch=prefetch)
+        payslips = run.env['hr.payslip'].create([
+            run._prepare_payslip_vals(employee)
+            for employee in employees.with_env(run.env)])
+        payslips.action_compute_sheet()
+        return (payslips.with_context(payslip_batch_prefetch=None),
+                prefetch.history.avoided_queries)
+
+    def _report_compute_progress(self, done, total, avoided_queries,
+                                 failed_ids):
+        """Log and store the share of the employees already computed and the
+        employees whose chunk failed"""
+        _logger.info("Payslip batch %s: %s/%s employees computed, "
+                     "%s failed, %s history queries avoided",
+                     self.name, done, total, len(failed_ids),
+                     avoided_queries)
+        self.write({
+            'compute_progress': total and 100.0 * done / total,
+            'history_queries_avoided': avoided_queries,
+            'failed_employee_ids': [Command.set(failed_ids)],
+        })
+
+    def _generate_payslips(self, employees, commit=True):
+        """Generate the payslips of the employees by chunks. The chunks are
+        computed by a pool of workers, each one with its own cursor and
+        committing its payslips, or in the current transaction with a single
+        worker or a single chunk.
+
+        A chunk is generated as a whole or not at all: the employees of a
+        failing chunk are stored in failed_employee_ids and the other chunks
+        are kept.
+
+        :param commit: commit the progress of the run, so that the workers
+            see the run and the progress is visible while they compute.
+        :return: the payslips created
+        """
+        self.ensure_one()
+        batch_size, workers = self._get_payslip_batch_params()
+        chunks = list(split_every(max(batch_size, 1), employees.ids))
+        total = len(employees)
+        payslip_ids = []
+        failed_ids = []
+        done = avoided_queries = 0
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                try:
+                    with self.env.cr.savepoint():
+                        chunk_payslips, chunk_avoided = \
+                            self._generate_payslips_chunk(
+                                self.env['hr.employee'].browse(chunk))
+                except Exception:
+                    _logger.exception("Payslip batch %s: generation failed "
+                                      "for employees %s", self.name, chunk)
+                    failed_ids += chunk
+                else:
+                    payslip_ids += chunk_payslips.ids
+                    avoided_queries += chunk_avoided
+                done += len(chunk)
+                self._report_compute_progress(done, total, avoided_queries,
+                                              failed_ids)
+            return self.env['hr.payslip'].browse(payslip_ids)
+
+        # The workers only see committed data
+        self._report_compute_progress(0, total, 0, failed_ids)
+        if commit:
+            self.env.cr.commit()
+        dbname, uid, context = (self.env.cr.dbname, self.env.uid,
+                                dict(self.env.context))
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks)),
+                                thread_name_prefix='payslip_batch') as executor:
+            futures = {
+                executor.submit(_generate_payslips_worker, dbname, uid,
+                                context, self.id, chunk): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    chunk_payslip_ids, chunk_avoided = future.result()
+                except Exception:
+                    _logger.exception("Payslip batch %s: generation failed "
+                                      "for employees %s", self.name, chunk)
+                    failed_ids += chunk
+                else:
+                    payslip_ids += chunk_payslip_ids
+                    avoided_queries += chunk_avoided
+                done += len(chunk)
+                self._report_compute_progress(done, total, avoided_queries,
+                                              failed_ids)
+                if commit:
+                    self.env.cr.commit()
+        self.env.invalidate_all()
+        return self.env['hr.payslip'].browse(payslip_ids)
@@ -23,7 +23,22 @@
 from odoo import api, fields, models, _
 # from odoo.addons import decimal_precision as dp
 from odoo.exceptions import UserError, ValidationError
-from odoo.tools.safe_eval import safe_eval
+from odoo.tools.lru import LRU
+from odoo.tools.safe_eval import (_BUILTINS, _SAFE_OPCODES, check_values,
+                                  test_expr, unsafe_eval)
+
+# Rule expressions compiled with the safe_eval opcode checks, by (database,
+# model, rule id, write date, field), along with the compiled expression
+_compiled_rule_expressions = LRU(8192)
+
+# Rule fields holding an expression, and their evaluation mode
+RULE_EXPRESSION_FIELDS = {
+    'condition_range': 'eval',
+    'condition_python': 'exec',
+    'quantity': 'eval',
+    'amount_percentage_base': 'eval',
+    'amount_python_compute': 'exec',
+}
 
 
 class HrSalaryRule(models.Model):
@@ -155,6 +170,38 @@ class HrSalaryRule(models.Model):
                                 copy=True, help="Choose Hr Rule Input")
     note = fields.Text(string='Description', help="Description for Salary Rule")
 
+    def write(self, vals):
+        """Drop the compiled expressions of the rules when they change"""
+        if RULE_EXPRESSION_FIELDS.keys() & vals.keys():
+            _compiled_rule_expressions.clear()
+        return super().write(vals)
+
+    def _get_compiled_expression(self, field_name):
+        """Code of the expression of the rule, compiled once by the same
+        checks as safe_eval"""
+        self.ensure_one()
+        expression = self[field_name]
+        key = (self.env.cr.dbname, self._name, self.id, self.write_date,
+               field_name)
+        compiled = _compiled_rule_expressions.get(key)
+        if compiled is None or compiled[0] != expression:
+            compiled = (expression, test_expr(
+                expression, _SAFE_OPCODES,
+                mode=RULE_EXPRESSION_FIELDS[field_name]))
+            _compiled_rule_expressions[key] = compiled
+        return compiled[1]
+
+    def _safe_eval_expression(self, field_name, localdict):
+        """Evaluate the compiled expression of the rule in the safe_eval
+        sandbox, localdict is updated in place"""
+        code = self._get_compiled_expression(field_name)
+        check_values(localdict)
+        localdict['__builtins__'] = dict(_BUILTINS)
+        try:
+            return unsafe_eval(code, localdict)
+        finally:
+            del localdict['__builtins__']
+
     @api.constrains('parent_rule_id')
     def _check_parent_rule_id(self):
         """Function to adding constrains for parent_rule_id field"""
@@ -195,7 +242,7 @@ class HrSalaryRule(models.Model):
             if rec.amount_select == 'fix':
                 try:
                     return rec.amount_fix, float(
-                        safe_eval(rec.quantity, localdict)), 100.0
+                        rec._safe_eval_expression('quantity', localdict)), 100.0
                 except:
                     raise UserError(
                         _('Wrong quantity defined for salary rule %s (%s).') % (
@@ -203,8 +250,10 @@ class HrSalaryRule(models.Model):
             elif rec.amount_select == 'percentage':
                 try:
                     return (
-                        float(safe_eval(rec.amount_percentage_base, localdict)),
-                        float(safe_eval(rec.quantity, localdict)),
+                        float(rec._safe_eval_expression(
+                            'amount_percentage_base', localdict)),
+                        float(rec._safe_eval_expression('quantity',
+                                                        localdict)),
                         rec.amount_percentage)
                 except:
                     raise UserError(
@@ -214,7 +263,8 @@ class HrSalaryRule(models.Model):
             else:
                 try:
 
-                    safe_eval(rec.amount_python_compute, localdict, mode='exec')
+                    rec._safe_eval_expression('amount_python_compute',
+                                              localdict)
                     return (float(localdict['result']),
                             'result_qty' in localdict and
                             localdict['result_qty'] or 1.0, 'result_rate'
@@ -236,7 +286,8 @@ class HrSalaryRule(models.Model):
             return True
         elif self.condition_select == 'range':
             try:
-                result = safe_eval(self.condition_range, localdict)
+                result = self._safe_eval_expression('condition_range',
+                                                    localdict)
                 return (
                             self.condition_range_min <= result <= self.condition_range_max or False)
             except:
@@ -246,8 +297,7 @@ class HrSalaryRule(models.Model):
                         self.name, self.code))
         else:  # python code
             try:
-                safe_eval(self.condition_python, localdict, mode='exec',
-                          nocopy=True)
+                self._safe_eval_expression('condition_python', localdict)
                 return 'result' in localdict and localdict['result'] or False
             except:
                 raise UserError(
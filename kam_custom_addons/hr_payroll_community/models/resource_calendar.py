@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from odoo import models
+
+
+class ResourceCalendar(models.Model):
+    """Inherit resource_calendar to share the intervals computed for the
+    employees of a payslip batch"""
+    _inherit = 'resource.calendar'
+
+    def _attendance_intervals_batch(self, start_dt, end_dt, resources=None,
+                                    *args, **kwargs):
+        """Attendance intervals, from the payslip batch when there is one"""
+        prefetch = self.env.context.get('payslip_batch_prefetch')
+        if prefetch is None or not resources:
+            return super()._attendance_intervals_batch(
+                start_dt, end_dt, resources, *args, **kwargs)
+        return prefetch.get_intervals(self, '_attendance_intervals_batch',
+                                      start_dt, end_dt, resources, args,
+                                      kwargs)
+
+    def _leave_intervals_batch(self, start_dt, end_dt, resources=None,
+                               *args, **kwargs):
+        """Leave intervals, from the payslip batch when there is one"""
+        prefetch = self.env.context.get('payslip_batch_prefetch')
+        if prefetch is None or not resources:
+            return super()._leave_intervals_batch(
+                start_dt, end_dt, resources, *args, **kwargs)
+        return prefetch.get_intervals(self, '_leave_intervals_batch',
+                                      start_dt, end_dt, resources, args,
+                                      kwargs)
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from . import test_hr_salary_rule
+from . import test_hr_payslip_run
+from . import test_hr_payslip_batch
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from datetime import date
+
+from odoo.tests import common
+from odoo.tools import mute_logger
+
+
+class PayslipBatchCommon(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        category = cls.env.ref('hr_payroll_community.BASIC')
+        rules = cls.env['hr.salary.rule'].create([{
+            'name': 'Wage',
+            'code': 'WAGE',
+            'sequence': 5,
+            'category_id': category.id,
+            'amount_select': 'code',
+            'amount_python_compute': 'result = contract.wage',
+        }, {
+            'name': 'Ratio',
+            'code': 'RATIO',
+            'sequence': 6,
+            'category_id': category.id,
+            'amount_select': 'code',
+            'amount_python_compute': 'result = 1000.0 / contract.wage',
+        }, {
+            'name': 'Bonus',
+            'code': 'BONUS',
+            'sequence': 10,
+            'category_id': category.id,
+            'amount_select': 'code',
+            'amount_python_compute': 'result = inputs.BONUS.amount',
+            'input_ids': [(0, 0, {'name': 'Bonus', 'code': 'BONUS'})],
+        }, {
+            'name': 'Worked Days',
+            'code': 'WORKED',
+            'sequence': 20,
+            'category_id': category.id,
+            'amount_select': 'code',
+            'amount_python_compute':
+                'result = worked_days.WORK100.number_of_days\n'
+                'result_qty = worked_days.WORK100.number_of_hours',
+        }, {
+            'name': 'Year to Date',
+            'code': 'YTD',
+            'sequence': 30,
+            'category_id': category.id,
+            'amount_select': 'code',
+            'amount_python_compute':
+                "result = payslip.sum('WAGE', '2025-01-01', '2025-12-31')",
+        }])
+        cls.structure = cls.env['hr.payroll.structure'].create({
+            'name': 'Batch',
+            'code': 'BATCH',
+            'rule_ids': [(6, 0, rules.ids)],
+        })
+        cls.template = cls.env['hr.version'].create({
+            'name': 'Batch Template',
+            'struct_id': cls.structure.id,
+            'wage': 0.0,
+        })
+        cls.employees = cls._create_employees(
+            [1000.0 * (index + 1) for index in range(5)])
+        # January payslips give the history summed by the YTD rule
+        january = cls.env['hr.payslip.run'].create({
+            'name': 'January',
+            'date_start': date(2025, 1, 1),
+            'date_end': date(2025, 1, 31),
+        })
+        cls._compute_sequentially(january, cls.employees).write(
+            {'state': 'done'})
+        cls.run = cls.env['hr.payslip.run'].create({
+            'name': 'February',
+            'date_start': date(2025, 2, 1),
+            'date_end': date(2025, 2, 28),
+        })
+
+    @classmethod
+    def _create_employees(cls, wages):
+        employees = cls.env['hr.employee'].create([
+            {'name': 'Batch %s' % index} for index in range(len(wages))])
+        for employee, wage in zip(employees, wages):
+            employee.version_id.write({
+                'date_version': date(2025, 1, 1),
+                'contract_date_start': date(2025, 1, 1),
+                'wage': wage,
+                'struct_id': cls.structure.id,
+                'contract_template_id': cls.template.id,
+                'resource_calendar_id':
+                    cls.env.company.resource_calendar_id.id,
+            })
+        return employees
+
+    @classmethod
+    def _compute_sequentially(cls, run, employees):
+        """Compute the payslips one by one, without the batch prefetch"""
+        payslips = cls.env['hr.payslip']
+        for employee in employees:
+            payslip = cls.env['hr.payslip'].create(
+                run._prepare_payslip_vals(employee))
+            payslip.action_compute_sheet()
+            payslips |= payslip
+        return payslips
+
+    def _set_batch_params(self, batch_size, workers):
+        params = self.env['ir.config_parameter'].sudo()
+        params.set_param('hr_payroll_community.payslip_batch_size',
+                         batch_size)
+        params.set_param('hr_payroll_community.payslip_batch_workers',
+                         workers)
+
+
+class TestPayslipBatch(PayslipBatchCommon):
+
+    def _payslip_values(self, payslip):
+        return (
+            sorted((line.code, line.amount, line.quantity, line.rate,
+                    line.total) for line in payslip.line_ids),
+            sorted((line.code, line.number_of_days, line.number_of_hours)
+                   for line in payslip.worked_days_line_ids),
+            sorted((line.code, line.amount)
+                   for line in payslip.input_line_ids),
+        )
+
+    def _check_matches_sequential(self, batch):
+        sequential = self._compute_sequentially(self.run, self.employees)
+        self.assertEqual(batch.employee_id, self.employees)
+        self.assertEqual(self.run.compute_progress, 100.0)
+        self.assertFalse(self.run.failed_employee_ids)
+        for employee in self.employees:
+            batch_payslip = batch.filtered(
+                lambda slip: slip.employee_id == employee)
+            sequential_payslip = sequential.filtered(
+                lambda slip: slip.employee_id == employee)
+            self.assertEqual(batch_payslip.line_ids.filtered(
+                lambda line: line.code == 'YTD').total,
+                employee.version_id.wage)
+            self.assertEqual(self._payslip_values(batch_payslip),
+                             self._payslip_values(sequential_payslip))
+
+    def _enter_test_mode(self):
+        """Let the workers' cursors see the data of the test"""
+        if not self.registry.in_test_mode():
+            self.registry_enter_test_mode()
+
+    def test_batch_matches_sequential(self):
+        """Payslips computed by chunks with the prefetch match the ones
+        computed one by one"""
+        self._set_batch_params(2, 1)
+        self._check_matches_sequential(
+            self.run._generate_payslips(self.employees, commit=False))
+
+    def test_pool_matches_sequential(self):
+        """Payslips computed by a pool of workers match the ones computed
+        one by one"""
+        self._enter_test_mode()
+        self._set_batch_params(2, 2)
+        self._check_matches_sequential(
+            self.run._generate_payslips(self.employees, commit=False))
+
+    @mute_logger('odoo.addons.hr_payroll_community.models.hr_payslip_run')
+    def _check_failed_chunk(self):
+        # a null wage fails the RATIO rule
+        failing = self._create_employees([0.0])
+        employees = self.employees | failing
+        payslips = self.run._generate_payslips(employees, commit=False)
+        # the employees are chunked by 2, the last chunk fails as a whole
+        failed = self.employees[4] | failing
+        self.assertEqual(self.run.failed_employee_ids, failed)
+        self.assertEqual(self.run.compute_progress, 100.0)
+        self.assertEqual(payslips.employee_id, self.employees[:4])
+        self.assertEqual(self.run.slip_ids, payslips)
+
+    def test_batch_failed_chunk(self):
+        """A failing chunk is rolled back and its employees reported"""
+        self._set_batch_params(2, 1)
+        self._check_failed_chunk()
+
+    def test_pool_failed_chunk(self):
+        """A failing chunk of a worker is rolled back and its employees
+        reported, the other chunks are kept"""
+        self._enter_test_mode()
+        self._set_batch_params(2, 2)
+        self._check_failed_chunk()
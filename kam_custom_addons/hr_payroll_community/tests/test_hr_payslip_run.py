@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+from datetime import date
+
+from odoo.tests import common
+
+from ..models.hr_payslip_run import PayslipHistory
+from .test_hr_payslip_batch import PayslipBatchCommon
+
+
+class TestPayslipHistory(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.employee = cls.env['hr.employee'].create({'name': 'History'})
+        cls.contract = cls.employee.version_id
+        for month, amount in ((1, 100.0), (2, 50.0)):
+            date_from = date(2025, month, 1)
+            date_to = date(2025, month, 28)
+            cls.env['hr.payslip'].create({
+                'employee_id': cls.employee.id,
+                'contract_id': cls.contract.id,
+                'date_from': date_from,
+                'date_to': date_to,
+                'input_line_ids': [(0, 0, {
+                    'name': 'Bonus',
+                    'code': 'BONUS',
+                    'amount': amount,
+                    'contract_id': cls.contract.id,
+                    'date_from': date_from,
+                    'date_to': date_to,
+                })],
+            }).state = 'done'
+
+    def _query_sum(self, code, from_date, to_date):
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT sum(amount) as sum
+            FROM hr_payslip as hp, hr_payslip_input as pi
+            WHERE hp.employee_id = %s AND hp.state = 'done'
+            AND hp.date_from >= %s AND hp.date_to <= %s AND hp.id =
+            pi.payslip_id AND pi.code = %s""",
+                            (self.employee.id, from_date, to_date, code))
+        return self.env.cr.fetchone()
+
+    def test_history_sum(self):
+        """Preloaded totals match the queries of the rule helpers"""
+        history = PayslipHistory(self.env, self.employee, date(2024, 1, 1))
+        for from_date, to_date in (('2025-01-01', '2025-12-31'),
+                                   ('2025-02-01', '2025-12-31'),
+                                   ('2025-01-01', '2025-01-31'),
+                                   ('2026-01-01', '2026-12-31')):
+            self.assertEqual(
+                history.get_sum('inputs', self.employee.id, 'BONUS',
+                                from_date, to_date),
+                self._query_sum('BONUS', from_date, to_date))
+        self.assertEqual(history.avoided_queries, 3)
+
+    def test_history_outside_window(self):
+        """Periods before the preloaded ones are left to the queries"""
+        history = PayslipHistory(self.env, self.employee, date(2025, 2, 1))
+        self.assertIsNone(history.get_sum(
+            'inputs', self.employee.id, 'BONUS', '2025-01-01', '2025-12-31'))
+        self.assertEqual(history.get_sum(
+            'inputs', self.employee.id, 'BONUS', '2025-02-01', '2025-12-31'),
+            (50.0,))
+        self.assertEqual(history.avoided_queries, 0)
+
+
+class TestPayslipRunHistory(PayslipBatchCommon):
+
+    def test_history_queries_avoided(self):
+        """The YTD rule of each payslip is served from the history loaded
+        once per chunk"""
+        self._set_batch_params(2, 1)
+        self.run._generate_payslips(self.employees, commit=False)
+        # 5 payslips ask the WAGE history, loaded by 3 chunks
+        self.assertEqual(self.run.history_queries_avoided, 2)
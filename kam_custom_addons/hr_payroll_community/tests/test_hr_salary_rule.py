@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# License LGPL-3.0 (https://www.gnu.org/licenses/lgpl-3.0.html).
+import logging
+import time
+
+from odoo.exceptions import UserError
+from odoo.tests import common, tagged
+from odoo.tools.safe_eval import safe_eval
+
+_logger = logging.getLogger(__name__)
+
+
+class RuleValues(object):
+    """Stand-in of the objects given to the rules by the payslip"""
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class SalaryRuleCommon(common.TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.category = cls.env.ref('hr_payroll_community.BASIC')
+
+    def _create_rule(self, code, **vals):
+        return self.env['hr.salary.rule'].create(dict({
+            'name': code,
+            'code': code,
+            'category_id': self.category.id,
+        }, **vals))
+
+    def _localdict(self, wage=1000.0):
+        return {
+            'contract': RuleValues(wage=wage),
+            'categories': RuleValues(BASIC=wage),
+            'result': None,
+            'result_qty': 1.0,
+            'result_rate': 100,
+        }
+
+
+class TestHrSalaryRule(SalaryRuleCommon):
+
+    def test_compiled_rule(self):
+        """Compiled expressions give the same result as safe_eval"""
+        rule = self._create_rule(
+            'PY', condition_select='python',
+            condition_python='result = contract.wage > 500',
+            amount_select='code',
+            amount_python_compute='result = contract.wage * 0.10\n'
+                                  'result_qty = 2')
+        localdict = self._localdict()
+        self.assertTrue(rule._satisfy_condition(localdict))
+        self.assertEqual(rule._compute_rule(localdict), (100.0, 2, 100))
+        self.assertNotIn('__builtins__', localdict)
+        self.assertFalse(rule._satisfy_condition(self._localdict(wage=100.0)))
+
+        localdict = self._localdict()
+        safe_eval(rule.amount_python_compute, localdict, mode='exec')
+        self.assertEqual(localdict['result'], 100.0)
+
+    def test_compiled_rule_percentage(self):
+        rule = self._create_rule(
+            'PCT', condition_select='range', condition_range='contract.wage',
+            condition_range_min=0.0, condition_range_max=2000.0,
+            amount_select='percentage', amount_percentage=20.0,
+            amount_percentage_base='categories.BASIC', quantity='1.5')
+        localdict = self._localdict()
+        self.assertTrue(rule._satisfy_condition(localdict))
+        self.assertEqual(rule._compute_rule(localdict), (1000.0, 1.5, 20.0))
+
+    def test_compiled_rule_write(self):
+        """Changing the code of a rule drops its compiled code"""
+        rule = self._create_rule(
+            'FIX', amount_select='code',
+            amount_python_compute='result = 10.0')
+        self.assertEqual(rule._compute_rule(self._localdict())[0], 10.0)
+        rule.amount_python_compute = 'result = 20.0'
+        self.assertEqual(rule._compute_rule(self._localdict())[0], 20.0)
+
+    def test_compiled_rule_sandbox(self):
+        """Compiled expressions keep the safe_eval restrictions"""
+        rule = self._create_rule(
+            'BAD', amount_select='code',
+            amount_python_compute='result = ().__class__.__bases__')
+        with self.assertRaises(UserError):
+            rule._compute_rule(self._localdict())
+        rule.amount_python_compute = 'import os\nresult = 1.0'
+        with self.assertRaises(UserError):
+            rule._compute_rule(self._localdict())
+
+
+@tagged('-standard', 'salary_rule_benchmark')
+class BenchmarkHrSalaryRule(SalaryRuleCommon):
+    """Rules evaluated per second on a 200 rule structure, run with
+    --test-tags salary_rule_benchmark"""
+
+    rule_count = 200
+    payslip_count = 50
+
+    def test_benchmark_rules(self):
+        rules = self.env['hr.salary.rule']
+        for index in range(self.rule_count):
+            rules |= self._create_rule(
+                'R%s' % index, condition_select='python',
+                condition_python='result = contract.wage > %s' % index,
+                amount_select='code',
+                amount_python_compute='result = contract.wage * %s / 100.0'
+                                      % (index % 10))
+        evaluations = self.rule_count * self.payslip_count
+
+        start = time.perf_counter()
+        for _index in range(self.payslip_count):
+            localdict = self._localdict()
+            for rule in rules:
+                safe_eval(rule.condition_python, localdict, mode='exec')
+                safe_eval(rule.amount_python_compute, localdict, mode='exec')
+        safe_eval_rate = evaluations / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _index in range(self.payslip_count):
+            localdict = self._localdict()
+            for rule in rules:
+                rule._satisfy_condition(localdict)
+                rule._compute_rule(localdict)
+        compiled_rate = evaluations / (time.perf_counter() - start)
+
+        _logger.info(
+            "Salary rules on a %s rule structure: %.0f rules/s with "
+            "safe_eval, %.0f rules/s compiled",
+            self.rule_count, safe_eval_rate, compiled_rate)
+        self.assertGreater(compiled_rate, safe_eval_rate)
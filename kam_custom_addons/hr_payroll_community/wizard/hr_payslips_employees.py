@@ -37,37 +37,26 @@ class HrPayslipEmployees(models.TransientModel):
 
     def action_compute_sheet(self):
         """Function for compute Payslip Sheet"""
-        payslips = self.env['hr.payslip']
         [data] = self.read()
         active_id = self.env.context.get('active_id')
-        if active_id:
-            [run_data] = self.env['hr.payslip.run'].browse(active_id).read(
-                ['date_start', 'date_end', 'credit_note'])
-        from_date = run_data.get('date_start')
-        to_date = run_data.get('date_end')
+        payslip_run = self.env['hr.payslip.run'].browse(active_id)
         if not data['employee_ids']:
             raise UserError(
                 _("You must select employee(s) to generate payslip(s)."))
-        for employee in self.env['hr.employee'].browse(data['employee_ids']):
-            slip_data = (
-                self.env['hr.payslip'].onchange_employee_id(
-                    from_date, to_date, employee.id, contract_id=False))
-            res = {
-                'employee_id': employee.id,
-                'name': slip_data['value'].get('name'),
-                'struct_id': slip_data['value'].get('struct_id'),
-                'contract_id': slip_data['value'].get('contract_id'),
-                'payslip_run_id': active_id,
-                'input_line_ids': [(0, 0, x) for x in
-                                   slip_data['value'].get('input_line_ids')],
-                'worked_days_line_ids': [(0, 0, x) for x in
-                                         slip_data['value'].get(
-                                             'worked_days_line_ids')],
-                'date_from': from_date,
-                'date_to': to_date,
-                'credit_note': run_data.get('credit_note'),
-                'company_id': employee.company_id.id,
+        payslip_run._generate_payslips(
+            self.env['hr.employee'].browse(data['employee_ids']))
+        if payslip_run.failed_employee_ids:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'type': 'warning',
+                    'sticky': True,
+                    'message': _("The payslips of %s employee(s) could not "
+                                 "be generated, see the Failed Employees of "
+                                 "the batch.",
+                                 len(payslip_run.failed_employee_ids)),
+                    'next': {'type': 'ir.actions.act_window_close'},
+                },
             }
-            payslips += self.env['hr.payslip'].create(res)
-        payslips.action_compute_sheet()
-        return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
+        return {'type': 'ir.actions.act_window_close'}
@@ -32,7 +32,7 @@ class HrPayslipAcc(models.Model):
     def action_payslip_done(self):
         """Calculate the dates and mark loan lines as paid"""
         for line in self.input_line_ids:
-            date_from = self.date_from
+            date_from = line.payslip_id.date_from
             tym = datetime.combine(fields.Date.from_string(date_from), time.min)
             locale = self.env.context.get('lang') or 'en_US'
             month = str(babel.dates.format_date(date=tym, format='MMMM-y', locale=locale))
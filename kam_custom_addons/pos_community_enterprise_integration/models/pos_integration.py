@@ -1,10 +1,105 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api
+import threading
+import time
 import xmlrpc.client
 import logging
 
 _logger = logging.getLogger(__name__)
 
+DEFAULT_MAPPING_TTL = 300
+
+
+# ---------------------------------------------------------------------------
+# Enterprise sessions & mapping cache, shared by the whole worker
+# ---------------------------------------------------------------------------
+class EnterpriseConnectionManager:
+    """Authenticate once per worker and credentials, and keep one set of
+    XML-RPC proxies per thread. A proxy keeps its transport, which reuses
+    the same HTTP keep-alive connection for all the calls of the thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._uids = {}
+        self._local = threading.local()
+
+    def get_proxy(self, url, endpoint):
+        proxies = getattr(self._local, 'proxies', None)
+        if proxies is None:
+            proxies = self._local.proxies = {}
+        if (url, endpoint) not in proxies:
+            proxies[(url, endpoint)] = xmlrpc.client.ServerProxy(
+                '%s/xmlrpc/2/%s' % (url, endpoint))
+        return proxies[(url, endpoint)]
+
+    def get_uid(self, url, db, username, password):
+        key = (url, db, username, password)
+        with self._lock:
+            uid = self._uids.get(key)
+            if not uid:
+                common = self.get_proxy(url, 'common')
+                uid = common.authenticate(db, username, password, {})
+                if not uid:
+                    raise Exception("POS Integration: Authentication to Enterprise DB failed.")
+                self._uids[key] = uid
+        return uid
+
+    def invalidate(self, url, db, username, password):
+        """Forget the session, the next call authenticates again."""
+        with self._lock:
+            self._uids.pop((url, db, username, password), None)
+        proxies = getattr(self._local, 'proxies', {})
+        for key in [key for key in proxies if key[0] == url]:
+            proxies.pop(key)('close')()
+
+    def clear(self):
+        with self._lock:
+            self._uids.clear()
+        self._local = threading.local()
+
+
+class RemoteIdCache:
+    """Enterprise ids of records matched by a field value, kept for a TTL.
+
+    Values missing in Enterprise are cached too (as False); creating a
+    record through the mixin drops the entries of its model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get_many(self, scope, values):
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for value in values:
+                entry = self._entries.get((scope, value))
+                if entry and entry[1] > now:
+                    found[value] = entry[0]
+                else:
+                    missing.append(value)
+        return found, missing
+
+    def set_many(self, scope, mapping, ttl):
+        expire = time.monotonic() + ttl
+        with self._lock:
+            for value, remote_id in mapping.items():
+                self._entries[(scope, value)] = (remote_id, expire)
+
+    def invalidate_model(self, url, db, model):
+        with self._lock:
+            for key in [key for key in self._entries
+                        if key[0][:3] == (url, db, model)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+enterprise_connections = EnterpriseConnectionManager()
+remote_id_cache = RemoteIdCache()
+
 
 # ---------------------------------------------------------------------------
 # Common Mixin for Enterprise Connection & External Reference
@@ -15,7 +110,10 @@ class POSIntegrationMixin(models.AbstractModel):
 
     @api.model
     def _get_enterprise_connection(self):
-        """Return a dict with xmlrpc proxies and credentials for Enterprise DB."""
+        """Return a dict with xmlrpc proxies and credentials for Enterprise DB.
+
+        The session and the proxies are reused across calls, see
+        EnterpriseConnectionManager."""
         config = self.env['ir.config_parameter'].sudo()
         url = config.get_param('pos_community_enterprise_integration.url')
         db = config.get_param('pos_community_enterprise_integration.db')
@@ -25,28 +123,42 @@ class POSIntegrationMixin(models.AbstractModel):
         if not all([url, db, username, password]):
             raise Exception("POS Integration: Enterprise connection parameters are not set correctly.")
 
-        common = xmlrpc.client.ServerProxy('%s/xmlrpc/2/common' % url)
-        uid = common.authenticate(db, username, password, {})
-        if not uid:
-            raise Exception("POS Integration: Authentication to Enterprise DB failed.")
-
-        models_proxy = xmlrpc.client.ServerProxy('%s/xmlrpc/2/object' % url)
+        uid = enterprise_connections.get_uid(url, db, username, password)
+        models_proxy = enterprise_connections.get_proxy(url, 'object')
 
         return {
             'url': url,
             'db': db,
             'uid': uid,
+            'username': username,
             'password': password,
             'models': models_proxy,
         }
 
-    def _rpc_search(self, model, domain, limit=1):
+    def _rpc_execute(self, model, method, args, kwargs=None):
+        """Call a method in Enterprise database, authenticating again once
+        if the cached session was refused."""
+        conn = self._get_enterprise_connection()
+        try:
+            return conn['models'].execute_kw(
+                conn['db'], conn['uid'], conn['password'],
+                model, method, args, kwargs or {}
+            )
+        except xmlrpc.client.Fault as e:
+            # Odoo answers an access denial with the fault code 3
+            if e.faultCode != 3:
+                raise
+        enterprise_connections.invalidate(
+            conn['url'], conn['db'], conn['username'], conn['password'])
         conn = self._get_enterprise_connection()
         return conn['models'].execute_kw(
             conn['db'], conn['uid'], conn['password'],
-            model, 'search', [domain], {'limit': limit}
+            model, method, args, kwargs or {}
         )
 
+    def _rpc_search(self, model, domain, limit=1):
+        return self._rpc_execute(model, 'search', [domain], {'limit': limit})
+
     def _rpc_search_id(self, model, domain):
         ids = self._rpc_search(model, domain, limit=1)
         return ids[0] if ids else False
@@ -54,63 +166,131 @@ class POSIntegrationMixin(models.AbstractModel):
     def _rpc_create(self, model, vals):
         """Create a record in Enterprise database."""
         conn = self._get_enterprise_connection()
-        return conn['models'].execute_kw(
-            conn['db'], conn['uid'], conn['password'],
-            model, 'create', [vals]
-        )
+        remote_id_cache.invalidate_model(conn['url'], conn['db'], model)
+        return self._rpc_execute(model, 'create', [vals])
+
+    # ---------------------------------------------------------
+    # Mapping of Community records to Enterprise ids
+    # ---------------------------------------------------------
+    def _get_mapping_ttl(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'pos_community_enterprise_integration.mapping_cache_ttl',
+            DEFAULT_MAPPING_TTL))
+
+    def _rpc_map(self, model, field, values, domain=None):
+        """Map field values to Enterprise ids, {value: id or False}.
+
+        Values not in the mapping cache are looked up together with a single
+        search_read; the first record matching a value wins, as with a
+        search limited to one record."""
+        values = list(dict.fromkeys(value for value in values if value))
+        if not values:
+            return {}
+        conn = self._get_enterprise_connection()
+        scope = (conn['url'], conn['db'], model, field, repr(domain or []))
+        ttl = self._get_mapping_ttl()
+        if ttl > 0:
+            result, missing = remote_id_cache.get_many(scope, values)
+        else:
+            result, missing = {}, values
+        if missing:
+            records = self._rpc_execute(
+                model, 'search_read',
+                [[(field, 'in', missing)] + list(domain or [])],
+                {'fields': [field]}
+            )
+            remote_ids = {}
+            for rec in records:
+                remote_ids.setdefault(rec[field], rec['id'])
+            fetched = {value: remote_ids.get(value, False) for value in missing}
+            if ttl > 0:
+                remote_id_cache.set_many(scope, fetched, ttl)
+            result.update(fetched)
+        return result
+
+    def _rpc_map_one(self, model, field, value, domain=None):
+        if not value:
+            return False
+        return self._rpc_map(model, field, [value], domain).get(value, False)
+
+    def _prefetch_enterprise_mapping(self, partners=None, users=None,
+                                     products=None, uoms=None, taxes=None,
+                                     currencies=None, payment_methods=None):
+        """Load the Enterprise ids of the given records in bulk, one
+        search_read per model, so the _map_* helpers are then answered by
+        the mapping cache."""
+        if partners:
+            self._rpc_map('res.partner', 'name', partners.mapped('name'))
+        if users:
+            self._rpc_map('res.users', 'login', users.mapped('login'))
+        if products:
+            self._rpc_map('product.product', 'default_code',
+                          products.mapped('default_code'))
+        if uoms:
+            self._rpc_map('uom.uom', 'name', uoms.mapped('name'))
+        if taxes:
+            self._map_taxes(taxes)
+        if currencies:
+            self._rpc_map('res.currency', 'name', currencies.mapped('name'))
+        if payment_methods:
+            self._rpc_map('pos.payment.method', 'name',
+                          payment_methods.mapped('name'))
 
     def _map_user_by_login(self, user):
         """Map user using login instead of name."""
         if not user or not user.login:
             return False
-        return self._rpc_search_id(
-            'res.users',
-            [('login', '=', user.login)]
-        )
+        return self._rpc_map_one('res.users', 'login', user.login)
 
     def _map_partner_by_name(self, partner):
-        return partner and self._rpc_search_id(
-            'res.partner', [('name', '=', partner.name)]
+        return partner and self._rpc_map_one(
+            'res.partner', 'name', partner.name
         )
 
     def _map_company_by_name(self, company):
-        return company and self._rpc_search_id(
-            'res.company', [('name', '=', company.name)]
+        return company and self._rpc_map_one(
+            'res.company', 'name', company.name
         )
 
     def _map_user_by_name(self, user):
-        return user and self._rpc_search_id(
-            'res.users', [('name', '=', user.name)]
+        return user and self._rpc_map_one(
+            'res.users', 'name', user.name
         )
 
     def _map_currency_by_name(self, currency):
-        return currency and self._rpc_search_id(
-            'res.currency', [('name', '=', currency.name)]
+        return currency and self._rpc_map_one(
+            'res.currency', 'name', currency.name
         )
 
     def _map_product_by_default_code(self, product):
         if not product or not product.default_code:
             return False
-        return self._rpc_search_id(
-            'product.product',
-            [('default_code', '=', product.default_code)]
+        return self._rpc_map_one(
+            'product.product', 'default_code', product.default_code
         )
 
     def _map_uom_by_name(self, uom):
-        return uom and self._rpc_search_id(
-            'uom.uom', [('name', '=', uom.name)]
+        return uom and self._rpc_map_one(
+            'uom.uom', 'name', uom.name
+        )
+
+    def _map_payment_method_by_name(self, payment_method):
+        return payment_method and self._rpc_map_one(
+            'pos.payment.method', 'name', payment_method.name
         )
 
     def _map_taxes(self, taxes):
+        tax_ids_by_name = {}
+        for type_tax_use in set(taxes.mapped('type_tax_use')):
+            names = taxes.filtered(
+                lambda t: t.type_tax_use == type_tax_use).mapped('name')
+            for name, tax_id in self._rpc_map(
+                    'account.tax', 'name', names,
+                    [('type_tax_use', '=', type_tax_use)]).items():
+                tax_ids_by_name[(name, type_tax_use)] = tax_id
         tax_ids = []
         for tax in taxes:
-            tax_id = self._rpc_search_id(
-                'account.tax',
-                [
-                    ('name', '=', tax.name),
-                    ('type_tax_use', '=', tax.type_tax_use),
-                ]
-            )
+            tax_id = tax_ids_by_name.get((tax.name, tax.type_tax_use))
             if tax_id:
                 tax_ids.append(tax_id)
         return tax_ids
@@ -1,10 +1,26 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.modules.registry import Registry
+from odoo.tools import split_every
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import logging
 
 _logger = logging.getLogger(__name__)
 
+DEFAULT_SYNC_BATCH_SIZE = 100
+DEFAULT_SYNC_WORKERS = 4
+DEFAULT_SYNC_SESSION_LIMIT = 50
+
+
+def _sync_session_worker(dbname, uid, context, session_id, commit):
+    """Sync one POS session in its own cursor (see _run_session_sync)."""
+    threading.current_thread().dbname = dbname
+    with Registry(dbname).cursor() as cr:
+        env = api.Environment(cr, uid, context)
+        return env['pos.session'].browse(session_id)._sync_one_session_to_enterprise(commit=commit)
+
 
 class POSPaymentIntegration(models.Model):
     _inherit = 'pos.payment'
@@ -29,14 +45,26 @@ class PosSessionIntegration(models.Model):
     )
     sync_message = fields.Char(copy=False)
     sync_date = fields.Datetime(copy=False)
+    sync_enterprise_id = fields.Integer(
+        readonly=True, copy=False,
+        help="ID of the session in Enterprise, set as soon as it is created "
+             "so that a failed batched sync resumes with the same session.",
+    )
+    sync_order_checkpoint = fields.Integer(
+        readonly=True, copy=False,
+        help="Last order synced by the batched sync, the next run resumes "
+             "with the orders after it.",
+    )
 
     # ---------------------------------------------------------
     # Sync logic with notifications
     # ---------------------------------------------------------
-    def _sync_pos_session_to_enterprise(self):
-        """Sync POS sessions to Enterprise with notifications"""
-        conn = self._get_enterprise_connection()
-        models_proxy = conn['models']
+    def _sync_pos_session_to_enterprise(self, commit=False):
+        """Sync POS sessions to Enterprise with notifications
+
+        :param commit: commit the progress of the sync, see
+            _sync_one_session_to_enterprise. Only the cron commits.
+        """
 
         success = []
         failed = []
@@ -55,58 +83,13 @@ class PosSessionIntegration(models.Model):
 
         _logger.info(f"Starting sync for {len(sessions)} session(s): {sessions.mapped('name')}")
 
-        for session in sessions:
-            try:
-                # Generate external ref ONCE
-                if not session.x_external_reference:
-                    session.x_external_reference = self.env['ir.sequence'].next_by_code(
-                        'pos.session.seq.integ'
-                    )
-
-                # Check if already exists in Enterprise
-                rec_ids = models_proxy.execute_kw(
-                    conn['db'], conn['uid'], conn['password'],
-                    'pos.session', 'search',
-                    [[('x_external_reference', '=', session.x_external_reference)]],
-                    {'limit': 1}
-                )
-
-                if rec_ids:
-                    _logger.warning(
-                        f"POS session {session.name} already exists in Enterprise (ID {rec_ids[0]}), skipping")
-                    success.append(f"{session.name} (already exists)")
-                    continue
-
-                # Prepare values
-                vals = self._prepare_pos_session_vals(session, models_proxy, conn)
-                session_e_id = models_proxy.execute_kw(
-                    conn['db'], conn['uid'], conn['password'],
-                    'pos.session', 'create', [vals]
-                )
-
-                # Create related records
-                self._sync_related_records(session, session_e_id, models_proxy, conn)
-
-                # Update sync status
-                session.write({
-                    'sync_state': 'synced',
-                    'sync_message': f'Synced to Enterprise ID {session_e_id}',
-                    'sync_date': fields.Datetime.now(),
-                })
-
-                success.append(session.name)
+        for label, session_e_id, error_msg in sessions._run_session_sync(commit=commit):
+            if error_msg:
+                failed.append(f"{label}: {error_msg}")
+                continue
+            success.append(label)
+            if session_e_id:
                 enterprise_ids.append(session_e_id)
-                _logger.info(f"✅ POS Session {session.name} synced to Enterprise ID {session_e_id}")
-
-            except Exception as e:
-                error_msg = str(e)
-                session.write({
-                    'sync_state': 'failed',
-                    'sync_message': error_msg,
-                    'sync_date': fields.Datetime.now(),
-                })
-                failed.append(f"{session.name}: {error_msg}")
-                _logger.error(f"❌ POS Session {session.name} sync failed: {error_msg}")
 
         # Show notification
         if failed:
@@ -114,7 +97,8 @@ class PosSessionIntegration(models.Model):
             if len(failed) > 10:
                 error_message += f"\n... and {len(failed) - 10} more errors"
 
-            self.env.cr.commit()
+            if commit:
+                self.env.cr.commit()
             raise UserError(
                 _("⚠️ Sync Results:\n\n"
                   "✅ Success: %s session(s)\n"
@@ -128,17 +112,200 @@ class PosSessionIntegration(models.Model):
             else:
                 ids_message = ""
 
-            self.env.cr.commit()
+            if commit:
+                self.env.cr.commit()
             raise UserError(
                 _("✅ Sync Successful!\n\n"
                   "%s POS session(s) synced successfully to Enterprise.%s") %
                 (len(success), ids_message)
             )
 
+    def _run_session_sync(self, commit=False):
+        """Sync the sessions through a bounded pool of workers, each one with
+        its own cursor. Falls back to the current cursor for a single
+        session or a single worker.
+
+        :return: a (label, enterprise id, error message) tuple per session
+        """
+        workers = int(self.env['ir.config_parameter'].sudo().get_param(
+            'pos_community_enterprise_integration.sync_workers', DEFAULT_SYNC_WORKERS))
+        if workers <= 1 or len(self) == 1:
+            return [session._sync_one_session_to_enterprise(commit=commit) for session in self]
+
+        # The workers only see committed data
+        if commit:
+            self.env.cr.commit()
+        dbname, uid, context = self.env.cr.dbname, self.env.uid, dict(self.env.context)
+        with ThreadPoolExecutor(max_workers=min(workers, len(self)),
+                                thread_name_prefix='pos_session_sync') as executor:
+            results = list(executor.map(
+                lambda session_id: _sync_session_worker(dbname, uid, context, session_id, commit),
+                self.ids,
+            ))
+        self.env.invalidate_all()
+        return results
+
+    def _get_sync_batch_size(self):
+        """Number of orders created per call by the batched sync, 0 (zero)
+        syncs orders, lines and payments one record at a time."""
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'pos_community_enterprise_integration.sync_batch_size', DEFAULT_SYNC_BATCH_SIZE))
+
+    def _sync_one_session_to_enterprise(self, commit=False):
+        """Sync one POS session. With commit, the batched sync commits once
+        the session is created and after each chunk of orders, so a failed
+        sync resumes from the last synced chunk. Without it, the checkpoints
+        are committed with the current transaction.
+
+        :return: a (label, enterprise id, error message) tuple
+        """
+        self.ensure_one()
+        session = self
+        mixin = self.env['pos.integration.mixin']
+        batch_size = self._get_sync_batch_size()
+        checkpoint = commit and batch_size > 0
+        try:
+            conn = mixin._get_enterprise_connection()
+            models_proxy = conn['models']
+            # Generate external ref ONCE
+            if not session.x_external_reference:
+                session.x_external_reference = self.env['ir.sequence'].next_by_code(
+                    'pos.session.seq.integ'
+                )
+
+            session_e_id = session.sync_enterprise_id
+            if not session_e_id:
+                # Check if already exists in Enterprise
+                rec_ids = mixin._rpc_search(
+                    'pos.session',
+                    [('x_external_reference', '=', session.x_external_reference)]
+                )
+
+                if rec_ids:
+                    _logger.warning(
+                        f"POS session {session.name} already exists in Enterprise (ID {rec_ids[0]}), skipping")
+                    return f"{session.name} (already exists)", False, False
+
+                # Prepare values
+                vals = self._prepare_pos_session_vals(session, models_proxy, conn)
+                session_e_id = mixin._rpc_execute('pos.session', 'create', [vals])
+                if batch_size > 0:
+                    session.sync_enterprise_id = session_e_id
+                if checkpoint:
+                    self.env.cr.commit()
+
+            # Create related records
+            if batch_size > 0:
+                self._sync_related_records_batched(session, session_e_id, batch_size, commit=commit)
+            else:
+                self._sync_related_records(session, session_e_id, models_proxy, conn)
+
+            # Update sync status
+            session.write({
+                'sync_state': 'synced',
+                'sync_message': f'Synced to Enterprise ID {session_e_id}',
+                'sync_date': fields.Datetime.now(),
+                'sync_enterprise_id': session_e_id,
+            })
+            if checkpoint:
+                self.env.cr.commit()
+            _logger.info(f"✅ POS Session {session.name} synced to Enterprise ID {session_e_id}")
+            return session.name, session_e_id, False
+
+        except Exception as e:
+            error_msg = str(e)
+            if checkpoint:
+                # Drop the unfinished chunk, the checkpoint is kept
+                self.env.cr.rollback()
+            session.write({
+                'sync_state': 'failed',
+                'sync_message': error_msg,
+                'sync_date': fields.Datetime.now(),
+            })
+            if checkpoint:
+                self.env.cr.commit()
+            _logger.error(f"❌ POS Session {session.name} sync failed: {error_msg}")
+            return session.name, False, error_msg
+
+    def _sync_related_records_batched(self, session, session_e_id, batch_size, commit=False):
+        """Sync orders with their lines and payments in chunks, one create
+        call per chunk, then pickings. The orders of the first chunk already
+        created by a run that failed before its checkpoint are not created
+        again."""
+        mixin = self.env['pos.integration.mixin']
+        orders = session.order_ids.filtered(
+            lambda o: o.state in ['paid', 'invoiced', 'done'] and o.id > session.sync_order_checkpoint
+        ).sorted('id')
+        mixin._prefetch_enterprise_mapping(
+            partners=orders.partner_id,
+            users=orders.user_id | session.user_id,
+            products=orders.lines.product_id,
+            payment_methods=orders.payment_ids.payment_method_id,
+        )
+        conn = mixin._get_enterprise_connection()
+        models_proxy = conn['models']
+
+        resumed = True
+        for order_ids in split_every(batch_size, orders.ids):
+            chunk = orders.browse(order_ids)
+            vals_list = []
+            for order in chunk:
+                order_vals = self._prepare_pos_order_vals(order, session_e_id, models_proxy, conn)
+                if not order_vals:
+                    continue
+                order_vals['lines'] = [
+                    (0, 0, line_vals) for line_vals in self._prepare_pos_order_line_vals_list(order)
+                ]
+                # Payments are created with the order, before confirming it
+                order_vals['payment_ids'] = [
+                    (0, 0, payment_vals)
+                    for payment_vals in self._prepare_pos_payment_vals_list(order, models_proxy, conn)
+                ]
+                vals_list.append(order_vals)
+            order_e_ids = []
+            if vals_list and resumed:
+                synced_orders = self._search_synced_orders(
+                    session_e_id, [vals['pos_reference'] for vals in vals_list])
+                vals_list = [vals for vals in vals_list if vals['pos_reference'] not in synced_orders]
+                order_e_ids = [order_e_id for order_e_id, state in synced_orders.values() if state == 'draft']
+            resumed = False
+            if vals_list:
+                order_e_ids += mixin._rpc_execute('pos.order', 'create', [vals_list])
+            if order_e_ids:
+                self._set_order_paid(order_e_ids, models_proxy, conn)
+            session.sync_order_checkpoint = chunk[-1].id
+            if commit:
+                self.env.cr.commit()
+            _logger.info(f"POS Session {session.name}: {len(vals_list)} order(s) synced up to order {chunk[-1].id}")
+
+        # Sync pickings
+        self._sync_pickings(session, session_e_id, models_proxy, conn)
+
+    def _search_synced_orders(self, session_e_id, references):
+        """Orders of the Enterprise session having one of the POS references
+
+        :return: the (enterprise id, state) of the orders by POS reference
+        """
+        references = [reference for reference in references if reference]
+        if not references:
+            return {}
+        orders = self.env['pos.integration.mixin']._rpc_execute(
+            'pos.order', 'search_read',
+            [[('session_id', '=', session_e_id), ('pos_reference', 'in', references)]],
+            {'fields': ['pos_reference', 'state']})
+        return {order['pos_reference']: (order['id'], order['state']) for order in orders}
+
     def _sync_related_records(self, session, session_e_id, models_proxy, conn):
         """Sync related records (orders, payments, pickings)"""
+        orders = session.order_ids.filtered(lambda o: o.state in ['paid', 'invoiced', 'done'])
+        self.env['pos.integration.mixin']._prefetch_enterprise_mapping(
+            partners=orders.partner_id,
+            users=orders.user_id | session.user_id,
+            products=orders.lines.product_id,
+            payment_methods=orders.payment_ids.payment_method_id,
+        )
         # Sync orders
-        for order in session.order_ids.filtered(lambda o: o.state in ['paid', 'invoiced', 'done']):
+        for order in orders:
             order_vals = self._prepare_pos_order_vals(order, session_e_id, models_proxy, conn)
             if order_vals:
                 order_e_id = models_proxy.execute_kw(
@@ -383,10 +550,12 @@ class PosSessionIntegration(models.Model):
 
         return vals
 
-    def _sync_order_lines(self, order, order_e_id, models_proxy, conn):
-        """Sync order lines"""
+    def _prepare_pos_order_line_vals_list(self, order):
+        """Prepare values of the order lines, lines whose product is not
+        found in Enterprise are skipped"""
         mixin = self.env['pos.integration.mixin']
 
+        vals_list = []
         for line in order.lines:
             product_e_id = False
             if line.product_id:
@@ -397,24 +566,28 @@ class PosSessionIntegration(models.Model):
                     f"Product {line.product_id.default_code if line.product_id else 'Unknown'} not found in Enterprise, skipping line")
                 continue
 
-            line_vals = {
-                'order_id': order_e_id,
+            vals_list.append({
                 'product_id': product_e_id,
                 'name': line.name or line.product_id.name,
                 'qty': line.qty or 1.0,
                 'price_unit': line.price_unit or 0.0,
                 'discount': line.discount or 0.0,
-            }
+            })
+        return vals_list
 
+    def _sync_order_lines(self, order, order_e_id, models_proxy, conn):
+        """Sync order lines"""
+        for line_vals in self._prepare_pos_order_line_vals_list(order):
+            line_vals['order_id'] = order_e_id
             models_proxy.execute_kw(
                 conn['db'], conn['uid'], conn['password'],
                 'pos.order.line', 'create', [line_vals]
             )
 
-    def _sync_payments(self, order, order_e_id, models_proxy, conn):
-        """Sync payments"""
-        mixin = self.env['pos.integration.mixin']
-
+    def _prepare_pos_payment_vals_list(self, order, models_proxy, conn):
+        """Prepare values of the order payments, payments whose method is
+        not found nor created in Enterprise are skipped"""
+        vals_list = []
         for payment in order.payment_ids:
             # Get payment method from Enterprise by name
             payment_method_e_id = self._get_or_create_payment_method(payment.payment_method_id, models_proxy, conn)
@@ -424,34 +597,39 @@ class PosSessionIntegration(models.Model):
                     f"Payment method {payment.payment_method_id.name} not found/created in Enterprise, skipping payment")
                 continue
 
-            # Create payment for the order
-            payment_vals = {
-                'pos_order_id': order_e_id,
+            vals_list.append({
                 'payment_method_id': payment_method_e_id,
                 'amount': payment.amount or 0.0,
                 'payment_date': payment.payment_date or fields.Datetime.now(),
-            }
+            })
+        return vals_list
 
+    def _sync_payments(self, order, order_e_id, models_proxy, conn):
+        """Sync payments"""
+        for payment_vals in self._prepare_pos_payment_vals_list(order, models_proxy, conn):
+            # Create payment for the order
+            payment_vals['pos_order_id'] = order_e_id
             models_proxy.execute_kw(
                 conn['db'], conn['uid'], conn['password'],
                 'pos.payment', 'create', [payment_vals]
             )
 
     def _set_order_paid(self, order_e_id, models_proxy, conn):
-        """Set order to paid state after payments are created"""
+        """Set order(s) to paid state after payments are created"""
+        order_e_ids = order_e_id if isinstance(order_e_id, list) else [order_e_id]
         try:
             # Set order to 'paid' state
             models_proxy.execute_kw(
                 conn['db'], conn['uid'], conn['password'],
                 'pos.order', 'write',
-                [[order_e_id], {'state': 'paid'}]
+                [order_e_ids, {'state': 'paid'}]
             )
 
             # Optionally set to 'done' if needed
             models_proxy.execute_kw(
                 conn['db'], conn['uid'], conn['password'],
                 'pos.order', 'write',
-                [[order_e_id], {'state': 'done'}]
+                [order_e_ids, {'state': 'done'}]
             )
         except Exception as e:
             _logger.warning(f"Could not set order {order_e_id} to paid/done state: {e}")
@@ -464,10 +642,7 @@ class PosSessionIntegration(models.Model):
             return False
 
         # First, try to find by name
-        payment_method_e_id = mixin._rpc_search_id(
-            'pos.payment.method',
-            [('name', '=', payment_method.name)]
-        )
+        payment_method_e_id = mixin._map_payment_method_by_name(payment_method)
 
         if payment_method_e_id:
             return payment_method_e_id
@@ -504,10 +679,7 @@ class PosSessionIntegration(models.Model):
         if journal_e_id:
             payment_method_vals['journal_id'] = journal_e_id
 
-        payment_method_e_id = models_proxy.execute_kw(
-            conn['db'], conn['uid'], conn['password'],
-            'pos.payment.method', 'create', [payment_method_vals]
-        )
+        payment_method_e_id = mixin._rpc_create('pos.payment.method', payment_method_vals)
 
         return payment_method_e_id
 
@@ -531,8 +703,7 @@ class PosSessionIntegration(models.Model):
         if self.sync_state == 'synced':
             raise UserError(_("This POS session is already synced."))
 
-        # Call sync on ONLY this session
-        return self._sync_pos_session_to_enterprise()
+        return self._schedule_enterprise_sync()
 
     def action_batch_sync_to_enterprise(self):
         """Sync multiple POS sessions"""
@@ -550,7 +721,20 @@ class PosSessionIntegration(models.Model):
                 len(synced_sessions)
             )
 
-        return selected_sessions._sync_pos_session_to_enterprise()
+        return selected_sessions._schedule_enterprise_sync()
+
+    def _schedule_enterprise_sync(self):
+        """Let the cron sync the pending and failed sessions, the sync
+        commits its progress and can't run in the user's transaction"""
+        self.env.ref('pos_community_enterprise_integration.ir_cron_pos_session_full_sync_enterprise')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _("%s POS session(s) will be synced to Enterprise in the background.") % len(self),
+            },
+        }
 
     # ---------------------------------------------------------
     # Reset action
@@ -564,6 +748,8 @@ class PosSessionIntegration(models.Model):
             'sync_message': False,
             'x_external_reference': False,
             'sync_date': False,
+            'sync_enterprise_id': False,
+            'sync_order_checkpoint': False,
         })
 
         raise UserError(_("Sync reset for %s.") % self.name)
@@ -574,14 +760,16 @@ class PosSessionIntegration(models.Model):
     @api.model
     def cron_sync_pos_sessions_to_enterprise(self):
         """Automatic sync of pending POS sessions"""
+        limit = int(self.env['ir.config_parameter'].sudo().get_param(
+            'pos_community_enterprise_integration.sync_session_limit', DEFAULT_SYNC_SESSION_LIMIT))
         sessions = self.search([
             ('state', '=', 'closed'),
             ('sync_state', 'in', ('pending', 'failed'))
-        ], limit=50)  # Limit to 50 per run
+        ], limit=limit)
 
         if sessions:
             try:
-                sessions._sync_pos_session_to_enterprise()
+                sessions._sync_pos_session_to_enterprise(commit=True)
             except UserError as e:
                 _logger.warning("Cron sync failed: %s", str(e))
             except Exception as e:
@@ -161,6 +161,11 @@ class PurchaseOrderIntegration(models.Model):
         }
 
         # Add order lines
+        mixin._prefetch_enterprise_mapping(
+            products=po.order_line.product_id,
+            uoms=po.order_line.product_uom_id,
+            taxes=po.order_line.tax_ids,
+        )
         line_commands = []
         for line in po.order_line:
             product_e_id = mixin._map_product_by_default_code(line.product_id)
@@ -26,3 +26,10 @@ class ResConfigSettings(models.TransientModel):
         required=True,
         config_parameter='pos_community_enterprise_integration.password',
     )
+    mapping_cache_ttl = fields.Integer(
+        string="Mapping Cache Duration (Seconds)",
+        default=300,
+        config_parameter='pos_community_enterprise_integration.mapping_cache_ttl',
+        help="Enterprise ids of partners, products, taxes... are reused during "
+             "this duration. Set to 0 (zero) to always look them up.",
+    )
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+import threading
+import xmlrpc.client
+from collections import Counter
+from socketserver import ThreadingMixIn
+from xmlrpc.server import (MultiPathXMLRPCServer, SimpleXMLRPCDispatcher,
+                           SimpleXMLRPCRequestHandler)
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.pos_integration import enterprise_connections, remote_id_cache
+
+
+class EnterpriseStandIn:
+    """Minimal Enterprise database answering the calls of the mixin."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.connections = 0
+        # number of the next calls refused as with an expired session
+        self.deny_calls = 0
+        self.records = {
+            'product.product': [
+                {'id': 100 + index, 'default_code': 'SYNC-%s' % index}
+                for index in range(5)
+            ],
+            'res.partner': [{'id': 7, 'name': 'Sync Customer'}],
+            'account.tax': [
+                {'id': 21, 'name': 'Sync Tax', 'type_tax_use': 'purchase'},
+                {'id': 22, 'name': 'Sync Tax', 'type_tax_use': 'sale'},
+            ],
+        }
+
+    def authenticate(self, db, login, password, user_agent_env):
+        self.calls['authenticate'] += 1
+        return 2 if password == 'secret' else False
+
+    def _match(self, record, domain):
+        for field, operator, value in domain:
+            if operator == 'in' and record.get(field) not in value:
+                return False
+            if operator == '=' and record.get(field) != value:
+                return False
+        return True
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        self.calls[method] += 1
+        if self.deny_calls:
+            self.deny_calls -= 1
+            raise xmlrpc.client.Fault(3, 'Access Denied')
+        kwargs = kwargs or {}
+        records = self.records.setdefault(model, [])
+        if method == 'create':
+            record = dict(args[0], id=1000 + len(records))
+            records.append(record)
+            return record['id']
+        found = [rec for rec in records if self._match(rec, args[0])]
+        if method == 'search':
+            return [rec['id'] for rec in found][:kwargs.get('limit') or None]
+        if method == 'search_read':
+            return [{field: rec.get(field, False)
+                     for field in ['id'] + kwargs.get('fields', [])}
+                    for rec in found]
+        raise ValueError(method)
+
+
+class ThreadedXMLRPCServer(ThreadingMixIn, MultiPathXMLRPCServer):
+    daemon_threads = True
+
+
+@tagged('post_install', '-at_install')
+class TestEnterpriseConnection(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stand_in = stand_in = EnterpriseStandIn()
+
+        class RequestHandler(SimpleXMLRPCRequestHandler):
+            # HTTP/1.1 keeps the connections open between calls
+            protocol_version = 'HTTP/1.1'
+            rpc_paths = ('/xmlrpc/2/common', '/xmlrpc/2/object')
+
+            def setup(self):
+                stand_in.connections += 1
+                super().setup()
+
+        cls.server = ThreadedXMLRPCServer(
+            ('127.0.0.1', 0), requestHandler=RequestHandler, logRequests=False)
+        for endpoint, function in [('common', stand_in.authenticate),
+                                   ('object', stand_in.execute_kw)]:
+            dispatcher = SimpleXMLRPCDispatcher()
+            dispatcher.register_function(function, function.__name__)
+            cls.server.add_dispatcher('/xmlrpc/2/%s' % endpoint, dispatcher)
+        thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        thread.start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+        config = cls.env['ir.config_parameter'].sudo()
+        for key, value in [
+            ('url', 'http://127.0.0.1:%s' % cls.server.server_address[1]),
+            ('db', 'enterprise'),
+            ('username', 'admin'),
+            ('password', 'secret'),
+        ]:
+            config.set_param('pos_community_enterprise_integration.%s' % key, value)
+        cls.mixin = cls.env['pos.integration.mixin']
+        cls.products = cls.env['product.product'].create([
+            {'name': 'Sync Product %s' % index,
+             'default_code': 'SYNC-%s' % index}
+            for index in range(6)
+        ])
+
+    def setUp(self):
+        super().setUp()
+        enterprise_connections.clear()
+        remote_id_cache.clear()
+        self.stand_in.calls.clear()
+        self.stand_in.connections = 0
+        self.stand_in.deny_calls = 0
+
+    def test_authenticate_once(self):
+        for _index in range(5):
+            self.mixin._rpc_search_id('res.partner', [('name', '=', 'Sync Customer')])
+        self.assertEqual(self.stand_in.calls['authenticate'], 1)
+        self.assertEqual(self.stand_in.calls['search'], 5)
+        # one keep-alive connection per endpoint
+        self.assertEqual(self.stand_in.connections, 2)
+
+    def test_authenticate_again_when_denied(self):
+        self.mixin._rpc_search_id('res.partner', [('name', '=', 'Sync Customer')])
+        self.stand_in.deny_calls = 1
+        partner_e_id = self.mixin._rpc_search_id(
+            'res.partner', [('name', '=', 'Sync Customer')])
+        self.assertEqual(partner_e_id, 7)
+        self.assertEqual(self.stand_in.calls['authenticate'], 2)
+        self.assertEqual(self.stand_in.calls['search'], 3)
+
+    def test_bulk_product_mapping(self):
+        self.mixin._prefetch_enterprise_mapping(products=self.products)
+        remote_ids = [self.mixin._map_product_by_default_code(product)
+                      for product in self.products]
+        self.assertEqual(remote_ids, [100, 101, 102, 103, 104, False])
+        # one search_read for all the products, the lines hit the cache
+        self.assertEqual(self.stand_in.calls['search_read'], 1)
+        self.assertEqual(self.stand_in.calls['search'], 0)
+
+    def test_mapping_cache_disabled(self):
+        self.env['ir.config_parameter'].sudo().set_param(
+            'pos_community_enterprise_integration.mapping_cache_ttl', 0)
+        for product in self.products[:3]:
+            self.mixin._map_product_by_default_code(product)
+            self.mixin._map_product_by_default_code(product)
+        self.assertEqual(self.stand_in.calls['search_read'], 6)
+
+    def test_map_taxes(self):
+        taxes = self.env['account.tax'].create([
+            {'name': 'Sync Tax', 'type_tax_use': 'sale', 'amount': 10},
+            {'name': 'Sync Tax', 'type_tax_use': 'purchase', 'amount': 10},
+        ])
+        self.assertEqual(self.mixin._map_taxes(taxes), [22, 21])
+        self.assertEqual(self.mixin._map_taxes(taxes), [22, 21])
+        self.assertEqual(self.stand_in.calls['search_read'], 2)
+
+    def test_create_invalidates_mapping(self):
+        partner = self.env['res.partner'].create({'name': 'New Customer'})
+        self.assertFalse(self.mixin._map_partner_by_name(partner))
+        partner_e_id = self.mixin._rpc_create('res.partner', {'name': 'New Customer'})
+        self.assertEqual(self.mixin._map_partner_by_name(partner), partner_e_id)
+        self.assertEqual(self.stand_in.calls['search_read'], 2)
+
+    def test_search_synced_orders(self):
+        self.stand_in.records['pos.order'] = [
+            {'id': 500, 'session_id': 9, 'pos_reference': 'Order 1', 'state': 'draft'},
+            {'id': 501, 'session_id': 9, 'pos_reference': 'Order 2', 'state': 'done'},
+            {'id': 502, 'session_id': 8, 'pos_reference': 'Order 3', 'state': 'done'},
+        ]
+        self.addCleanup(self.stand_in.records.pop, 'pos.order')
+        synced_orders = self.env['pos.session']._search_synced_orders(
+            9, ['Order 1', 'Order 2', 'Order 3', False])
+        self.assertEqual(synced_orders, {'Order 1': (500, 'draft'), 'Order 2': (501, 'done')})
+        self.assertEqual(self.env['pos.session']._search_synced_orders(9, [False]), {})
+        self.assertEqual(self.stand_in.calls['search_read'], 1)
@@ -6,7 +6,7 @@ _logger = logging.getLogger(__name__)
 class StockMove(models.Model):
     _inherit = 'stock.move'
 
-    def _get_all_related_moves(self, move):
+    def _get_all_related_moves(self, move, chain_moves=None):
         """الحصول على جميع الحركات المرتبطة عبر جميع السيناريوهات - bidirectional"""
         related_moves = self.env['stock.move']
         product = move.product_id
@@ -359,3 +359,26 @@ class TestPurchaseSaleInterCompany(TestAccountInvoiceInterCompanyBase):
                 "name": "Test",
             }
         )
+
+    def test_write_move_quantity(self):
+        """The quantity of a receipt move can be changed with the related moves
+        of the intercompany chain synced"""
+        stock_product = self.env["product.product"].create(
+            {
+                "name": "Stock Product",
+                "type": "consu",
+                "is_storable": True,
+            }
+        )
+        if "company_ids" in self.env["product.template"]._fields:
+            stock_product.company_ids = False
+        purchase = self._create_purchase_order(
+            self.partner_company_b, products=[stock_product]
+        )
+        self._approve_po(purchase)
+        move = purchase.picking_ids.move_ids.filtered(
+            lambda m: m.product_id == stock_product
+        )
+        self.assertTrue(move)
+        move.sudo().write({"quantity": 2.0})
+        self.assertEqual(move.quantity, 2.0)
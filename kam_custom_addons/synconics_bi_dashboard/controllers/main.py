@@ -0,0 +1,51 @@
+import json
+
+from odoo import http
+from odoo.http import request
+from odoo.tools.json import json_default
+
+from ..models.dashboard_render import iter_charts_data
+
+USER_CONTEXT_KEYS = ("lang", "tz", "allowed_company_ids")
+
+
+class DashboardChartController(http.Controller):
+    @http.route(
+        "/synconics_bi_dashboard/chart_data",
+        type="http",
+        auth="user",
+        methods=["GET"],
+        readonly=True,
+    )
+    def stream_chart_data(self, dashboard_id, chart_ids, context="{}", **kwargs):
+        """
+        Stream the data of the requested charts as JSON lines, in the order
+        the charts are computed
+        """
+        user_context = {
+            key: value
+            for key, value in json.loads(context).items()
+            if key in USER_CONTEXT_KEYS
+        }
+        dashboard = (
+            request.env["dashboard.dashboard"]
+            .with_context(**user_context)
+            .browse(int(dashboard_id))
+        )
+        jobs = dashboard._prepare_charts_data_jobs(
+            [chart_id for chart_id in chart_ids.split(",") if chart_id]
+        )
+
+        def generate():
+            for chart_id, chart_data in iter_charts_data(**jobs):
+                line = {"id": str(chart_id), "recordset": chart_data}
+                yield json.dumps(line, default=json_default) + "\n"
+
+        return request.make_response(
+            generate(),
+            headers=[
+                ("Content-Type", "application/x-ndjson"),
+                ("Cache-Control", "no-store"),
+                ("X-Accel-Buffering", "no"),
+            ],
+        )
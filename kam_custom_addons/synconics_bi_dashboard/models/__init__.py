@@ -5,3 +5,6 @@ from . import list_field
 from . import dashboard_action
 from . import dashboard
 from . import dashboard_chart
+from . import dashboard_chart_aggregate
+from . import dashboard_chart_cache
+from . import dashboard_render
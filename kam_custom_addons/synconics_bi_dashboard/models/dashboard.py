@@ -642,6 +642,19 @@ class Dashboard(models.Model):
         This function will return charts details and positioning and based on that
         charts will show in dashboard's menu
         """
+        return self._get_charts_details()
+
+    def get_charts_layout(self):
+        """
+        First step of the lazy dashboard rendering, same as get_charts_details
+        without the chart data which is then loaded with get_charts_data
+        """
+        return self._get_charts_details(with_data=False)
+
+    def _get_charts_details(self, with_data=True):
+        """
+        Charts visible to the current user with their positioning
+        """
         try:
             self.check_access("read")
         except Exception:
@@ -696,17 +709,19 @@ class Dashboard(models.Model):
                     else 0
                 }
             )
-            chart_data_list.append(
-                {
-                    "id": str(chart.id),
-                    "name": chart.name,
-                    "chart_type": chart.chart_type,
-                    "theme": chart.theme,
-                    "recordset": chart.get_chart_data(chart.chart_type, chart.name),
-                    "background_color": chart.background_color,
-                    **{k: dim[k] for k in ("x", "y", "h", "w", "minh")},
-                }
-            )
+            chart_details = {
+                "id": str(chart.id),
+                "name": chart.name,
+                "chart_type": chart.chart_type,
+                "theme": chart.theme,
+                "background_color": chart.background_color,
+                **{k: dim[k] for k in ("x", "y", "h", "w", "minh")},
+            }
+            if with_data:
+                chart_details["recordset"] = chart.get_chart_data(
+                    chart.chart_type, chart.name
+                )
+            chart_data_list.append(chart_details)
 
         return [
             int(self.auto_reload_duration),
@@ -2535,6 +2535,9 @@ class DashboardChart(models.Model):
         check_constraint = self.check_conf_obj(conf_obj)
         if check_constraint:
             return check_constraint
+        aggregated = self._aggregate_measurement_group_data(conf_obj)
+        if aggregated is not None:
+            return aggregated
 
         record_obj = self.env[conf_obj.model]
         today_date = False
@@ -2686,6 +2689,16 @@ class DashboardChart(models.Model):
                         )
                     )
 
+        return self._prepare_measurement_rows(
+            conf_obj, grouped_data, measurement_multiplier_value
+        )
+
+    def _prepare_measurement_rows(
+        self, conf_obj, grouped_data, measurement_multiplier_value
+    ):
+        """
+        Convert grouped measurement data to the rows used by the charts
+        """
         result = []
         for customer, metrics in grouped_data.items():
             row = {
@@ -2752,6 +2765,9 @@ class DashboardChart(models.Model):
         check_constraint = self.check_conf_obj(conf_obj, True)
         if check_constraint:
             return check_constraint
+        aggregated = self._aggregate_category_value_data(conf_obj)
+        if aggregated is not None:
+            return aggregated
 
         record_obj = self.env[conf_obj.model]
         today_date = False
@@ -2879,6 +2895,9 @@ class DashboardChart(models.Model):
         check_constraint = self.check_conf_obj(conf_obj, True)
         if check_constraint:
             return check_constraint
+        aggregated = self._aggregate_map_chart_data(conf_obj)
+        if aggregated is not None:
+            return aggregated
 
         record_obj = self.env[conf_obj.model]
         today_date = False
@@ -3014,6 +3033,9 @@ class DashboardChart(models.Model):
         check_constraint = self.check_conf_obj(conf_obj, True)
         if check_constraint:
             return check_constraint
+        aggregated = self._aggregate_meter_chart_data(conf_obj)
+        if aggregated is not None:
+            return aggregated
 
         record_obj = self.env[conf_obj.model]
         today_date = False
@@ -0,0 +1,443 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, time
+
+from odoo import models
+
+from .dashboard_chart import format_date_by_range
+
+GROUPABLE_FIELD_TYPES = ("many2one", "selection", "char", "integer", "boolean")
+MEASURABLE_FIELD_TYPES = ("integer", "float", "monetary")
+NO_DATA = {"type": "error", "message": "No Data to display!"}
+
+
+class DashboardChart(models.Model):
+    _inherit = "dashboard.chart"
+
+    # ------------------------------------------------------------------
+    # Configuration checks
+    # ------------------------------------------------------------------
+
+    def _aggregate_groupby_spec(self, record_obj, field_name, time_range=False):
+        """
+        Return the ``_read_group`` spec of a chart group by, or None when the
+        database can't group on it the way the python handlers do
+        """
+        field = record_obj._fields.get(field_name)
+        if not field or not field.store or not field.column_type:
+            return None
+        if field.type in ("date", "datetime"):
+            if time_range:
+                return f"{field_name}:{time_range}"
+            return f"{field_name}:day" if field.type == "date" else None
+        if field.type in GROUPABLE_FIELD_TYPES:
+            return field_name
+        return None
+
+    def _aggregate_can_measure(self, record_obj, measurement_fields):
+        """
+        Check that every measure is a stored numeric column
+        """
+        for measurement in measurement_fields:
+            field = record_obj._fields.get(measurement.name)
+            if (
+                not field
+                or not field.store
+                or field.type not in MEASURABLE_FIELD_TYPES
+            ):
+                return False
+        return True
+
+    def _aggregate_can_sort(self, conf_obj, record_obj):
+        """
+        Check that the configured sort field can be used in an ORDER BY
+        """
+        if not (conf_obj.sort_order and conf_obj.sort_field):
+            return True
+        field = record_obj._fields.get(conf_obj.sort_field)
+        return bool(field and field.store and field.column_type)
+
+    # ------------------------------------------------------------------
+    # Domain, limit and ordering
+    # ------------------------------------------------------------------
+
+    def _aggregate_domain(self, conf_obj, record_obj, previous=0):
+        """
+        Build the full domain of a chart, including the company and the date
+        filter, without touching ``conf_obj.domain``
+        """
+        domain = list(conf_obj.domain)
+        if conf_obj.company and "company_id" in record_obj._fields:
+            domain.append(("company_id", "in", [conf_obj.company, False]))
+        if (
+            conf_obj.date_filter_field
+            and conf_obj.date_filter_option
+            and conf_obj.date_filter_option != "none"
+        ):
+            date_domain = self.get_date_filter_domain(
+                record_obj,
+                conf_obj.date_filter_field,
+                conf_obj.date_filter_option,
+                conf_obj.include_periods,
+                conf_obj.same_period_previous_years,
+                previous,
+            )
+            start_date = date_domain.get("start_date")
+            end_date = date_domain.get("end_date")
+            if not date_domain.get("domain") or not start_date:
+                return domain
+            if end_date and start_date.date() != end_date.date():
+                domain.extend(date_domain["domain"])
+            elif record_obj._fields[conf_obj.date_filter_field].type == "datetime":
+                # single day filters compare the date part of the stored value
+                day_start = datetime.combine(start_date.date(), time.min)
+                domain += [
+                    (conf_obj.date_filter_field, ">=", day_start),
+                    (conf_obj.date_filter_field, "<", day_start + timedelta(days=1)),
+                ]
+            else:
+                domain.append((conf_obj.date_filter_field, "=", start_date.date()))
+        return domain
+
+    def _aggregate_limit_domain(self, conf_obj, record_obj, domain):
+        """
+        Record limits apply to the sorted records and not to the groups, so
+        select the limited ids first and aggregate on them
+        """
+        if conf_obj.limit_record <= 0:
+            return domain
+        order = None
+        if conf_obj.sort_order and conf_obj.sort_field:
+            order = f"{conf_obj.sort_field} {conf_obj.sort_order} NULLS LAST"
+        records = record_obj.search(domain, order=order, limit=conf_obj.limit_record)
+        return [("id", "in", records.ids)]
+
+    def _aggregate_group_order(self, conf_obj, record_obj, groupby_spec):
+        """
+        Order groups like the first appearance of their records in the sorted
+        recordset: the smallest (or largest) sort value of each group.
+        Return False when the order can't be expressed in SQL.
+        """
+        if not (conf_obj.sort_order and conf_obj.sort_field):
+            return None
+        if conf_obj.sort_field == conf_obj.group_by:
+            return f"{groupby_spec} {conf_obj.sort_order}"
+        sort_field = record_obj._fields[conf_obj.sort_field]
+        if sort_field.relational or sort_field.type == "boolean":
+            return False
+        aggregate = "max" if conf_obj.sort_order == "desc" else "min"
+        return f"{conf_obj.sort_field}:{aggregate} {conf_obj.sort_order} NULLS LAST"
+
+    # ------------------------------------------------------------------
+    # Values
+    # ------------------------------------------------------------------
+
+    def _aggregate_group_value(self, record_obj, field_name, time_range, value):
+        """
+        Convert a ``_read_group`` key to the (label, record id) pair the
+        charts use
+        """
+        field = record_obj._fields[field_name]
+        if field.type == "selection":
+            selection = field.selection
+            if isinstance(selection, str):
+                selection = getattr(record_obj, selection)()
+            elif callable(selection):
+                selection = selection(record_obj)
+            label = dict(selection).get(value)
+            return label, label
+        if field.type == "many2one":
+            return value.display_name, value.id
+        if time_range and value:
+            label = format_date_by_range(value, time_range)
+            return label, label
+        return value, value
+
+    def _aggregate_multiplier(self, conf_obj, measurement):
+        """
+        Multiplier configured on a measurement field, 1 if none
+        """
+        if not conf_obj.is_apply_multiplier:
+            return 1
+        return next(
+            (
+                m.get("multiplier", 1)
+                for m in conf_obj.chart_multiplier_ids
+                if m.get("field_id") == measurement.id
+            ),
+            1,
+        )
+
+    # ------------------------------------------------------------------
+    # Chart handlers
+    # ------------------------------------------------------------------
+
+    def _aggregate_measurement_group_data(self, conf_obj):
+        """
+        Database version of get_measurement_group_data, None when the
+        configuration needs the python implementation
+        """
+        record_obj = self.env[conf_obj.model].with_context(tz="UTC")
+        group_spec = self._aggregate_groupby_spec(
+            record_obj, conf_obj.group_by, conf_obj.time_range
+        )
+        groupby = [group_spec]
+        if conf_obj.sub_group_by:
+            groupby.append(
+                self._aggregate_groupby_spec(
+                    record_obj, conf_obj.sub_group_by, conf_obj.sub_time_range
+                )
+            )
+        measurements = (
+            conf_obj.measurement_field_ids
+            if conf_obj.data_type in ["sum", "average"]
+            else []
+        )
+        if (
+            None in groupby
+            or not self._aggregate_can_measure(record_obj, measurements)
+            or not self._aggregate_can_sort(conf_obj, record_obj)
+        ):
+            return None
+        order = self._aggregate_group_order(conf_obj, record_obj, group_spec)
+        if order is False:
+            return None
+
+        domain = self._aggregate_domain(conf_obj, record_obj)
+        if conf_obj.hide_false_value:
+            domain.append((conf_obj.group_by, "!=", False))
+            if conf_obj.sub_group_by:
+                domain.append((conf_obj.sub_group_by, "!=", False))
+        domain = self._aggregate_limit_domain(conf_obj, record_obj, domain)
+        aggregates = ["__count"] + [f"{m.name}:sum" for m in measurements]
+        groups = record_obj._read_group(domain, groupby, aggregates, order=order)
+        if not groups:
+            return NO_DATA
+
+        grouped_data = defaultdict(lambda: defaultdict(float))
+        counts = defaultdict(lambda: defaultdict(int))
+        for group in groups:
+            group_key = self._aggregate_group_value(
+                record_obj, conf_obj.group_by, conf_obj.time_range, group[0]
+            )
+            values = group[len(groupby) :]
+            count = values[0]
+            sub_groupby = False
+            if conf_obj.sub_group_by:
+                sub_groupby = self._aggregate_group_value(
+                    record_obj, conf_obj.sub_group_by, conf_obj.sub_time_range, group[1]
+                )[0]
+            if conf_obj.data_type == "count":
+                key = f"{sub_groupby} - count" if conf_obj.sub_group_by else " - count"
+                grouped_data[group_key][key] += count
+                continue
+            for measurement, total in zip(measurements, values[1:]):
+                key = (
+                    f"{sub_groupby} - {measurement.field_description}"
+                    if conf_obj.sub_group_by
+                    else f" - {measurement.field_description}"
+                )
+                if conf_obj.data_type == "sum":
+                    # averages are left unscaled, as in get_measurement_fields
+                    total = (total or 0) * self._aggregate_multiplier(
+                        conf_obj, measurement
+                    )
+                grouped_data[group_key][key] += total or 0
+                counts[group_key][key] += count
+
+        if conf_obj.data_type == "average":
+            for group_key, metrics in grouped_data.items():
+                for key, total in metrics.items():
+                    count = counts[group_key][key]
+                    metrics[key] = total / count if count else 0
+        return self._prepare_measurement_rows(conf_obj, grouped_data, {})
+
+    def _aggregate_category_value_data(self, conf_obj):
+        """
+        Database version of get_category_value_data, None when the
+        configuration needs the python implementation
+        """
+        record_obj = self.env[conf_obj.model].with_context(tz="UTC")
+        group_spec = self._aggregate_groupby_spec(record_obj, conf_obj.group_by)
+        measurements = (
+            conf_obj.measurement_field_id
+            if conf_obj.data_type in ["sum", "average"]
+            else []
+        )
+        if (
+            not group_spec
+            or not self._aggregate_can_measure(record_obj, measurements)
+            or not self._aggregate_can_sort(conf_obj, record_obj)
+        ):
+            return None
+
+        domain = self._aggregate_domain(conf_obj, record_obj)
+        if conf_obj.hide_false_value:
+            domain.append((conf_obj.group_by, "!=", False))
+            if conf_obj.sub_group_by:
+                domain.append((conf_obj.sub_group_by, "!=", False))
+        domain = self._aggregate_limit_domain(conf_obj, record_obj, domain)
+        aggregates = ["__count"] + [f"{m.name}:sum" for m in measurements]
+        groups = record_obj._read_group(domain, [group_spec], aggregates)
+        if not groups:
+            return NO_DATA
+
+        data_list = []
+        for group in groups:
+            category_instance, record_id = self._aggregate_group_value(
+                record_obj, conf_obj.group_by, False, group[0]
+            )
+            count = group[1]
+            category_value = count
+            if measurements:
+                category_value = group[2] or 0
+                if conf_obj.data_type == "average" and category_value:
+                    category_value /= count
+                category_value *= self._aggregate_multiplier(conf_obj, measurements)
+            if conf_obj.is_apply_multiplier and conf_obj.chart_multiplier_ids:
+                category_value *= conf_obj.chart_multiplier_ids[0].get("multiplier")
+            if conf_obj.hide_false_value and not category_instance:
+                continue
+            data_list.append(
+                {
+                    "category": category_instance,
+                    "record_id": record_id,
+                    "value": category_value,
+                }
+            )
+        if not data_list:
+            return NO_DATA
+        return sorted(
+            data_list,
+            key=lambda data: data.get("value"),
+            reverse=conf_obj.sort_order == "desc",
+        )
+
+    def _aggregate_map_chart_data(self, conf_obj):
+        """
+        Database version of get_map_chart_data. Records are grouped by the
+        map group by in SQL and the (few) groups are then folded per country.
+        """
+        record_obj = self.env[conf_obj.model]
+        map_field = record_obj._fields.get(conf_obj.map_group_by)
+        measurement = conf_obj.measurement_field_id
+        if (
+            not map_field
+            or map_field.type != "many2one"
+            or not map_field.store
+            or "country_id" not in self.env[map_field.comodel_name]._fields
+            or not self._aggregate_can_measure(record_obj, measurement)
+            or not self._aggregate_can_sort(conf_obj, record_obj)
+        ):
+            return None
+
+        domain = self._aggregate_domain(conf_obj, record_obj)
+        domain = self._aggregate_limit_domain(conf_obj, record_obj, domain)
+        aggregates = ["__count"]
+        if measurement:
+            aggregates += [f"{measurement.name}:sum", f"{measurement.name}:min"]
+        groups = record_obj._read_group(domain, [conf_obj.map_group_by], aggregates)
+        if not groups:
+            return NO_DATA
+
+        countries = {}
+        for group in groups:
+            country = group[0].country_id
+            values = countries.setdefault(
+                country, {"count": 0, "total": 0, "first": None}
+            )
+            values["count"] += group[1]
+            if measurement:
+                values["total"] += group[2] or 0
+                first = group[3] or 0
+                if values["first"] is None or first < values["first"]:
+                    values["first"] = first
+        if measurement:
+            # python handler walks the records by ascending measure value
+            countries = dict(
+                sorted(countries.items(), key=lambda item: item[1]["first"])
+            )
+
+        multiplier = self._aggregate_multiplier(conf_obj, measurement)
+        data_list = []
+        for country_id, values in countries.items():
+            category_value = 0
+            if conf_obj.data_type == "sum":
+                category_value = values["total"] * multiplier
+            elif conf_obj.data_type == "count":
+                category_value = values["count"]
+            elif conf_obj.data_type == "average":
+                if values["total"] != 0:
+                    category_value = values["total"] / values["count"]
+                category_value *= multiplier
+            if conf_obj.hide_false_value and (category_value == 0 or not country_id):
+                continue
+            data_list.append(
+                {
+                    "id": country_id.code,
+                    "name": country_id.name,
+                    "value": category_value,
+                    "record_id": country_id.id,
+                }
+            )
+        if not data_list:
+            return NO_DATA
+        return data_list
+
+    def _aggregate_meter_value(self, conf_obj, record_obj, previous=0):
+        """
+        Sum, average or count of the meter records, None when there are none
+        """
+        measurement = conf_obj.measurement_field_id
+        domain = self._aggregate_domain(conf_obj, record_obj, previous)
+        domain = self._aggregate_limit_domain(conf_obj, record_obj, domain)
+        aggregates = ["__count"]
+        if measurement and conf_obj.data_type in ["sum", "average"]:
+            aggregates.append(f"{measurement.name}:sum")
+        [values] = record_obj._read_group(domain, [], aggregates)
+        count = values[0]
+        if not count:
+            return None
+        if conf_obj.data_type == "sum":
+            return values[1] or 0
+        if conf_obj.data_type == "average":
+            return (values[1] or 0) / count
+        return count
+
+    def _aggregate_meter_chart_data(self, conf_obj):
+        """
+        Database version of get_meter_chart_data, None when the configuration
+        needs the python implementation
+        """
+        record_obj = self.env[conf_obj.model]
+        if not self._aggregate_can_measure(
+            record_obj, conf_obj.measurement_field_id
+        ) or not self._aggregate_can_sort(conf_obj, record_obj):
+            return None
+
+        total_vals = self._aggregate_meter_value(conf_obj, record_obj)
+        if total_vals is None:
+            return NO_DATA
+        target = conf_obj.meter_target
+        if (
+            conf_obj.date_filter_option
+            not in [
+                "none",
+                "past_till_now",
+                "past_excluding_today",
+                "future_starting_now",
+                "future_starting_tomorrow",
+            ]
+            and conf_obj.previous_period_comparision
+        ):
+            target = self._aggregate_meter_value(
+                conf_obj, record_obj, conf_obj.previous_period_duration
+            )
+            if target is None:
+                return {"type": "error", "message": "Target is not valid!"}
+        if target <= 0:
+            return {"type": "error", "message": "Target is not valid!"}
+        return {
+            "type": "success",
+            "current_value": round(total_vals, 2),
+            "target": target,
+        }
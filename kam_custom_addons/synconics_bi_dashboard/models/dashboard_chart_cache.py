@@ -0,0 +1,167 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from odoo import models, fields
+
+DEFAULT_CACHE_SIZE = 256
+UNCACHED_CHART_TYPES = ["to_do"]
+
+
+class ChartResultCache:
+    """
+    Process wide LRU cache of chart payloads.
+
+    Entries expire after their TTL. Changing a chart or refreshing its
+    dashboard drops its entries in the current worker, other workers rely
+    on the TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._stats = defaultdict(lambda: [0, 0])
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expire"] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats[key[:2]][0] += 1
+                return True, copy.deepcopy(entry["value"])
+            if entry:
+                self._pop(key)
+            self._stats[key[:2]][1] += 1
+            return False, None
+
+    def set(self, key, value, ttl, max_size):
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = {
+                "value": copy.deepcopy(value),
+                "expire": time.monotonic() + ttl,
+            }
+            while len(self._entries) > max_size:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate_charts(self, dbname, chart_ids):
+        chart_ids = set(chart_ids)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dbname and k[1] in chart_ids]:
+                self._pop(key)
+
+    def stats(self, dbname, chart_id):
+        with self._lock:
+            return tuple(self._stats.get((dbname, chart_id), (0, 0)))
+
+    def _pop(self, key):
+        self._entries.pop(key, None)
+
+
+chart_result_cache = ChartResultCache()
+
+
+class DashboardChart(models.Model):
+    _inherit = "dashboard.chart"
+
+    def _compute_cache_stats(self):
+        dbname = self.env.cr.dbname
+        for chart in self:
+            hits, misses = chart_result_cache.stats(dbname, chart.id)
+            chart.cache_hit_count = hits
+            chart.cache_miss_count = misses
+
+    cache_ttl = fields.Integer(
+        string="Cache Duration (Seconds)",
+        default=60,
+        help="Chart data is reused during this duration, unless the chart "
+        "is changed or the dashboard refreshed. Set to 0 (zero) to always "
+        "recompute it.",
+    )
+    cache_hit_count = fields.Integer(
+        string="Cache Hits", compute="_compute_cache_stats"
+    )
+    cache_miss_count = fields.Integer(
+        string="Cache Misses", compute="_compute_cache_stats"
+    )
+
+    def _get_chart_cache_key(self, chart_type, name):
+        """
+        Key the chart data by chart, configuration, user, access groups,
+        companies and day: record rules such as "own documents" depend on
+        the user, not only on the groups
+        """
+        conf, _domain = self._init_configuration()
+        configuration = repr(sorted(vars(conf).items()))
+        return (
+            self.env.cr.dbname,
+            self.id,
+            hashlib.sha1(
+                f"{chart_type}|{name}|{configuration}".encode()
+            ).hexdigest(),
+            self.env.uid,
+            tuple(sorted(self.env.user.group_ids.ids)),
+            tuple(self.env.companies.ids),
+            fields.Date.context_today(self),
+        )
+
+    def get_chart_data(
+        self,
+        chart_type,
+        name,
+        isDirty=False,
+        data=False,
+        extra_action=False,
+        print_options=False,
+    ):
+        """
+        Serve dashboard loads from the chart result cache, form previews
+        and drill downs are always recomputed
+        """
+        if (
+            isDirty
+            or extra_action
+            or print_options
+            or self.cache_ttl <= 0
+            or chart_type in UNCACHED_CHART_TYPES
+        ):
+            return super().get_chart_data(
+                chart_type, name, isDirty, data, extra_action, print_options
+            )
+        key = self._get_chart_cache_key(chart_type, name)
+        hit, result = chart_result_cache.get(key)
+        if hit:
+            return result
+        result = super().get_chart_data(chart_type, name)
+        max_size = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("synconics_bi_dashboard.chart_cache_size", DEFAULT_CACHE_SIZE)
+        )
+        chart_result_cache.set(key, result, self.cache_ttl, max_size)
+        return result
+
+    def write(self, vals):
+        chart_result_cache.invalidate_charts(self.env.cr.dbname, self.ids)
+        return super().write(vals)
+
+    def unlink(self):
+        chart_result_cache.invalidate_charts(self.env.cr.dbname, self.ids)
+        return super().unlink()
+
+
+class Dashboard(models.Model):
+    _inherit = "dashboard.dashboard"
+
+    def refresh_chart_cache(self):
+        """
+        Drop the cached data of the dashboard charts, the next load
+        recomputes them
+        """
+        self.check_access("read")
+        chart_result_cache.invalidate_charts(
+            self.env.cr.dbname, self.sudo().chart_ids.ids
+        )
+        return True
@@ -0,0 +1,94 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from odoo import models, api
+from odoo.modules.registry import Registry
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_RENDER_WORKERS = 4
+
+
+def _render_chart(dbname, uid, context, chart_id):
+    """
+    Compute the data of one chart in its own read-only cursor
+    """
+    threading.current_thread().dbname = dbname
+    try:
+        with Registry(dbname).cursor(readonly=True) as cr:
+            env = api.Environment(cr, uid, context)
+            chart = env["dashboard.chart"].browse(chart_id)
+            return chart.get_chart_data(chart.chart_type, chart.name)
+    except Exception:
+        _logger.exception("Failed to compute the data of dashboard chart %s", chart_id)
+        return {"type": "error", "message": "Unable to load chart data!"}
+
+
+def iter_charts_data(dbname, uid, context, chart_ids, workers):
+    """
+    Yield (chart id, chart data) pairs as soon as each chart is computed.
+    Charts are spread over a pool of threads, each one with its own cursor,
+    so that a slow chart doesn't delay the others.
+    """
+    if not chart_ids:
+        return
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(workers, len(chart_ids))),
+        thread_name_prefix="dashboard_chart",
+    ) as executor:
+        futures = {
+            executor.submit(_render_chart, dbname, uid, context, chart_id): chart_id
+            for chart_id in chart_ids
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+class Dashboard(models.Model):
+    _inherit = "dashboard.dashboard"
+
+    def _get_visible_chart_ids(self, chart_ids):
+        """
+        Keep the requested charts the current user is allowed to see
+        """
+        visible_ids = {
+            int(chart["id"])
+            for chart in self._get_charts_details(with_data=False)[1]
+        }
+        return [int(chart_id) for chart_id in chart_ids if int(chart_id) in visible_ids]
+
+    def _prepare_charts_data_jobs(self, chart_ids):
+        """
+        Everything the rendering threads need, evaluated in the request
+        transaction so it can be used once the request cursor is closed
+        """
+        self.ensure_one()
+        workers = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("synconics_bi_dashboard.chart_workers", DEFAULT_RENDER_WORKERS)
+        )
+        context = dict(self.env.context, allowed_company_ids=self.env.companies.ids)
+        return {
+            "dbname": self.env.cr.dbname,
+            "uid": self.env.uid,
+            "context": context,
+            "chart_ids": self._get_visible_chart_ids(chart_ids),
+            "workers": workers,
+        }
+
+    def get_charts_data(self, chart_ids):
+        """
+        Second step of the lazy dashboard rendering: compute the data of the
+        given (visible) charts in parallel, or in the current transaction
+        with a single worker
+        """
+        jobs = self._prepare_charts_data_jobs(chart_ids)
+        if jobs["workers"] <= 1:
+            charts = self.env["dashboard.chart"].browse(jobs["chart_ids"])
+            return {
+                chart.id: chart.get_chart_data(chart.chart_type, chart.name)
+                for chart in charts
+            }
+        return dict(iter_charts_data(**jobs))
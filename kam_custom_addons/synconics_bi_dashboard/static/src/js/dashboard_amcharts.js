@@ -1,9 +1,18 @@
 /** @odoo-module **/
 
-import { Component, onWillStart, onMounted, useState, useRef } from "@odoo/owl";
+import {
+  Component,
+  onWillStart,
+  onMounted,
+  onPatched,
+  onWillUnmount,
+  useState,
+  useRef,
+} from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { _t } from "@web/core/l10n/translation";
 import { useService } from "@web/core/utils/hooks";
+import { user } from "@web/core/user";
 import { DashboardChartWrapper } from "../js/dashboard_chart_wrapper";
 import { loadJS } from "@web/core/assets";
 import { isMobileOS } from "@web/core/browser/feature_detection";
@@ -50,9 +59,22 @@ export class DashboardAmcharts extends Component {
       if (isMobileOS()) {
         this.grid.column(1);
       }
+      this.observe_charts();
       this.update_timer();
     });
 
+    onPatched(() => {
+      // charts added after the first rendering
+      this.observe_new_charts();
+    });
+
+    onWillUnmount(() => {
+      if (this.chartObserver) {
+        this.chartObserver.disconnect();
+      }
+      clearTimeout(this.timer);
+    });
+
     this.onUpdateExport = (chartId, chartDetails) => {
       this.state.downloadDetails[chartId] = chartDetails;
     };
@@ -249,6 +271,13 @@ export class DashboardAmcharts extends Component {
 
     this.onEditDiscard = (ev) => window.location.reload();
 
+    this.onRefreshDashboard = async (ev) => {
+      await this.orm.call("dashboard.dashboard", "refresh_chart_cache", [
+        [this.props.action.params.record],
+      ]);
+      this.reloadKey.value += 1;
+    };
+
     this.editChart = (chartId, name, onHandleEdit) => {
       this.editLayout = true;
       var self = this;
@@ -314,11 +343,92 @@ export class DashboardAmcharts extends Component {
       this.state.charts,
       this.state.name,
       this.dashboard_user,
-    ] = await this.orm.call("dashboard.dashboard", "get_charts_details", [
+    ] = await this.orm.call("dashboard.dashboard", "get_charts_layout", [
       this.props.action.params.record,
     ]);
   }
 
+  observe_charts() {
+    // Only the charts scrolled into view are computed, in batches
+    this.pendingChartIds = new Set();
+    this.observedCharts = new WeakSet();
+    this.chartObserver = new IntersectionObserver((entries) => {
+      for (const entry of entries) {
+        if (entry.isIntersecting) {
+          this.chartObserver.unobserve(entry.target);
+          this.pendingChartIds.add(entry.target.getAttribute("data-chart-id"));
+        }
+      }
+      this.load_chart_data();
+    });
+    this.observe_new_charts();
+  }
+
+  observe_new_charts() {
+    if (!this.chartObserver) {
+      return;
+    }
+    document.querySelectorAll(".grid-stack .grid-stack-item").forEach((el) => {
+      if (!this.observedCharts.has(el)) {
+        this.observedCharts.add(el);
+        this.chartObserver.observe(el);
+      }
+    });
+  }
+
+  async load_chart_data() {
+    const chartIds = [...this.pendingChartIds];
+    this.pendingChartIds.clear();
+    if (!chartIds.length) {
+      return;
+    }
+    const params = new URLSearchParams({
+      dashboard_id: this.props.action.params.record,
+      chart_ids: chartIds.join(","),
+      context: JSON.stringify(user.context),
+    });
+    const loadedIds = new Set();
+    try {
+      const response = await fetch(
+        `/synconics_bi_dashboard/chart_data?${params}`,
+      );
+      if (!response.ok) {
+        throw new Error(`Chart data request failed: ${response.status}`);
+      }
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+          break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        for (const line of lines.filter((line) => line.trim())) {
+          const { id, recordset } = JSON.parse(line);
+          const chart = this.state.charts.find((chart) => chart.id === id);
+          if (chart) {
+            chart.recordset = recordset;
+            loadedIds.add(id);
+          }
+        }
+      }
+    } catch (error) {
+      console.error("Error loading chart data:", error);
+    }
+    // the charts the response didn't include stop spinning
+    for (const chart of this.state.charts) {
+      if (chartIds.includes(chart.id) && !loadedIds.has(chart.id)) {
+        chart.recordset = {
+          type: "error",
+          message: _t("Unable to load chart data!"),
+        };
+      }
+    }
+  }
+
   update_timer() {
     var self = this;
     self.timer = setTimeout(() => {
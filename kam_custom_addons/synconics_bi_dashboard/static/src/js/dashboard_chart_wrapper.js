@@ -30,7 +30,7 @@ export class DashboardChartWrapper extends Component {
     theme: String,
     chart_type: String,
     editChart: Function,
-    recordSets: Object,
+    recordSets: { type: Object, optional: true },
     background_color: String,
     dashboard_user: Boolean,
     reloadKey: Number,
@@ -48,6 +48,7 @@ export class DashboardChartWrapper extends Component {
       current_group_by: false,
       isKpiError: false,
       recordSets: this.props.recordSets,
+      loading: this.props.recordSets === undefined,
       exporting: false,
       background_color: this.props.background_color,
     });
@@ -67,6 +68,22 @@ export class DashboardChartWrapper extends Component {
     this.action = useService("action");
     this.dialog = useService("dialog");
     onWillUpdateProps((nextprops) => {
+      if (
+        nextprops.reloadKey === this.props.reloadKey &&
+        nextprops.recordSets !== this.props.recordSets
+      ) {
+        // data computed by the dashboard lazy loading
+        this.state.recordSets = nextprops.recordSets;
+        this.state.isKpiError = this.is_kpi_error(
+          nextprops.chart_type,
+          nextprops.recordSets,
+        );
+        this.state.loading = false;
+        return;
+      }
+      if (this.state.loading) {
+        return;
+      }
       this.update_record_sets(
         nextprops.chartId,
         nextprops.chart_type,
@@ -342,6 +359,16 @@ export class DashboardChartWrapper extends Component {
     return new Blob([array], { type: mime });
   }
 
+  is_kpi_error(chart_type, recordSets) {
+    return (
+      ["kpi", "tile"].includes(chart_type) &&
+      typeof recordSets === "object" &&
+      recordSets !== null &&
+      !Array.isArray(recordSets) &&
+      "type" in recordSets
+    );
+  }
+
   async update_record_sets(recordId, chart_type, isDirty, name, data) {
     let recordSets = await this.orm.call(
       "dashboard.chart",
@@ -0,0 +1,2 @@
+from . import test_dashboard_render
+from . import test_dashboard_chart_cache
@@ -0,0 +1,87 @@
+from odoo.tests import TransactionCase
+
+from odoo.addons.synconics_bi_dashboard.models.dashboard_chart_cache import (
+    chart_result_cache,
+)
+
+
+class TestDashboardChartCache(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dashboard = cls.env["dashboard.dashboard"].create({"name": "Cached"})
+        cls.chart = cls.env["dashboard.chart"].create(
+            {
+                "name": "Partners",
+                "dashboard_id": cls.dashboard.id,
+                "chart_type": "tile",
+                "model_id": cls.env["ir.model"]._get("res.partner").id,
+                "data_type": "count",
+                "cache_ttl": 600,
+            }
+        )
+        cls.user = cls.env["res.users"].create(
+            {
+                "name": "Dashboard User",
+                "login": "dashboard_cache_user",
+                "group_ids": [
+                    (6, 0, cls.env.ref("synconics_bi_dashboard.group_dashboard_user").ids)
+                ],
+            }
+        )
+
+    def setUp(self):
+        super().setUp()
+        chart_result_cache.invalidate_charts(self.env.cr.dbname, self.chart.ids)
+
+    def _get_data(self, chart=None):
+        chart = chart or self.chart
+        return chart.get_chart_data(chart.chart_type, chart.name)
+
+    def _stats(self):
+        return chart_result_cache.stats(self.env.cr.dbname, self.chart.id)
+
+    def test_cache_hit(self):
+        """The second load is served from the cache, until the TTL"""
+        hits, misses = self._stats()
+        data = self._get_data()
+        self.env["res.partner"].create({"name": "Not counted yet"})
+        self.assertEqual(self._get_data(), data)
+        self.assertEqual(self._stats(), (hits + 1, misses + 1))
+        self.chart.invalidate_recordset(["cache_hit_count"])
+        self.assertEqual(self.chart.cache_hit_count, hits + 1)
+
+    def test_cache_miss(self):
+        """Other users and uncached charts are computed again"""
+        self._get_data()
+        hits, misses = self._stats()
+        self._get_data(self.chart.with_user(self.user))
+        self.assertEqual(self._stats(), (hits, misses + 1))
+        self.chart.cache_ttl = 0
+        self._get_data()
+        self._get_data()
+        self.assertEqual(self._stats(), (hits, misses + 1))
+
+    def test_cache_expired(self):
+        """Expired entries are computed again"""
+        self._get_data()
+        for key, entry in chart_result_cache._entries.items():
+            if key[1] == self.chart.id:
+                entry["expire"] = 0
+        hits, misses = self._stats()
+        self._get_data()
+        self.assertEqual(self._stats(), (hits, misses + 1))
+
+    def test_cache_invalidation(self):
+        """Changing the chart or refreshing the dashboard drops its data"""
+        data = self._get_data()
+        self.chart.cache_ttl = 300
+        hits, misses = self._stats()
+        self._get_data()
+        self.assertEqual(self._stats(), (hits, misses + 1))
+
+        self.env["res.partner"].create({"name": "Counted after refresh"})
+        self.assertEqual(self._get_data(), data)
+        self.dashboard.refresh_chart_cache()
+        self.assertNotEqual(self._get_data(), data)
+        self.assertEqual(self._stats(), (hits + 1, misses + 2))
@@ -0,0 +1,89 @@
+import json
+from urllib.parse import urlencode
+
+from odoo.tests import HttpCase, TransactionCase, tagged
+from odoo.tools.json import json_default
+
+
+class DashboardRenderCommon(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dashboard = cls.env["dashboard.dashboard"].create({"name": "Lazy"})
+        partner_model = cls.env["ir.model"]._get("res.partner")
+        cls.chart, cls.hidden_chart = cls.env["dashboard.chart"].create(
+            [
+                {
+                    "name": "Partners",
+                    "dashboard_id": cls.dashboard.id,
+                    "chart_type": "tile",
+                    "model_id": partner_model.id,
+                    "data_type": "count",
+                },
+                {
+                    "name": "Hidden Partners",
+                    "dashboard_id": cls.dashboard.id,
+                    "chart_type": "tile",
+                    "model_id": partner_model.id,
+                    "data_type": "count",
+                    "group_ids": [(6, 0, cls.env.ref("base.group_no_one").ids)],
+                },
+            ]
+        )
+
+    def _set_workers(self, workers):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "synconics_bi_dashboard.chart_workers", workers
+        )
+
+    def _expected_data(self, user):
+        chart = self.chart.with_user(user)
+        data = chart.get_chart_data(chart.chart_type, chart.name)
+        return json.loads(json.dumps(data, default=json_default))
+
+
+class TestDashboardRender(DashboardRenderCommon):
+    def test_charts_data_single_worker(self):
+        """A single worker computes the visible charts in the transaction"""
+        self._set_workers(1)
+        self.env.user.group_ids -= self.env.ref("base.group_no_one")
+        data = self.dashboard.get_charts_data(
+            [str(self.chart.id), str(self.hidden_chart.id)]
+        )
+        self.assertEqual(list(data), [self.chart.id])
+        self.assertNotEqual(data[self.chart.id].get("type"), "error")
+        self.assertEqual(
+            data[self.chart.id],
+            self.chart.get_chart_data(self.chart.chart_type, self.chart.name),
+        )
+
+
+@tagged("post_install", "-at_install")
+class TestDashboardChartData(HttpCase, DashboardRenderCommon):
+    def _get_chart_data(self, chart_ids):
+        params = urlencode(
+            {
+                "dashboard_id": self.dashboard.id,
+                "chart_ids": ",".join(str(chart_id) for chart_id in chart_ids),
+            }
+        )
+        response = self.url_open(f"/synconics_bi_dashboard/chart_data?{params}")
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in response.text.splitlines() if line]
+
+    def test_stream_chart_data(self):
+        """The endpoint streams the data computed by the pool of workers"""
+        self._set_workers(2)
+        self.authenticate("admin", "admin")
+        lines = self._get_chart_data([self.chart.id, self.chart.id + 1000])
+        expected = self._expected_data(self.env.ref("base.user_admin"))
+        self.assertEqual(lines, [{"id": str(self.chart.id), "recordset": expected}])
+
+    def test_stream_chart_data_requires_user(self):
+        params = urlencode(
+            {"dashboard_id": self.dashboard.id, "chart_ids": str(self.chart.id)}
+        )
+        response = self.url_open(
+            f"/synconics_bi_dashboard/chart_data?{params}", allow_redirects=False
+        )
+        self.assertNotEqual(response.status_code, 200)
@@ -1,2 +1,8 @@
+from odoo.tools import SQL
 
 from . import models
+from .models.order_chain import ORDER_CHAIN_TABLE
+
+
+def uninstall_hook(env):
+    env.cr.execute(SQL("DROP TABLE IF EXISTS %s", SQL.identifier(ORDER_CHAIN_TABLE)))
@@ -34,4 +34,5 @@
     ],
     'demo': [
     ],
+    'uninstall_hook': 'uninstall_hook',
 }
@@ -7,4 +7,5 @@ from . import product_packaging
 from . import sale_order
 from . import product_pricelist
 from . import stock_move
+from . import order_chain
 from . import monkeypatch
\ No newline at end of file
@@ -0,0 +1,193 @@
+from odoo import models, api
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Links of the sale and purchase orders chained across companies. Each order
+# is linked both ways to every reference it carries (origin, customer or
+# vendor reference), so that the orders sharing a name or a reference are in
+# the same chain.
+ORDER_CHAIN_TABLE = 'wedo_order_chain_link'
+# Safety limit of the links followed from the start of a chain
+ORDER_CHAIN_MAX_DEPTH = 10
+
+
+class OrderChainMixin(models.AbstractModel):
+    _name = 'order.chain.mixin'
+    _description = 'Intercompany Order Chain'
+
+    # Column of the chain table holding the order, and fields of the order
+    # referencing other orders of the chain
+    _order_chain_column = None
+    _order_chain_reference_fields = []
+
+    def init(self):
+        """Create the chain table and link the orders of the model again, so
+        that the table is in sync after an update"""
+        super().init()
+        if self._abstract:
+            return
+        self.env.cr.execute(
+            SQL(
+                """
+                CREATE TABLE IF NOT EXISTS %(table)s (
+                    sale_order_id INTEGER
+                        REFERENCES sale_order(id) ON DELETE CASCADE,
+                    purchase_order_id INTEGER
+                        REFERENCES purchase_order(id) ON DELETE CASCADE,
+                    order_name VARCHAR NOT NULL,
+                    node VARCHAR NOT NULL,
+                    neighbour VARCHAR NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS %(node_index)s ON %(table)s (node);
+                CREATE INDEX IF NOT EXISTS %(order_name_index)s ON %(table)s (order_name);
+                CREATE INDEX IF NOT EXISTS %(sale_index)s ON %(table)s (sale_order_id);
+                CREATE INDEX IF NOT EXISTS %(purchase_index)s ON %(table)s (purchase_order_id);
+                DELETE FROM %(table)s WHERE %(column)s IS NOT NULL;
+                """,
+                table=SQL.identifier(ORDER_CHAIN_TABLE),
+                node_index=SQL.identifier(f'{ORDER_CHAIN_TABLE}_node_index'),
+                order_name_index=SQL.identifier(f'{ORDER_CHAIN_TABLE}_order_name_index'),
+                sale_index=SQL.identifier(f'{ORDER_CHAIN_TABLE}_sale_order_id_index'),
+                purchase_index=SQL.identifier(f'{ORDER_CHAIN_TABLE}_purchase_order_id_index'),
+                column=SQL.identifier(self._order_chain_column),
+            )
+        )
+        self.env.cr.execute(self._get_order_chain_insert_query(SQL("TRUE")))
+
+    @api.model
+    def _get_order_chain_insert_query(self, order_condition):
+        """Link the orders to their own name and to each of their references.
+        A reference listing several names separated by commas is linked to
+        each of them.
+
+        :param order_condition: SQL condition on the orders (``o``)
+        """
+        return SQL(
+            """
+            INSERT INTO %(table)s (%(column)s, order_name, node, neighbour)
+            SELECT link.order_id, link.order_name, link.node, link.neighbour
+            FROM (
+                SELECT o.id AS order_id, o.name AS order_name,
+                    o.name AS node, o.name AS neighbour
+                FROM %(order_table)s o
+                WHERE %(condition)s
+                UNION ALL
+                SELECT ref.order_id, ref.order_name, edge.node, edge.neighbour
+                FROM (
+                    SELECT o.id AS order_id, o.name AS order_name,
+                        TRIM(UNNEST(STRING_TO_ARRAY(
+                            CONCAT_WS(',', %(references)s), ','
+                        ))) AS value
+                    FROM %(order_table)s o
+                    WHERE %(condition)s
+                ) AS ref
+                CROSS JOIN LATERAL (
+                    VALUES
+                        (ref.order_name, ref.value),
+                        (ref.value, ref.order_name)
+                ) AS edge(node, neighbour)
+                WHERE ref.value != '' AND ref.value != ref.order_name
+            ) AS link
+            WHERE link.order_name IS NOT NULL
+            """,
+            table=SQL.identifier(ORDER_CHAIN_TABLE),
+            column=SQL.identifier(self._order_chain_column),
+            order_table=SQL.identifier(self._table),
+            condition=order_condition,
+            references=SQL(', ').join(
+                SQL.identifier('o', fname) for fname in self._order_chain_reference_fields
+            ),
+        )
+
+    def _refresh_order_chain(self):
+        """Rebuild the chain links of the orders"""
+        if not self.ids:
+            return
+        self.flush_recordset(['name'] + self._order_chain_reference_fields)
+        self.env.cr.execute(
+            SQL(
+                "DELETE FROM %s WHERE %s = ANY(%s)",
+                SQL.identifier(ORDER_CHAIN_TABLE),
+                SQL.identifier(self._order_chain_column),
+                self.ids,
+            )
+        )
+        self.env.cr.execute(
+            self._get_order_chain_insert_query(SQL("o.id = ANY(%s)", self.ids))
+        )
+
+    @api.model
+    def _get_order_chain(self, start_names):
+        """Sale and purchase orders of the chains going through the given
+        order names or references, across companies and ignoring access
+        rights.
+
+        :return: (sale orders, purchase orders)
+        """
+        SaleOrder = self.env['sale.order'].sudo()
+        PurchaseOrder = self.env['purchase.order'].sudo()
+        start_names = [name for name in start_names if name]
+        if not start_names:
+            return SaleOrder.browse(), PurchaseOrder.browse()
+        self.env.cr.execute(
+            SQL(
+                """
+                WITH RECURSIVE chain(node, depth) AS (
+                    SELECT UNNEST(%(start_names)s::VARCHAR[]), 0
+                    UNION
+                    SELECT link.neighbour, chain.depth + 1
+                    FROM chain
+                    JOIN %(table)s link ON link.node = chain.node
+                    WHERE chain.depth < %(max_depth)s
+                )
+                SELECT
+                    ARRAY_AGG(DISTINCT link.sale_order_id)
+                        FILTER (WHERE link.sale_order_id IS NOT NULL),
+                    ARRAY_AGG(DISTINCT link.purchase_order_id)
+                        FILTER (WHERE link.purchase_order_id IS NOT NULL)
+                FROM %(table)s link
+                WHERE link.order_name IN (SELECT node FROM chain)
+                """,
+                start_names=start_names,
+                table=SQL.identifier(ORDER_CHAIN_TABLE),
+                max_depth=ORDER_CHAIN_MAX_DEPTH,
+            )
+        )
+        sale_order_ids, purchase_order_ids = self.env.cr.fetchone()
+        sale_orders = SaleOrder.browse(sale_order_ids or [])
+        purchase_orders = PurchaseOrder.browse(purchase_order_ids or [])
+        _logger.info(
+            f"🔗 Order chain of {sorted(start_names)}: "
+            f"{len(sale_orders)} SO, {len(purchase_orders)} PO"
+        )
+        return sale_orders, purchase_orders
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        orders = super().create(vals_list)
+        orders._refresh_order_chain()
+        return orders
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'name', *self._order_chain_reference_fields} & set(vals):
+            self._refresh_order_chain()
+        return res
+
+
+class SaleOrder(models.Model):
+    _name = 'sale.order'
+    _inherit = ['sale.order', 'order.chain.mixin']
+
+    _order_chain_column = 'sale_order_id'
+    _order_chain_reference_fields = ['origin', 'client_order_ref']
+
+
+class PurchaseOrder(models.Model):
+    _name = 'purchase.order'
+    _inherit = ['purchase.order', 'order.chain.mixin']
+
+    _order_chain_column = 'purchase_order_id'
+    _order_chain_reference_fields = ['origin', 'partner_ref']
@@ -25,113 +25,28 @@ class StockMove(models.Model):
                 return True
         return super()._action_assign(force_qty=force_qty)
 
-    def _trace_through_chain(self, start_name, visited=None, depth=0):
-        """Recursively trace through the entire order chain, ignoring access rights"""
-        if visited is None:
-            visited = set()
-
-        if start_name in visited or not start_name or depth > 10:  # Safety limit
-            return set()
-
-        visited.add(start_name)
-        all_related_names = set([start_name])
-        indent = "  " * depth
-        _logger.info(f"{indent}🔍 Depth {depth}: Tracing from: {start_name}")
-
-        # Use sudo() to ignore access rights
-        PurchaseOrder = self.env['purchase.order'].sudo()
-        SaleOrder = self.env['sale.order'].sudo()
-
-        # Find POs
-        pos = PurchaseOrder.search([
-            '|', '|', '|',
-            ('origin', '=', start_name),
-            ('partner_ref', '=', start_name),
-            ('name', '=', start_name),
-            ('partner_ref', 'ilike', f'%{start_name}%')
-        ])
-
-        for po in pos:
-            _logger.info(f"{indent}  📥 Found PO: {po.name}")
-            all_related_names.add(po.name)
-            if po.origin and po.origin != po.name:
-                all_related_names.update(self._trace_through_chain(po.origin, visited, depth + 1))
-            if po.partner_ref and po.partner_ref not in [po.name, po.origin]:
-                all_related_names.update(self._trace_through_chain(po.partner_ref, visited, depth + 1))
-            if po.name != start_name:
-                all_related_names.update(self._trace_through_chain(po.name, visited, depth + 1))
-
-        # Find SOs
-        sos = SaleOrder.search([
-            '|', '|',
-            ('origin', '=', start_name),
-            ('name', '=', start_name),
-            ('client_order_ref', '=', start_name)
-        ])
-
-        for so in sos:
-            _logger.info(f"{indent}  📤 Found SO: {so.name}")
-            all_related_names.add(so.name)
-            if so.origin and so.origin != so.name:
-                all_related_names.update(self._trace_through_chain(so.origin, visited, depth + 1))
-            if so.name != start_name:
-                all_related_names.update(self._trace_through_chain(so.name, visited, depth + 1))
-
-            # print('all_related_names', all_related_names)
-
-        return all_related_names
+    def _get_chain_moves(self):
+        """Get the open moves of all the pickings chained to the picking of
+        the move, bypassing access rights"""
+        self.ensure_one()
+        if not self.picking_id:
+            return self.env['stock.move'].sudo()
+        related_pickings = self.picking_id.sudo()._get_chain_pickings().filtered(
+            lambda p: p.state not in ('done', 'cancel')
+        )
+        return related_pickings.mapped('move_ids').filtered(
+            lambda m: m.state not in ('done', 'cancel')
+        )
 
-    def _get_all_related_moves(self, move):
+    def _get_all_related_moves(self, move, chain_moves=None):
         """Get all related moves, bypassing access rights"""
-        related_moves = self.env['stock.move'].sudo()
         product = move.product_id
         _logger.info(f"🔍 Finding related moves for move {move.id} (Product: {product.name})")
-
-        start_names = set()
-
-        if move.picking_id:
-            picking = move.picking_id.sudo()
-            if picking.purchase_id:
-                po = picking.purchase_id
-                start_names.update([po.name, po.origin or '', po.partner_ref or ''])
-            elif picking.sale_id:
-                so = picking.sale_id
-                start_names.update([so.name, so.origin or ''])
-
-        if not start_names:
-            return related_moves
-
-        all_related_names = set()
-        for start_name in start_names:
-            if start_name:
-                all_related_names.update(self._trace_through_chain(start_name))
-
-        _logger.info(f"🔗 All related order names in chain: {sorted(all_related_names)}")
-
-        Picking = self.env['stock.picking'].sudo()
-
-        for order_name in all_related_names:
-            if not order_name:
-                continue
-
-            # PO pickings
-            po_pickings = Picking.search([
-                ('purchase_id.name', '=', order_name),
-                ('state', 'not in', ['done', 'cancel'])
-            ])
-            related_moves |= po_pickings.mapped('move_ids').filtered(
-                lambda m: m.product_id == product and m.id != move.id and m.state not in ('done', 'cancel')
-            )
-
-            # SO pickings
-            so_pickings = Picking.search([
-                ('sale_id.name', '=', order_name),
-                ('state', 'not in', ['done', 'cancel'])
-            ])
-            related_moves |= so_pickings.mapped('move_ids').filtered(
-                lambda m: m.product_id == product and m.id != move.id and m.state not in ('done', 'cancel')
-            )
-
+        if chain_moves is None:
+            chain_moves = move._get_chain_moves()
+        related_moves = chain_moves.filtered(
+            lambda m: m.product_id == product and m.id != move.id
+        )
         _logger.info(f"🎯 Total related moves found: {len(related_moves)}")
         return related_moves
 
@@ -150,8 +65,13 @@ class StockMove(models.Model):
 
         res = super().write(vals)
 
+        # Moves of the same picking share the same chain
+        chain_moves_by_picking = {}
         for move in self:
-            related_moves = move._get_all_related_moves(move)
+            if move.picking_id not in chain_moves_by_picking:
+                chain_moves_by_picking[move.picking_id] = move._get_chain_moves()
+            related_moves = move._get_all_related_moves(
+                move, chain_moves_by_picking[move.picking_id])
             if related_moves:
                 update_vals = {}
                 if 'quantity' in vals:
@@ -215,47 +135,43 @@ class StockPicking(models.Model):
             allowed_company_ids=company_ids
         )
 
-    def _get_all_related_pickings(self):
-        related_pickings = self.browse()
+    def _get_chain_start_names(self):
+        """Names and references of the order of the picking the chain is
+        looked up from"""
         start_names = set()
-
         if self.purchase_id:
             po = self.purchase_id.sudo()
             start_names.update([po.name, po.origin or '', po.partner_ref or ''])
         elif self.sale_id:
             so = self.sale_id.sudo()
             start_names.update([so.name, so.origin or ''])
+        return {name for name in start_names if name}
 
-        if not start_names:
-            return related_pickings
-
-        StockMove = self.env['stock.move']
-        all_related_names = set()
-        for name in start_names:
-            all_related_names |= StockMove._trace_through_chain(name)
-
-        _logger.info(f"🔗 Related chain: {sorted(all_related_names)}")
-
+    def _get_chain_pickings(self):
+        """Get the pickings of all the orders chained to the order of the
+        picking, in all companies"""
+        self.ensure_one()
         PickingEnv = self._get_super_env()
+        start_names = self._get_chain_start_names()
+        if not start_names:
+            return PickingEnv.browse()
+        sale_orders, purchase_orders = self.env['order.chain.mixin']._get_order_chain(start_names)
+        if not sale_orders and not purchase_orders:
+            return PickingEnv.browse()
+        return PickingEnv.search([
+            '|',
+            ('purchase_id', 'in', purchase_orders.ids),
+            ('sale_id', 'in', sale_orders.ids),
+            ('state', '!=', 'cancel')
+        ])
 
-        for name in all_related_names:
-            if not name:
-                continue
-            related_pickings |= PickingEnv.search([
-                '|',
-                ('purchase_id.name', '=', name),
-                ('sale_id.name', '=', name),
-                ('state', 'not in', ('cancel'))
-            ])
-
+    def _get_all_related_pickings(self):
+        related_pickings = self._get_chain_pickings()
         return related_pickings.filtered(lambda p: p.id != self.id)
 
     def _get_all_related_orders_across_companies(self):
         self.ensure_one()
 
-        SaleOrder = self.env['sale.order'].sudo()
-        PurchaseOrder = self.env['purchase.order'].sudo()
-
         start_names = set()
 
         if self.purchase_id:
@@ -271,59 +187,47 @@ class StockPicking(models.Model):
                 self.sale_id.origin or '',
             ])
 
-        start_names = {n for n in start_names if n}
-
-        if not start_names:
-            return SaleOrder.browse(), PurchaseOrder.browse()
-
-        # 🔥 TRACE FULL CHAIN
-        all_names = set()
-        for name in start_names:
-            all_names |= self.env['stock.move']._trace_through_chain(name)
-
-        _logger.info(f"🧾 Accounting chain resolved: {sorted(all_names)}")
+        # 🔥 CHAIN ORDERS (ALL COMPANIES)
+        sale_orders, purchase_orders = self.env['order.chain.mixin']._get_order_chain(start_names)
 
-        # 🔥 FETCH ALL ORDERS (ALL COMPANIES)
-        sale_orders = SaleOrder.search([
-            '|',
-            ('name', 'in', list(all_names)),
-            ('origin', 'in', list(all_names)),
-        ])
-
-        purchase_orders = PurchaseOrder.search([
-            '|',
-            ('name', 'in', list(all_names)),
-            ('origin', 'in', list(all_names)),
-        ])
-        # print('sale_orders',sale_orders)
-        # print('purchase_orders',purchase_orders)
+        _logger.info(
+            f"🧾 Accounting chain resolved: "
+            f"{sorted(sale_orders.mapped('name') + purchase_orders.mapped('name'))}"
+        )
 
         return sale_orders, purchase_orders
 
     def _create_and_post_bills(self, purchase_orders):
-        for po in purchase_orders:
-            po = po.sudo().with_company(po.company_id)
+        for company, company_orders in purchase_orders.grouped('company_id').items():
+            bills = self.env['account.move'].sudo().with_company(company)
+            for po in company_orders:
+                po = po.sudo().with_company(company)
 
-            # 🔄 Force recompute after receipt
-            # po._compute_invoice_status()
+                # 🔄 Force recompute after receipt
+                # po._compute_invoice_status()
 
-            if po.invoice_status != 'to invoice':
-                _logger.info(f"⏭️ PO {po.name} not invoiceable (status={po.invoice_status})")
-                continue
+                if po.invoice_status != 'to invoice':
+                    _logger.info(f"⏭️ PO {po.name} not invoiceable (status={po.invoice_status})")
+                    continue
 
-            # ❌ Prevent duplicates
-            if po.invoice_ids.filtered(lambda m: m.state != 'cancel'):
-                continue
+                # ❌ Prevent duplicates
+                if po.invoice_ids.filtered(lambda m: m.state != 'cancel'):
+                    continue
 
-            invoice_action = po.action_create_invoice()
-            if not invoice_action or not invoice_action.get('res_id'):
+                invoice_action = po.action_create_invoice()
+                if not invoice_action or not invoice_action.get('res_id'):
+                    continue
+
+                bills |= bills.browse(invoice_action['res_id'])
+
+            if not bills:
                 continue
 
-            bill = self.env['account.move'].browse(invoice_action['res_id'])
-            bill.invoice_date = fields.Date.today()
-            bill.action_post()
+            # Post all the bills of the company at once
+            bills.write({'invoice_date': fields.Date.today()})
+            bills.action_post()
 
-            _logger.info(f"🧾 Bill created & posted for PO {po.name}")
+            _logger.info(f"🧾 Bills created & posted for {company.name}: {', '.join(bills.mapped('name'))}")
 
     def _so_has_negative_qty(self, so):
         return any(
@@ -345,18 +249,19 @@ class StockPicking(models.Model):
                 return False
         return True
 
-    def _create_refund_from_sale_order(self, so):
-        Move = self.env['account.move']
-
+    def _prepare_move_vals_from_sale_order(self, so, move_type):
+        """Invoice or credit note values of the delivered quantities of the
+        sale order, None when there is nothing to invoice"""
         invoice_vals = so._prepare_invoice()
         invoice_vals.update({
-            'move_type': 'out_refund',
+            'move_type': move_type,
             'invoice_origin': so.name,
         })
 
+        refund = move_type == 'out_refund'
         lines = []
         for line in so.order_line.filtered(
-                lambda l: not l.display_type and l.qty_delivered < 0
+                lambda l: not l.display_type and (l.qty_delivered < 0 if refund else l.qty_delivered > 0)
         ):
             lines.append((0, 0, {
                 'product_id': line.product_id.id,
@@ -368,11 +273,17 @@ class StockPicking(models.Model):
             }))
 
         if not lines:
-            return self.env['account.move']
+            return None
 
         invoice_vals['invoice_line_ids'] = lines
+        return invoice_vals
 
-        refund = Move.sudo().with_company(so.company_id).create(invoice_vals)
+    def _create_refund_from_sale_order(self, so):
+        invoice_vals = self._prepare_move_vals_from_sale_order(so, 'out_refund')
+        if not invoice_vals:
+            return self.env['account.move']
+
+        refund = self.env['account.move'].sudo().with_company(so.company_id).create(invoice_vals)
         refund.action_post()
 
         _logger.info("🧾 Refund created: %s for SO %s", refund.name, so.name)
@@ -381,54 +292,34 @@ class StockPicking(models.Model):
     def _create_and_post_invoices(self, sale_orders):
         created_moves = self.env['account.move']
 
-        for so in sale_orders:
-            so = so.sudo().with_company(so.company_id)
-
-            delivered_qty = self._get_delivered_qty(so)
-            if not delivered_qty:
-                continue
+        for company, company_orders in sale_orders.grouped('company_id').items():
+            invoice_vals_list = []
+            for so in company_orders:
+                so = so.sudo().with_company(company)
 
-            # 🔒 PREVENT DUPLICATES (THE FIX)
-            if self._is_so_fully_invoiced_for_delivery(so):
-                _logger.info("⏭️ SO %s already invoiced for delivered qty", so.name)
-                continue
-
-            # 🔴 RETURN → CREDIT NOTE
-            if delivered_qty < 0:
-                refund = self._create_refund_from_sale_order(so)
-                created_moves |= refund
+                delivered_qty = self._get_delivered_qty(so)
+                if not delivered_qty:
+                    continue
 
-            # 🟢 NORMAL DELIVERY → INVOICE
-            else:
-                Move = self.env['account.move']
-
-                invoice_vals = so._prepare_invoice()
-                invoice_vals.update({
-                    'move_type': 'out_invoice',
-                    'invoice_origin': so.name,
-                })
-
-                lines = []
-                for line in so.order_line.filtered(
-                        lambda l: not l.display_type and l.qty_delivered > 0
-                ):
-                    lines.append((0, 0, {
-                        'product_id': line.product_id.id,
-                        'name': line.name,
-                        'quantity': line.qty_delivered,
-                        'price_unit': line.price_unit,
-                        'tax_ids': [(6, 0, line.tax_ids.ids)],
-                        'sale_line_ids': [(6, 0, line.ids)],
-                    }))
-
-                if not lines:
+                # 🔒 PREVENT DUPLICATES (THE FIX)
+                if self._is_so_fully_invoiced_for_delivery(so):
+                    _logger.info("⏭️ SO %s already invoiced for delivered qty", so.name)
                     continue
 
-                invoice_vals['invoice_line_ids'] = lines
+                # 🔴 RETURN → CREDIT NOTE
+                # 🟢 NORMAL DELIVERY → INVOICE
+                move_type = 'out_refund' if delivered_qty < 0 else 'out_invoice'
+                invoice_vals = self._prepare_move_vals_from_sale_order(so, move_type)
+                if invoice_vals:
+                    invoice_vals_list.append(invoice_vals)
+
+            if not invoice_vals_list:
+                continue
 
-                invoice = Move.sudo().with_company(so.company_id).create(invoice_vals)
-                invoice.action_post()
-                created_moves |= invoice
+            # Create and post all the customer moves of the company at once
+            moves = self.env['account.move'].sudo().with_company(company).create(invoice_vals_list)
+            moves.action_post()
+            created_moves |= moves
 
         _logger.info(
             "🧾 Customer moves created: %s",
@@ -472,26 +363,12 @@ class StockPicking(models.Model):
 
         _logger.info(f"🔄 Auto-validating {len(related_pickings)} related pickings")
 
-        for rp in related_pickings:
-            try:
-                rp = rp.with_company(rp.company_id).with_context(skip_intercompany_sync=True)
-                for move in rp.move_ids.filtered(lambda m: m.state not in ('done', 'cancel')):
-                    qty = move.quantity
-
-                    # 🔑 Force product_uom_qty to match synced quantity
-                    move.sudo().with_context(skip_qty_confirmed_check=True).write({'product_uom_qty': qty})
-
+        related_pickings = related_pickings.filtered(lambda p: p.state not in ('done', 'cancel'))
+        for company, company_pickings in related_pickings.grouped('company_id').items():
+            picking._validate_related_pickings(company, company_pickings)
 
-
-                # Now validate safely
-                super(StockPicking, rp).button_validate()
-                _logger.info(f"✅ Auto-validated {rp.name}")
-
-            except Exception as e:
-                _logger.error(f"❌ Failed validating {rp.name}: {e}")
         sale_orders, purchase_orders = picking._get_all_related_orders_across_companies()
 
-
         # Vendor Bills (PO)
         picking._create_and_post_bills(purchase_orders)
 
@@ -499,3 +376,34 @@ class StockPicking(models.Model):
         picking._create_and_post_invoices(sale_orders)
 
         return res
+
+    def _validate_related_pickings(self, company, pickings):
+        """Validate the related pickings of a company together, falling back
+        to one picking at a time when the batch fails"""
+        pickings = pickings.with_company(company).with_context(skip_intercompany_sync=True)
+        moves = pickings.move_ids.filtered(
+            lambda m: m.state not in ('done', 'cancel') and m.product_uom_qty != m.quantity
+        )
+        # 🔑 Force product_uom_qty to match synced quantity, the related moves
+        # are all aligned here so there is nothing to sync between them
+        for qty, qty_moves in moves.grouped('quantity').items():
+            qty_moves.sudo().with_context(
+                skip_qty_confirmed_check=True, skip_all_sync=True
+            ).write({'product_uom_qty': qty})
+
+        # Now validate safely
+        try:
+            with self.env.cr.savepoint():
+                super(StockPicking, pickings).button_validate()
+            _logger.info(f"✅ Auto-validated {', '.join(pickings.mapped('name'))}")
+            return
+        except Exception as e:
+            _logger.error(f"❌ Failed validating {', '.join(pickings.mapped('name'))} together: {e}")
+
+        for rp in pickings:
+            try:
+                with self.env.cr.savepoint():
+                    super(StockPicking, rp).button_validate()
+                _logger.info(f"✅ Auto-validated {rp.name}")
+            except Exception as e:
+                _logger.error(f"❌ Failed validating {rp.name}: {e}")